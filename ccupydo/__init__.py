@@ -9,3 +9,5 @@ from CCupydo import CManager
 from CCupydo import CInterfaceMatrix
 from CCupydo import CFlexInterfaceData
 from CCupydo import CLinearSolver
+from CCupydo import CInterfacePermutation
+from CCupydo import ADTPoint
@@ -280,6 +280,7 @@ class AlgorithmExplicit(Algorithm):
             self.FluidSolver.remeshing()
             self.fluidRemeshingTimer.stop()
             self.fluidRemeshingTimer.cumul()
+            self.interfaceInterpolator.updateMapping()
             # ---
 
             self.timeIter += 1
@@ -553,6 +554,7 @@ class AlgorithmBGSStaticRelax(Algorithm):
             self.FluidSolver.remeshing()
             self.fluidRemeshingTimer.stop()
             self.fluidRemeshingTimer.cumul()
+            self.interfaceInterpolator.updateMapping()
             # ---
 
             if self.timeIter >= self.timeIterTreshold and self.predictor:
@@ -739,9 +741,8 @@ class AlgorithmBGSStaticRelax(Algorithm):
 
         if self.myid in self.manager.getSolidInterfaceProcessors():
             localSolidInterfaceDisp_X, localSolidInterfaceDisp_Y, localSolidInterfaceDisp_Z = self.SolidSolver.getNodalDisplacements()
-            for iVertex in range(self.manager.getNumberOfLocalSolidInterfaceNodes()):
-                iGlobalVertex = self.manager.getGlobalIndex('solid', self.myid, iVertex)
-                predictedDisplacement[iGlobalVertex] = [localSolidInterfaceDisp_X[iVertex], localSolidInterfaceDisp_Y[iVertex], localSolidInterfaceDisp_Z[iVertex]]
+            solidGlobalIndices = self.manager.getGlobalIndices('solid', self.myid)
+            predictedDisplacement.setLocalBlock(solidGlobalIndices, [localSolidInterfaceDisp_X, localSolidInterfaceDisp_Y, localSolidInterfaceDisp_Z])
 
         predictedDisplacement.assemble()
 
@@ -765,10 +766,9 @@ class AlgorithmBGSStaticRelax(Algorithm):
         if self.myid in self.manager.getSolidInterfaceProcessors():
             localSolidInterfaceHeatFlux_X, localSolidInterfaceHeatFlux_Y, localSolidInterfaceHeatFlux_Z = self.SolidSolver.getNodalHeatFluxes()
             localSolidInterfaceTemperature = self.SolidSolver.getNodalTemperatures()
-            for iVertex in range(self.manager.getNumberOfLocalSolidInterfaceNodes()):
-                iGlobalVertex = self.manager.getGlobalIndex('solid', self.myid, iVertex)
-                predictedHF[iGlobalVertex] = [localSolidInterfaceHeatFlux_X[iVertex], localSolidInterfaceHeatFlux_Y[iVertex], localSolidInterfaceHeatFlux_Z[iVertex]]
-                predictedTemp[iGlobalVertex] = [localSolidInterfaceTemperature[iVertex]]
+            solidGlobalIndices = self.manager.getGlobalIndices('solid', self.myid)
+            predictedHF.setLocalBlock(solidGlobalIndices, [localSolidInterfaceHeatFlux_X, localSolidInterfaceHeatFlux_Y, localSolidInterfaceHeatFlux_Z])
+            predictedTemp.setLocalBlock(solidGlobalIndices, [localSolidInterfaceTemperature])
 
         predictedHF.assemble()
         predictedTemp.assemble()
@@ -793,10 +793,9 @@ class AlgorithmBGSStaticRelax(Algorithm):
         if self.myid in self.manager.getSolidInterfaceProcessors():
             localSolidInterfaceVel_X, localSolidInterfaceVel_Y, localSolidInterfaceVel_Z = self.SolidSolver.getNodalVelocity()
             localSolidInterfaceVelNm1_X, localSolidInterfaceVelNm1_Y, localSolidInterfaceVelNm1_Z = self.SolidSolver.getNodalVelocityNm1()
-            for iVertex in range(self.manager.getNumberOfLocalSolidInterfaceNodes()):
-                iGlobalVertex = self.manager.getGlobalIndex('solid', self.myid, iVertex)
-                self.solidInterfaceVelocity[iGlobalVertex] = [localSolidInterfaceVel_X[iVertex], localSolidInterfaceVel_Y[iVertex], localSolidInterfaceVel_Z[iVertex]]
-                self.solidInterfaceVelocitynM1[iGlobalVertex] = [localSolidInterfaceVelNm1_X[iVertex], localSolidInterfaceVelNm1_Y[iVertex], localSolidInterfaceVelNm1_Z[iVertex]]
+            solidGlobalIndices = self.manager.getGlobalIndices('solid', self.myid)
+            self.solidInterfaceVelocity.setLocalBlock(solidGlobalIndices, [localSolidInterfaceVel_X, localSolidInterfaceVel_Y, localSolidInterfaceVel_Z])
+            self.solidInterfaceVelocitynM1.setLocalBlock(solidGlobalIndices, [localSolidInterfaceVelNm1_X, localSolidInterfaceVelNm1_Y, localSolidInterfaceVelNm1_Z])
 
         self.solidInterfaceVelocity.assemble()
         self.solidInterfaceVelocitynM1.assemble()
@@ -1102,9 +1101,8 @@ class AlgorithmIQN_ILS(AlgorithmBGSAitkenRelax):
                 # --- Initialize d_tilde for the construction of the Wk matrix -- #
                 if self.myid in self.manager.getSolidInterfaceProcessors():
                     localSolidInterfaceDisp_X, localSolidInterfaceDisp_Y, localSolidInterfaceDisp_Z = self.SolidSolver.getNodalDisplacements()
-                    for iVertex in range(self.manager.getNumberOfLocalSolidInterfaceNodes()):
-                        iGlobalVertex = self.manager.getGlobalIndex('solid', self.myid, iVertex)
-                        solidInterfaceDisplacement_tilde[iGlobalVertex] = [localSolidInterfaceDisp_X[iVertex], localSolidInterfaceDisp_Y[iVertex], localSolidInterfaceDisp_Z[iVertex]]
+                    solidGlobalIndices = self.manager.getGlobalIndices('solid', self.myid)
+                    solidInterfaceDisplacement_tilde.setLocalBlock(solidGlobalIndices, [localSolidInterfaceDisp_X, localSolidInterfaceDisp_Y, localSolidInterfaceDisp_Z])
 
                 solidInterfaceDisplacement_tilde.assemble()
                 
@@ -1170,9 +1168,8 @@ class AlgorithmIQN_ILS(AlgorithmBGSAitkenRelax):
                             delta_ds_loc_Y = delta_ds_loc[1]
                             delta_ds_loc_Z = np.zeros(ns)
                         
-                        for iVertex in range(delta_ds_loc_X.shape[0]):
-                            iGlobalVertex = self.manager.getGlobalIndex('solid', self.myid, iVertex)
-                            delta_ds[iGlobalVertex] = [delta_ds_loc_X[iVertex], delta_ds_loc_Y[iVertex], delta_ds_loc_Z[iVertex]]
+                        deltaGlobalIndices = self.manager.getGlobalIndex('solid', self.myid, 0) + np.arange(delta_ds_loc_X.shape[0], dtype=np.intc)
+                        delta_ds.setLocalBlock(deltaGlobalIndices, [delta_ds_loc_X, delta_ds_loc_Y, delta_ds_loc_Z])
                     
                     # --- Go back to parallel run --- #
                     mpiBarrier(self.mpiComm)
@@ -153,6 +153,13 @@ class SolidSolver:
     def remeshing(self):
         return
 
+    def updateInterfaceNodes(self):
+        """
+        Des.
+        Updates the interface nodes (nNodes, nPhysicalNodes, node ordering) after remeshing.
+        """
+        return
+
     def exit(self):
         return
 
@@ -202,6 +209,14 @@ class FluidSolver:
     def getNodalIndex(self, iVertex):
         return
 
+    def getInterfaceConnectivity(self):
+        """
+        Des.
+        Returns the faces of the f/s interface as an integer array (nFaces X nNodesPerFace) of local interface vertex indices, None if not available.
+        """
+
+        return None
+
     def fakeSolidSolver(self, time):
         return
 
@@ -251,6 +266,13 @@ class FluidSolver:
     def remeshing(self):
         return
 
+    def updateInterfaceNodes(self):
+        """
+        Des.
+        Updates the interface nodes (nNodes, nPhysicalNodes, node ordering) after remeshing.
+        """
+        return
+
     def meshUpdate(self, nt):
         return
 
@@ -29,8 +29,14 @@ Authors : David THOMAS, Marco Lucio CERQUAGLIA, Romain BOMAN
 
 import numpy as np
 import scipy as sp
+import scipy.linalg as splin
+import scipy.sparse as spsparse
+import scipy.sparse.linalg as splinalg
+import pickle
+from contextlib import contextmanager
 
 import ccupydo
+from searchTree import SearchTree
 
 np.set_printoptions(threshold=np.nan)
 
@@ -38,18 +44,41 @@ np.set_printoptions(threshold=np.nan)
 #   FlexInterfaceData class
 # ----------------------------------------------------------------------
 
-class FlexInterfaceData(ccupydo.CFlexInterfaceData):
+class FlexInterfaceData(object):
     """
     Description
+    Common base of the interface data. FlexInterfaceData(val_nPoint, val_nDim, mpiComm, blocked) creates a SerialFlexInterfaceData
+    (pure numpy) if mpiComm is None and a ParallelFlexInterfaceData (PETSc) otherwise, both being FlexInterfaceData with the same API.
     """
 
-    def __init__(self, val_nPoint, val_nDim, mpiComm=None):
+    def __new__(cls, val_nPoint, val_nDim, mpiComm=None, blocked=False):
+        """
+        Des.
+        """
+
+        if cls is FlexInterfaceData:
+            cls = SerialFlexInterfaceData if mpiComm == None else ParallelFlexInterfaceData
+
+        return super(FlexInterfaceData, cls).__new__(cls)
+
+# ----------------------------------------------------------------------
+#   ParallelFlexInterfaceData class
+# ----------------------------------------------------------------------
+
+class ParallelFlexInterfaceData(FlexInterfaceData, ccupydo.CFlexInterfaceData):
+    """
+    Parallel implementation of FlexInterfaceData, based on PETSc vectors (C++ core).
+    If blocked, the nDim components are interleaved in one PETSc vector (block size nDim) instead of one vector per component,
+    so that the assembly, the products, the reductions and the gathers are done once for all the components.
+    """
+
+    def __init__(self, val_nPoint, val_nDim, mpiComm=None, blocked=False):
         """
         Des.
         """
         self.mpiComm = mpiComm
         
-        ccupydo.CFlexInterfaceData.__init__(self, val_nPoint, val_nDim, mpiComm)
+        ccupydo.CFlexInterfaceData.__init__(self, val_nPoint, val_nDim, mpiComm, blocked)
 
         #self.mpiComm = mpiComm
         #self.nPoint = val_nPoint
@@ -103,7 +132,7 @@ class FlexInterfaceData(ccupydo.CFlexInterfaceData):
             if self.nPoint != dataToAdd.nPoint:
                 raise IndexError("Lengthes do not match for + operator !")
 
-        newData = FlexInterfaceData(self.nPoint, self.nDim, self.comm)
+        newData = FlexInterfaceData(self.nPoint, self.nDim, self.comm, self.isBlocked())
         self.copy(newData)
         newData.add(dataToAdd)
 
@@ -144,7 +173,7 @@ class FlexInterfaceData(ccupydo.CFlexInterfaceData):
             if self.nPoint != dataToSub.nPoint:
                 raise IndexError("Lengthes do not match for + operator !")
 
-        newData = FlexInterfaceData(self.nPoint, self.nDim, self.comm)
+        newData = FlexInterfaceData(self.nPoint, self.nDim, self.comm, self.isBlocked())
         self.copy(newData)
         newData.sub(dataToSub)
 
@@ -185,7 +214,7 @@ class FlexInterfaceData(ccupydo.CFlexInterfaceData):
         Des.
         """
 
-        newData = FlexInterfaceData(self.nPoint, self.nDim, self.comm)
+        newData = FlexInterfaceData(self.nPoint, self.nDim, self.comm, self.isBlocked())
         self.copy(newData)
         newData.scale(mulVal)
 
@@ -210,47 +239,416 @@ class FlexInterfaceData(ccupydo.CFlexInterfaceData):
         return self
     
     def dot(self, dataToDot):
-        
-        dotList = []
 
-        if self.mpiComm != None:
-            dotList = ccupydo.CFlexInterfaceData.dot(self, dataToDot)
-        else:
-            for iDim in range(self.nDim):
-                myData = self.getData(iDim)
-                dotData = dataToDot.getData(iDim)
-                val_dot = myData.dot(dotData)
-                dotList.append(val_dot)
+        return ccupydo.CFlexInterfaceData.dot(self, dataToDot)
 
-        return dotList
-    
     def sum(self):
-        
-        sumList = []
 
-        if self.mpiComm != None:
-            sumList = ccupydo.CFlexInterfaceData.sum(self)
-        else:
-            for iDim in range(self.nDim):
-                myData = self.getData(iDim)
-                val_sum = myData.sum()
-                sumList.append(val_sum)
+        return ccupydo.CFlexInterfaceData.sum(self)
 
-        return sumList
-    
     def norm(self):
-        
-        normList = []
 
-        if self.mpiComm != None:
-            normList = ccupydo.CFlexInterfaceData.norm(self)
-        else:
+        return ccupydo.CFlexInterfaceData.norm(self)
+
+    def getDataArray(self, iDim):
+        """
+        Des.
+        Returns a copy of the local part of the component iDim (see readArrays and writeArrays for views without copy).
+        """
+
+        with self.readArrays() as arrays:
+            localArray = np.array(arrays[iDim])
+
+        return localArray
+
+    @contextmanager
+    def readArrays(self):
+        """
+        Des.
+        Read-only views (no copy) on the local part of all the components :
+            with data.readArrays() as arrays:
+                ... arrays[iDim] ...
+        For blocked data, the views are strided (one column of the local interleaved block each).
+        The arrays are given back to PETSc (VecRestoreArrayRead) when leaving the block and must not be used afterwards.
+        The data can still be read (e.g. dot, norm) but not modified inside the block.
+        """
+
+        if self.isBlocked():
+            with self.readBlock() as block:
+                yield [block[:,iDim] for iDim in range(self.nDim)]
+            return
+
+        arrays = []
+        try:
+            for iDim in range(self.nDim):
+                array = ccupydo.CFlexInterfaceData.getDataArrayRead(self, iDim)
+                array.flags.writeable = False
+                arrays.append(array)
+            yield arrays
+        finally:
+            for iDim in range(len(arrays)):
+                ccupydo.CFlexInterfaceData.restoreDataArrayRead(self, iDim)
+
+    @contextmanager
+    def writeArrays(self):
+        """
+        Des.
+        Writable views (no copy) on the local part of all the components, e.g. to write the nodal values of a solver directly :
+            with data.writeArrays() as arrays:
+                arrays[iDim][:] = ...
+        For blocked data, the views are strided (one column of the local interleaved block each).
+        The arrays are given back to PETSc (VecRestoreArray) when leaving the block and must not be used afterwards.
+        The data must not be accessed in any other way inside the block.
+        """
+
+        if self.isBlocked():
+            try:
+                block = ccupydo.CFlexInterfaceData.getDataArray(self, 0).reshape(-1, self.nDim)
+                yield [block[:,iDim] for iDim in range(self.nDim)]
+            finally:
+                ccupydo.CFlexInterfaceData.restoreDataArray(self, 0)
+            return
+
+        arrays = []
+        try:
             for iDim in range(self.nDim):
-                myData = self.getData(iDim)
-                val_norm = np.linalg.norm(myData)
-                normList.append(val_norm)
+                arrays.append(ccupydo.CFlexInterfaceData.getDataArray(self, iDim))
+            yield arrays
+        finally:
+            for iDim in range(len(arrays)):
+                ccupydo.CFlexInterfaceData.restoreDataArray(self, iDim)
+
+    @contextmanager
+    def readBlock(self):
+        """
+        Des.
+        Read-only (nLocal X nDim) array of the local values, see readArrays.
+        Without copy for blocked data (the local interleaved block), a copy of the components otherwise.
+        """
+
+        if not self.isBlocked():
+            with self.readArrays() as arrays:
+                block = np.column_stack(arrays)
+            yield block
+            return
+
+        try:
+            block = ccupydo.CFlexInterfaceData.getDataArrayRead(self, 0).reshape(-1, self.nDim)
+            block.flags.writeable = False
+            yield block
+        finally:
+            ccupydo.CFlexInterfaceData.restoreDataArrayRead(self, 0)
+
+    def setLocalBlock(self, globalIndices, values):
+        """
+        Des.
+        Sets the values of all the components at the points globalIndices in one call (VecSetValues for each component).
+        values holds nDim arrays (e.g. the nodal arrays of a solver), only their first len(globalIndices) entries are used.
+        """
 
-        return normList
+        if len(values) != self.nDim:
+            raise IndexError("Length of values does not match nDim !")
+
+        nLocal = len(globalIndices)
+        block = np.array([np.asarray(values[iDim], dtype=float)[:nLocal] for iDim in range(self.nDim)]).reshape(self.nDim, nLocal)
+
+        ccupydo.CFlexInterfaceData.setLocalBlock(self, globalIndices, block)
+
+    def remap(self, val_nPoint, sourceIndices):
+        """
+        Des.
+        Serial only (see SerialFlexInterfaceData.remap).
+        """
+
+        raise Exception("FlexInterfaceData.remap is only available in serial !")
+
+# ----------------------------------------------------------------------
+#   SerialFlexInterfaceData class
+# ----------------------------------------------------------------------
+
+class SerialFlexInterfaceData(FlexInterfaceData):
+    """
+    Serial implementation of FlexInterfaceData, entirely in numpy (no call to the C++ core).
+    The values are stored in one contiguous (nPoint X nDim) array, getData(iDim) is a (writable) view on its column iDim.
+    Created by FlexInterfaceData when mpiComm is None (the storage being already interleaved, blocked is ignored).
+    """
+
+    def __init__(self, val_nPoint, val_nDim, mpiComm=None, blocked=False):
+        """
+        Des.
+        """
+
+        if mpiComm != None:
+            raise Exception("SerialFlexInterfaceData cannot be used in parallel !")
+
+        self.mpiComm = None
+        self.comm = None
+        self.nPoint = val_nPoint
+        self.nDim = val_nDim
+        self.data = np.zeros((val_nPoint, val_nDim))
+
+    def __checkSizes(self, data, operator):
+        """
+        Des.
+        """
+
+        if isinstance(data, SerialFlexInterfaceData):
+            if self.nDim != data.nDim:
+                raise IndexError("Dimensions do not match for {} operator !".format(operator))
+            if self.nPoint != data.nPoint:
+                raise IndexError("Lengthes do not match for {} operator !".format(operator))
+            return data.data
+
+        return data
+
+    def __setitem__(self, index, values):
+        """
+        Des.
+        """
+
+        if type(values) != list:
+            raise TypeError("FlexInterfaceData.__setitem__ needs list as argument !")
+
+        if len(values) != self.nDim:
+            raise IndexError("Length of values does not match nDim !")
+
+        self.data[index,:] = values
+
+    def __newData(self, values):
+        """
+        Des.
+        """
+
+        newData = SerialFlexInterfaceData(self.nPoint, self.nDim)
+        newData.data[:] = values
+
+        return newData
+
+    def __add__(self, dataToAdd):
+        """
+        Des.
+        """
+
+        return self.__newData(self.data + self.__checkSizes(dataToAdd, '+'))
+
+    def __radd__(self, dataToAdd):
+        """
+        Des.
+        """
+
+        return self + dataToAdd
+
+    def __iadd__(self, dataToAdd):
+        """
+        Des.
+        """
+
+        self.add(dataToAdd)
+
+        return self
+
+    def __sub__(self, dataToSub):
+        """
+        Des.
+        """
+
+        return self.__newData(self.data - self.__checkSizes(dataToSub, '-'))
+
+    def __rsub__(self, dataToSub):
+        """
+        Des.
+        """
+
+        return self.__newData(self.__checkSizes(dataToSub, '-') - self.data)
+
+    def __isub__(self, dataToSub):
+        """
+        Des.
+        """
+
+        self.sub(dataToSub)
+
+        return self
+
+    def __mul__(self, mulVal):
+        """
+        Des.
+        """
+
+        return self.__newData(self.data*mulVal)
+
+    def __rmul__(self, mulVal):
+        """
+        Des.
+        """
+
+        return self*mulVal
+
+    def __imul__(self, mulVal):
+        """
+        Des.
+        """
+
+        self.scale(mulVal)
+
+        return self
+
+    def getnPoint(self):
+
+        return self.nPoint
+
+    def getDim(self):
+
+        return self.nDim
+
+    def getComm(self):
+
+        return self.comm
+
+    def getLocalLength(self):
+
+        return self.nPoint
+
+    def isBlocked(self):
+
+        return False
+
+    def getOwnershipRange(self):
+
+        return [0, self.nPoint]
+
+    def view(self, iDim):
+
+        print(self.data[:,iDim])
+
+    def destroy(self):
+
+        pass
+
+    def setValue(self, iDim, index, value):
+
+        self.data[index,iDim] = value
+
+    def setValues(self, iDim, indices, values):
+
+        self.data[indices,iDim] = values
+
+    def setAllValues(self, iDim, value):
+
+        self.data[:,iDim] = value
+
+    def setLocalBlock(self, globalIndices, values):
+        """
+        Des.
+        See ParallelFlexInterfaceData.setLocalBlock.
+        """
+
+        if len(values) != self.nDim:
+            raise IndexError("Length of values does not match nDim !")
+
+        nLocal = len(globalIndices)
+        for iDim in range(self.nDim):
+            self.data[globalIndices,iDim] = np.asarray(values[iDim], dtype=float)[:nLocal]
+
+    def getData(self, iDim):
+
+        return self.data[:,iDim]
+
+    def setData(self, iDim, values):
+
+        self.data[:,iDim] = values
+
+    def getDataArray(self, iDim):
+
+        return self.data[:,iDim]
+
+    @contextmanager
+    def readArrays(self):
+        """
+        Des.
+        See ParallelFlexInterfaceData.readArrays (read-only views on the columns of the data).
+        """
+
+        arrays = []
+        for iDim in range(self.nDim):
+            array = self.data[:,iDim]
+            array.flags.writeable = False
+            arrays.append(array)
+
+        yield arrays
+
+    @contextmanager
+    def writeArrays(self):
+        """
+        Des.
+        See ParallelFlexInterfaceData.writeArrays (writable views on the columns of the data).
+        """
+
+        yield [self.data[:,iDim] for iDim in range(self.nDim)]
+
+    @contextmanager
+    def readBlock(self):
+        """
+        Des.
+        See ParallelFlexInterfaceData.readBlock (read-only view on the data).
+        """
+
+        block = self.data.view()
+        block.flags.writeable = False
+
+        yield block
+
+    def assemble(self):
+
+        pass
+
+    def copy(self, target):
+
+        target.data[:] = self.data
+
+    def set(self, donor):
+
+        self.data[:] = self.__checkSizes(donor, '=')
+
+    def add(self, dataToAdd):
+
+        self.data += self.__checkSizes(dataToAdd, '+')
+
+    def sub(self, dataToSub):
+
+        self.data -= self.__checkSizes(dataToSub, '-')
+
+    def scale(self, value):
+
+        self.data *= value
+
+    def dot(self, dataToDot):
+
+        return list(np.einsum('ij,ij->j', self.data, self.__checkSizes(dataToDot, 'dot')))
+
+    def sum(self):
+
+        return list(self.data.sum(axis=0))
+
+    def norm(self):
+
+        return list(np.sqrt(np.einsum('ij,ij->j', self.data, self.data)))
+
+    def remap(self, val_nPoint, sourceIndices):
+        """
+        Des.
+        Returns new data of val_nPoint points, the point i taking the values of the point sourceIndices[i] (zero if negative).
+        """
+
+        sourceIndices = np.asarray(sourceIndices, dtype=int)
+        if len(sourceIndices) != val_nPoint:
+            raise IndexError("Length of sourceIndices does not match nPoint !")
+
+        newData = SerialFlexInterfaceData(val_nPoint, self.nDim)
+        kept = np.flatnonzero(sourceIndices >= 0)
+        newData.data[kept,:] = self.data[sourceIndices[kept],:]
+
+        return newData
 
 # ----------------------------------------------------------------------
 #    InterfaceMatrix class
@@ -265,6 +663,9 @@ class InterfaceMatrix(ccupydo.CInterfaceMatrix):
         -createSparse()
         -createSparseFullAlloc()
         -setValue()
+        -setRowValues()
+        -setRowsCSR()
+        -flush()
         -assemble()
         -getMat()
     """
@@ -287,7 +688,477 @@ class InterfaceMatrix(ccupydo.CInterfaceMatrix):
         if self.mpiComm != None:
             ccupydo.CInterfaceMatrix.mult(self, Data, DataOut)
         else:
-            PyH = self.getMat();
+            PyH = self.getMat()
+            dim = Data.getDim()
+            XX = PyH.dot(np.column_stack([Data.getData(iDim) for iDim in range(dim)]))
+            for iDim in range(dim):
+                DataOut.getData(iDim)[:] = XX[:,iDim]
+
+    def multTranspose(self, Data, DataOut):
+        """
+        Performs interface transposed matrix-data multiplication.
+        """
+
+        if self.mpiComm != None:
+            ccupydo.CInterfaceMatrix.multTranspose(self, Data, DataOut)
+        else:
+            PyH = self.getMat()
             dim = Data.getDim()
+            XX = PyH.T.dot(np.column_stack([Data.getData(iDim) for iDim in range(dim)]))
             for iDim in range(dim):
-                np.dot(PyH, Data.getData(iDim), DataOut.getData(iDim))
+                DataOut.getData(iDim)[:] = XX[:,iDim]
+
+    def getMat(self):
+        """
+        Returns the underlying matrix.
+        In serial, sparse matrices are returned as a scipy CSR matrix viewing the C++ storage (no copy).
+        """
+
+        if self.mpiComm == None and self.isSparse():
+            indptr, indices, values = self.getCSR()
+            return spsparse.csr_matrix((values, indices, indptr), shape=(self.sizes[0], self.sizes[1]), copy=False)
+        else:
+            return ccupydo.CInterfaceMatrix.getMat(self)
+
+# ----------------------------------------------------------------------
+#    InterfacePermutation class
+# ----------------------------------------------------------------------
+
+class InterfacePermutation(ccupydo.CInterfacePermutation):
+    """
+    Define a transfer operator with a single unit entry per row (matching meshes).
+    Same interface as InterfaceMatrix, but the data are moved by a scatter (parallel) or an indexed gather (serial).
+    Inherited public members :
+        -setEntries()
+        -save()
+        -load()
+        -getIndices() (serial)
+    """
+
+    def __init__(self, sizes, mpiComm=None):
+        """
+        Overloaded constructor
+        """
+
+        ccupydo.CInterfacePermutation.__init__(self, sizes[0],sizes[1])
+
+        self.sizes = sizes
+        self.mpiComm = mpiComm
+
+    def mult(self, Data, DataOut):
+        """
+        Des.
+        DataOut[i] = Data[indices[i]], rows without donor are set to zero.
+        """
+
+        if self.mpiComm != None:
+            ccupydo.CInterfacePermutation.mult(self, Data, DataOut)
+        else:
+            indices = self.getIndices()
+            hasDonor = indices >= 0
+            for iDim in range(Data.getDim()):
+                out = DataOut.getData(iDim)
+                out[hasDonor] = Data.getData(iDim)[indices[hasDonor]]
+                out[~hasDonor] = 0.0
+
+    def multTranspose(self, Data, DataOut):
+        """
+        Des.
+        DataOut[indices[i]] += Data[i].
+        """
+
+        if self.mpiComm != None:
+            ccupydo.CInterfacePermutation.multTranspose(self, Data, DataOut)
+        else:
+            indices = self.getIndices()
+            hasDonor = indices >= 0
+            for iDim in range(Data.getDim()):
+                DataOut.getData(iDim)[:] = np.bincount(indices[hasDonor], weights=Data.getData(iDim)[hasDonor], minlength=self.sizes[1])
+
+# ----------------------------------------------------------------------
+#    HierarchicalInterfaceMatrix class
+# ----------------------------------------------------------------------
+
+class HierarchicalInterfaceMatrix(InterfaceMatrix):
+    """
+    Define a compressed (hierarchical) TPS interface matrix, serial only.
+    The points are sorted in a cluster tree (the ADT of the points, see SearchTree) on both sides of the kernel block.
+    Well separated cluster pairs are stored as low rank products computed by adaptive cross approximation (ACA),
+    the other pairs and the polynomial blocks are stored in a sparse near field.
+    Storage and matrix-vector products are then close to O(n log n) instead of O(n^2).
+    Same interface as InterfaceMatrix, getMat returns a scipy LinearOperator (products only).
+    The saddle point matrices provide a two-level preconditioner (see getPreconditioner) and are solved by GMRES (see LinearSolver)
+    down to the same relative tolerance, so the transfers (the reproduction of the linear fields included) are only accurate up to
+    this tolerance. The total force and the virtual work of the fluid to solid transfers are conserved, but the load distribution
+    is perturbed by up to the tolerance times the condition number.
+    """
+
+    def __init__(self, sizes, tolerance=1e-6, leafSize=64, eta=1.0, overlap=1.5, mpiComm=None):
+        """
+        Overloaded constructor
+        tolerance is the relative accuracy of the low rank blocks
+        leafSize is the maximum number of points of a leaf of the cluster tree
+        eta is the admissibility parameter, two clusters are well separated if min(diameters) <= eta*distance
+        overlap is the extension of the local problems of the preconditioner, in half diagonals of their leaf cluster
+        """
+
+        if mpiComm != None:
+            raise Exception('Hierarchical interface matrices are only available in serial.')
+
+        InterfaceMatrix.__init__(self, sizes, mpiComm)
+
+        self.tolerance = tolerance
+        self.leafSize = leafSize
+        self.eta = eta
+        self.overlap = overlap
+        self.nearField = None
+        self.farField = []
+        self.points = None
+        self.preconditioner = None
+
+    def kernel(self, X, Y):
+        """
+        Des.
+        TPS kernel phi = r^2*log10(r) between the points X (m x 3) and Y (n x 3).
+        """
+
+        dist2 = np.sum((X[:,np.newaxis,:]-Y[np.newaxis,:,:])**2, axis=2)
+
+        return 0.5*dist2*np.log10(np.where(dist2 > 0.0, dist2, 1.0))
+
+    def polynomial(self, X, nDim):
+        """
+        Des.
+        Polynomial terms (1, x, y(, z)) at the points X.
+        """
+
+        return np.column_stack([np.ones(X.shape[0])] + [X[:,iDim] for iDim in range(nDim)])
+
+    def __buildClusterTree(self, points):
+        """
+        Des.
+        Returns the permutation of the points and the list of the clusters [start, stop, boxMin, boxMax, children].
+        The clusters are the nodes of the ADT of the points (balanced bisections along the largest extent), the points of a cluster are perm[start:stop].
+        The clusters of at most leafSize points are not split.
+        """
+
+        perm, clusters = SearchTree(points[:,0], points[:,1], points[:,2]).clusters()
+        for cluster in clusters:
+            if cluster[1]-cluster[0] <= self.leafSize:
+                cluster[4] = []
+
+        return perm, clusters
+
+    def __isAdmissible(self, targetCluster, sourceCluster):
+        """
+        Des.
+        """
+
+        gap = np.maximum(0.0, np.maximum(sourceCluster[2]-targetCluster[3], targetCluster[2]-sourceCluster[3]))
+        distance = np.linalg.norm(gap)
+        diameter = min(np.linalg.norm(targetCluster[3]-targetCluster[2]), np.linalg.norm(sourceCluster[3]-sourceCluster[2]))
+
+        return distance > 0.0 and diameter <= self.eta*distance
+
+    def __approximateBlock(self, X, Y):
+        """
+        Des.
+        ACA with partial pivoting of the kernel block between X and Y.
+        Returns (U, V) such that kernel(X,Y) ~ U*V, or None if the block is not worth compressing.
+        """
+
+        m, n = X.shape[0], Y.shape[0]
+        maxRank = min(m, n)//2
+        U = np.zeros((m, maxRank))
+        V = np.zeros((maxRank, n))
+        usedRows = np.zeros(m, dtype=bool)
+        norm2 = 0.0
+        rank = 0
+        iRow = 0
+        while rank < maxRank:
+            usedRows[iRow] = True
+            row = self.kernel(X[iRow:iRow+1], Y)[0] - U[iRow,:rank].dot(V[:rank])
+            jCol = np.argmax(np.abs(row))
+            if row[jCol] != 0.0:
+                v = row/row[jCol]
+                u = self.kernel(X, Y[jCol:jCol+1])[:,0] - U[:,:rank].dot(V[:rank,jCol])
+                norm2 += 2.0*np.dot(U[:,:rank].T.dot(u), V[:rank].dot(v)) + u.dot(u)*v.dot(v)
+                U[:,rank] = u
+                V[rank] = v
+                rank += 1
+                if np.sqrt(u.dot(u)*v.dot(v)) <= self.tolerance*np.sqrt(abs(norm2)):
+                    return U[:,:rank], V[:rank]
+                candidates = np.abs(u)
+            else:
+                candidates = np.ones(m)
+            candidates[usedRows] = -1.0
+            iRow = np.argmax(candidates)
+            if usedRows[iRow]:
+                # every row has been matched exactly
+                return U[:,:rank], V[:rank]
+
+        return None
+
+    def fill(self, targets, sources, nDim, saddle=False):
+        """
+        Des.
+        Builds the matrix [PHI P] (or [[PHI P],[P^T 0]] if saddle) from the positions (n x 3 arrays) of the targets (rows) and of the sources (columns).
+        The polynomial columns of the sources follow the kernel columns.
+        """
+
+        nTarget, nSource = targets.shape[0], sources.shape[0]
+        nPoly = nDim+1
+
+        targetPerm, targetClusters = self.__buildClusterTree(targets)
+        sourcePerm, sourceClusters = self.__buildClusterTree(sources)
+
+        rows, cols, values = [], [], []
+        self.farField = []
+        stack = [(0, 0)]
+        while stack:
+            iTarget, iSource = stack.pop()
+            targetCluster, sourceCluster = targetClusters[iTarget], sourceClusters[iSource]
+            rowIndices = targetPerm[targetCluster[0]:targetCluster[1]]
+            colIndices = sourcePerm[sourceCluster[0]:sourceCluster[1]]
+            if self.__isAdmissible(targetCluster, sourceCluster):
+                lowRank = self.__approximateBlock(targets[rowIndices], sources[colIndices])
+                if lowRank != None:
+                    self.farField.append((rowIndices, colIndices, lowRank[0], lowRank[1]))
+                    continue
+            if targetCluster[4] or sourceCluster[4]:
+                # the largest cluster is split
+                if targetCluster[4] and (not sourceCluster[4] or len(rowIndices) >= len(colIndices)):
+                    stack += [(iChild, iSource) for iChild in targetCluster[4]]
+                else:
+                    stack += [(iTarget, iChild) for iChild in sourceCluster[4]]
+                continue
+            rows.append(np.repeat(rowIndices, len(colIndices)))
+            cols.append(np.tile(colIndices, len(rowIndices)))
+            values.append(self.kernel(targets[rowIndices], sources[colIndices]).ravel())
+
+        targetPoly = self.polynomial(targets, nDim)
+        rows.append(np.repeat(np.arange(nTarget), nPoly))
+        cols.append(np.tile(nSource+np.arange(nPoly), nTarget))
+        values.append(targetPoly.ravel())
+        if saddle:
+            rows.append(np.repeat(nSource+np.arange(nPoly), nSource))
+            cols.append(np.tile(np.arange(nSource), nPoly))
+            values.append(self.polynomial(sources, nDim).T.ravel())
+
+        self.nearField = spsparse.csr_matrix((np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))), shape=tuple(self.sizes))
+        # the points of the saddle point matrices are kept for their preconditioner
+        self.points = sources if saddle else None
+        self.preconditioner = None
+
+    def getCompressionRatio(self):
+        """
+        Des.
+        Number of stored values over the number of entries of the equivalent dense matrix.
+        """
+
+        stored = self.nearField.nnz + sum(U.size + V.size for rowIndices, colIndices, U, V in self.farField)
+
+        return float(stored)/(self.sizes[0]*self.sizes[1])
+
+    def __apply(self, XX, transpose=False):
+        """
+        Des.
+        Product with a 1-D or 2-D (one column per component) array.
+        """
+
+        if not transpose:
+            YY = self.nearField.dot(XX)
+            for rowIndices, colIndices, U, V in self.farField:
+                YY[rowIndices] += U.dot(V.dot(XX[colIndices]))
+        else:
+            YY = self.nearField.T.dot(XX)
+            for rowIndices, colIndices, U, V in self.farField:
+                YY[colIndices] += V.T.dot(U.T.dot(XX[rowIndices]))
+
+        return YY
+
+    def mult(self, Data , DataOut):
+        """
+        Performs interface matrix-data multiplication.
+        """
+
+        dim = Data.getDim()
+        XX = self.__apply(np.column_stack([Data.getData(iDim) for iDim in range(dim)]))
+        for iDim in range(dim):
+            DataOut.getData(iDim)[:] = XX[:,iDim]
+
+    def multTranspose(self, Data, DataOut):
+        """
+        Performs interface transposed matrix-data multiplication.
+        """
+
+        dim = Data.getDim()
+        XX = self.__apply(np.column_stack([Data.getData(iDim) for iDim in range(dim)]), True)
+        for iDim in range(dim):
+            DataOut.getData(iDim)[:] = XX[:,iDim]
+
+    def getMat(self):
+        """
+        Returns the matrix as a scipy LinearOperator.
+        """
+
+        return splinalg.LinearOperator(tuple(self.sizes), matvec=lambda x: self.__apply(x), rmatvec=lambda x: self.__apply(x, True),
+                                       matmat=lambda X: self.__apply(X), dtype=float)
+
+    def getTolerance(self):
+        """
+        Des.
+        Relative accuracy of the low rank blocks, also used as the tolerance of the solves.
+        """
+
+        return self.tolerance
+
+    def getPreconditioner(self):
+        """
+        Des.
+        Two-level preconditioner of the saddle point matrix [[PHI P],[P^T 0]] as a scipy LinearOperator (None for the other matrices).
+        The coarse level is the TPS interpolation on one point per cluster of about sqrt(n)/4 points (dense LU), which removes the smooth
+        part of the residual (the far field of the kernel, which dominates for the TPS). The fine level is a restricted additive Schwarz sweep
+        on the remaining residual : it is interpolated on every leaf cluster extended by its neighbours (dense LU), and only the coefficients
+        of the points of the cluster are kept. The number of GMRES iterations then hardly grows with the number of points.
+        Built once, the factors take about (1+overlap)^2 times the memory of the near field diagonal blocks.
+        """
+
+        if self.points is None:
+            return None
+
+        if self.preconditioner is None:
+            n = self.points.shape[0]
+            perm, clusters = SearchTree(self.points[:,0], self.points[:,1], self.points[:,2]).clusters()
+            coarseClusters, leafClusters = [], []
+            stack = [(0, False, False)]
+            while stack:
+                iCluster, inCoarse, inLeaf = stack.pop()
+                start, stop, boxMin, boxMax, children = clusters[iCluster]
+                if not inCoarse and (stop-start <= 0.25*np.sqrt(n) or not children):
+                    coarseClusters.append(iCluster)
+                    inCoarse = True
+                if not inLeaf and (stop-start <= self.leafSize or not children):
+                    leafClusters.append(iCluster)
+                    inLeaf = True
+                if not (inCoarse and inLeaf):
+                    stack += [(iChild, inCoarse, inLeaf) for iChild in children]
+            coarse = self.__factorizeCoarseLevel(perm, [clusters[iCluster] for iCluster in coarseClusters])
+            local = self.__factorizeLocalProblems(perm, [clusters[iCluster] for iCluster in leafClusters])
+            self.preconditioner = splinalg.LinearOperator(tuple(self.sizes), matvec=lambda rr: self.__precondition(np.ravel(rr), coarse, local), dtype=float)
+
+        return self.preconditioner
+
+    def __saddlePointMatrix(self, indices):
+        """
+        Des.
+        Dense interpolation matrix [[PHI P],[P^T 0]] of the subset indices of the points.
+        """
+
+        n, nPoly = len(indices), self.sizes[0]-self.points.shape[0]
+        X = self.points[indices]
+        K = np.zeros((n+nPoly, n+nPoly))
+        K[:n,:n] = self.kernel(X, X)
+        K[:n,n:] = self.polynomial(X, nPoly-1)
+        K[n:,:n] = K[:n,n:].T
+
+        return K
+
+    def __factorizeCoarseLevel(self, perm, clusters):
+        """
+        Des.
+        Coarse points (the closest one to the centroid of every cluster) and LU factors of their interpolation matrix.
+        """
+
+        coarse = []
+        for start, stop, boxMin, boxMax, children in clusters:
+            indices = perm[start:stop]
+            centroid = np.mean(self.points[indices], axis=0)
+            coarse.append(indices[np.argmin(np.sum((self.points[indices]-centroid)**2, axis=1))])
+        coarse = np.sort(coarse)
+
+        return coarse, splin.lu_factor(self.__saddlePointMatrix(coarse))
+
+    def __factorizeLocalProblems(self, perm, clusters):
+        """
+        Des.
+        Extended point sets of the leaf clusters, positions of the points of the cluster in them and LU factors of their interpolation matrices.
+        """
+
+        centres = np.array([0.5*(boxMin+boxMax) for start, stop, boxMin, boxMax, children in clusters])
+        radii = np.array([0.5*self.overlap*np.linalg.norm(boxMax-boxMin) for start, stop, boxMin, boxMax, children in clusters])
+        indptr, ids, dist = SearchTree(self.points[:,0], self.points[:,1], self.points[:,2]).ball(centres[:,0], centres[:,1], centres[:,2], radii)
+
+        local = []
+        for iCluster, (start, stop, boxMin, boxMax, children) in enumerate(clusters):
+            own = perm[start:stop]
+            extended = np.union1d(ids[indptr[iCluster]:indptr[iCluster+1]], own)
+            local.append((own, extended, np.searchsorted(extended, own), splin.lu_factor(self.__saddlePointMatrix(extended))))
+
+        return local
+
+    def __precondition(self, rr, coarse, local):
+        """
+        Des.
+        Coarse correction, then restricted additive Schwarz sweep on the updated residual.
+        """
+
+        n = self.points.shape[0]
+        nPoly = self.sizes[0]-n
+        coarseIndices, coarseLU = coarse
+
+        zz = np.zeros(self.sizes[0])
+        coarseCorrection = splin.lu_solve(coarseLU, np.concatenate((rr[coarseIndices], rr[n:])))
+        zz[coarseIndices] = coarseCorrection[:len(coarseIndices)]
+        zz[n:] = coarseCorrection[len(coarseIndices):]
+
+        residual = rr - self.__apply(zz)
+        for own, extended, ownPositions, LU in local:
+            zz[own] += splin.lu_solve(LU, np.concatenate((residual[extended], np.zeros(nPoly))))[ownPositions]
+
+        return zz
+
+    def isSparse(self):
+        """
+        Des.
+        """
+
+        return False
+
+    def assemble(self):
+        """
+        Des.
+        The matrix is complete once filled.
+        """
+
+        pass
+
+    def save(self, fileName):
+        """
+        Des.
+        """
+
+        with open(fileName, 'wb') as cacheFile:
+            pickle.dump((self.sizes, self.nearField, self.farField, self.points), cacheFile, 2)
+
+    def load(self, fileName):
+        """
+        Des.
+        Returns False if the file cannot be read or does not match the size of the matrix.
+        """
+
+        try:
+            with open(fileName, 'rb') as cacheFile:
+                sizes, nearField, farField, points = pickle.load(cacheFile)
+        except (IOError, EOFError, ValueError, pickle.UnpicklingError):
+            return False
+
+        if tuple(sizes) != tuple(self.sizes):
+            return False
+
+        self.nearField = nearField
+        self.farField = farField
+        self.points = points
+        self.preconditioner = None
+
+        return True
@@ -28,11 +28,18 @@ Authors : David THOMAS, Marco Lucio CERQUAGLIA, Romain BOMAN
 # ----------------------------------------------------------------------
 
 import numpy as np
+import scipy.linalg as splin
+import scipy.sparse as spsparse
+import weakref
+import hashlib
 
 import ccupydo
 from utilities import *
 from interfaceData import FlexInterfaceData
 from interfaceData import InterfaceMatrix
+from interfaceData import InterfacePermutation
+from interfaceData import HierarchicalInterfaceMatrix
+from searchTree import SearchTree
 from linearSolver import LinearSolver
 
 np.set_printoptions(threshold=np.nan)
@@ -46,17 +53,21 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
     Interpolator of CUPyDO.
     Perform inteporlation of fluid-structure meshes.
     Inherited public members :
-        -matching_fillMatrix()
+        -clearSearchTrees()
+        -matching_fillPermutation()
         -TPS_fillMatrixA()
         -TPS_fillMatrixB()
         -RBF_fillMatrixA()
         -RBF_fillMatrixB()
+        -PU_fillMatrix()
+        -IDW_fillMatrix()
+        -projection_fillMatrix()
         -PHI_TPS()
         -PHI_RBF()
         -distance()
     """
 
-    def __init__(self, Manager, FluidSolver, SolidSolver, mpiComm = None, chtTransferMethod=None, heatTransferCoeff=1.0):
+    def __init__(self, Manager, FluidSolver, SolidSolver, mpiComm = None, chtTransferMethod=None, heatTransferCoeff=1.0, mappingCacheDir=None, normalizeCoordinates=False):
         """
         Description.
         """
@@ -70,6 +81,8 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
         self.FluidSolver = FluidSolver
 
         self.mappingTimer = Timer()
+        self.mappingCacheDir = mappingCacheDir
+        self.exactPreallocation = False
 
         self.nf = self.manager.getNumberOfFluidInterfaceNodes()
         self.ns = self.manager.getNumberOfSolidInterfaceNodes()
@@ -101,6 +114,19 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
             self.myid = 0
             self.mpiSize = 1
 
+        # the coordinates seen by the kernels are centred and scaled, which does not change the interpolation
+        # (the linear polynomial absorbs the translation, the kernels are scaled consistently) but its conditioning
+        self.normalizeCoordinates = normalizeCoordinates
+        self.coordinatesCentre = np.zeros(3)
+        self.coordinatesScale = 1.0
+        if self.normalizeCoordinates:
+            self.computeCoordinatesNormalization()
+
+        # adaptive support radii of the compact kernels (None for a uniform radius), by physics and by owning rank
+        self.nNeighbours = None
+        self.minRadius = 0.0
+        self.donorRadii = {}
+
         self.solidInterfaceDisplacement = None
         self.fluidInterfaceDisplacement = None
         self.solidInterfaceLoads = None
@@ -115,6 +141,98 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
         self.fluidInterfaceRobinTemperature = None
         self.solidInterfaceRobinTemperature = None
 
+        # interpolation coefficients of each transferred field, kept as the initial guess of the next solve,
+        # and work vectors of the transfers (right-hand sides, centre values), allocated once per field
+        self.fieldCoefficients = weakref.WeakKeyDictionary()
+        self.fieldWorkVectors = weakref.WeakKeyDictionary()
+
+        # incremental remapping after a change of the fluid interface nodes (see enableIncrementalRemapping)
+        self.incrementalRemapping = False
+        self.remappingTolerance = 0.0
+        self.interfaceNodes = {}
+        self.fluidRowSubset = None
+
+        # interleaved storage of the components of the interface data (see enableBlockedStorage)
+        self.blockedData = False
+
+    def getFieldCoefficients(self, fieldData, size):
+        """
+        Des.
+        Returns the persistent coefficient vector (of global size size) of the transferred field fieldData.
+        The previous solution is kept between the calls, so it warm-starts the iterative solvers.
+        """
+
+        coefficients = self.fieldCoefficients.get(fieldData)
+        if coefficients == None or coefficients.getDim() != fieldData.getDim() or coefficients.getnPoint() != size:
+            coefficients = FlexInterfaceData(size, fieldData.getDim(), self.mpiComm, fieldData.isBlocked())
+            self.fieldCoefficients[fieldData] = coefficients
+
+        return coefficients
+
+    def getFieldWorkVector(self, fieldData, size, name):
+        """
+        Des.
+        Returns the work vector name (of global size size) of the transfers of the field fieldData.
+        Its content is overwritten by each transfer, it is only kept to avoid an allocation per transfer.
+        """
+
+        workVectors = self.fieldWorkVectors.setdefault(fieldData, {})
+        workVector = workVectors.get(name)
+        if workVector == None or workVector.getDim() != fieldData.getDim() or workVector.getnPoint() != size:
+            workVector = FlexInterfaceData(size, fieldData.getDim(), self.mpiComm, fieldData.isBlocked())
+            workVectors[name] = workVector
+
+        return workVector
+
+    def checkConservation(self):
+        """
+        Des.
+        """
+
+        WSX, WSY, WSZ = self.solidInterfaceLoads.dot(self.solidInterfaceDisplacement)
+
+        WFX, WFY, WFZ = self.fluidInterfaceLoads.dot(self.fluidInterfaceDisplacement)
+
+        mpiPrint("Checking f/s interface conservation...", self.mpiComm)
+        mpiPrint('Solid side (Wx, Wy, Wz) = ({}, {}, {})'.format(WSX, WSY, WSZ), self.mpiComm)
+        mpiPrint('Fluid side (Wx, Wy, Wz) = ({}, {}, {})'.format(WFX, WFY, WFZ), self.mpiComm)
+
+    def generateInterfaceData(self):
+        """
+        Des.
+        Creates the interface data of the interpolators working directly on the nodal values (ns solid and nf fluid nodes).
+        """
+
+        if self.manager.mechanical:
+            self.solidInterfaceDisplacement = FlexInterfaceData(self.ns, 3, self.mpiComm, self.blockedData)
+            self.fluidInterfaceDisplacement = FlexInterfaceData(self.nf, 3, self.mpiComm, self.blockedData)
+            self.solidInterfaceLoads = FlexInterfaceData(self.ns, 3, self.mpiComm, self.blockedData)
+            self.fluidInterfaceLoads = FlexInterfaceData(self.nf, 3, self.mpiComm, self.blockedData)
+
+        if self.manager.thermal :
+            if self.chtTransferMethod == 'TFFB':
+                self.solidInterfaceTemperature = FlexInterfaceData(self.ns, 1, self.mpiComm, self.blockedData)
+                self.fluidInterfaceTemperature = FlexInterfaceData(self.nf, 1, self.mpiComm, self.blockedData)
+                self.solidInterfaceHeatFlux = FlexInterfaceData(self.ns, 3, self.mpiComm, self.blockedData)
+                self.fluidInterfaceHeatFlux = FlexInterfaceData(self.nf, 3, self.mpiComm, self.blockedData)
+            elif self.chtTransferMethod == 'FFTB':
+                self.solidInterfaceTemperature = FlexInterfaceData(self.ns, 1, self.mpiComm, self.blockedData)
+                self.fluidInterfaceTemperature = FlexInterfaceData(self.nf, 1, self.mpiComm, self.blockedData)
+                self.solidInterfaceHeatFlux = FlexInterfaceData(self.ns, 3, self.mpiComm, self.blockedData)
+                self.fluidInterfaceHeatFlux = FlexInterfaceData(self.nf, 3, self.mpiComm, self.blockedData)
+                self.fluidInterfaceNormalHeatFlux = FlexInterfaceData(self.nf, 1, self.mpiComm, self.blockedData)
+                self.solidInterfaceNormalHeatFlux = FlexInterfaceData(self.ns, 1, self.mpiComm, self.blockedData)
+            elif self.chtTransferMethod == 'hFTB':
+                self.fluidInterfaceRobinTemperature = FlexInterfaceData(self.nf, 1, self.mpiComm, self.blockedData)
+                self.solidInterfaceRobinTemperature = FlexInterfaceData(self.ns, 1, self.mpiComm, self.blockedData)
+                self.solidInterfaceTemperature = FlexInterfaceData(self.ns, 1, self.mpiComm, self.blockedData)
+                self.fluidInterfaceTemperature = FlexInterfaceData(self.nf, 1, self.mpiComm, self.blockedData)
+            elif self.chtTransferMethod == 'hFFB':
+                self.fluidInterfaceRobinTemperature = FlexInterfaceData(self.nf, 1, self.mpiComm, self.blockedData)
+                self.solidInterfaceRobinTemperature = FlexInterfaceData(self.ns, 1, self.mpiComm, self.blockedData)
+                self.solidInterfaceHeatFlux = FlexInterfaceData(self.ns, 3, self.mpiComm, self.blockedData)
+                self.fluidInterfaceHeatFlux = FlexInterfaceData(self.nf, 3, self.mpiComm, self.blockedData)
+
     def checkTotalLoad(self):
         """
         Des.
@@ -135,9 +253,8 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
 
         if self.myid in self.manager.getSolidInterfaceProcessors():
             localSolidInterfaceDisp_X, localSolidInterfaceDisp_Y, localSolidInterfaceDisp_Z = self.SolidSolver.getNodalDisplacements()
-            for iVertex in range(self.ns_loc):
-                iGlobalVertex = self.manager.getGlobalIndex('solid', self.myid, iVertex)
-                self.solidInterfaceDisplacement[iGlobalVertex] = [localSolidInterfaceDisp_X[iVertex], localSolidInterfaceDisp_Y[iVertex], localSolidInterfaceDisp_Z[iVertex]]
+            solidGlobalIndices = self.manager.getGlobalIndices('solid', self.myid)
+            self.solidInterfaceDisplacement.setLocalBlock(solidGlobalIndices, [localSolidInterfaceDisp_X, localSolidInterfaceDisp_Y, localSolidInterfaceDisp_Z])
 
         self.solidInterfaceDisplacement.assemble()
 
@@ -148,9 +265,8 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
 
         if self.myid in self.manager.getSolidInterfaceProcessors():
             localSolidInterfaceHeatFlux_X, localSolidInterfaceHeatFlux_Y, localSolidInterfaceHeatFlux_Z = self.SolidSolver.getNodalHeatFluxes()
-            for iVertex in range(self.ns_loc):
-                iGlobalVertex = self.manager.getGlobalIndex('solid', self.myid, iVertex)
-                self.solidInterfaceHeatFlux[iGlobalVertex] = [localSolidInterfaceHeatFlux_X[iVertex], localSolidInterfaceHeatFlux_Y[iVertex], localSolidInterfaceHeatFlux_Z[iVertex]]
+            solidGlobalIndices = self.manager.getGlobalIndices('solid', self.myid)
+            self.solidInterfaceHeatFlux.setLocalBlock(solidGlobalIndices, [localSolidInterfaceHeatFlux_X, localSolidInterfaceHeatFlux_Y, localSolidInterfaceHeatFlux_Z])
 
         self.solidInterfaceHeatFlux.assemble()
 
@@ -161,9 +277,8 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
 
         if self.myid in self.manager.getFluidInterfaceProcessors():
             localFluidInterfaceLoad_X, localFluidInterfaceLoad_Y, localFluidInterfaceLoad_Z = self.FluidSolver.getNodalLoads()
-            for iVertex in range(self.nf_loc):
-                iGlobalVertex = self.manager.getGlobalIndex('fluid', self.myid, iVertex)
-                self.fluidInterfaceLoads[iGlobalVertex] = [localFluidInterfaceLoad_X[iVertex], localFluidInterfaceLoad_Y[iVertex], localFluidInterfaceLoad_Z[iVertex]]
+            fluidGlobalIndices = self.manager.getGlobalIndices('fluid', self.myid)
+            self.fluidInterfaceLoads.setLocalBlock(fluidGlobalIndices, [localFluidInterfaceLoad_X, localFluidInterfaceLoad_Y, localFluidInterfaceLoad_Z])
 
         self.fluidInterfaceLoads.assemble()
 
@@ -174,9 +289,8 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
 
         if self.myid in self.manager.getFluidInterfaceProcessors():
             localFluidInterfaceTemperature = self.FluidSolver.getNodalTemperatures()
-            for iVertex in range(self.nf_loc):
-                iGlobalVertex = self.manager.getGlobalIndex('fluid', self.myid, iVertex)
-                self.fluidInterfaceTemperature[iGlobalVertex] = [localFluidInterfaceTemperature[iVertex]]
+            fluidGlobalIndices = self.manager.getGlobalIndices('fluid', self.myid)
+            self.fluidInterfaceTemperature.setLocalBlock(fluidGlobalIndices, [localFluidInterfaceTemperature])
 
         self.fluidInterfaceTemperature.assemble()
 
@@ -189,9 +303,8 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
             localFluidInterfaceNormalHeatFlux = self.FluidSolver.getNodalNormalHeatFlux()
             localFluidInterfaceTemperature = self.FluidSolver.getNodalTemperatures()
             localFluidInterfaceRobinTemperature = localFluidInterfaceTemperature - (localFluidInterfaceNormalHeatFlux/self.heatTransferCoeff)
-            for iVertex in range(self.nf_loc):
-                iGlobalVertex = self.manager.getGlobalIndex('fluid', self.myid, iVertex)
-                self.fluidInterfaceRobinTemperature[iGlobalVertex] = [localFluidInterfaceRobinTemperature[iVertex]]
+            fluidGlobalIndices = self.manager.getGlobalIndices('fluid', self.myid)
+            self.fluidInterfaceRobinTemperature.setLocalBlock(fluidGlobalIndices, [localFluidInterfaceRobinTemperature])
 
         self.fluidInterfaceRobinTemperature.assemble()
 
@@ -203,10 +316,9 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
         if self.myid in self.manager.getFluidInterfaceProcessors():
             localFluidInterfaceHeatFlux_X, localFluidInterfaceHeatFlux_Y, localFluidInterfaceHeatFlux_Z = self.FluidSolver.getNodalHeatFluxes()
             localFluidInterfaceNormalHeatFlux = self.FluidSolver.getNodalNormalHeatFlux()
-            for iVertex in range(self.nf_loc):
-                iGlobalVertex = self.manager.getGlobalIndex('fluid', self.myid, iVertex)
-                self.fluidInterfaceHeatFlux[iGlobalVertex] = [localFluidInterfaceHeatFlux_X[iVertex], localFluidInterfaceHeatFlux_Y[iVertex], localFluidInterfaceHeatFlux_Z[iVertex]]
-                self.fluidInterfaceNormalHeatFlux[iGlobalVertex] = [localFluidInterfaceNormalHeatFlux[iVertex]]
+            fluidGlobalIndices = self.manager.getGlobalIndices('fluid', self.myid)
+            self.fluidInterfaceHeatFlux.setLocalBlock(fluidGlobalIndices, [localFluidInterfaceHeatFlux_X, localFluidInterfaceHeatFlux_Y, localFluidInterfaceHeatFlux_Z])
+            self.fluidInterfaceNormalHeatFlux.setLocalBlock(fluidGlobalIndices, [localFluidInterfaceNormalHeatFlux])
 
         self.fluidInterfaceHeatFlux.assemble()
         self.fluidInterfaceNormalHeatFlux.assemble()
@@ -220,11 +332,20 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
         haloNodesData = {}
 
         if self.mpiComm != None:
-            localSize = fluidInterfaceData.getDataArray(0).shape[0]
+            localSize = fluidInterfaceData.getLocalLength()
             fluidInterfaceData_array_recon = []
-            for iDim in range(fluidInterfaceData.nDim):
-                array_recon = mpiGatherv(fluidInterfaceData.getDataArray(iDim), localSize, self.nf, self.mpiComm, 0)
-                fluidInterfaceData_array_recon.append(array_recon)
+            if fluidInterfaceData.isBlocked():
+                # one gather of the interleaved local blocks for all the components
+                with fluidInterfaceData.readBlock() as localBlock:
+                    block_recon = mpiGatherv(localBlock.reshape(-1), localSize*fluidInterfaceData.nDim, self.nf*fluidInterfaceData.nDim, self.mpiComm, 0)
+                if self.myid == 0:
+                    block_recon = block_recon.reshape(-1, fluidInterfaceData.nDim)
+                    fluidInterfaceData_array_recon = [block_recon[:,iDim] for iDim in range(fluidInterfaceData.nDim)]
+            else:
+                with fluidInterfaceData.readArrays() as localArrays:
+                    for iDim in range(fluidInterfaceData.nDim):
+                        array_recon = mpiGatherv(localArrays[iDim], localSize, self.nf, self.mpiComm, 0)
+                        fluidInterfaceData_array_recon.append(array_recon)
             haloNodesData = {}
             haloNodesData_bis = {}
             if self.myid == 0:
@@ -248,10 +369,13 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
                         sendBuffHalo[key] = []
                         for iDim in range(fluidInterfaceData.nDim):
                             sendBuffHalo[key].append(fluidInterfaceData_array_recon[iDim][globalIndex])
-                    iTagSend = 1
-                    for iDim in range(fluidInterfaceData.nDim):
-                        self.mpiComm.Send(sendBuff[iDim], dest=iProc, tag = iTagSend)
-                        iTagSend += 1
+                    if fluidInterfaceData.isBlocked():
+                        self.mpiComm.Send(np.column_stack(sendBuff), dest=iProc, tag = 1)
+                    else:
+                        iTagSend = 1
+                        for iDim in range(fluidInterfaceData.nDim):
+                            self.mpiComm.Send(sendBuff[iDim], dest=iProc, tag = iTagSend)
+                            iTagSend += 1
                     #self.mpiComm.send(sendBuffHalo, dest = iProc, tag=iTagSend)
                     sendBuffHalo_key = np.array(sendBuffHalo.keys())
                     sendBuffHalo_values = np.empty((sendBuffHalo_key.size, 3),dtype=float)
@@ -262,12 +386,18 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
                     self.mpiComm.Send(sendBuffHalo_values, dest=iProc, tag=103)
             if self.myid in self.manager.getFluidInterfaceProcessors():
                 localFluidInterfaceData_array = []
-                iTagRec = 1
-                for iDim in range(fluidInterfaceData.nDim):
-                    local_array = np.zeros(self.nf_loc)
-                    self.mpiComm.Recv(local_array, source=0, tag=iTagRec)
-                    localFluidInterfaceData_array.append(local_array)
-                    iTagRec += 1
+                if fluidInterfaceData.isBlocked():
+                    local_block = np.zeros((self.nf_loc, fluidInterfaceData.nDim))
+                    self.mpiComm.Recv(local_block, source=0, tag=1)
+                    for iDim in range(fluidInterfaceData.nDim):
+                        localFluidInterfaceData_array.append(np.ascontiguousarray(local_block[:,iDim]))
+                else:
+                    iTagRec = 1
+                    for iDim in range(fluidInterfaceData.nDim):
+                        local_array = np.zeros(self.nf_loc)
+                        self.mpiComm.Recv(local_array, source=0, tag=iTagRec)
+                        localFluidInterfaceData_array.append(local_array)
+                        iTagRec += 1
                 #haloNodesData = self.mpiComm.recv(source=0, tag=iTagRec)
                 nHaloNodesRcv = np.empty(1, dtype=int)
                 self.mpiComm.Recv(nHaloNodesRcv, source=0, tag=101)
@@ -292,11 +422,20 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
         haloNodesData_bis = {}
 
         if self.mpiComm != None:
-            localSize = solidInterfaceData.getDataArray(0).shape[0]
+            localSize = solidInterfaceData.getLocalLength()
             solidInterfaceData_array_recon = []
-            for iDim in range(solidInterfaceData.nDim):
-                array_recon = mpiGatherv(solidInterfaceData.getDataArray(iDim), localSize, self.ns+self.d, self.mpiComm, 0)
-                solidInterfaceData_array_recon.append(array_recon)
+            if solidInterfaceData.isBlocked():
+                # one gather of the interleaved local blocks for all the components
+                with solidInterfaceData.readBlock() as localBlock:
+                    block_recon = mpiGatherv(localBlock.reshape(-1), localSize*solidInterfaceData.nDim, (self.ns+self.d)*solidInterfaceData.nDim, self.mpiComm, 0)
+                if self.myid == 0:
+                    block_recon = block_recon.reshape(-1, solidInterfaceData.nDim)
+                    solidInterfaceData_array_recon = [block_recon[:,iDim] for iDim in range(solidInterfaceData.nDim)]
+            else:
+                with solidInterfaceData.readArrays() as localArrays:
+                    for iDim in range(solidInterfaceData.nDim):
+                        array_recon = mpiGatherv(localArrays[iDim], localSize, self.ns+self.d, self.mpiComm, 0)
+                        solidInterfaceData_array_recon.append(array_recon)
             haloNodesData = {}
             if self.myid == 0:
                 for iProc in self.manager.getSolidInterfaceProcessors():
@@ -319,10 +458,13 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
                         sendBuffHalo[key] = []
                         for iDim in range(solidInterfaceData.nDim):
                             sendBuffHalo[key].append(solidInterfaceData_array_recon[iDim][globalIndex])
-                    iTagSend = 1
-                    for iDim in range(solidInterfaceData.nDim):
-                        self.mpiComm.Send(sendBuff[iDim], dest=iProc, tag = iTagSend)
-                        iTagSend += 1
+                    if solidInterfaceData.isBlocked():
+                        self.mpiComm.Send(np.column_stack(sendBuff), dest=iProc, tag = 1)
+                    else:
+                        iTagSend = 1
+                        for iDim in range(solidInterfaceData.nDim):
+                            self.mpiComm.Send(sendBuff[iDim], dest=iProc, tag = iTagSend)
+                            iTagSend += 1
                     #self.mpiComm.send(sendBuffHalo, dest = iProc, tag=iTagSend)
                     sendBuffHalo_key = np.array(sendBuffHalo.keys())
                     sendBuffHalo_values = np.empty((sendBuffHalo_key.size, 3),dtype=float)
@@ -333,12 +475,18 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
                     self.mpiComm.Send(sendBuffHalo_values, dest=iProc, tag=103)
             if self.myid in self.manager.getSolidInterfaceProcessors():
                 localSolidInterfaceData_array = []
-                iTagRec = 1
-                for iDim in range(solidInterfaceData.nDim):
-                    local_array = np.zeros(self.ns_loc)
-                    self.mpiComm.Recv(local_array, source=0, tag = iTagRec)
-                    localSolidInterfaceData_array.append(local_array)
-                    iTagRec += 1
+                if solidInterfaceData.isBlocked():
+                    local_block = np.zeros((self.ns_loc, solidInterfaceData.nDim))
+                    self.mpiComm.Recv(local_block, source=0, tag=1)
+                    for iDim in range(solidInterfaceData.nDim):
+                        localSolidInterfaceData_array.append(np.ascontiguousarray(local_block[:,iDim]))
+                else:
+                    iTagRec = 1
+                    for iDim in range(solidInterfaceData.nDim):
+                        local_array = np.zeros(self.ns_loc)
+                        self.mpiComm.Recv(local_array, source=0, tag = iTagRec)
+                        localSolidInterfaceData_array.append(local_array)
+                        iTagRec += 1
                 #haloNodesData = self.mpiComm.recv(source=0, tag=iTagRec)
                 nHaloNodesRcv = np.empty(1, dtype=int)
                 self.mpiComm.Recv(nHaloNodesRcv, source=0, tag=101)
@@ -515,659 +663,1867 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
 
         self.interpolateFluidToSolid(self.fluidInterfaceRobinTemperature, self.solidInterfaceRobinTemperature)
 
-    def getNs(self):
+    def computeCoordinatesNormalization(self):
         """
         Des.
+        Computes the centre and the size of the bounding box of the whole (solid and fluid) interface.
         """
 
-        return self.ns
+        localBox = np.empty(6)
+        localBox[:3] = np.inf
+        localBox[3:] = -np.inf
+        for solver, processors in [(self.SolidSolver, self.manager.getSolidInterfaceProcessors()), (self.FluidSolver, self.manager.getFluidInterfaceProcessors())]:
+            if self.mpiComm == None or self.myid in processors:
+                for iDim, array in enumerate(solver.getNodalInitialPositions()):
+                    if len(array) > 0:
+                        localBox[iDim] = min(localBox[iDim], np.min(array))
+                        localBox[3+iDim] = max(localBox[3+iDim], np.max(array))
 
-    def getNf(self):
-        """
-        Des.
-        """
+        if self.mpiComm != None:
+            from mpi4py import MPI
+            boxMin = np.empty(3)
+            boxMax = np.empty(3)
+            self.mpiComm.Allreduce(localBox[:3].copy(), boxMin, op=MPI.MIN)
+            self.mpiComm.Allreduce(localBox[3:].copy(), boxMax, op=MPI.MAX)
+        else:
+            boxMin = localBox[:3]
+            boxMax = localBox[3:]
 
-        return self.nf
+        self.coordinatesCentre = 0.5*(boxMin+boxMax)
+        self.coordinatesScale = np.max(boxMax-boxMin)
+        if not self.coordinatesScale > 0.0:
+            self.coordinatesScale = 1.0
 
-    def getd(self):
+        mpiPrint('Interface coordinates normalized (centre {}, scale {})'.format(self.coordinatesCentre, self.coordinatesScale), self.mpiComm)
+
+    def normalizePositions(self, X, Y, Z):
         """
         Des.
+        Returns the coordinates seen by the kernels.
         """
 
-        return self.d
+        if not self.normalizeCoordinates:
+            return X, Y, Z
 
-class MatchingMeshesInterpolator(InterfaceInterpolator):
-    """
-    Description.
-    """
+        return tuple(np.ascontiguousarray((np.asarray(array, dtype=float)-self.coordinatesCentre[iDim])/self.coordinatesScale) for iDim, array in enumerate((X, Y, Z)))
 
-    def __init__(self, Manager, FluidSolver, SolidSolver, mpiComm = None, chtTransferMethod=None, heatTransferCoeff=1.0):
+    def getInterfacePositions(self, solver):
         """
-        Description
+        Des.
+        Returns the (normalized if requested) initial positions of the local interface nodes of solver.
         """
 
-        InterfaceInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff)
+        X, Y, Z = solver.getNodalInitialPositions()
+        # only the rows being recomputed by an incremental remapping
+        if solver is self.FluidSolver and self.fluidRowSubset is not None:
+            X, Y, Z = (np.asarray(array)[self.fluidRowSubset] for array in (X, Y, Z))
 
-        mpiPrint('\nSetting matching meshes interpolator...', mpiComm)
+        return self.normalizePositions(X, Y, Z)
 
-        if self.nf != self.ns:
-            raise Exception("Fluid and solid interface must have the same number of nodes for matching meshes ! ")
-        ccupydo.CInterpolator.matching_initSearch(self)
+    def setCompression(self, compressed, compressionTolerance):
+        """
+        Des.
+        Enables the hierarchical compression of the TPS matrices (see HierarchicalInterfaceMatrix).
+        The compressed backend is serial only : the cluster trees, the low rank blocks and the preconditioner are built in Python
+        on the whole interface, there is no distributed (PETSc) counterpart, so that it is refused in parallel.
+        """
 
-        self.generateInterfaceData()
+        if compressed and self.mpiComm != None:
+            raise Exception('Hierarchical compression of the TPS matrices is only available in serial !')
 
-        self.generateMapping()
+        self.compressed = compressed
+        self.compressionTolerance = compressionTolerance if compressed else None
 
-    def checkConservation(self):
+    def fillCompressedMatrix(self, H, targetSolver, sourceSolver, saddle=False):
         """
         Des.
+        Fills the hierarchical matrix H with the TPS kernel from the positions of sourceSolver to the ones of targetSolver.
         """
 
-        WSX, WSY, WSZ = self.solidInterfaceLoads.dot(self.solidInterfaceDisplacement)
+        start = tm.time()
+        H.fill(np.column_stack(self.getInterfacePositions(targetSolver)), np.column_stack(self.getInterfacePositions(sourceSolver)), self.nDim, saddle)
+        stop = tm.time()
+        mpiPrint('Compressed matrix of size {} X {} built in {} s ({:.2%} of the dense storage, {} low rank blocks)'.format(H.sizes[0], H.sizes[1], stop-start, H.getCompressionRatio(), len(H.farField)), self.mpiComm)
 
-        WFX, WFY, WFZ = self.fluidInterfaceLoads.dot(self.fluidInterfaceDisplacement)
+    def getKernelRadius(self):
+        """
+        Des.
+        Support radius of the compact kernels, in the units of the normalized coordinates.
+        """
 
-        mpiPrint("Checking f/s interface conservation...", self.mpiComm)
-        mpiPrint('Solid side (Wx, Wy, Wz) = ({}, {}, {})'.format(WSX, WSY, WSZ), self.mpiComm)
-        mpiPrint('Fluid side (Wx, Wy, Wz) = ({}, {}, {})'.format(WFX, WFY, WFZ), self.mpiComm)
+        return 1.01*self.radius/self.coordinatesScale
 
-    def generateInterfaceData(self):
+    def computeAdaptiveRadii(self, physics):
         """
         Des.
+        Support radius of each donor node of physics : 1.01 times the distance to its nNeighbours-th nearest neighbour (the node itself excluded),
+        clamped to [minRadius, radius]. The neighbours are searched (ADT k-NN queries) among the nodes of all the partitions within the search margin.
+        Only the local radii are stored here, the radii of the other partitions are received along with their coordinates (see exchangeInterfaceCoordinates).
         """
 
-        if self.manager.mechanical:
-            self.solidInterfaceDisplacement = FlexInterfaceData(self.ns, 3, self.mpiComm)
-            self.fluidInterfaceDisplacement = FlexInterfaceData(self.nf, 3, self.mpiComm)
-            self.solidInterfaceLoads = FlexInterfaceData(self.ns, 3, self.mpiComm)
-            self.fluidInterfaceLoads = FlexInterfaceData(self.nf, 3, self.mpiComm)
+        if physics == 'solid':
+            solver, processors = self.SolidSolver, self.manager.getSolidInterfaceProcessors()
+        else:
+            solver, processors = self.FluidSolver, self.manager.getFluidInterfaceProcessors()
 
-        if self.manager.thermal :
-            if self.chtTransferMethod == 'TFFB':
-                self.solidInterfaceTemperature = FlexInterfaceData(self.ns, 1, self.mpiComm)
-                self.fluidInterfaceTemperature = FlexInterfaceData(self.nf, 1, self.mpiComm)
-                self.solidInterfaceHeatFlux = FlexInterfaceData(self.ns, 3, self.mpiComm)
-                self.fluidInterfaceHeatFlux = FlexInterfaceData(self.nf, 3, self.mpiComm)
-            elif self.chtTransferMethod == 'FFTB':
-                self.solidInterfaceTemperature = FlexInterfaceData(self.ns, 1, self.mpiComm)
-                self.fluidInterfaceTemperature = FlexInterfaceData(self.nf, 1, self.mpiComm)
-                self.solidInterfaceHeatFlux = FlexInterfaceData(self.ns, 3, self.mpiComm)
-                self.fluidInterfaceHeatFlux = FlexInterfaceData(self.nf, 3, self.mpiComm)
-                self.fluidInterfaceNormalHeatFlux = FlexInterfaceData(self.nf, 1, self.mpiComm)
-                self.solidInterfaceNormalHeatFlux = FlexInterfaceData(self.ns, 1, self.mpiComm)
-            elif self.chtTransferMethod == 'hFTB':
-                self.fluidInterfaceRobinTemperature = FlexInterfaceData(self.nf, 1, self.mpiComm)
-                self.solidInterfaceRobinTemperature = FlexInterfaceData(self.ns, 1, self.mpiComm)
-                self.solidInterfaceTemperature = FlexInterfaceData(self.ns, 1, self.mpiComm)
-                self.fluidInterfaceTemperature = FlexInterfaceData(self.nf, 1, self.mpiComm)
-            elif self.chtTransferMethod == 'hFFB':
-                self.fluidInterfaceRobinTemperature = FlexInterfaceData(self.nf, 1, self.mpiComm)
-                self.solidInterfaceRobinTemperature = FlexInterfaceData(self.ns, 1, self.mpiComm)
-                self.solidInterfaceHeatFlux = FlexInterfaceData(self.ns, 3, self.mpiComm)
-                self.fluidInterfaceHeatFlux = FlexInterfaceData(self.nf, 3, self.mpiComm)
+        if self.mpiComm == None or self.myid in processors:
+            X, Y, Z = self.getInterfacePositions(solver)
+        else:
+            X, Y, Z = np.zeros(0), np.zeros(0), np.zeros(0)
 
-        self.H = InterfaceMatrix((self.nf,self.ns), self.mpiComm)
-        self.H_T = InterfaceMatrix((self.ns,self.nf), self.mpiComm)
-        self.H.createSparse(1,1)
-        self.H_T.createSparse(1,1)
+        # the previous radii are not sent with the coordinates of the neighbour search
+        self.donorRadii.pop(physics, None)
 
-    def generateMapping(self):
-        """
-        Des.
-        """
+        # the node itself is its own nearest neighbour
+        k = self.nNeighbours+1
+        distances = np.full(len(X)*k, np.inf)
+        for iProc, buffRcv_X, buffRcv_Y, buffRcv_Z in self.exchangeInterfaceCoordinates(physics, physics):
+            ccupydo.CInterpolator.kNN_updateDistances(self, X, Y, Z, buffRcv_X, buffRcv_Y, buffRcv_Z, distances, physics, iProc)
 
-        solidInterfaceProcessors = self.manager.getSolidInterfaceProcessors()
-        fluidInterfaceProcessors = self.manager.getFluidInterfaceProcessors()
-        solidPhysicalInterfaceNodesDistribution = self.manager.getSolidPhysicalInterfaceNodesDistribution()
+        # a neighbour beyond the search margin would give a radius larger than the maximum one anyway
+        maxRadius = self.getKernelRadius()
+        minRadius = min(1.01*self.minRadius/self.coordinatesScale, maxRadius)
+        radii = np.clip(1.01*distances.reshape(len(X), k)[:,k-1], minRadius, maxRadius)
 
-        mpiPrint('\nBuilding interpolation matrix...', self.mpiComm)
-        mpiPrint('\nBuilding matrix H of size {} X {}...'.format(self.nf, self.ns), self.mpiComm)
-        self.mappingTimer.start()
+        self.donorRadii[physics] = {self.myid: radii}
 
+        statistics = (len(radii), np.min(radii) if len(radii) > 0 else np.inf, np.max(radii) if len(radii) > 0 else -np.inf, np.sum(radii))
         if self.mpiComm != None:
-            for iProc in solidInterfaceProcessors:
-                if self.myid == iProc:
-                    localSolidInterface_array_X, localSolidInterface_array_Y, localSolidInterface_array_Z = self.SolidSolver.getNodalInitialPositions()
-                    for jProc in fluidInterfaceProcessors:
-                        self.mpiComm.Send(localSolidInterface_array_X, dest=jProc, tag=1)
-                        self.mpiComm.Send(localSolidInterface_array_Y, dest=jProc, tag=2)
-                        self.mpiComm.Send(localSolidInterface_array_Z, dest=jProc, tag=3)
-                if self.myid in fluidInterfaceProcessors:
-                    sizeOfBuff = solidPhysicalInterfaceNodesDistribution[iProc]
-                    solidInterfaceBuffRcv_X = np.zeros(sizeOfBuff)
-                    solidInterfaceBuffRcv_Y = np.zeros(sizeOfBuff)
-                    solidInterfaceBuffRcv_Z = np.zeros(sizeOfBuff)
-                    self.mpiComm.Recv(solidInterfaceBuffRcv_X, iProc, tag=1)
-                    self.mpiComm.Recv(solidInterfaceBuffRcv_Y, iProc, tag=2)
-                    self.mpiComm.Recv(solidInterfaceBuffRcv_Z, iProc, tag=3)
-                    self.mappingSearch(solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, iProc)
-            if self.myid in fluidInterfaceProcessors:
-                self.fillMatrix()
-        else:
-            localSolidInterface_array_X, localSolidInterface_array_Y, localSolidInterface_array_Z = self.SolidSolver.getNodalInitialPositions()
-            self.mappingSearch(localSolidInterface_array_X, localSolidInterface_array_Y, localSolidInterface_array_Z, 0)
-            self.fillMatrix()
+            statistics = zip(*self.mpiComm.allgather(statistics))
+            statistics = (sum(statistics[0]), min(statistics[1]), max(statistics[2]), sum(statistics[3]))
+        if statistics[0] > 0:
+            mpiPrint('Adaptive {} support radii ({} neighbours) from {} to {}, mean {}'.format(physics, self.nNeighbours, statistics[1], statistics[2], statistics[3]/statistics[0]), self.mpiComm)
 
-        mpiBarrier(self.mpiComm)
-        mpiPrint("\nAssembling H & H_T...", self.mpiComm)
-        start = tm.time()
-        self.H.assemble()
-        mpiBarrier(self.mpiComm)
-        self.H_T.assemble()
-        mpiBarrier(self.mpiComm)
-        stop = tm.time()
-        mpiPrint('Assembly performed in {} s'.format(stop-start), self.mpiComm)
-        mpiPrint('Matrix H is built.', self.mpiComm)
+    def getDonorRadii(self, physics, iProc):
+        """
+        Des.
+        Support radii of the donor nodes of physics owned by iProc (empty for a uniform radius).
+        Only the local radii and those of the partitions received by the last exchangeInterfaceCoordinates from physics are known.
+        """
 
-        self.mappingTimer.stop()
-        self.mappingTimer.cumul()
+        if self.nNeighbours == None:
+            return np.zeros(0)
 
-    def mappingSearch(self, solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, iProc):
+        return self.donorRadii[physics][iProc]
+
+    def getDonorPositions(self, physics):
         """
         Des.
+        Initial positions of the local interface nodes of physics that act as donors (interpolation centres).
         """
 
-        localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init = self.FluidSolver.getNodalInitialPositions()
+        if physics == 'solid':
+            return self.SolidSolver.getNodalInitialPositions()
+        else:
+            return self.FluidSolver.getNodalInitialPositions()
 
-        print('Matching mapping search on rank {}...'.format(self.myid))
-        start = tm.time()
-        ccupydo.CInterpolator.matching_search(self, localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init,
-                                              solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, iProc)
-        stop = tm.time()
-        print('Search on rank {} in {} s'.format(self.myid,stop-start))
+    def getDonorDistribution(self, physics):
+        """
+        Des.
+        Number of donor nodes of physics on each rank.
+        """
 
-    def fillMatrix(self):
+        if physics == 'solid':
+            return self.manager.getSolidPhysicalInterfaceNodesDistribution()
+        else:
+            return self.manager.getFluidPhysicalInterfaceNodesDistribution()
+
+    def getSearchMargin(self):
         """
         Des.
+        Distance beyond which donor points do not contribute to the mapping (None for a global support).
         """
 
-        print('Building H on rank {}...'.format(self.myid))
-        start = tm.time()
-        ccupydo.CInterpolator.matching_fillMatrix(self, self.H, self.H_T)
-        stop = tm.time()
-        print('Built H on rank {} in {} s'.format(self.myid,stop-start))
+        return None
 
-    def interpolateFluidToSolid(self, fluidInterfaceData, solidInterfaceData):
+    def exchangeInterfaceCoordinates(self, donorPhysics, receiverPhysics):
         """
-        des.
+        Des.
+        Sends the initial coordinates of the donor interface partitions to the receiver partitions.
+        Only the partitions whose bounding boxes, inflated by the search margin, overlap are exchanged.
+        Once computed, the adaptive support radii of the donors are sent in the same message (see getDonorRadii).
+        Returns the list of (iProc, X, Y, Z) received by the rank, sorted by donor rank.
         """
 
-        self.H_T.mult(fluidInterfaceData, solidInterfaceData)
+        if donorPhysics == 'solid':
+            donorProcessors = self.manager.getSolidInterfaceProcessors()
+        else:
+            donorProcessors = self.manager.getFluidInterfaceProcessors()
+        donorDistribution = self.getDonorDistribution(donorPhysics)
 
-    def interpolateSolidToFluid(self, solidInterfaceData, fluidInterfaceData):
+        if receiverPhysics == 'solid':
+            receiverSolver = self.SolidSolver
+            receiverProcessors = self.manager.getSolidInterfaceProcessors()
+        else:
+            receiverSolver = self.FluidSolver
+            receiverProcessors = self.manager.getFluidInterfaceProcessors()
+
+        if self.mpiComm == None:
+            X, Y, Z = self.getDonorPositions(donorPhysics)
+            return [(0,) + self.normalizePositions(X, Y, Z)]
+
+        from mpi4py import MPI
+
+        margin = self.getSearchMargin()
+
+        def boundingBox(arrays):
+            box = np.empty(6)
+            box[:3] = np.inf
+            box[3:] = -np.inf
+            for iDim, array in enumerate(arrays):
+                if len(array) > 0:
+                    box[iDim] = np.min(array)
+                    box[3+iDim] = np.max(array)
+            return box
+
+        localDonorBox = None
+        localReceiverBox = None
+        if self.myid in donorProcessors:
+            localDonor = self.getDonorPositions(donorPhysics)
+            localDonorBox = boundingBox(localDonor)
+        if self.myid in receiverProcessors:
+            localReceiverBox = boundingBox(receiverSolver.getNodalInitialPositions())
+        donorBoxes = self.mpiComm.allgather(localDonorBox)
+        receiverBoxes = self.mpiComm.allgather(localReceiverBox)
+
+        def overlap(iProc, jProc):
+            # partitions without donor nodes have nothing to send
+            if donorDistribution[iProc] == 0:
+                return False
+            if margin == None:
+                return True
+            dBox = donorBoxes[iProc]
+            rBox = receiverBoxes[jProc]
+            # small tolerance relative to the box sizes to be robust to round-off (e.g. matching meshes)
+            tol = margin + 1e-8*max(1.0, np.max(np.abs(dBox)), np.max(np.abs(rBox)))
+            return bool(np.all(dBox[:3] <= rBox[3:]+tol) and np.all(dBox[3:] >= rBox[:3]-tol))
+
+        # the radii of the donors are the fourth row of the messages
+        withRadii = donorPhysics in self.donorRadii
+        nRows = 4 if withRadii else 3
+
+        requests = []
+        if self.myid in donorProcessors:
+            sendBuff = np.ascontiguousarray(np.vstack(tuple(localDonor) + ((self.donorRadii[donorPhysics][self.myid],) if withRadii else ())), dtype=float)
+            for jProc in receiverProcessors:
+                if overlap(self.myid, jProc):
+                    requests.append(self.mpiComm.Isend(sendBuff, dest=jProc, tag=11))
+
+        received = []
+        if self.myid in receiverProcessors:
+            for iProc in donorProcessors:
+                if overlap(iProc, self.myid):
+                    rcvBuff = np.empty((nRows, donorDistribution[iProc]), dtype=float)
+                    self.mpiComm.Recv(rcvBuff, source=iProc, tag=11)
+                    if withRadii:
+                        self.donorRadii[donorPhysics][iProc] = rcvBuff[3].copy()
+                    received.append((iProc,) + self.normalizePositions(rcvBuff[0], rcvBuff[1], rcvBuff[2]))
+
+        MPI.Request.Waitall(requests)
+
+        return received
+
+    def preallocateMatrices(self, matrices, buffers, fillMethod):
         """
         Des.
+        Creates the matrices with an exact nonzero preallocation (if exactPreallocation is set).
+        The nonzero pattern is counted by a first pass of fillMethod over the received buffers.
         """
 
-        self.H.mult(solidInterfaceData, fluidInterfaceData)
+        if not self.exactPreallocation:
+            return
 
-class ConservativeInterpolator(InterfaceInterpolator):
-    """
-    Description.
-    """
+        if self.mpiComm != None:
+            for matrix in matrices:
+                matrix.initNonZeros()
+            for iProc, buffRcv_X, buffRcv_Y, buffRcv_Z in buffers:
+                fillMethod(buffRcv_X, buffRcv_Y, buffRcv_Z, iProc)
+        for matrix in matrices:
+            matrix.createSparseExactAlloc()
 
-    def __init__(self, Manager, FluidSolver, SolidSolver, mpiComm = None, chtTransferMethod=None, heatTransferCoeff=1.0):
+    def fillExplicitOperator(self, H, M, solver, nSolve, dropTol, blockSize):
+        """
+        Des.
+        Fills the explicit operator H = M*K^{-1}, solver solving the systems with K (of size nSolve).
+        The rows of H are computed by blocks of blockSize : K^{-T}*(M^T*E) gives the rows of H selected by the unit vectors E.
+        Entries whose magnitude does not exceed dropTol are dropped.
+        The rows are inserted as soon as they are computed, H is preallocated from the lengths of the rows of the first block.
+        """
+
+        nRows = M.sizes[0]
+        E = FlexInterfaceData(nRows, blockSize, self.mpiComm)
+        MT_E = FlexInterfaceData(nSolve, blockSize, self.mpiComm)
+        X = FlexInterfaceData(nSolve, blockSize, self.mpiComm)
+        startE, stopE = E.getOwnershipRange()
+        startX, stopX = X.getOwnershipRange()
+
+        if nRows == 0:
+            self.createExplicitOperator(H, nSolve, np.zeros(0, dtype=np.intc))
+        for firstRow in range(0, nRows, blockSize):
+            nBlockRows = min(blockSize, nRows-firstRow)
+            for iDim in range(blockSize):
+                E.setAllValues(iDim, 0.0)
+                if startE <= firstRow+iDim < stopE:
+                    E.setValue(iDim, firstRow+iDim, 1.0)
+            E.assemble()
+            M.multTranspose(E, MT_E)
+            solver.solveTranspose(MT_E, X)
+            with X.readArrays() as columns:
+                # each rank holds the entries of the rows in the columns it owns
+                nonZeros = [np.flatnonzero(np.abs(columns[iDim]) > dropTol) for iDim in range(nBlockRows)]
+                if firstRow == 0:
+                    self.createExplicitOperator(H, nSolve, np.array([len(cols) for cols in nonZeros]))
+                for iDim in range(nBlockRows):
+                    if len(nonZeros[iDim]) > 0:
+                        H.setRowValues(firstRow+iDim, (nonZeros[iDim]+startX).astype(np.intc), columns[iDim][nonZeros[iDim]])
+            # the entries of the rows owned by the other ranks are sent block by block rather than stashed until the assembly
+            H.flush()
+        H.assemble()
+
+    def createExplicitOperator(self, H, nCols, localRowLengths):
         """
         Des.
+        Creates the sparse explicit operator H with nCols columns, preallocated with the longest row of localRowLengths
+        (lengths of the first rows on this rank, the longer rows are allocated on the fly).
         """
 
-        InterfaceInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff)
+        rowLengths = np.array(localRowLengths, dtype=np.intc)
+        if self.mpiComm != None:
+            from mpi4py import MPI
+            self.mpiComm.Allreduce(localRowLengths.astype(np.intc), rowLengths, MPI.SUM)
+        rowLength = int(np.max(rowLengths)) if len(rowLengths) > 0 else 0
 
-        mpiPrint('\nSetting non-matching conservative interpolator...', mpiComm)
+        if rowLength > 0.5*nCols:
+            mpiPrint('WARNING : the explicit operator is nearly dense ({} nonzeros out of {} columns in the first rows) !'.format(rowLength, nCols), self.mpiComm)
 
-        self.d = self.nDim+1
-        self.SolverA = None
-        self.SolverA_T = None
+        H.createSparse(rowLength, rowLength)
 
-    def getLinearSolvers(self):
+    def buildMapping(self):
         """
         Des.
-        """
+        Loads the interpolation matrices from the mapping cache if possible, generates (and stores) them otherwise.
+        """
+
+        if self.mappingCacheDir != None:
+            cache = MappingCache(self.mappingCacheDir, self.mpiComm)
+            key = cache.computeKey(self.getMappingSignature(), self.getLocalInterfaceCoordinates())
+            isLoaded = False
+            if cache.contains(key, self.getMappingMatrices().keys()):
+                self.mappingTimer.start()
+                isLoaded = cache.load(key, self.getMappingMatrices())
+                self.mappingTimer.stop()
+                self.mappingTimer.cumul()
+                if not isLoaded:
+                    # the matrices may have been partially overwritten
+                    self.generateInterfaceData()
+            if isLoaded:
+                mpiPrint('\nInterpolation matrices loaded from the mapping cache (key {}).'.format(key), self.mpiComm)
+            else:
+                mpiPrint('\nNo valid entry in the mapping cache, building the interpolation matrices...', self.mpiComm)
+                self.generateMapping()
+                cache.save(key, self.getMappingMatrices())
+        else:
+            self.generateMapping()
+        # the search trees are only used while the matrices are filled
+        self.clearSearchTrees()
 
-        return [self.SolverA, self.SolverA_T]
+        self.generateLinearSolvers()
 
-    def checkConservation(self):
+    def enableIncrementalRemapping(self, tolerance=0.0):
         """
         Des.
+        Enables the update of the mapping after a change of the fluid interface nodes (remeshing), see updateMapping.
+        A node is considered as moved if its initial position changed by more than tolerance.
+        Serial only.
         """
 
-        WSX, WSY, WSZ = self.solidInterfaceLoads.dot(self.solidInterfaceDisplacement)
-
-        WFX, WFY, WFZ = self.fluidInterfaceLoads.dot(self.fluidInterfaceDisplacement)
+        if self.mpiComm != None:
+            raise Exception("Incremental remapping is only available in serial (the interface nodes cannot be repartitioned) !")
 
-        mpiPrint("Checking f/s interface conservation...", self.mpiComm)
-        mpiPrint('Solid side (Wx, Wy, Wz) = ({}, {}, {})'.format(WSX, WSY, WSZ), self.mpiComm)
-        mpiPrint('Fluid side (Wx, Wy, Wz) = ({}, {}, {})'.format(WFX, WFY, WFZ), self.mpiComm)
+        self.incrementalRemapping = True
+        self.remappingTolerance = tolerance
+        self.interfaceNodes['fluid'] = self.getInterfaceNodes(self.FluidSolver)
+        self.interfaceNodes['solid'] = self.getInterfaceNodes(self.SolidSolver)
 
-    def generateInterfaceData(self):
+    def enableBlockedStorage(self):
         """
-        Description.
+        Des.
+        Stores the components of the interface data interleaved in one PETSc vector (block size nDim) instead of one vector per component.
+        The interpolation products, the reductions and the gathers are then done once for all the components.
+        Parallel only (the serial storage is already interleaved), to be called before the algorithm is created.
         """
 
-        if self.manager.mechanical:
-            self.solidInterfaceDisplacement = FlexInterfaceData(self.ns + self.d, 3, self.mpiComm)
-            self.fluidInterfaceDisplacement = FlexInterfaceData(self.nf, 3, self.mpiComm)
-            self.solidInterfaceLoads = FlexInterfaceData(self.ns + self.d, 3, self.mpiComm)
-            self.fluidInterfaceLoads = FlexInterfaceData(self.nf, 3, self.mpiComm)
-
-        if self.manager.thermal :
-            if self.chtTransferMethod == 'TFFB':
-                self.solidInterfaceTemperature = FlexInterfaceData(self.ns + self.d, 1, self.mpiComm)
-                self.fluidInterfaceTemperature = FlexInterfaceData(self.nf, 1, self.mpiComm)
-                self.solidInterfaceHeatFlux = FlexInterfaceData(self.ns + self.d, 3, self.mpiComm)
-                self.fluidInterfaceHeatFlux = FlexInterfaceData(self.nf, 3, self.mpiComm)
-            elif self.chtTransferMethod == 'FFTB':
-                self.solidInterfaceTemperature = FlexInterfaceData(self.ns + self.d, 1, self.mpiComm)
-                self.fluidInterfaceTemperature = FlexInterfaceData(self.nf, 1, self.mpiComm)
-                self.solidInterfaceHeatFlux = FlexInterfaceData(self.ns + self.d, 3, self.mpiComm)
-                self.fluidInterfaceHeatFlux = FlexInterfaceData(self.nf, 3, self.mpiComm)
-                self.fluidInterfaceNormalHeatFlux = FlexInterfaceData(self.nf, 1, self.mpiComm)
-                self.solidInterfaceNormalHeatFlux = FlexInterfaceData(self.ns, 1, self.mpiComm)
-            elif self.chtTransferMethod == 'hFTB':
-                self.fluidInterfaceRobinTemperature = FlexInterfaceData(self.nf, 1, self.mpiComm)
-                self.solidInterfaceRobinTemperature = FlexInterfaceData(self.ns, 1, self.mpiComm)
-                self.solidInterfaceTemperature = FlexInterfaceData(self.ns + self.d, 1, self.mpiComm)
-                self.fluidInterfaceTemperature = FlexInterfaceData(self.nf, 1, self.mpiComm)
-            elif self.chtTransferMethod == 'hFFB':
-                self.fluidInterfaceRobinTemperature = FlexInterfaceData(self.nf, 1, self.mpiComm)
-                self.solidInterfaceRobinTemperature = FlexInterfaceData(self.ns, 1, self.mpiComm)
-                self.solidInterfaceHeatFlux = FlexInterfaceData(self.ns + self.d, 3, self.mpiComm)
-                self.fluidInterfaceHeatFlux = FlexInterfaceData(self.nf, 3, self.mpiComm)
+        if self.mpiComm == None:
+            return
 
-        self.A = InterfaceMatrix((self.ns+self.d,self.ns+self.d), self.mpiComm)
-        self.A_T = InterfaceMatrix((self.ns+self.d,self.ns+self.d), self.mpiComm)
-        self.B = InterfaceMatrix((self.nf,self.ns+self.d), self.mpiComm)
-        self.B_T = InterfaceMatrix((self.ns+self.d,self.nf), self.mpiComm)
+        self.blockedData = True
+        self.generateInterfaceData()
 
-    def generateMapping(self):
+    def getInterfaceNodes(self, solver):
         """
         Des.
+        Returns the identifiers (solver indexing) and the initial positions (nPoint X 3) of the physical interface nodes of solver.
         """
 
-        solidInterfaceProcessors = self.manager.getSolidInterfaceProcessors()
-        fluidInterfaceProcessors = self.manager.getFluidInterfaceProcessors()
-        solidPhysicalInterfaceNodesDistribution = self.manager.getSolidPhysicalInterfaceNodesDistribution()
-
-        mpiPrint('\nBuilding interpolation matrices...', self.mpiComm)
+        nodeIndices = np.array([solver.getNodalIndex(iVertex) for iVertex in range(solver.nPhysicalNodes)], dtype=int)
+        positions = np.column_stack(solver.getNodalInitialPositions()) if solver.nPhysicalNodes > 0 else np.zeros((0,3))
 
-        mpiPrint('\nBuilding matrix A of size {} X {}...'.format(self.ns, self.ns), self.mpiComm)
-        # Fill the matrix A
-        if self.mpiComm != None:
-            for iProc in solidInterfaceProcessors:
-                if self.myid == iProc:
-                    localSolidInterface_array_X, localSolidInterface_array_Y, localSolidInterface_array_Z = self.SolidSolver.getNodalInitialPositions()
-                    for jProc in solidInterfaceProcessors:
-                        self.mpiComm.Send(localSolidInterface_array_X, dest=jProc, tag=1)
-                        self.mpiComm.Send(localSolidInterface_array_Y, dest=jProc, tag=2)
-                        self.mpiComm.Send(localSolidInterface_array_Z, dest=jProc, tag=3)
-                if self.myid in solidInterfaceProcessors:
-                    sizeOfBuff = solidPhysicalInterfaceNodesDistribution[iProc]
-                    solidInterfaceBuffRcv_X = np.zeros(sizeOfBuff)
-                    solidInterfaceBuffRcv_Y = np.zeros(sizeOfBuff)
-                    solidInterfaceBuffRcv_Z = np.zeros(sizeOfBuff)
-                    self.mpiComm.Recv(solidInterfaceBuffRcv_X, iProc, tag=1)
-                    self.mpiComm.Recv(solidInterfaceBuffRcv_Y, iProc, tag=2)
-                    self.mpiComm.Recv(solidInterfaceBuffRcv_Z, iProc, tag=3)
-                    self.fillMatrixA(solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, iProc)
-        else:
-            localSolidInterface_array_X, localSolidInterface_array_Y, localSolidInterface_array_Z = self.SolidSolver.getNodalInitialPositions()
-            self.fillMatrixA(localSolidInterface_array_X, localSolidInterface_array_Y, localSolidInterface_array_Z, 0)
+        return nodeIndices, positions
 
-        mpiBarrier(self.mpiComm)
-        mpiPrint("\nAssembling A & A_T...", self.mpiComm)
+    def updateMapping(self):
+        """
+        Des.
+        Follows a change of the fluid interface nodes (to be called after remeshing) if the incremental remapping is enabled.
+        The added, removed and moved fluid nodes are detected from their identifiers and initial positions. Only the rows of the
+        fluid row matrices (getFluidRowMatrices) of the added and moved nodes are recomputed, the other rows are moved to their
+        new position. Interpolators without fluid row matrices rebuild their mapping. The fluid interface data are resized,
+        the values of the kept nodes are preserved.
+        """
+
+        if not self.incrementalRemapping:
+            return
+
+        self.FluidSolver.updateInterfaceNodes()
+        self.SolidSolver.updateInterfaceNodes()
+
+        solidIndices, solidPositions = self.getInterfaceNodes(self.SolidSolver)
+        oldSolidIndices, oldSolidPositions = self.interfaceNodes['solid']
+        if not (np.array_equal(solidIndices, oldSolidIndices) and np.allclose(solidPositions, oldSolidPositions, rtol=0.0, atol=self.remappingTolerance)):
+            raise Exception("Incremental remapping only supports changes of the fluid interface nodes !")
+
+        fluidIndices, fluidPositions = self.getInterfaceNodes(self.FluidSolver)
+        oldFluidIndices, oldFluidPositions = self.interfaceNodes['fluid']
+
+        # source (old index) of each new fluid node, -1 for the added and moved nodes whose rows are recomputed
+        oldRows = dict((nodeIndex, iVertex) for iVertex, nodeIndex in enumerate(oldFluidIndices))
+        source = np.array([oldRows.get(nodeIndex, -1) for nodeIndex in fluidIndices], dtype=int)
+        kept = source >= 0
+        nAdded = len(source) - np.count_nonzero(kept)
+        moved = np.zeros(len(source), dtype=bool)
+        moved[kept] = np.linalg.norm(fluidPositions[kept]-oldFluidPositions[source[kept]], axis=1) > self.remappingTolerance
+        source[moved] = -1
+        affected = np.flatnonzero(source < 0).astype(int)
+        nRemoved = len(oldFluidIndices) - np.count_nonzero(kept)
+
+        if len(affected) == 0 and nRemoved == 0 and np.array_equal(source, np.arange(len(oldFluidIndices))):
+            return
+
+        mpiPrint('\nUpdating the mapping after a change of the fluid interface ({} added, {} removed, {} moved nodes)...'.format(nAdded, nRemoved, np.count_nonzero(moved)), self.mpiComm)
         start = tm.time()
-        self.A.assemble()
-        mpiBarrier(self.mpiComm)
-        self.A_T.assemble()
-        mpiBarrier(self.mpiComm)
-        stop = tm.time()
-        mpiPrint('Assembly performed in {} s'.format(stop-start), self.mpiComm)
-        mpiPrint('Matrix A is built.', self.mpiComm)
 
-        mpiPrint('\nBuilding matrix B of size {} X {}...'.format(self.nf, self.ns), self.mpiComm)
-        # Fill the matrix B
-        if self.mpiComm != None:
-            for iProc in solidInterfaceProcessors:
-                if self.myid == iProc:
-                    for jProc in fluidInterfaceProcessors:
-                        self.mpiComm.Send(localSolidInterface_array_X, dest=jProc, tag=1)
-                        self.mpiComm.Send(localSolidInterface_array_Y, dest=jProc, tag=2)
-                        self.mpiComm.Send(localSolidInterface_array_Z, dest=jProc, tag=3)
-                if self.myid in fluidInterfaceProcessors:
-                    sizeOfBuff = solidPhysicalInterfaceNodesDistribution[iProc]
-                    solidInterfaceBuffRcv_X = np.zeros(sizeOfBuff)
-                    solidInterfaceBuffRcv_Y = np.zeros(sizeOfBuff)
-                    solidInterfaceBuffRcv_Z = np.zeros(sizeOfBuff)
-                    self.mpiComm.Recv(solidInterfaceBuffRcv_X, iProc, tag=1)
-                    self.mpiComm.Recv(solidInterfaceBuffRcv_Y, iProc, tag=2)
-                    self.mpiComm.Recv(solidInterfaceBuffRcv_Z, iProc, tag=3)
-                    self.fillMatrixB(solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, iProc)
+        self.manager.updateInterfaceNodes(self.FluidSolver, self.SolidSolver)
+        nfOld = self.nf
+        self.setFluidSize(self.manager.getNumberOfFluidInterfaceNodes(), self.manager.getNumberOfLocalFluidInterfaceNodes())
+
+        fluidFields = self.getFluidInterfaceFields()
+        rowMatrices = self.getFluidRowMatrices()
+        if len(rowMatrices) > 0:
+            self.updateFluidRows(rowMatrices, source, affected)
+            self.clearSearchTrees()
         else:
-            self.fillMatrixB(localSolidInterface_array_X, localSolidInterface_array_Y, localSolidInterface_array_Z, 0)
+            solidFields = self.getSolidInterfaceFields()
+            explicitOperators = getattr(self, 'H_BA', None) != None
+            self.generateInterfaceData()
+            for name, data in solidFields.items():
+                setattr(self, name, data)
+            self.buildMapping()
+            if explicitOperators:
+                self.computeExplicitOperators()
+
+        # the padding (polynomial) entries of the consistent fields are kept
+        for name, data in fluidFields.items():
+            extra = data.getnPoint() - nfOld
+            setattr(self, name, data.remap(self.nf + extra, np.concatenate((source, nfOld + np.arange(extra)))))
+
+        self.interfaceNodes['fluid'] = (fluidIndices, fluidPositions)
 
-        mpiBarrier(self.mpiComm)
-        mpiPrint("\nAssembling B & B_T...", self.mpiComm)
-        start = tm.time()
-        self.B.assemble()
-        mpiBarrier(self.mpiComm)
-        self.B_T.assemble()
-        mpiBarrier(self.mpiComm)
         stop = tm.time()
-        mpiPrint('Assembly performed in {} s'.format(stop-start), self.mpiComm)
-        mpiPrint('Matrix B is built.', self.mpiComm)
-
-        self.SolverA = LinearSolver(self.A, self.mpiComm)
-        self.SolverA_T = LinearSolver(self.A_T, self.mpiComm)
+        mpiPrint('Mapping updated in {} s ({} recomputed rows out of {})'.format(stop-start, len(affected) if len(rowMatrices) > 0 else self.nf, self.nf), self.mpiComm)
 
-    def interpolateFluidToSolid(self, fluidInterfaceData, solidInterfaceData):
+    def setFluidSize(self, nf, nf_loc):
         """
-        des.
+        Des.
+        Sets the (global and local) number of fluid interface nodes seen by the fill routines.
         """
 
-        dim = fluidInterfaceData.getDim()
-        gamma_array = FlexInterfaceData(self.ns + self.d, dim, self.mpiComm)
+        self.nf = nf
+        self.nf_loc = nf_loc
 
-        self.B_T.mult(fluidInterfaceData, gamma_array)
-        self.SolverA_T.solve(gamma_array, solidInterfaceData)
-
-    def interpolateSolidToFluid(self, solidInterfaceData, fluidInterfaceData):
+    def getFluidInterfaceFields(self):
         """
         Des.
         """
 
-        dim = solidInterfaceData.getDim()
-        gamma_array = FlexInterfaceData(self.ns + self.d, dim, self.mpiComm)
-
-        self.SolverA.solve(solidInterfaceData, gamma_array)
-        self.B.mult(gamma_array, fluidInterfaceData)
-
+        names = ['fluidInterfaceDisplacement', 'fluidInterfaceLoads', 'fluidInterfaceHeatFlux', 'fluidInterfaceTemperature', 'fluidInterfaceNormalHeatFlux', 'fluidInterfaceRobinTemperature']
 
-class ConsistentInterpolator(InterfaceInterpolator):
-    """
-    Description.
-    """
+        return dict((name, getattr(self, name)) for name in names if getattr(self, name) != None)
 
-    def __init__(self, Manager, FluidSolver, SolidSolver, mpiComm = None, chtTransferMethod=None, heatTransferCoeff=1.0):
+    def getSolidInterfaceFields(self):
         """
         Des.
         """
 
-        InterfaceInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff)
-
-        mpiPrint('\nSetting non-matching consistent interpolator...', mpiComm)
+        names = ['solidInterfaceDisplacement', 'solidInterfaceLoads', 'solidInterfaceHeatFlux', 'solidInterfaceTemperature', 'solidInterfaceNormalHeatFlux', 'solidInterfaceRobinTemperature']
 
-        self.d = self.nDim+1
-        self.SolverA = None
-        self.SolverC = None
+        return dict((name, getattr(self, name)) for name in names if getattr(self, name) != None)
 
-    def getLinearSolvers(self):
+    def getFluidRowMatrices(self):
         """
         Des.
+        Names of the mapping matrices whose rows are the fluid interface nodes and whose columns do not depend on them.
+        Their rows can be recomputed independently by generateFluidRowMatrices. Empty if the mapping must be rebuilt.
         """
 
-        return [self.SolverA, self.SolverC]
+        return []
 
-    def checkConservation(self):
+    def generateFluidRowMatrices(self):
         """
         Des.
+        Creates and fills the fluid row matrices for the current fluid interface nodes.
         """
 
-        mpiPrint('No conservation check for consistent interpolation.', self.mpiComm)
+        pass
 
-    def generateInterfaceData(self):
+    def updateFluidRows(self, names, source, affected):
         """
-        Description.
+        Des.
+        The fluid row matrices are filled for the affected nodes only (by restricting the fluid positions seen by the fill routines),
+        then merged with the kept rows of the previous matrices.
         """
 
-        if self.manager.mechanical:
-            self.solidInterfaceDisplacement = FlexInterfaceData(self.ns + self.d, 3, self.mpiComm)
-            self.fluidInterfaceDisplacement = FlexInterfaceData(self.nf, 3, self.mpiComm)
-            self.solidInterfaceLoads = FlexInterfaceData(self.ns, 3, self.mpiComm)
-            self.fluidInterfaceLoads = FlexInterfaceData(self.nf + self.d, 3, self.mpiComm)
+        oldMatrices = dict((name, getattr(self, name)) for name in names)
 
-        if self.manager.thermal :
-            if self.chtTransferMethod == 'TFFB':
-                self.solidInterfaceTemperature = FlexInterfaceData(self.ns, 1, self.mpiComm)
-                self.fluidInterfaceTemperature = FlexInterfaceData(self.nf + self.d, 1, self.mpiComm)
-                self.solidInterfaceHeatFlux = FlexInterfaceData(self.ns + self.d, 3, self.mpiComm)
-                self.fluidInterfaceHeatFlux = FlexInterfaceData(self.nf, 3, self.mpiComm)
-            elif self.chtTransferMethod == 'FFTB':
-                self.solidInterfaceTemperature = FlexInterfaceData(self.ns + self.d, 1, self.mpiComm)
-                self.fluidInterfaceTemperature = FlexInterfaceData(self.nf, 1, self.mpiComm)
-                self.solidInterfaceHeatFlux = FlexInterfaceData(self.ns, 3, self.mpiComm)
-                self.fluidInterfaceHeatFlux = FlexInterfaceData(self.nf + self.d, 3, self.mpiComm)
-                self.fluidInterfaceNormalHeatFlux = FlexInterfaceData(self.nf + self.d, 1, self.mpiComm)
-                self.solidInterfaceNormalHeatFlux = FlexInterfaceData(self.ns, 1, self.mpiComm)
-            elif self.chtTransferMethod == 'hFTB':
-                self.fluidInterfaceRobinTemperature = FlexInterfaceData(self.nf + self.d, 1, self.mpiComm)
-                self.solidInterfaceRobinTemperature = FlexInterfaceData(self.ns, 1, self.mpiComm)
-                self.solidInterfaceTemperature = FlexInterfaceData(self.ns + self.d, 1, self.mpiComm)
-                self.fluidInterfaceTemperature = FlexInterfaceData(self.nf, 1, self.mpiComm)
-            elif self.chtTransferMethod == 'hFFB':
-                self.fluidInterfaceRobinTemperature = FlexInterfaceData(self.nf + self.d, 1, self.mpiComm)
-                self.solidInterfaceRobinTemperature = FlexInterfaceData(self.ns, 1, self.mpiComm)
-                self.solidInterfaceHeatFlux = FlexInterfaceData(self.ns + self.d, 3, self.mpiComm)
-                self.fluidInterfaceHeatFlux = FlexInterfaceData(self.nf, 3, self.mpiComm)
+        nf, nf_loc = self.nf, self.nf_loc
+        self.fluidRowSubset = affected
+        self.setFluidSize(len(affected), len(affected))
+        try:
+            if len(affected) > 0:
+                self.generateFluidRowMatrices()
+        finally:
+            self.fluidRowSubset = None
+            self.setFluidSize(nf, nf_loc)
 
-        self.A = InterfaceMatrix((self.ns+self.d,self.ns+self.d), self.mpiComm)
-        self.B = InterfaceMatrix((self.nf,self.ns+self.d), self.mpiComm)
-        self.C = InterfaceMatrix((self.nf+self.d,self.nf+self.d), self.mpiComm)
-        self.D = InterfaceMatrix((self.ns,self.nf+self.d), self.mpiComm)
+        for name in names:
+            partialMatrix = getattr(self, name) if len(affected) > 0 else None
+            setattr(self, name, self.mergeFluidRows(oldMatrices[name], partialMatrix, source, affected))
 
-    def generateMapping(self):
+    def mergeFluidRows(self, oldMatrix, partialMatrix, source, affected):
         """
         Des.
+        Returns the matrix of nf rows whose row i is the row source[i] of oldMatrix, or the row of partialMatrix of the i-th affected node.
+        The old and recomputed rows are stacked, the merged rows are picked from them at once and set in a single call (serial only).
         """
 
-        solidInterfaceProcessors = self.manager.getSolidInterfaceProcessors()
-        fluidInterfaceProcessors = self.manager.getFluidInterfaceProcessors()
-        solidPhysicalInterfaceNodesDistribution = self.manager.getSolidPhysicalInterfaceNodesDistribution()
-        fluidPhysicalInterfaceNodesDistribution = self.manager.getFluidPhysicalInterfaceNodesDistribution()
+        sparse = oldMatrix.isSparse()
+        nCols = oldMatrix.sizes[1]
+        matrix = InterfaceMatrix((self.nf, nCols), self.mpiComm)
+        if sparse:
+            matrix.createSparse(0, 0)
+        else:
+            matrix.createDense()
 
-        mpiPrint('\nBuilding interpolation matrices...', self.mpiComm)
+        # the recomputed rows follow the old ones in the stacked matrix
+        nOldRows = oldMatrix.sizes[0]
+        stackedRows = np.array(source, dtype=int)
+        stackedRows[affected] = nOldRows + np.arange(len(affected))
+        rows = [spsparse.csr_matrix(oldMatrix.getMat())]
+        if partialMatrix != None:
+            rows.append(spsparse.csr_matrix(partialMatrix.getMat()))
+        mergedRows = spsparse.vstack(rows, format='csr')[stackedRows]
+        mergedRows.sort_indices()
 
-        mpiPrint('\nBuilding matrix A of size {} X {}...'.format(self.ns, self.ns), self.mpiComm)
-        # Fill the matrix A
-        if self.mpiComm != None:
-            for iProc in solidInterfaceProcessors:
-                if self.myid == iProc:
-                    localSolidInterface_array_X, localSolidInterface_array_Y, localSolidInterface_array_Z = self.SolidSolver.getNodalInitialPositions()
-                    for jProc in solidInterfaceProcessors:
-                        self.mpiComm.Send(localSolidInterface_array_X, dest=jProc, tag=1)
-                        self.mpiComm.Send(localSolidInterface_array_Y, dest=jProc, tag=2)
-                        self.mpiComm.Send(localSolidInterface_array_Z, dest=jProc, tag=3)
-                if self.myid in solidInterfaceProcessors:
-                    sizeOfBuff = solidPhysicalInterfaceNodesDistribution[iProc]
-                    solidInterfaceBuffRcv_X = np.zeros(sizeOfBuff)
-                    solidInterfaceBuffRcv_Y = np.zeros(sizeOfBuff)
-                    solidInterfaceBuffRcv_Z = np.zeros(sizeOfBuff)
-                    self.mpiComm.Recv(solidInterfaceBuffRcv_X, iProc, tag=1)
-                    self.mpiComm.Recv(solidInterfaceBuffRcv_Y, iProc, tag=2)
-                    self.mpiComm.Recv(solidInterfaceBuffRcv_Z, iProc, tag=3)
-                    self.fillMatrixA(solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, iProc)
-        else:
-            localSolidInterface_array_X, localSolidInterface_array_Y, localSolidInterface_array_Z = self.SolidSolver.getNodalInitialPositions()
-            self.fillMatrixA(localSolidInterface_array_X, localSolidInterface_array_Y, localSolidInterface_array_Z, 0)
+        matrix.setRowsCSR(0, mergedRows.indptr.astype(np.intc), mergedRows.indices.astype(np.intc), mergedRows.data.astype(float))
+        matrix.assemble()
 
-        mpiBarrier(self.mpiComm)
-        mpiPrint("\nAssembling A...", self.mpiComm)
-        start = tm.time()
-        self.A.assemble()
-        mpiBarrier(self.mpiComm)
+        return matrix
+
+    def getMappingSignature(self):
+        """
+        Des.
+        Describes everything (but the coordinates) the interpolation matrices depend on.
+        """
+
+        signature = '{}|nDim={}|ns={}|nf={}|d={}|mpiSize={}'.format(self.__class__.__name__, self.nDim, self.ns, self.nf, self.d, self.mpiSize)
+        signature += '|radius={!r}|normalize={!r}'.format(getattr(self, 'radius', None), self.normalizeCoordinates)
+        signature += '|compression={!r}'.format(getattr(self, 'compressionTolerance', None))
+        signature += '|neighbours={!r}|minRadius={!r}'.format(self.nNeighbours, self.minRadius)
+        signature += '|solid={!r}|fluid={!r}'.format(list(self.manager.getSolidGlobalIndexRange()), list(self.manager.getFluidGlobalIndexRange()))
+
+        return signature
+
+    def getLocalInterfaceCoordinates(self):
+        """
+        Des.
+        """
+
+        coordinates = []
+        if self.myid in self.manager.getSolidInterfaceProcessors():
+            coordinates += list(self.SolidSolver.getNodalInitialPositions())
+        if self.myid in self.manager.getFluidInterfaceProcessors():
+            coordinates += list(self.FluidSolver.getNodalInitialPositions())
+
+        return coordinates
+
+    def getMappingMatrices(self):
+        """
+        Des.
+        """
+
+        return {}
+
+    def generateLinearSolvers(self):
+        """
+        Des.
+        """
+
+        pass
+
+    def getLinearSolvers(self):
+        """
+        Des.
+        """
+
+        return []
+
+    def setSolverProfile(self, profile):
+        """
+        Des.
+        Applies the same solver profile (see LinearSolver.setSolverProfile) to all the linear solvers of the interpolator.
+        """
+
+        for solver in self.getLinearSolvers():
+            solver.setSolverProfile(profile)
+
+    def getNs(self):
+        """
+        Des.
+        """
+
+        return self.ns
+
+    def getNf(self):
+        """
+        Des.
+        """
+
+        return self.nf
+
+    def getd(self):
+        """
+        Des.
+        """
+
+        return self.d
+
+class MatchingMeshesInterpolator(InterfaceInterpolator):
+    """
+    Description.
+    """
+
+    def __init__(self, Manager, FluidSolver, SolidSolver, mpiComm = None, chtTransferMethod=None, heatTransferCoeff=1.0, mappingCacheDir=None):
+        """
+        Description
+        """
+
+        InterfaceInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff, mappingCacheDir)
+
+        mpiPrint('\nSetting matching meshes interpolator...', mpiComm)
+
+        if self.nf != self.ns:
+            raise Exception("Fluid and solid interface must have the same number of nodes for matching meshes ! ")
+        ccupydo.CInterpolator.matching_initSearch(self)
+
+        self.generateInterfaceData()
+
+        self.buildMapping()
+
+    def generateInterfaceData(self):
+        """
+        Des.
+        """
+
+        InterfaceInterpolator.generateInterfaceData(self)
+
+        self.H = InterfacePermutation((self.nf,self.ns), self.mpiComm)
+
+    def generateMapping(self):
+        """
+        Des.
+        """
+
+        mpiPrint('\nBuilding interpolation permutation...', self.mpiComm)
+        mpiPrint('\nBuilding permutation H of size {} X {}...'.format(self.nf, self.ns), self.mpiComm)
+        self.mappingTimer.start()
+
+        for iProc, solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z in self.exchangeInterfaceCoordinates('solid', 'fluid'):
+            self.mappingSearch(solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, iProc)
+        # collective in parallel, ranks without fluid interface nodes take part with an empty mapping
+        self.fillMatrix()
+
+        mpiBarrier(self.mpiComm)
+        mpiPrint('Permutation H is built.', self.mpiComm)
+
+        self.mappingTimer.stop()
+        self.mappingTimer.cumul()
+
+    def getSearchMargin(self):
+        """
+        Des.
+        """
+
+        return 0.0
+
+    def getMappingMatrices(self):
+        """
+        Des.
+        """
+
+        return {'P':self.H}
+
+    def mappingSearch(self, solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, iProc):
+        """
+        Des.
+        """
+
+        localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init = self.FluidSolver.getNodalInitialPositions()
+
+        print('Matching mapping search on rank {}...'.format(self.myid))
+        start = tm.time()
+        ccupydo.CInterpolator.matching_search(self, localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init,
+                                              solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, iProc)
+        stop = tm.time()
+        print('Search on rank {} in {} s'.format(self.myid,stop-start))
+
+    def fillMatrix(self):
+        """
+        Des.
+        """
+
+        print('Building H on rank {}...'.format(self.myid))
+        start = tm.time()
+        ccupydo.CInterpolator.matching_fillPermutation(self, self.H)
+        stop = tm.time()
+        print('Built H on rank {} in {} s'.format(self.myid,stop-start))
+
+    def interpolateFluidToSolid(self, fluidInterfaceData, solidInterfaceData):
+        """
+        des.
+        """
+
+        self.H.multTranspose(fluidInterfaceData, solidInterfaceData)
+
+    def interpolateSolidToFluid(self, solidInterfaceData, fluidInterfaceData):
+        """
+        Des.
+        """
+
+        self.H.mult(solidInterfaceData, fluidInterfaceData)
+
+class IDWInterpolator(InterfaceInterpolator):
+    """
+    Inverse distance weighting interpolator.
+    Each fluid node takes the weighted mean of its nNeighbours nearest solid nodes (ADT k-NN queries), with weights 1/d^power.
+    The sparse operator H (nf X ns) needs no linear solve : the solid to fluid transfer is H*solid and the fluid to solid
+    transfer H^T*fluid (conservative). Only exact for constant fields, meant for cheap transfers.
+    """
+
+    def __init__(self, Manager, FluidSolver, SolidSolver, nNeighbours=4, power=2.0, mpiComm=None, chtTransferMethod=None, heatTransferCoeff=1.0, mappingCacheDir=None):
+        """
+        Des.
+        """
+
+        InterfaceInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff, mappingCacheDir)
+
+        mpiPrint('\nSetting inverse distance weighting interpolator...', mpiComm)
+
+        if nNeighbours < 1:
+            raise Exception("Inverse distance weighting needs at least one neighbour !")
+
+        self.nNeighbours = nNeighbours
+        self.power = power
+
+        self.generateInterfaceData()
+
+        self.buildMapping()
+
+    def generateInterfaceData(self):
+        """
+        Des.
+        """
+
+        InterfaceInterpolator.generateInterfaceData(self)
+
+        self.H = InterfaceMatrix((self.nf,self.ns), self.mpiComm)
+
+    def getMappingSignature(self):
+        """
+        Des.
+        """
+
+        return InterfaceInterpolator.getMappingSignature(self) + '|power={!r}'.format(self.power)
+
+    def getMappingMatrices(self):
+        """
+        Des.
+        """
+
+        return {'H':self.H}
+
+    def getFluidRowMatrices(self):
+        """
+        Des.
+        """
+
+        return ['H']
+
+    def generateFluidRowMatrices(self):
+        """
+        Des.
+        """
+
+        self.H = InterfaceMatrix((self.nf,self.ns), self.mpiComm)
+        self.generateMapping()
+
+    def generateMapping(self):
+        """
+        Des.
+        """
+
+        mpiPrint('\nBuilding inverse distance weighting matrix H of size {} X {} ({} neighbours)...'.format(self.nf, self.ns, self.nNeighbours), self.mpiComm)
+        self.mappingTimer.start()
+
+        # the nearest neighbours may lie on any solid partition (global search)
+        solidInterfaceBuffRcv = self.exchangeInterfaceCoordinates('solid', 'fluid')
+        # collective in parallel (exact preallocation), ranks without fluid interface nodes take part with empty arrays
+        self.fillMatrix(solidInterfaceBuffRcv)
+
+        mpiBarrier(self.mpiComm)
+        mpiPrint('\nAssembling H...', self.mpiComm)
+        start = tm.time()
+        self.H.assemble()
+        mpiBarrier(self.mpiComm)
+        stop = tm.time()
+        mpiPrint('Matrix H is built and assembled in {} s'.format(stop-start), self.mpiComm)
+
+        self.mappingTimer.stop()
+        self.mappingTimer.cumul()
+
+    def fillMatrix(self, solidInterfaceBuffRcv):
+        """
+        Des.
+        Gathers all the received solid nodes (with their global indices) and fills H with the local fluid nodes as targets.
+        """
+
+        if len(solidInterfaceBuffRcv) > 0:
+            solidInterfaceBuffRcv_X = np.concatenate([buffX for iProc, buffX, buffY, buffZ in solidInterfaceBuffRcv])
+            solidInterfaceBuffRcv_Y = np.concatenate([buffY for iProc, buffX, buffY, buffZ in solidInterfaceBuffRcv])
+            solidInterfaceBuffRcv_Z = np.concatenate([buffZ for iProc, buffX, buffY, buffZ in solidInterfaceBuffRcv])
+            solidGlobalIndices = np.concatenate([self.manager.getGlobalIndexOffset('solid', iProc) + np.arange(len(buffX), dtype=np.intc) for iProc, buffX, buffY, buffZ in solidInterfaceBuffRcv]).astype(np.intc)
+        else:
+            solidInterfaceBuffRcv_X = solidInterfaceBuffRcv_Y = solidInterfaceBuffRcv_Z = np.zeros(0)
+            solidGlobalIndices = np.zeros(0, dtype=np.intc)
+
+        if self.mpiComm == None or self.myid in self.manager.getFluidInterfaceProcessors():
+            localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init = self.getInterfacePositions(self.FluidSolver)
+        else:
+            localFluidInterface_array_X_init = localFluidInterface_array_Y_init = localFluidInterface_array_Z_init = np.zeros(0)
+
+        print('Building H on rank {}...'.format(self.myid))
+        start = tm.time()
+        ccupydo.CInterpolator.IDW_fillMatrix(self, localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init,
+                                             solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, solidGlobalIndices,
+                                             self.H, self.nNeighbours, self.power)
+        stop = tm.time()
+        print('Built H on rank {} in {} s'.format(self.myid,stop-start))
+
+    def interpolateFluidToSolid(self, fluidInterfaceData, solidInterfaceData):
+        """
+        des.
+        """
+
+        self.H.multTranspose(fluidInterfaceData, solidInterfaceData)
+
+    def interpolateSolidToFluid(self, solidInterfaceData, fluidInterfaceData):
+        """
+        Des.
+        """
+
+        self.H.mult(solidInterfaceData, fluidInterfaceData)
+
+class ProjectionInterpolator(InterfaceInterpolator):
+    """
+    Projection (nearest face) interpolator.
+    Each fluid node is projected onto the nearest face of the solid interface, given by the connectivity of the solid solver
+    (getInterfaceConnectivity). The sparse operator H (nf X ns) holds the shape functions of that face at the projection
+    (segments, triangles or quadrangles split into two triangles). The candidate faces are found by an ADT over the face centroids.
+    The solid to fluid transfer is H*solid and the fluid to solid transfer H^T*fluid (conservative), no linear solve is needed.
+    """
+
+    def __init__(self, Manager, FluidSolver, SolidSolver, mpiComm=None, chtTransferMethod=None, heatTransferCoeff=1.0, mappingCacheDir=None):
+        """
+        Des.
+        """
+
+        InterfaceInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff, mappingCacheDir)
+
+        mpiPrint('\nSetting projection interpolator...', mpiComm)
+
+        self.solidFaces = None
+
+        self.generateInterfaceData()
+
+        self.buildMapping()
+
+    def generateInterfaceData(self):
+        """
+        Des.
+        """
+
+        InterfaceInterpolator.generateInterfaceData(self)
+
+        self.H = InterfaceMatrix((self.nf,self.ns), self.mpiComm)
+
+    def getMappingMatrices(self):
+        """
+        Des.
+        """
+
+        return {'H':self.H}
+
+    def getFluidRowMatrices(self):
+        """
+        Des.
+        """
+
+        return ['H']
+
+    def generateFluidRowMatrices(self):
+        """
+        Des.
+        """
+
+        self.H = InterfaceMatrix((self.nf,self.ns), self.mpiComm)
+        self.generateMapping()
+
+    def getMappingSignature(self):
+        """
+        Des.
+        H also depends on the connectivity of the solid interface (collective in parallel).
+        """
+
+        solidFaces = self.getSolidFaces()
+
+        return InterfaceInterpolator.getMappingSignature(self) + '|faces={}|{}'.format(solidFaces.shape, hashlib.sha1(solidFaces.tostring()).hexdigest())
+
+    def getSolidFaces(self):
+        """
+        Des.
+        Returns the faces of the solid interface of all the partitions, as an array (nFaces X nNodesPerFace) of global solid indices.
+        The halo nodes of the faces are replaced by the global indices of their owners. The faces are gathered once (collective in parallel)
+        and kept for the next calls.
+        """
+
+        if self.solidFaces is not None:
+            return self.solidFaces
+
+        localFaces = None
+        if self.mpiComm == None or self.myid in self.manager.getSolidInterfaceProcessors():
+            localFaces = self.SolidSolver.getInterfaceConnectivity()
+            if localFaces is None:
+                raise Exception("The solid solver does not provide the connectivity of its interface, which is required by the projection interpolator !")
+            localFaces = np.asarray(localFaces, dtype=np.intc)
+            if localFaces.ndim != 2 or localFaces.shape[1] not in (2,3,4):
+                raise Exception("The interface faces must be segments, triangles or quadrangles for the projection interpolator !")
+            nLocalNodes = self.SolidSolver.nNodes
+            if localFaces.size > 0 and (np.min(localFaces) < 0 or np.max(localFaces) >= nLocalNodes):
+                raise Exception("The interface faces must only refer to the interface nodes of their partition !")
+            # global index of each local interface vertex, physical or halo (the solver indexing holds the nodes of all the partitions)
+            solidIndexing = self.manager.getSolidIndexing()
+            vertexGlobalIndices = np.array([solidIndexing[self.SolidSolver.getNodalIndex(iVertex)] for iVertex in range(nLocalNodes)], dtype=np.intc)
+            localFaces = vertexGlobalIndices[localFaces].reshape(localFaces.shape)
+
+        if self.mpiComm != None:
+            allFaces = [faces for faces in self.mpiComm.allgather(localFaces) if faces is not None and faces.size > 0]
+        else:
+            allFaces = [localFaces]
+
+        nNodesPerFace = set(faces.shape[1] for faces in allFaces)
+        if len(nNodesPerFace) > 1:
+            raise Exception("All the interface faces must have the same number of nodes for the projection interpolator !")
+        if len(allFaces) == 0:
+            self.solidFaces = np.zeros((0,2), dtype=np.intc)
+        else:
+            self.solidFaces = np.ascontiguousarray(np.vstack(allFaces), dtype=np.intc)
+
+        return self.solidFaces
+
+    def generateMapping(self):
+        """
+        Des.
+        """
+
+        solidFaces = self.getSolidFaces()
+
+        mpiPrint('\nBuilding projection matrix H of size {} X {} ({} solid faces of {} nodes)...'.format(self.nf, self.ns, solidFaces.shape[0], solidFaces.shape[1]), self.mpiComm)
+        self.mappingTimer.start()
+
+        # the nearest face may lie on any solid partition (global search)
+        solidInterfaceBuffRcv = self.exchangeInterfaceCoordinates('solid', 'fluid')
+        # collective in parallel (exact preallocation), ranks without fluid interface nodes take part with empty arrays
+        self.fillMatrix(solidInterfaceBuffRcv, solidFaces)
+
+        mpiBarrier(self.mpiComm)
+        mpiPrint('\nAssembling H...', self.mpiComm)
+        start = tm.time()
+        self.H.assemble()
+        mpiBarrier(self.mpiComm)
+        stop = tm.time()
+        mpiPrint('Matrix H is built and assembled in {} s'.format(stop-start), self.mpiComm)
+
+        self.mappingTimer.stop()
+        self.mappingTimer.cumul()
+
+    def fillMatrix(self, solidInterfaceBuffRcv, solidFaces):
+        """
+        Des.
+        Gathers the received solid nodes by global index and fills H with the local fluid nodes as targets.
+        """
+
+        solidInterface_X = np.zeros(self.ns)
+        solidInterface_Y = np.zeros(self.ns)
+        solidInterface_Z = np.zeros(self.ns)
+        for iProc, buffX, buffY, buffZ in solidInterfaceBuffRcv:
+            offset = self.manager.getGlobalIndexOffset('solid', iProc)
+            solidInterface_X[offset:offset+len(buffX)] = buffX
+            solidInterface_Y[offset:offset+len(buffY)] = buffY
+            solidInterface_Z[offset:offset+len(buffZ)] = buffZ
+        if self.mpiComm != None and self.myid not in self.manager.getFluidInterfaceProcessors():
+            solidFaces = np.zeros((0,solidFaces.shape[1]), dtype=np.intc)
+
+        if self.mpiComm == None or self.myid in self.manager.getFluidInterfaceProcessors():
+            localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init = self.getInterfacePositions(self.FluidSolver)
+        else:
+            localFluidInterface_array_X_init = localFluidInterface_array_Y_init = localFluidInterface_array_Z_init = np.zeros(0)
+
+        print('Building H on rank {}...'.format(self.myid))
+        start = tm.time()
+        ccupydo.CInterpolator.projection_fillMatrix(self, localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init,
+                                                    solidInterface_X, solidInterface_Y, solidInterface_Z, solidFaces.ravel(),
+                                                    self.H, solidFaces.shape[1])
+        stop = tm.time()
+        print('Built H on rank {} in {} s'.format(self.myid,stop-start))
+
+    def interpolateFluidToSolid(self, fluidInterfaceData, solidInterfaceData):
+        """
+        des.
+        """
+
+        self.H.multTranspose(fluidInterfaceData, solidInterfaceData)
+
+    def interpolateSolidToFluid(self, solidInterfaceData, fluidInterfaceData):
+        """
+        Des.
+        """
+
+        self.H.mult(solidInterfaceData, fluidInterfaceData)
+
+class ConservativeInterpolator(InterfaceInterpolator):
+    """
+    Description.
+    """
+
+    def __init__(self, Manager, FluidSolver, SolidSolver, mpiComm = None, chtTransferMethod=None, heatTransferCoeff=1.0, mappingCacheDir=None, normalizeCoordinates=False):
+        """
+        Des.
+        """
+
+        InterfaceInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff, mappingCacheDir, normalizeCoordinates)
+
+        mpiPrint('\nSetting non-matching conservative interpolator...', mpiComm)
+
+        self.d = self.nDim+1
+        # number of RBF centres (all the solid interface nodes unless the centres are reduced)
+        self.nc = self.ns
+        self.SolverA = None
+        self.H_BA = None
+
+    def getLinearSolvers(self):
+        """
+        Des.
+        """
+
+        return [self.SolverA]
+
+    def checkConservation(self):
+        """
+        Des.
+        """
+
+        WSX, WSY, WSZ = self.solidInterfaceLoads.dot(self.solidInterfaceDisplacement)
+
+        WFX, WFY, WFZ = self.fluidInterfaceLoads.dot(self.fluidInterfaceDisplacement)
+
+        mpiPrint("Checking f/s interface conservation...", self.mpiComm)
+        mpiPrint('Solid side (Wx, Wy, Wz) = ({}, {}, {})'.format(WSX, WSY, WSZ), self.mpiComm)
+        mpiPrint('Fluid side (Wx, Wy, Wz) = ({}, {}, {})'.format(WFX, WFY, WFZ), self.mpiComm)
+
+    def generateInterfaceData(self):
+        """
+        Description.
+        """
+
+        if self.manager.mechanical:
+            self.solidInterfaceDisplacement = FlexInterfaceData(self.ns + self.d, 3, self.mpiComm, self.blockedData)
+            self.fluidInterfaceDisplacement = FlexInterfaceData(self.nf, 3, self.mpiComm, self.blockedData)
+            self.solidInterfaceLoads = FlexInterfaceData(self.ns + self.d, 3, self.mpiComm, self.blockedData)
+            self.fluidInterfaceLoads = FlexInterfaceData(self.nf, 3, self.mpiComm, self.blockedData)
+
+        if self.manager.thermal :
+            if self.chtTransferMethod == 'TFFB':
+                self.solidInterfaceTemperature = FlexInterfaceData(self.ns + self.d, 1, self.mpiComm, self.blockedData)
+                self.fluidInterfaceTemperature = FlexInterfaceData(self.nf, 1, self.mpiComm, self.blockedData)
+                self.solidInterfaceHeatFlux = FlexInterfaceData(self.ns + self.d, 3, self.mpiComm, self.blockedData)
+                self.fluidInterfaceHeatFlux = FlexInterfaceData(self.nf, 3, self.mpiComm, self.blockedData)
+            elif self.chtTransferMethod == 'FFTB':
+                self.solidInterfaceTemperature = FlexInterfaceData(self.ns + self.d, 1, self.mpiComm, self.blockedData)
+                self.fluidInterfaceTemperature = FlexInterfaceData(self.nf, 1, self.mpiComm, self.blockedData)
+                self.solidInterfaceHeatFlux = FlexInterfaceData(self.ns + self.d, 3, self.mpiComm, self.blockedData)
+                self.fluidInterfaceHeatFlux = FlexInterfaceData(self.nf, 3, self.mpiComm, self.blockedData)
+                self.fluidInterfaceNormalHeatFlux = FlexInterfaceData(self.nf, 1, self.mpiComm, self.blockedData)
+                self.solidInterfaceNormalHeatFlux = FlexInterfaceData(self.ns, 1, self.mpiComm, self.blockedData)
+            elif self.chtTransferMethod == 'hFTB':
+                self.fluidInterfaceRobinTemperature = FlexInterfaceData(self.nf, 1, self.mpiComm, self.blockedData)
+                self.solidInterfaceRobinTemperature = FlexInterfaceData(self.ns, 1, self.mpiComm, self.blockedData)
+                self.solidInterfaceTemperature = FlexInterfaceData(self.ns + self.d, 1, self.mpiComm, self.blockedData)
+                self.fluidInterfaceTemperature = FlexInterfaceData(self.nf, 1, self.mpiComm, self.blockedData)
+            elif self.chtTransferMethod == 'hFFB':
+                self.fluidInterfaceRobinTemperature = FlexInterfaceData(self.nf, 1, self.mpiComm, self.blockedData)
+                self.solidInterfaceRobinTemperature = FlexInterfaceData(self.ns, 1, self.mpiComm, self.blockedData)
+                self.solidInterfaceHeatFlux = FlexInterfaceData(self.ns + self.d, 3, self.mpiComm, self.blockedData)
+                self.fluidInterfaceHeatFlux = FlexInterfaceData(self.nf, 3, self.mpiComm, self.blockedData)
+
+        # A is symmetric, the fluid to solid transfer uses the transposed operations of A and B
+        self.A = InterfaceMatrix((self.nc+self.d,self.nc+self.d), self.mpiComm)
+        self.A.setSymmetric(True)
+        self.B = InterfaceMatrix((self.nf,self.nc+self.d), self.mpiComm)
+
+    def generateMapping(self):
+        """
+        Des.
+        """
+
+        mpiPrint('\nBuilding interpolation matrices...', self.mpiComm)
+
+        self.generateMatrixA()
+        self.generateMatrixB()
+
+    def generateMatrixA(self):
+        """
+        Des.
+        """
+
+        mpiPrint('\nBuilding matrix A of size {} X {}...'.format(self.nc, self.nc), self.mpiComm)
+        # Fill the matrix A
+        solidInterfaceBuffers = self.exchangeInterfaceCoordinates('solid', 'solid')
+        self.preallocateMatrices([self.A], solidInterfaceBuffers, self.fillMatrixA)
+        for iProc, solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z in solidInterfaceBuffers:
+            self.fillMatrixA(solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, iProc)
+
+        mpiBarrier(self.mpiComm)
+        mpiPrint("\nAssembling A...", self.mpiComm)
+        start = tm.time()
+        self.A.assemble()
+        mpiBarrier(self.mpiComm)
+        stop = tm.time()
+        mpiPrint('Assembly performed in {} s'.format(stop-start), self.mpiComm)
+        mpiPrint('Matrix A is built.', self.mpiComm)
+
+    def generateMatrixB(self):
+        """
+        Des.
+        """
+
+        mpiPrint('\nBuilding matrix B of size {} X {}...'.format(self.nf, self.nc), self.mpiComm)
+        # Fill the matrix B
+        solidInterfaceBuffers = self.exchangeInterfaceCoordinates('solid', 'fluid')
+        self.preallocateMatrices([self.B], solidInterfaceBuffers, self.fillMatrixB)
+        for iProc, solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z in solidInterfaceBuffers:
+            self.fillMatrixB(solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, iProc)
+
+        mpiBarrier(self.mpiComm)
+        mpiPrint("\nAssembling B...", self.mpiComm)
+        start = tm.time()
+        self.B.assemble()
+        mpiBarrier(self.mpiComm)
+        stop = tm.time()
+        mpiPrint('Assembly performed in {} s'.format(stop-start), self.mpiComm)
+        mpiPrint('Matrix B is built.', self.mpiComm)
+
+    def getMappingMatrices(self):
+        """
+        Des.
+        """
+
+        return {'A':self.A, 'B':self.B}
+
+    def getFluidRowMatrices(self):
+        """
+        Des.
+        Only B depends on the fluid interface nodes (unless the explicit operator H_BA is used).
+        """
+
+        if self.H_BA != None or isinstance(self.B, HierarchicalInterfaceMatrix):
+            return []
+        return ['B']
+
+    def generateFluidRowMatrices(self):
+        """
+        Des.
+        """
+
+        dense = not self.B.isSparse()
+        self.B = InterfaceMatrix((self.nf,self.nc+self.d), self.mpiComm)
+        if dense:
+            self.B.createDense()
+        self.generateMatrixB()
+
+    def generateLinearSolvers(self):
+        """
+        Des.
+        """
+
+        self.SolverA = LinearSolver(self.A, self.mpiComm)
+
+    def computeExplicitOperators(self, dropTol=1e-12, blockSize=64):
+        """
+        Des.
+        Forms H_BA = B*A^{-1} once, every transfer is then a single matrix product (fluid to solid uses H_BA^T = A^{-T}*B^T).
+        To be called once the linear solvers are configured.
+        """
+
+        mpiPrint('\nBuilding explicit transfer operator B*A^-1 of size {} X {}...'.format(self.nf, self.nc+self.d), self.mpiComm)
+        start = tm.time()
+        self.H_BA = InterfaceMatrix((self.nf, self.nc+self.d), self.mpiComm)
+        self.fillExplicitOperator(self.H_BA, self.B, self.SolverA, self.nc+self.d, dropTol, blockSize)
+        stop = tm.time()
+        mpiPrint('Explicit operator built in {} s'.format(stop-start), self.mpiComm)
+
+    def interpolateFluidToSolid(self, fluidInterfaceData, solidInterfaceData):
+        """
+        des.
+        """
+
+        if self.H_BA != None:
+            self.H_BA.multTranspose(fluidInterfaceData, solidInterfaceData)
+            return
+
+        gamma_array = self.getFieldWorkVector(fluidInterfaceData, self.ns + self.d, 'rhs')
+
+        # the solution is solidInterfaceData itself, which already holds the previous transfer as initial guess
+        self.B.multTranspose(fluidInterfaceData, gamma_array)
+        self.SolverA.solveTranspose(gamma_array, solidInterfaceData)
+
+    def interpolateSolidToFluid(self, solidInterfaceData, fluidInterfaceData):
+        """
+        Des.
+        """
+
+        if self.H_BA != None:
+            self.H_BA.mult(solidInterfaceData, fluidInterfaceData)
+            return
+
+        gamma_array = self.getFieldCoefficients(solidInterfaceData, self.ns + self.d)
+
+        self.SolverA.solve(solidInterfaceData, gamma_array)
+        self.B.mult(gamma_array, fluidInterfaceData)
+
+
+class ConsistentInterpolator(InterfaceInterpolator):
+    """
+    Description.
+    """
+
+    def __init__(self, Manager, FluidSolver, SolidSolver, mpiComm = None, chtTransferMethod=None, heatTransferCoeff=1.0, mappingCacheDir=None, normalizeCoordinates=False):
+        """
+        Des.
+        """
+
+        InterfaceInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff, mappingCacheDir, normalizeCoordinates)
+
+        mpiPrint('\nSetting non-matching consistent interpolator...', mpiComm)
+
+        self.d = self.nDim+1
+        self.SolverA = None
+        self.SolverC = None
+        self.H_BA = None
+        self.H_DC = None
+
+    def getLinearSolvers(self):
+        """
+        Des.
+        """
+
+        return [self.SolverA, self.SolverC]
+
+    def checkConservation(self):
+        """
+        Des.
+        """
+
+        mpiPrint('No conservation check for consistent interpolation.', self.mpiComm)
+
+    def generateInterfaceData(self):
+        """
+        Description.
+        """
+
+        if self.manager.mechanical:
+            self.solidInterfaceDisplacement = FlexInterfaceData(self.ns + self.d, 3, self.mpiComm, self.blockedData)
+            self.fluidInterfaceDisplacement = FlexInterfaceData(self.nf, 3, self.mpiComm, self.blockedData)
+            self.solidInterfaceLoads = FlexInterfaceData(self.ns, 3, self.mpiComm, self.blockedData)
+            self.fluidInterfaceLoads = FlexInterfaceData(self.nf + self.d, 3, self.mpiComm, self.blockedData)
+
+        if self.manager.thermal :
+            if self.chtTransferMethod == 'TFFB':
+                self.solidInterfaceTemperature = FlexInterfaceData(self.ns, 1, self.mpiComm, self.blockedData)
+                self.fluidInterfaceTemperature = FlexInterfaceData(self.nf + self.d, 1, self.mpiComm, self.blockedData)
+                self.solidInterfaceHeatFlux = FlexInterfaceData(self.ns + self.d, 3, self.mpiComm, self.blockedData)
+                self.fluidInterfaceHeatFlux = FlexInterfaceData(self.nf, 3, self.mpiComm, self.blockedData)
+            elif self.chtTransferMethod == 'FFTB':
+                self.solidInterfaceTemperature = FlexInterfaceData(self.ns + self.d, 1, self.mpiComm, self.blockedData)
+                self.fluidInterfaceTemperature = FlexInterfaceData(self.nf, 1, self.mpiComm, self.blockedData)
+                self.solidInterfaceHeatFlux = FlexInterfaceData(self.ns, 3, self.mpiComm, self.blockedData)
+                self.fluidInterfaceHeatFlux = FlexInterfaceData(self.nf + self.d, 3, self.mpiComm, self.blockedData)
+                self.fluidInterfaceNormalHeatFlux = FlexInterfaceData(self.nf + self.d, 1, self.mpiComm, self.blockedData)
+                self.solidInterfaceNormalHeatFlux = FlexInterfaceData(self.ns, 1, self.mpiComm, self.blockedData)
+            elif self.chtTransferMethod == 'hFTB':
+                self.fluidInterfaceRobinTemperature = FlexInterfaceData(self.nf + self.d, 1, self.mpiComm, self.blockedData)
+                self.solidInterfaceRobinTemperature = FlexInterfaceData(self.ns, 1, self.mpiComm, self.blockedData)
+                self.solidInterfaceTemperature = FlexInterfaceData(self.ns + self.d, 1, self.mpiComm, self.blockedData)
+                self.fluidInterfaceTemperature = FlexInterfaceData(self.nf, 1, self.mpiComm, self.blockedData)
+            elif self.chtTransferMethod == 'hFFB':
+                self.fluidInterfaceRobinTemperature = FlexInterfaceData(self.nf + self.d, 1, self.mpiComm, self.blockedData)
+                self.solidInterfaceRobinTemperature = FlexInterfaceData(self.ns, 1, self.mpiComm, self.blockedData)
+                self.solidInterfaceHeatFlux = FlexInterfaceData(self.ns + self.d, 3, self.mpiComm, self.blockedData)
+                self.fluidInterfaceHeatFlux = FlexInterfaceData(self.nf, 3, self.mpiComm, self.blockedData)
+
+        self.A = InterfaceMatrix((self.ns+self.d,self.ns+self.d), self.mpiComm)
+        self.A.setSymmetric(True)
+        self.B = InterfaceMatrix((self.nf,self.ns+self.d), self.mpiComm)
+        self.C = InterfaceMatrix((self.nf+self.d,self.nf+self.d), self.mpiComm)
+        self.C.setSymmetric(True)
+        self.D = InterfaceMatrix((self.ns,self.nf+self.d), self.mpiComm)
+
+    def generateMapping(self):
+        """
+        Des.
+        """
+
+        mpiPrint('\nBuilding interpolation matrices...', self.mpiComm)
+
+        mpiPrint('\nBuilding matrix A of size {} X {}...'.format(self.ns, self.ns), self.mpiComm)
+        # Fill the matrix A
+        solidInterfaceBuffers = self.exchangeInterfaceCoordinates('solid', 'solid')
+        self.preallocateMatrices([self.A], solidInterfaceBuffers, self.fillMatrixA)
+        for iProc, solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z in solidInterfaceBuffers:
+            self.fillMatrixA(solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, iProc)
+
+        mpiBarrier(self.mpiComm)
+        mpiPrint("\nAssembling A...", self.mpiComm)
+        start = tm.time()
+        self.A.assemble()
+        mpiBarrier(self.mpiComm)
         stop = tm.time()
         mpiPrint('Assembly performed in {} s'.format(stop-start), self.mpiComm)
         mpiPrint('Matrix A is built.', self.mpiComm)
 
-        mpiPrint('\nBuilding matrix B & D of size {} X {} & {} X {}...'.format(self.nf, self.ns, self.ns, self.nf), self.mpiComm)
-        # Fill the matrix B & D
-        if self.mpiComm != None:
-            for iProc in solidInterfaceProcessors:
-                if self.myid == iProc:
-                    for jProc in fluidInterfaceProcessors:
-                        self.mpiComm.Send(localSolidInterface_array_X, dest=jProc, tag=1)
-                        self.mpiComm.Send(localSolidInterface_array_Y, dest=jProc, tag=2)
-                        self.mpiComm.Send(localSolidInterface_array_Z, dest=jProc, tag=3)
-                if self.myid in fluidInterfaceProcessors:
-                    sizeOfBuff = solidPhysicalInterfaceNodesDistribution[iProc]
-                    solidInterfaceBuffRcv_X = np.zeros(sizeOfBuff)
-                    solidInterfaceBuffRcv_Y = np.zeros(sizeOfBuff)
-                    solidInterfaceBuffRcv_Z = np.zeros(sizeOfBuff)
-                    self.mpiComm.Recv(solidInterfaceBuffRcv_X, iProc, tag=1)
-                    self.mpiComm.Recv(solidInterfaceBuffRcv_Y, iProc, tag=2)
-                    self.mpiComm.Recv(solidInterfaceBuffRcv_Z, iProc, tag=3)
-                    self.fillMatrixBD(solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, iProc)
-        else:
-            self.fillMatrixBD(localSolidInterface_array_X, localSolidInterface_array_Y, localSolidInterface_array_Z, 0)
+        mpiPrint('\nBuilding matrix B & D of size {} X {} & {} X {}...'.format(self.nf, self.ns, self.ns, self.nf), self.mpiComm)
+        # Fill the matrix B & D
+        solidInterfaceBuffers = self.exchangeInterfaceCoordinates('solid', 'fluid')
+        self.preallocateMatrices([self.B, self.D], solidInterfaceBuffers, self.fillMatrixBD)
+        for iProc, solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z in solidInterfaceBuffers:
+            self.fillMatrixBD(solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, iProc)
+
+        mpiBarrier(self.mpiComm)
+        mpiPrint("\nAssembling B & D...", self.mpiComm)
+        start = tm.time()
+        self.B.assemble()
+        mpiBarrier(self.mpiComm)
+        self.D.assemble()
+        mpiBarrier(self.mpiComm)
+        stop = tm.time()
+        mpiPrint('Assembly performed in {} s'.format(stop-start), self.mpiComm)
+        mpiPrint('Matrix B & D are built.', self.mpiComm)
+
+        mpiPrint('\nBuilding matrix C of size {} X {}...'.format(self.nf, self.nf), self.mpiComm)
+        # Fill the matrix C
+        fluidInterfaceBuffers = self.exchangeInterfaceCoordinates('fluid', 'fluid')
+        self.preallocateMatrices([self.C], fluidInterfaceBuffers, self.fillMatrixC)
+        for iProc, fluidInterfaceBuffRcv_X, fluidInterfaceBuffRcv_Y, fluidInterfaceBuffRcv_Z in fluidInterfaceBuffers:
+            self.fillMatrixC(fluidInterfaceBuffRcv_X, fluidInterfaceBuffRcv_Y, fluidInterfaceBuffRcv_Z, iProc)
+
+        mpiBarrier(self.mpiComm)
+        mpiPrint("\nAssembling C...", self.mpiComm)
+        start = tm.time()
+        self.C.assemble()
+        mpiBarrier(self.mpiComm)
+        stop = tm.time()
+        mpiPrint('Assembly performed in {} s'.format(stop-start), self.mpiComm)
+        mpiPrint('Matrix C is built.', self.mpiComm)
+
+    def getMappingMatrices(self):
+        """
+        Des.
+        """
+
+        return {'A':self.A, 'B':self.B, 'C':self.C, 'D':self.D}
+
+    def generateLinearSolvers(self):
+        """
+        Des.
+        """
+
+        self.SolverA = LinearSolver(self.A, self.mpiComm)
+        self.SolverC = LinearSolver(self.C, self.mpiComm)
+
+    def computeExplicitOperators(self, dropTol=1e-12, blockSize=64):
+        """
+        Des.
+        Forms H_BA = B*A^{-1} and H_DC = D*C^{-1} once, every transfer is then a single matrix product.
+        To be called once the linear solvers are configured.
+        """
+
+        mpiPrint('\nBuilding explicit transfer operators B*A^-1 & D*C^-1 of size {} X {} & {} X {}...'.format(self.nf, self.ns+self.d, self.ns, self.nf+self.d), self.mpiComm)
+        start = tm.time()
+        self.H_BA = InterfaceMatrix((self.nf, self.ns+self.d), self.mpiComm)
+        self.fillExplicitOperator(self.H_BA, self.B, self.SolverA, self.ns+self.d, dropTol, blockSize)
+        self.H_DC = InterfaceMatrix((self.ns, self.nf+self.d), self.mpiComm)
+        self.fillExplicitOperator(self.H_DC, self.D, self.SolverC, self.nf+self.d, dropTol, blockSize)
+        stop = tm.time()
+        mpiPrint('Explicit operators built in {} s'.format(stop-start), self.mpiComm)
+
+    def interpolateFluidToSolid(self, fluidInterfaceData, solidInterfaceData):
+        """
+        des.
+        """
+
+        if self.H_DC != None:
+            self.H_DC.mult(fluidInterfaceData, solidInterfaceData)
+            return
+
+        gamma_array = self.getFieldCoefficients(fluidInterfaceData, self.nf + self.d)
+
+        self.SolverC.solve(fluidInterfaceData, gamma_array)
+        self.D.mult(gamma_array, solidInterfaceData)
+
+    def interpolateSolidToFluid(self, solidInterfaceData, fluidInterfaceData):
+        """
+        Des.
+        """
+
+        if self.H_BA != None:
+            self.H_BA.mult(solidInterfaceData, fluidInterfaceData)
+            return
+
+        gamma_array = self.getFieldCoefficients(solidInterfaceData, self.ns + self.d)
+
+        self.SolverA.solve(solidInterfaceData, gamma_array)
+        self.B.mult(gamma_array, fluidInterfaceData)
+
+class RBFInterpolator(ConservativeInterpolator):
+    """
+    Description.
+    """
+
+    def __init__(self, Manager, FluidSolver, SolidSolver, RBFradius=0.1, mpiComm = None, chtTransferMethod=None, heatTransferCoeff=1.0, mappingCacheDir=None, normalizeCoordinates=False, nNeighbours=None, minRadius=0.0):
+        """"
+        Description.
+        nNeighbours enables the adaptive radii : the support of each centre reaches its nNeighbours-th nearest solid neighbour,
+        clamped to [minRadius, RBFradius]
+        """
+
+        ConservativeInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff, mappingCacheDir, normalizeCoordinates)
+
+        mpiPrint('\nSetting interpolation with Radial Basis Functions...', mpiComm)
+
+        self.radius = RBFradius
+        self.nNeighbours = nNeighbours
+        self.minRadius = minRadius
+
+        self.generateInterfaceData()
+
+        self.buildMapping()
+
+
+    def generateInterfaceData(self):
+        """
+        Des.
+        """
+
+        ConservativeInterpolator.generateInterfaceData(self)
+
+        mpiPrint('Generating interface data for conservative RBF interpolator...', self.mpiComm)
+
+        # A & B are created with an exact preallocation when the mapping is generated
+        self.exactPreallocation = True
+
+        # with adaptive radii, the kernel of a column depends on the radius of its centre
+        if self.nNeighbours != None:
+            self.A.setSymmetric(False)
+
+    def generateMapping(self):
+        """
+        Des.
+        """
+
+        if self.nNeighbours != None:
+            self.computeAdaptiveRadii('solid')
+
+        ConservativeInterpolator.generateMapping(self)
+
+    def getSearchMargin(self):
+        """
+        Des.
+        """
+
+        return 1.01*self.radius
+
+    def fillMatrixA(self, solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, iProc):
+        """
+        Description.
+        """
 
-        mpiBarrier(self.mpiComm)
-        mpiPrint("\nAssembling B & D...", self.mpiComm)
+        localSolidInterface_array_X_init, localSolidInterface_array_Y_init, localSolidInterface_array_Z_init = self.getInterfacePositions(self.SolidSolver)
         start = tm.time()
-        self.B.assemble()
-        mpiBarrier(self.mpiComm)
-        self.D.assemble()
-        mpiBarrier(self.mpiComm)
+        ccupydo.CInterpolator.RBF_fillMatrixA(self, localSolidInterface_array_X_init, localSolidInterface_array_Y_init, localSolidInterface_array_Z_init,
+                                              solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, self.A, iProc, self.getKernelRadius(), self.getDonorRadii('solid', iProc))
         stop = tm.time()
-        mpiPrint('Assembly performed in {} s'.format(stop-start), self.mpiComm)
-        mpiPrint('Matrix B & D are built.', self.mpiComm)
+        print('Built A on rank {} in {} s'.format(self.myid,stop-start))
 
-        mpiPrint('\nBuilding matrix C of size {} X {}...'.format(self.nf, self.nf), self.mpiComm)
-        # Fill the matrix C
-        if self.mpiComm != None:
-            for iProc in fluidInterfaceProcessors:
-                if self.myid == iProc:
-                    localFluidInterface_array_X, localFluidInterface_array_Y, localFluidInterface_array_Z = self.FluidSolver.getNodalInitialPositions()
-                    for jProc in fluidInterfaceProcessors:
-                        self.mpiComm.Send(localFluidInterface_array_X, dest=jProc, tag=1)
-                        self.mpiComm.Send(localFluidInterface_array_Y, dest=jProc, tag=2)
-                        self.mpiComm.Send(localFluidInterface_array_Z, dest=jProc, tag=3)
-                if self.myid in fluidInterfaceProcessors:
-                    sizeOfBuff = fluidPhysicalInterfaceNodesDistribution[iProc]
-                    fluidInterfaceBuffRcv_X = np.zeros(sizeOfBuff)
-                    fluidInterfaceBuffRcv_Y = np.zeros(sizeOfBuff)
-                    fluidInterfaceBuffRcv_Z = np.zeros(sizeOfBuff)
-                    self.mpiComm.Recv(fluidInterfaceBuffRcv_X, iProc, tag=1)
-                    self.mpiComm.Recv(fluidInterfaceBuffRcv_Y, iProc, tag=2)
-                    self.mpiComm.Recv(fluidInterfaceBuffRcv_Z, iProc, tag=3)
-                    self.fillMatrixC(fluidInterfaceBuffRcv_X, fluidInterfaceBuffRcv_Y, fluidInterfaceBuffRcv_Z, iProc)
-        else:
-            localFluidInterface_array_X, localFluidInterface_array_Y, localFluidInterface_array_Z = self.FluidSolver.getNodalInitialPositions()
-            self.fillMatrixC(localFluidInterface_array_X, localFluidInterface_array_Y, localFluidInterface_array_Z, 0)
 
-        mpiBarrier(self.mpiComm)
-        mpiPrint("\nAssembling C...", self.mpiComm)
+    def fillMatrixB(self, solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, iProc):
+        """
+        Description.
+        """
+
+        localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init = self.getInterfacePositions(self.FluidSolver)
         start = tm.time()
-        self.C.assemble()
-        mpiBarrier(self.mpiComm)
+        ccupydo.CInterpolator.RBF_fillMatrixB(self, localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init,
+                                              solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, self.B, iProc, self.getKernelRadius(), self.getDonorRadii('solid', iProc))
         stop = tm.time()
-        mpiPrint('Assembly performed in {} s'.format(stop-start), self.mpiComm)
-        mpiPrint('Matrix C is built.', self.mpiComm)
+        print('Built B on rank {} in {} s'.format(self.myid,stop-start))
 
-        self.SolverA = LinearSolver(self.A, self.mpiComm)
-        self.SolverC = LinearSolver(self.C, self.mpiComm)
 
-    def interpolateFluidToSolid(self, fluidInterfaceData, solidInterfaceData):
+
+class ReducedRBFInterpolator(RBFInterpolator):
+    """
+    Conservative RBF interpolator with a reduced set of centres.
+    The centres are greedily selected among the solid interface nodes (P-greedy : the node where the power function of the current
+    centres is the largest is added) until the power function falls below tolerance everywhere, which bounds the interpolation
+    error of any field by tolerance times its native norm. A and B are built on the centres only, R gathers the centre values.
+    The loads are distributed on all the solid interface nodes through the kernels of the centres (least squares, see interpolateFluidToSolid) :
+    the total force and moment are conserved, the virtual work is conserved for the displacements reproduced by the centres (i.e. up to the
+    tolerance for a smooth displacement field) rather than exactly as with the transpose R^T*A^-T*B^T of the displacement transfer,
+    which would apply the loads on the centres only.
+    """
+
+    def __init__(self, Manager, FluidSolver, SolidSolver, RBFradius=0.1, tolerance=1e-2, maxCentres=None, mpiComm=None, chtTransferMethod=None, heatTransferCoeff=1.0, mappingCacheDir=None, normalizeCoordinates=False):
         """
-        des.
+        Des.
         """
 
-        dim = fluidInterfaceData.getDim()
-        gamma_array = FlexInterfaceData(self.nf + self.d, dim, self.mpiComm)
+        ConservativeInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff, mappingCacheDir, normalizeCoordinates)
 
-        self.SolverC.solve(fluidInterfaceData, gamma_array)
-        self.D.mult(gamma_array, solidInterfaceData)
+        mpiPrint('\nSetting interpolation with Radial Basis Functions on a reduced set of centres...', mpiComm)
 
-    def interpolateSolidToFluid(self, solidInterfaceData, fluidInterfaceData):
+        self.radius = RBFradius
+        self.tolerance = tolerance
+        self.maxCentres = maxCentres
+
+        self.selectCentres()
+
+        self.generateInterfaceData()
+
+        self.buildMapping()
+
+    def selectCentres(self):
         """
         Des.
+        Greedy selection of the centres, with the Newton basis of the kernel space spanned by the current centres.
+        Defines the global indexing of the centres and the kernels object filling A and B with it.
         """
 
-        dim = solidInterfaceData.getDim()
-        gamma_array = FlexInterfaceData(self.ns + self.d, dim, self.mpiComm)
+        mpiPrint('\nSelecting the RBF centres (tolerance {})...'.format(self.tolerance), self.mpiComm)
+        start = tm.time()
 
-        self.SolverA.solve(solidInterfaceData, gamma_array)
-        self.B.mult(gamma_array, fluidInterfaceData)
+        if self.mpiComm == None or self.myid in self.manager.getSolidInterfaceProcessors():
+            X = np.column_stack(self.getInterfacePositions(self.SolidSolver))
+        else:
+            X = np.zeros((0,3))
+        nLocal = X.shape[0]
+        radius = self.getKernelRadius()
+        maxCentres = self.ns if self.maxCentres == None else min(self.maxCentres, self.ns)
+
+        # the kernel of a new centre only needs to be evaluated at the local nodes of its support
+        tree = SearchTree(X[:,0], X[:,1], X[:,2])
+
+        # power function (squared) of the current centres at the local nodes, phi(0) = 1 without centre
+        power2 = np.ones(nLocal)
+        # Newton basis, one column per centre : the columns are contiguous and only those of the selected centres are ever written
+        # (the allocation is zero-filled on demand), so that the memory in use grows with the number of centres
+        newtonBasis = np.zeros((nLocal, maxCentres), order='F')
+        kernel = np.zeros(nLocal)
+        localCentres = []
+        selected = []
+        kernelColumns = []
+        for k in range(maxCentres):
+            # a single collective per centre : each rank proposes its best node together with what the others need if it is chosen
+            if nLocal > 0:
+                iLoc = int(np.argmax(power2))
+                candidate = (power2[iLoc], self.myid, iLoc, X[iLoc].copy(), newtonBasis[iLoc,:k].copy())
+            else:
+                candidate = (-1.0, self.myid, -1, None, None)
+            if self.mpiComm != None:
+                candidate = max(self.mpiComm.allgather(candidate), key=lambda item: item[:2])
+            maxPower2, owner, iLoc, centre, basisAtCentre = candidate
+            # the polynomial needs at least d centres
+            if maxPower2 <= self.tolerance**2 and k >= self.d:
+                break
+
+            if owner == self.myid:
+                localCentres.append(iLoc)
+            selected.append((owner, iLoc))
+
+            indptr, support, dist = tree.ball(centre[0:1], centre[1:2], centre[2:3], radius)
+            eps = np.minimum(dist/radius, 1.0)
+            kernel[support] = (1.0-eps)**4*(4.0*eps+1.0)
+            kernelColumns.append((support, kernel[support].copy()))
+            # column k = (kernel - N[:,:k]*N(centre,:k))/sqrt(power2(centre)), computed in place
+            column = newtonBasis[:,k]
+            np.dot(newtonBasis[:,:k], basisAtCentre, out=column)
+            np.subtract(kernel, column, out=column)
+            column /= np.sqrt(maxPower2)
+            kernel[support] = 0.0
+            power2 -= column**2
+            if owner == self.myid:
+                power2[iLoc] = 0.0
+        del newtonBasis
+
+        # centres are numbered by rank, then by local index
+        self.localCentres = np.array(sorted(localCentres), dtype=np.intc)
+        self.nc_loc = len(self.localCentres)
+        self.nc = len(selected)
+        self.centreDistribution = np.array(mpiAllGather(self.mpiComm, self.nc_loc), dtype=int).reshape(-1)
+        offsets = np.concatenate(([0], np.cumsum(self.centreDistribution)))
+        self.centreOffset = int(offsets[self.myid])
+        centreIndexRange = [(int(offsets[iProc]), int(offsets[iProc+1])-1) if self.centreDistribution[iProc] > 0 else (0,0) for iProc in range(self.mpiSize)]
+
+        # kernels of the centres and polynomial at the local solid nodes (the loads are distributed with them)
+        centreIndices = np.empty(self.nc, dtype=int)
+        centreIndices[sorted(range(self.nc), key=selected.__getitem__)] = np.arange(self.nc)
+        rows = [support for support, values in kernelColumns] + [np.arange(nLocal)]*self.d
+        columns = [np.full(len(support), centreIndices[k], dtype=int) for k, (support, values) in enumerate(kernelColumns)] + [np.full(nLocal, self.nc+iPoly, dtype=int) for iPoly in range(self.d)]
+        values = [values for support, values in kernelColumns] + [np.ones(nLocal)] + [X[:,iDim] for iDim in range(self.nDim)]
+        self.solidKernels = spsparse.csr_matrix((np.concatenate(values), (np.concatenate(rows), np.concatenate(columns))), shape=(nLocal, self.nc+self.d))
+        self.solidKernelsR = self.factorizeSolidKernels()
+
+        # kernels filling A and B with the global indexing of the centres
+        self.centreManager = ccupydo.CManager()
+        self.centreManager.setGlobalIndexing("solid", centreIndexRange)
+        self.centreManager.setGlobalIndexing("fluid", [tuple(indexRange) for indexRange in self.manager.getFluidGlobalIndexRange()])
+        self.centreKernels = ccupydo.CInterpolator(self.centreManager)
+        self.centreKernels.ns = self.nc
+        self.centreKernels.nf = self.nf
+        self.centreKernels.ns_loc = self.nc_loc
+        self.centreKernels.nf_loc = self.nf_loc
+        self.centreKernels.nDim = self.nDim
+        self.centreKernels.myid = self.myid
 
-class RBFInterpolator(ConservativeInterpolator):
-    """
-    Description.
-    """
+        stop = tm.time()
+        mpiPrint('{} centres selected out of {} solid interface nodes in {} s'.format(self.nc, self.ns, stop-start), self.mpiComm)
 
-    def __init__(self, Manager, FluidSolver, SolidSolver, RBFradius=0.1, mpiComm = None, chtTransferMethod=None, heatTransferCoeff=1.0):
-        """"
-        Description.
+    def factorizeSolidKernels(self, blockRows=1024):
+        """
+        Des.
+        Triangular factor R of the QR factorization of the kernels of the centres at all the solid nodes (C = Q*R, tall skinny QR) :
+        the local rows are reduced block by block, then the local factors are stacked and reduced again on every rank.
+        R^T*R = C^T*C without forming C^T*C, whose conditioning is the square of the one of C.
         """
 
-        ConservativeInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff)
+        nCols = self.nc + self.d
+        R = np.zeros((0, nCols))
+        for firstRow in range(0, self.solidKernels.shape[0], blockRows):
+            block = self.solidKernels[firstRow:firstRow+blockRows].toarray()
+            R = splin.qr(np.vstack((R, block)), mode='r')[0][:nCols]
+        if self.mpiComm != None:
+            R = splin.qr(np.vstack(self.mpiComm.allgather(R)), mode='r')[0][:nCols]
 
-        mpiPrint('\nSetting interpolation with Radial Basis Functions...', mpiComm)
+        if R.shape[0] < nCols or np.min(np.abs(np.diag(R))) <= 1e-14*np.max(np.abs(np.diag(R))):
+            raise Exception("The kernels of the RBF centres are rank deficient on the solid interface nodes !")
 
-        self.radius = RBFradius
+        return R
 
-        self.generateInterfaceData()
+    def setFluidSize(self, nf, nf_loc):
+        """
+        Des.
+        """
 
-        self.generateMapping()
+        RBFInterpolator.setFluidSize(self, nf, nf_loc)
 
+        # B is filled by the kernels of the centres
+        self.centreKernels.nf = nf
+        self.centreKernels.nf_loc = nf_loc
+        self.centreManager.setGlobalIndexing("fluid", [tuple(indexRange) for indexRange in self.manager.getFluidGlobalIndexRange()])
 
     def generateInterfaceData(self):
         """
         Des.
         """
 
-        ConservativeInterpolator.generateInterfaceData(self)
+        RBFInterpolator.generateInterfaceData(self)
 
-        mpiPrint('Generating interface data for conservative RBF interpolator...', self.mpiComm)
+        self.R = InterfacePermutation((self.nc+self.d,self.ns+self.d), self.mpiComm)
+
+    def generateMapping(self):
+        """
+        Des.
+        """
+
+        ConservativeInterpolator.generateMapping(self)
+
+        # R picks the values of the centres (and keeps the polynomial entries), collective in parallel
+        targets = self.centreOffset + np.arange(self.nc_loc)
+        donors = self.manager.getGlobalIndexOffset('solid', self.myid) + self.localCentres
+        if self.myid == 0:
+            targets = np.concatenate((targets, self.nc + np.arange(self.d)))
+            donors = np.concatenate((donors, self.ns + np.arange(self.d)))
+        self.R.setEntries(targets.astype(np.intc), donors.astype(np.intc))
+
+    def getMappingSignature(self):
+        """
+        Des.
+        """
+
+        return ConservativeInterpolator.getMappingSignature(self) + '|nc={}|tolerance={!r}'.format(self.nc, self.tolerance)
+
+    def getMappingMatrices(self):
+        """
+        Des.
+        """
+
+        return {'A':self.A, 'B':self.B, 'R':self.R}
+
+    def getDonorPositions(self, physics):
+        """
+        Des.
+        """
+
+        if physics == 'solid':
+            return tuple(np.ascontiguousarray(np.asarray(array)[self.localCentres]) for array in self.SolidSolver.getNodalInitialPositions())
+        else:
+            return ConservativeInterpolator.getDonorPositions(self, physics)
+
+    def getDonorDistribution(self, physics):
+        """
+        Des.
+        """
 
-        self.A.createSparseFullAlloc()
-        self.A_T.createSparseFullAlloc()
-        self.B.createSparseFullAlloc()
-        self.B_T.createSparseFullAlloc()
+        if physics == 'solid':
+            return self.centreDistribution
+        else:
+            return ConservativeInterpolator.getDonorDistribution(self, physics)
 
     def fillMatrixA(self, solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, iProc):
         """
         Description.
         """
 
-        localSolidInterface_array_X_init, localSolidInterface_array_Y_init, localSolidInterface_array_Z_init = self.SolidSolver.getNodalInitialPositions()
+        localCentres_array_X_init, localCentres_array_Y_init, localCentres_array_Z_init = self.normalizePositions(*self.getDonorPositions('solid'))
         start = tm.time()
-        ccupydo.CInterpolator.RBF_fillMatrixA(self, localSolidInterface_array_X_init, localSolidInterface_array_Y_init, localSolidInterface_array_Z_init,
-                                              solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, self.A, self.A_T, iProc, 1.01*self.radius)
+        ccupydo.CInterpolator.RBF_fillMatrixA(self.centreKernels, localCentres_array_X_init, localCentres_array_Y_init, localCentres_array_Z_init,
+                                              solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, self.A, iProc, self.getKernelRadius(), self.getDonorRadii('solid', iProc))
         stop = tm.time()
         print('Built A on rank {} in {} s'.format(self.myid,stop-start))
 
-
     def fillMatrixB(self, solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, iProc):
         """
         Description.
         """
 
-        localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init = self.FluidSolver.getNodalInitialPositions()
+        localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init = self.getInterfacePositions(self.FluidSolver)
         start = tm.time()
-        ccupydo.CInterpolator.RBF_fillMatrixB(self, localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init,
-                                              solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, self.B, self.B_T, iProc, 1.01*self.radius)
+        ccupydo.CInterpolator.RBF_fillMatrixB(self.centreKernels, localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init,
+                                              solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, self.B, iProc, self.getKernelRadius(), self.getDonorRadii('solid', iProc))
         stop = tm.time()
         print('Built B on rank {} in {} s'.format(self.myid,stop-start))
 
+    def interpolateFluidToSolid(self, fluidInterfaceData, solidInterfaceData):
+        """
+        des.
+        The solid loads are the smallest (least squares) ones whose moments on the kernels of the centres are the ones of the fluid loads,
+        f_s = C*(C^T*C)^{-1}*B^T*f_f, C being the kernels of the centres at all the solid nodes (see factorizeSolidKernels).
+        """
+
+        rhs_array = self.getFieldWorkVector(fluidInterfaceData, self.nc + self.d, 'rhs')
+        self.B.multTranspose(fluidInterfaceData, rhs_array)
+
+        # the moments are gathered on every rank (nc+d values per component)
+        with rhs_array.readBlock() as block:
+            moments = np.array(block)
+        if self.mpiComm != None:
+            moments = np.vstack(self.mpiComm.allgather(moments))
+        coefficients = splin.solve_triangular(self.solidKernelsR, splin.solve_triangular(self.solidKernelsR, moments, trans='T'))
+        solidLoads = self.solidKernels.dot(coefficients)
+
+        # the polynomial entries are cleared
+        nLocal = solidLoads.shape[0]
+        globalIndices = self.manager.getGlobalIndexOffset('solid', self.myid) + np.arange(nLocal)
+        if self.myid == 0:
+            globalIndices = np.concatenate((globalIndices, self.ns + np.arange(self.d)))
+            solidLoads = np.vstack((solidLoads, np.zeros((self.d, solidLoads.shape[1]))))
+        solidInterfaceData.setLocalBlock(globalIndices.astype(np.intc), solidLoads.T)
+        solidInterfaceData.assemble()
+
+    def interpolateSolidToFluid(self, solidInterfaceData, fluidInterfaceData):
+        """
+        Des.
+        """
+
+        centreData = self.getFieldWorkVector(solidInterfaceData, self.nc + self.d, 'centres')
+        self.R.mult(solidInterfaceData, centreData)
+
+        if self.H_BA != None:
+            self.H_BA.mult(centreData, fluidInterfaceData)
+            return
 
+        gamma_array = self.getFieldCoefficients(solidInterfaceData, self.nc + self.d)
+
+        self.SolverA.solve(centreData, gamma_array)
+        self.B.mult(gamma_array, fluidInterfaceData)
 
 class ConsistentRBFInterpolator(ConsistentInterpolator):
     """
     Description.
     """
 
-    def __init__(self, Manager, FluidSolver, SolidSolver, RBFradius = 0.1, mpiComm= None, chtTransferMethod=None, heatTransferCoeff=1.0):
+    def __init__(self, Manager, FluidSolver, SolidSolver, RBFradius = 0.1, mpiComm= None, chtTransferMethod=None, heatTransferCoeff=1.0, mappingCacheDir=None, normalizeCoordinates=False, nNeighbours=None, minRadius=0.0):
         """
         Des.
+        nNeighbours enables the adaptive radii : the support of each centre reaches its nNeighbours-th nearest neighbour on the same side,
+        clamped to [minRadius, RBFradius]
         """
 
-        ConsistentInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff)
+        ConsistentInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff, mappingCacheDir, normalizeCoordinates)
 
         mpiPrint('\nSetting interpolation with Radial Basis Functions...', mpiComm)
 
         self.radius = RBFradius
+        self.nNeighbours = nNeighbours
+        self.minRadius = minRadius
 
         self.generateInterfaceData()
 
-        self.generateMapping()
+        self.buildMapping()
 
     def generateInterfaceData(self):
         """
@@ -1178,21 +2534,42 @@ class ConsistentRBFInterpolator(ConsistentInterpolator):
 
         mpiPrint('Generating interface data for consistent RBF interpolator...', self.mpiComm)
 
-        self.A.createSparseFullAlloc()
-        self.B.createSparseFullAlloc()
-        self.C.createSparseFullAlloc()
-        self.D.createSparseFullAlloc()
+        # A, B, C & D are created with an exact preallocation when the mapping is generated
+        self.exactPreallocation = True
+
+        # with adaptive radii, the kernel of a column depends on the radius of its centre
+        if self.nNeighbours != None:
+            self.A.setSymmetric(False)
+            self.C.setSymmetric(False)
+
+    def generateMapping(self):
+        """
+        Des.
+        """
+
+        if self.nNeighbours != None:
+            self.computeAdaptiveRadii('solid')
+            self.computeAdaptiveRadii('fluid')
+
+        ConsistentInterpolator.generateMapping(self)
+
+
+    def getSearchMargin(self):
+        """
+        Des.
+        """
 
+        return 1.01*self.radius
 
     def fillMatrixA(self, solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, iProc):
         """
         Description.
         """
 
-        localSolidInterface_array_X_init, localSolidInterface_array_Y_init, localSolidInterface_array_Z_init = self.SolidSolver.getNodalInitialPositions()
+        localSolidInterface_array_X_init, localSolidInterface_array_Y_init, localSolidInterface_array_Z_init = self.getInterfacePositions(self.SolidSolver)
         start = tm.time()
-        ccupydo.CInterpolator.consistent_RBF_fillMatrixA(self, localSolidInterface_array_X_init, localSolidInterface_array_Y_init, localSolidInterface_array_Z_init,
-                                              solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, self.A, iProc, 1.01*self.radius)
+        ccupydo.CInterpolator.RBF_fillMatrixA(self, localSolidInterface_array_X_init, localSolidInterface_array_Y_init, localSolidInterface_array_Z_init,
+                                              solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, self.A, iProc, self.getKernelRadius(), self.getDonorRadii('solid', iProc))
         stop = tm.time()
         print('Built A on rank {} in {} s'.format(self.myid,stop-start))
 
@@ -1201,10 +2578,11 @@ class ConsistentRBFInterpolator(ConsistentInterpolator):
         Description.
         """
 
-        localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init = self.FluidSolver.getNodalInitialPositions()
+        localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init = self.getInterfacePositions(self.FluidSolver)
         start = tm.time()
         ccupydo.CInterpolator.consistent_RBF_fillMatrixBD(self, localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init,
-                                              solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, self.B, self.D, iProc, 1.01*self.radius)
+                                              solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, self.B, self.D, iProc, self.getKernelRadius(),
+                                              self.getDonorRadii('solid', iProc), self.getDonorRadii('fluid', self.myid))
         stop = tm.time()
         print('Built B & D on rank {} in {} s'.format(self.myid,stop-start))
 
@@ -1213,10 +2591,10 @@ class ConsistentRBFInterpolator(ConsistentInterpolator):
         Description.
         """
 
-        localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init = self.FluidSolver.getNodalInitialPositions()
+        localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init = self.getInterfacePositions(self.FluidSolver)
         start = tm.time()
         ccupydo.CInterpolator.consistent_RBF_fillMatrixC(self, localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init,
-                                              fluidInterfaceBuffRcv_X, fluidInterfaceBuffRcv_Y, fluidInterfaceBuffRcv_Z, self.C, iProc, 1.01*self.radius)
+                                              fluidInterfaceBuffRcv_X, fluidInterfaceBuffRcv_Y, fluidInterfaceBuffRcv_Z, self.C, iProc, self.getKernelRadius(), self.getDonorRadii('fluid', iProc))
         stop = tm.time()
         print('Built C on rank {} in {} s'.format(self.myid,stop-start))
 
@@ -1225,18 +2603,22 @@ class TPSInterpolator(ConservativeInterpolator):
     Des.
     """
 
-    def __init__(self, Manager, FluidSolver, SolidSolver, mpiComm=None, chtTransferMethod=None, heatTransferCoeff=1.0):
+    def __init__(self, Manager, FluidSolver, SolidSolver, mpiComm=None, chtTransferMethod=None, heatTransferCoeff=1.0, mappingCacheDir=None, normalizeCoordinates=False, compressed=False, compressionTolerance=1e-6):
         """
         des.
+        compressed replaces the dense matrices by hierarchical ones (see HierarchicalInterfaceMatrix, serial only),
+        the displacement transfers are then accurate up to compressionTolerance (the load distribution less, see HierarchicalInterfaceMatrix)
         """
 
-        ConservativeInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff)
+        ConservativeInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff, mappingCacheDir, normalizeCoordinates)
 
         mpiPrint('\nSetting interpolation with Thin Plate Spline...', self.mpiComm)
 
+        self.setCompression(compressed, compressionTolerance)
+
         self.generateInterfaceData()
 
-        self.generateMapping()
+        self.buildMapping()
 
     def generateInterfaceData(self):
         """
@@ -1247,21 +2629,45 @@ class TPSInterpolator(ConservativeInterpolator):
 
         mpiPrint('Generating interface data for TPS interpolator...', self.mpiComm)
 
-        self.A.createDense()
-        self.A_T.createDense()
-        self.B.createDense()
-        self.B_T.createDense()
+        if self.compressed:
+            self.A = HierarchicalInterfaceMatrix(self.A.sizes, self.compressionTolerance)
+            self.A.setSymmetric(True)
+            self.B = HierarchicalInterfaceMatrix(self.B.sizes, self.compressionTolerance)
+        else:
+            self.A.createDense()
+            self.B.createDense()
+
+    def generateMapping(self):
+        """
+        Des.
+        """
+
+        if not self.compressed:
+            ConservativeInterpolator.generateMapping(self)
+            return
+
+        mpiPrint('\nBuilding compressed interpolation matrices...', self.mpiComm)
+        self.fillCompressedMatrix(self.A, self.SolidSolver, self.SolidSolver, True)
+        self.fillCompressedMatrix(self.B, self.FluidSolver, self.SolidSolver)
+
+    def computeExplicitOperators(self, dropTol=1e-12, blockSize=64):
+        """
+        Des.
+        Refused : the kernel of the TPS is globally supported, so that its explicit operators are dense (stored as sparse matrices).
+        """
+
+        raise Exception("Explicit transfer operators are not available for the TPS interpolators (they are dense) !")
 
     def fillMatrixA(self, solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, iProc):
         """
         Description.
         """
 
-        localSolidInterface_array_X_init, localSolidInterface_array_Y_init, localSolidInterface_array_Z_init = self.SolidSolver.getNodalInitialPositions()
+        localSolidInterface_array_X_init, localSolidInterface_array_Y_init, localSolidInterface_array_Z_init = self.getInterfacePositions(self.SolidSolver)
 
         start = tm.time()
         ccupydo.CInterpolator.TPS_fillMatrixA(self, localSolidInterface_array_X_init, localSolidInterface_array_Y_init, localSolidInterface_array_Z_init,
-                                              solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, self.A, self.A_T, iProc)
+                                              solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, self.A, iProc)
         stop = tm.time()
         print('Built A on rank {} in {} s'.format(self.myid,stop-start))
 
@@ -1270,11 +2676,11 @@ class TPSInterpolator(ConservativeInterpolator):
         Description.
         """
 
-        localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init = self.FluidSolver.getNodalInitialPositions()
+        localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init = self.getInterfacePositions(self.FluidSolver)
 
         start = tm.time()
         ccupydo.CInterpolator.TPS_fillMatrixB(self, localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init,
-                                              solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, self.B, self.B_T, iProc)
+                                              solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, self.B, iProc)
         stop = tm.time()
         print('Built B on rank {} in {} s'.format(self.myid,stop-start))
 
@@ -1283,18 +2689,22 @@ class ConsistentTPSInterpolator(ConsistentInterpolator):
     Description.
     """
 
-    def __init__(self, Manager, FluidSolver, SolidSolver, mpiComm= None, chtTransferMethod=None, heatTransferCoeff=1.0):
+    def __init__(self, Manager, FluidSolver, SolidSolver, mpiComm= None, chtTransferMethod=None, heatTransferCoeff=1.0, mappingCacheDir=None, normalizeCoordinates=False, compressed=False, compressionTolerance=1e-6):
         """
         Des.
+        compressed replaces the dense matrices by hierarchical ones (see HierarchicalInterfaceMatrix, serial only),
+        the displacement transfers are then accurate up to compressionTolerance (the load distribution less, see HierarchicalInterfaceMatrix)
         """
 
-        ConsistentInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff)
+        ConsistentInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff, mappingCacheDir, normalizeCoordinates)
 
         mpiPrint('\nSetting consistent interpolation with Thin Plate Spline...', self.mpiComm)
 
+        self.setCompression(compressed, compressionTolerance)
+
         self.generateInterfaceData()
 
-        self.generateMapping()
+        self.buildMapping()
 
     def generateInterfaceData(self):
         """
@@ -1305,19 +2715,50 @@ class ConsistentTPSInterpolator(ConsistentInterpolator):
 
         mpiPrint('Generating interface data for consistent TPS interpolator...', self.mpiComm)
 
-        self.A.createDense()
-        self.B.createDense()
-        self.C.createDense()
-        self.D.createDense()
+        if self.compressed:
+            self.A = HierarchicalInterfaceMatrix(self.A.sizes, self.compressionTolerance)
+            self.A.setSymmetric(True)
+            self.B = HierarchicalInterfaceMatrix(self.B.sizes, self.compressionTolerance)
+            self.C = HierarchicalInterfaceMatrix(self.C.sizes, self.compressionTolerance)
+            self.C.setSymmetric(True)
+            self.D = HierarchicalInterfaceMatrix(self.D.sizes, self.compressionTolerance)
+        else:
+            self.A.createDense()
+            self.B.createDense()
+            self.C.createDense()
+            self.D.createDense()
+
+    def generateMapping(self):
+        """
+        Des.
+        """
+
+        if not self.compressed:
+            ConsistentInterpolator.generateMapping(self)
+            return
+
+        mpiPrint('\nBuilding compressed interpolation matrices...', self.mpiComm)
+        self.fillCompressedMatrix(self.A, self.SolidSolver, self.SolidSolver, True)
+        self.fillCompressedMatrix(self.B, self.FluidSolver, self.SolidSolver)
+        self.fillCompressedMatrix(self.C, self.FluidSolver, self.FluidSolver, True)
+        self.fillCompressedMatrix(self.D, self.SolidSolver, self.FluidSolver)
+
+    def computeExplicitOperators(self, dropTol=1e-12, blockSize=64):
+        """
+        Des.
+        Refused : the kernel of the TPS is globally supported, so that its explicit operators are dense (stored as sparse matrices).
+        """
+
+        raise Exception("Explicit transfer operators are not available for the TPS interpolators (they are dense) !")
 
     def fillMatrixA(self, solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, iProc):
         """
         Des.
         """
 
-        localSolidInterface_array_X_init, localSolidInterface_array_Y_init, localSolidInterface_array_Z_init = self.SolidSolver.getNodalInitialPositions()
+        localSolidInterface_array_X_init, localSolidInterface_array_Y_init, localSolidInterface_array_Z_init = self.getInterfacePositions(self.SolidSolver)
         start = tm.time()
-        ccupydo.CInterpolator.consistent_TPS_fillMatrixA(self, localSolidInterface_array_X_init, localSolidInterface_array_Y_init, localSolidInterface_array_Z_init,
+        ccupydo.CInterpolator.TPS_fillMatrixA(self, localSolidInterface_array_X_init, localSolidInterface_array_Y_init, localSolidInterface_array_Z_init,
                                               solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, self.A, iProc)
         stop = tm.time()
         print('Built A on rank {} in {} s'.format(self.myid,stop-start))
@@ -1327,7 +2768,7 @@ class ConsistentTPSInterpolator(ConsistentInterpolator):
         des.
         """
 
-        localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init = self.FluidSolver.getNodalInitialPositions()
+        localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init = self.getInterfacePositions(self.FluidSolver)
         start = tm.time()
         ccupydo.CInterpolator.consistent_TPS_fillMatrixBD(self, localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init,
                                               solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, self.B, self.D, iProc)
@@ -1339,9 +2780,133 @@ class ConsistentTPSInterpolator(ConsistentInterpolator):
         Des.
         """
 
-        localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init = self.FluidSolver.getNodalInitialPositions()
+        localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init = self.getInterfacePositions(self.FluidSolver)
         start = tm.time()
         ccupydo.CInterpolator.consistent_TPS_fillMatrixC(self, localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init,
                                               fluidInterfaceBuffRcv_X, fluidInterfaceBuffRcv_Y, fluidInterfaceBuffRcv_Z, self.C, iProc)
         stop = tm.time()
         print('Built C on rank {} in {} s'.format(self.myid,stop-start))
+
+class PartitionOfUnityRBFInterpolator(InterfaceInterpolator):
+    """
+    Partition of unity RBF interpolator.
+    The interface is covered by overlapping patches (of radius patchRadius, centred on a regular grid), a small RBF (kernel='RBF')
+    or TPS (kernel='TPS') system is solved on each patch and the local interpolants are blended with normalized weights.
+    The resulting sparse operator H (nf X ns) is built once, in O(n) time and memory. Its rows sum to one, the solid to fluid
+    transfer is H*solid and the fluid to solid transfer H^T*fluid (conservative).
+    """
+
+    def __init__(self, Manager, FluidSolver, SolidSolver, patchRadius=0.1, kernel='RBF', mpiComm=None, chtTransferMethod=None, heatTransferCoeff=1.0, mappingCacheDir=None, normalizeCoordinates=False):
+        """
+        Des.
+        """
+
+        InterfaceInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff, mappingCacheDir, normalizeCoordinates)
+
+        mpiPrint('\nSetting partition of unity interpolation with Radial Basis Functions...', mpiComm)
+
+        if kernel not in ['RBF', 'TPS']:
+            raise Exception("Local kernel of the partition of unity interpolator must be 'RBF' or 'TPS' !")
+
+        self.radius = patchRadius
+        self.kernel = kernel
+
+        self.generateInterfaceData()
+
+        self.buildMapping()
+
+    def generateInterfaceData(self):
+        """
+        Des.
+        """
+
+        InterfaceInterpolator.generateInterfaceData(self)
+
+        self.H = InterfaceMatrix((self.nf,self.ns), self.mpiComm)
+
+    def getMappingSignature(self):
+        """
+        Des.
+        """
+
+        return InterfaceInterpolator.getMappingSignature(self) + '|kernel={}'.format(self.kernel)
+
+    def getSearchMargin(self):
+        """
+        Des.
+        The patches covering a fluid node gather the solid nodes up to two patch radii away.
+        """
+
+        return 2.02*self.radius
+
+    def getMappingMatrices(self):
+        """
+        Des.
+        """
+
+        return {'H':self.H}
+
+    def generateMapping(self):
+        """
+        Des.
+        """
+
+        mpiPrint('\nBuilding partition of unity interpolation matrix H of size {} X {}...'.format(self.nf, self.ns), self.mpiComm)
+        self.mappingTimer.start()
+
+        solidInterfaceBuffRcv = self.exchangeInterfaceCoordinates('solid', 'fluid')
+        # collective in parallel (exact preallocation), ranks without fluid interface nodes take part with empty arrays
+        self.fillMatrix(solidInterfaceBuffRcv)
+
+        mpiBarrier(self.mpiComm)
+        mpiPrint('\nAssembling H...', self.mpiComm)
+        start = tm.time()
+        self.H.assemble()
+        mpiBarrier(self.mpiComm)
+        stop = tm.time()
+        mpiPrint('Matrix H is built and assembled in {} s'.format(stop-start), self.mpiComm)
+
+        self.mappingTimer.stop()
+        self.mappingTimer.cumul()
+
+    def fillMatrix(self, solidInterfaceBuffRcv):
+        """
+        Des.
+        Gathers all the received solid nodes (with their global indices) and fills H with the local fluid nodes as targets.
+        """
+
+        if len(solidInterfaceBuffRcv) > 0:
+            solidInterfaceBuffRcv_X = np.concatenate([buffX for iProc, buffX, buffY, buffZ in solidInterfaceBuffRcv])
+            solidInterfaceBuffRcv_Y = np.concatenate([buffY for iProc, buffX, buffY, buffZ in solidInterfaceBuffRcv])
+            solidInterfaceBuffRcv_Z = np.concatenate([buffZ for iProc, buffX, buffY, buffZ in solidInterfaceBuffRcv])
+            solidGlobalIndices = np.concatenate([self.manager.getGlobalIndexOffset('solid', iProc) + np.arange(len(buffX), dtype=np.intc) for iProc, buffX, buffY, buffZ in solidInterfaceBuffRcv]).astype(np.intc)
+        else:
+            solidInterfaceBuffRcv_X = solidInterfaceBuffRcv_Y = solidInterfaceBuffRcv_Z = np.zeros(0)
+            solidGlobalIndices = np.zeros(0, dtype=np.intc)
+
+        if self.mpiComm == None or self.myid in self.manager.getFluidInterfaceProcessors():
+            localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init = self.getInterfacePositions(self.FluidSolver)
+        else:
+            localFluidInterface_array_X_init = localFluidInterface_array_Y_init = localFluidInterface_array_Z_init = np.zeros(0)
+
+        print('Building H on rank {}...'.format(self.myid))
+        start = tm.time()
+        ccupydo.CInterpolator.PU_fillMatrix(self, localFluidInterface_array_X_init, localFluidInterface_array_Y_init, localFluidInterface_array_Z_init,
+                                            solidInterfaceBuffRcv_X, solidInterfaceBuffRcv_Y, solidInterfaceBuffRcv_Z, solidGlobalIndices,
+                                            self.H, self.radius/self.coordinatesScale, self.kernel == 'TPS')
+        stop = tm.time()
+        print('Built H on rank {} in {} s'.format(self.myid,stop-start))
+
+    def interpolateFluidToSolid(self, fluidInterfaceData, solidInterfaceData):
+        """
+        des.
+        """
+
+        self.H.multTranspose(fluidInterfaceData, solidInterfaceData)
+
+    def interpolateSolidToFluid(self, solidInterfaceData, fluidInterfaceData):
+        """
+        Des.
+        """
+
+        self.H.mult(solidInterfaceData, fluidInterfaceData)
@@ -29,6 +29,8 @@ Authors : David THOMAS, Marco Lucio CERQUAGLIA, Romain BOMAN
 
 import numpy as np
 import scipy as sp
+import scipy.linalg as splin
+import scipy.sparse as spsparse
 import scipy.sparse.linalg as splinalg
 
 import ccupydo
@@ -43,14 +45,31 @@ class LinearSolver(ccupydo.CLinearSolver):
     """
     Define a parallel linear solver (serial compatible).
     Designed to be used with InterfaceData and InterfaceMatrix classes.
+    In serial, the operator is factorized once at construction and the factorization is reused for every solve.
+    The fill of the sparse factors is bounded by the memory cap during the factorization, large operators (or factorizations
+    reaching the cap) are solved with ILU-preconditioned GMRES instead (the ILU fill is bounded by the cap as well).
+    Compressed operators (HierarchicalInterfaceMatrix) are always solved with GMRES, preconditioned by their two-level preconditioner
+    (see HierarchicalInterfaceMatrix.getPreconditioner), down to the tolerance of the compression.
+    In parallel, the Krylov solver and the preconditioner are chosen with a solver profile (see setSolverProfile).
     Inherited public members :
         -solve()
+        -solveTranspose()
+        -setKSPType()
+        -setPreconditioner()
+        -setFactorizationPackage()
+        -setOptionsPrefix()
+        -setFromOptions()
+        -getIterationNumber()
     """
 
-    def __init__(self, MatrixOperator, mpiComm=None):
+    directSolverMaxSize = 200000
+    directSolverMemoryCap = 2.0e9
+
+    def __init__(self, MatrixOperator, mpiComm=None, solverProfile=None):
         """
         Constructor.
         MatrixOperator is of type InterfaceMatrix
+        solverProfile is an optional dictionary (see setSolverProfile)
         """
 
         ccupydo.CLinearSolver.__init__(self, MatrixOperator)
@@ -58,7 +77,222 @@ class LinearSolver(ccupydo.CLinearSolver):
         self.mpiComm = mpiComm
 
         if mpiComm == None:
+            self.symmetric = MatrixOperator.isSymmetric()
             self.LinOperator = MatrixOperator.getMat()
+            # compressed operators only provide their products and their preconditioner
+            self.compressed = isinstance(self.LinOperator, splinalg.LinearOperator)
+            self.relTol = 1e-5
+            self.maxInt = 10000
+            self.nIterations = 0
+            self.LU = None
+            self.Precond = None
+            self.PrecondT = None
+            if self.compressed:
+                # solving more accurately than the compression is useless, less accurately spoils the transfers
+                self.relTol = MatrixOperator.getTolerance()
+                self.Precond = MatrixOperator.getPreconditioner()
+                self.PrecondT = self.Precond if self.symmetric else None
+            else:
+                self.__factorize()
+
+        if solverProfile != None:
+            self.setSolverProfile(solverProfile)
+
+    def __factorize(self, forceDirect=False):
+        """
+        Des.
+        Computes the (serial) factorization of the operator.
+        The direct path is used if the size and the memory footprint of the factors stay below the caps (or if forceDirect).
+        The sparse factorization starts dropping entries when its fill reaches the memory cap, it is then replaced by the ILU preconditioner.
+        """
+
+        n = self.LinOperator.shape[0]
+
+        if forceDirect:
+            if spsparse.issparse(self.LinOperator):
+                self.LU = ('sparse', splinalg.splu(self.LinOperator.tocsc()))
+            else:
+                self.LU = ('dense', splin.lu_factor(self.LinOperator))
+            self.Precond = None
+            self.PrecondT = None
+            return
+
+        if not spsparse.issparse(self.LinOperator):
+            if 8.0*n*n <= self.directSolverMemoryCap:
+                self.LU = ('dense', splin.lu_factor(self.LinOperator))
+                return
+            self.LinOperator = spsparse.csr_matrix(self.LinOperator)
+
+        if n <= self.directSolverMaxSize and self.__getFillBound(self.LinOperator) >= 1.0:
+            # the fill is bounded during the factorization : without any dropped entry, the incomplete LU is the complete one
+            try:
+                lu = splinalg.spilu(self.LinOperator.tocsc(), drop_tol=0.0, fill_factor=self.__getFillBound(self.LinOperator), diag_pivot_thresh=1.0)
+                if self.__isComplete(lu):
+                    self.LU = ('sparse', lu)
+                    return
+                del lu
+            except (RuntimeError, MemoryError):
+                pass
+
+        self.__setPreconditioner(self.LinOperator)
+
+    def __getFillBound(self, matrix):
+        """
+        Des.
+        Largest ratio between the number of nonzeros of the factors and of the sparse matrix that fits in the memory cap.
+        """
+
+        return self.directSolverMemoryCap/(12.0*max(matrix.nnz, 1))
+
+    def __isComplete(self, lu):
+        """
+        Des.
+        Checks that no entry was dropped from the factorization, from the backward error of a solve (round-off level for the complete factors).
+        """
+
+        probe = np.random.RandomState(0).rand(self.LinOperator.shape[0])
+        XX = lu.solve(probe)
+        residual = np.linalg.norm(self.LinOperator.dot(XX)-probe, np.inf)
+
+        return residual <= 1e-10*(splinalg.norm(self.LinOperator, np.inf)*np.linalg.norm(XX, np.inf) + np.linalg.norm(probe, np.inf))
+
+    def __setPreconditioner(self, matrix):
+        """
+        Des.
+        Builds the preconditioners of GMRES from the incomplete LU factorization of the sparse matrix.
+        """
+
+        n = matrix.shape[0]
+
+        self.Precond = None
+        self.PrecondT = None
+        if self.__getFillBound(matrix) < 1.0:
+            # the matrix alone fills the memory cap
+            return
+
+        try:
+            ilu = splinalg.spilu(matrix.tocsc(), drop_tol=1e-4, fill_factor=min(10.0, self.__getFillBound(matrix)))
+            self.Precond = splinalg.LinearOperator((n,n), ilu.solve)
+            self.PrecondT = splinalg.LinearOperator((n,n), lambda x: ilu.solve(x, 'T'))
+        except (RuntimeError, MemoryError):
+            self.Precond = None
+            self.PrecondT = None
+
+    def __solveArray(self, rhs, transpose=False, x0=None):
+        """
+        Des.
+        Solves the (serial) system (or the transposed one) for a 1-D or 2-D (one column per component) right-hand side array.
+        x0 is the initial guess of the iterative path (same shape as rhs).
+        """
+
+        transpose = transpose and not self.symmetric
+
+        if self.LU != None:
+            kind, lu = self.LU
+            if kind == 'dense':
+                return splin.lu_solve(lu, rhs, trans=int(transpose))
+            else:
+                return lu.solve(rhs, trans='T' if transpose else 'N')
+        elif rhs.ndim == 2:
+            columns = []
+            nIterations = 0
+            for jj in range(rhs.shape[1]):
+                columns.append(self.__solveArray(rhs[:,jj], transpose, None if x0 is None else x0[:,jj]))
+                nIterations = max(nIterations, self.nIterations)
+            self.nIterations = nIterations
+            return np.column_stack(columns)
+        else:
+            self.nIterations = 0
+            def countIteration(residual):
+                self.nIterations += 1
+            if transpose:
+                XX, info = splinalg.gmres(self.LinOperator.T, rhs, x0=x0, tol=self.relTol, maxiter=self.maxInt, M=self.PrecondT, callback=countIteration)
+            else:
+                XX, info = splinalg.gmres(self.LinOperator, rhs, x0=x0, tol=self.relTol, maxiter=self.maxInt, M=self.Precond, callback=countIteration)
+            if info > 0:
+                print('GMRES did not converge within {} iterations'.format(info))
+            return XX
+
+    def setMaxNumberIterations(self, maxInt):
+        """
+        Des.
+        Sets the maximum number of iterations of the iterative solver.
+        """
+
+        if self.mpiComm != None:
+            ccupydo.CLinearSolver.setMaxNumberIterations(self, maxInt)
+        else:
+            self.maxInt = maxInt
+
+    def setRelativeTolerance(self, relTol):
+        """
+        Des.
+        Sets the relative tolerance of the iterative solver.
+        """
+
+        if self.mpiComm != None:
+            ccupydo.CLinearSolver.setRelativeTolerance(self, relTol)
+        else:
+            self.relTol = relTol
+
+    def setTolerances(self, relTol, absTol, divTol, maxInt):
+        """
+        Des.
+        Sets the tolerances and the maximum number of iterations of the iterative solver.
+        """
+
+        if self.mpiComm != None:
+            ccupydo.CLinearSolver.setTolerances(self, relTol, absTol, divTol, maxInt)
+        else:
+            self.relTol = relTol
+            self.maxInt = maxInt
+
+    def setSolverProfile(self, profile):
+        """
+        Des.
+        Configures the solver from a dictionary, all the keys are optional :
+            -'prefix' : PETSc options prefix, the options database (command line) is then read with it
+            -'ksp' : Krylov solver (FGMRES, GMRES, BCGS, CG, MINRES or PREONLY for a single preconditioner application)
+            -'package' : factorization package of the ILU/LU preconditioners (e.g. MUMPS, SUPERLU_DIST). PETSc's own factorizations
+                         are sequential, so on several processes LU defaults to MUMPS and ILU without a package becomes BJACOBI with ILU blocks
+            -'pc' : preconditioner (JACOBI, BJACOBI, ASM, SOR, ILU, LU or NONE)
+            -'subPc' : local solver of the BJACOBI/ASM blocks (ILU, LU, ICC, SOR or JACOBI)
+            -'overlap' : overlap of the ASM subdomains
+            -'relTol', 'absTol', 'divTol', 'maxIt' : tolerances of the Krylov solver
+        In serial, only the tolerances are used and 'pc':'LU' forces the direct factorization (ignored for the compressed operators,
+        which always use their own preconditioner).
+        """
+
+        if self.mpiComm != None:
+            if 'prefix' in profile:
+                self.setOptionsPrefix(profile['prefix'])
+            if 'ksp' in profile:
+                self.setKSPType(profile['ksp'])
+            if 'package' in profile:
+                self.setFactorizationPackage(profile['package'])
+            if 'pc' in profile:
+                self.setPreconditioner(profile['pc'], profile.get('subPc', 'ILU'), profile.get('overlap', 1))
+            if any(key in profile for key in ('relTol', 'absTol', 'divTol', 'maxIt')):
+                self.setTolerances(profile.get('relTol', 1e-5), profile.get('absTol', 1e-50), profile.get('divTol', 1e5), profile.get('maxIt', 10000))
+            if 'prefix' in profile:
+                # command line options keep the last word
+                self.setFromOptions()
+        else:
+            if profile.get('pc') == 'LU' and self.LU == None and not self.compressed:
+                self.__factorize(True)
+            self.relTol = profile.get('relTol', self.relTol)
+            self.maxInt = profile.get('maxIt', self.maxInt)
+
+    def getIterationNumber(self):
+        """
+        Des.
+        Number of Krylov iterations of the last solve (the largest one over the components in serial, 0 for the direct solves).
+        """
+
+        if self.mpiComm != None:
+            return ccupydo.CLinearSolver.getIterationNumber(self)
+        else:
+            return self.nIterations
 
     def solve(self, DataB, DataX):
         """
@@ -70,6 +304,21 @@ class LinearSolver(ccupydo.CLinearSolver):
             ccupydo.CLinearSolver.solve(self, DataB, DataX)
         else:
             dim = DataB.getDim()
+            # the current values of VecX are the initial guess
+            XX = self.__solveArray(np.column_stack([DataB.getData(iDim) for iDim in range(dim)]), False, np.column_stack([DataX.getData(iDim) for iDim in range(dim)]))
+            for iDim in range(dim):
+                DataX.getData(iDim)[:] = XX[:,iDim]
+
+    def solveTranspose(self, DataB, DataX):
+        """
+        Solve system MatrixOperator^T*VecX = VecB (same as solve if MatrixOperator is symmetric).
+        VecX and VecB are InterfaceData types.
+        """
+
+        if self.mpiComm != None:
+            ccupydo.CLinearSolver.solveTranspose(self, DataB, DataX)
+        else:
+            dim = DataB.getDim()
+            XX = self.__solveArray(np.column_stack([DataB.getData(iDim) for iDim in range(dim)]), True, np.column_stack([DataX.getData(iDim) for iDim in range(dim)]))
             for iDim in range(dim):
-                XX = splinalg.spsolve(self.LinOperator, DataB.getData(iDim))
-                DataX.setData(iDim, XX)
+                DataX.getData(iDim)[:] = XX[:,iDim]
@@ -85,6 +85,7 @@ class Manager(ccupydo.CManager):
         self.haveSolidInterface = False
         self.solidHaloNodesList = {}
         self.solidIndexing = {}
+        self.globalIndices = {}
 
         # --- Identify the fluid and solid interfaces and store the number of nodes on both sides (and for each partition) ---
 
@@ -246,6 +247,43 @@ class Manager(ccupydo.CManager):
             self.solidIndexing = solidIndexing_temp.copy()
         del fluidIndexing_temp, solidIndexing_temp
 
+    def updateInterfaceNodes(self, FluidSolver, SolidSolver):
+        """
+        Description.
+        Updates the number of nodes, the global indexing and the solvers indexing after a change of the interface nodes (remeshing).
+        Serial only.
+        """
+
+        if self.mpiComm != None:
+            raise Exception("The interface nodes can only be updated in serial !")
+
+        self.nLocalFluidInterfaceNodes = FluidSolver.nNodes
+        self.nLocalFluidInterfacePhysicalNodes = FluidSolver.nPhysicalNodes
+        self.haveFluidInterface = (self.nLocalFluidInterfaceNodes != 0)
+        self.nLocalSolidInterfaceNodes = SolidSolver.nNodes
+        self.nLocalSolidInterfacePhysicalNodes = SolidSolver.nPhysicalNodes
+        self.haveSolidInterface = (self.nLocalSolidInterfaceNodes != 0)
+
+        self.nFluidInterfaceNodes = self.nLocalFluidInterfaceNodes
+        self.nFluidInterfacePhysicalNodes = self.nLocalFluidInterfacePhysicalNodes
+        self.nSolidInterfaceNodes = self.nLocalSolidInterfaceNodes
+        self.nSolidInterfacePhysicalNodes = self.nLocalSolidInterfacePhysicalNodes
+        self.fluidPhysicalInterfaceNodesDistribution[0] = self.nFluidInterfacePhysicalNodes
+        self.solidPhysicalInterfaceNodesDistribution[0] = self.nSolidInterfacePhysicalNodes
+        self.fluidGlobalIndexRange = [(0,self.nLocalFluidInterfacePhysicalNodes-1)]
+        self.solidGlobalIndexRange = [(0,self.nSolidInterfacePhysicalNodes-1)]
+        # the C++ indexing is used by the fill routines
+        self.setGlobalIndexing("fluid", self.fluidGlobalIndexRange)
+        self.setGlobalIndexing("solid", self.solidGlobalIndexRange)
+
+        self.globalIndices = {}
+        self.fluidIndexing = {}
+        for iVertex in range(self.nLocalFluidInterfacePhysicalNodes):
+            self.fluidIndexing[FluidSolver.getNodalIndex(iVertex)] = self.getGlobalIndex('fluid', 0, iVertex)
+        self.solidIndexing = {}
+        for jVertex in range(self.nLocalSolidInterfacePhysicalNodes):
+            self.solidIndexing[SolidSolver.getNodalIndex(jVertex)] = self.getGlobalIndex('solid', 0, jVertex)
+
     def getGlobalIndex(self, domain, iProc, iLocalVertex):
         """
         Description.
@@ -259,6 +297,22 @@ class Manager(ccupydo.CManager):
 
         return globalIndex
 
+    def getGlobalIndices(self, domain, iProc):
+        """
+        Description.
+        Returns the global indices of all the interface physical nodes of iProc (computed once, then cached).
+        """
+
+        if (domain, iProc) not in self.globalIndices:
+            if domain == 'fluid':
+                nLocal = self.fluidPhysicalInterfaceNodesDistribution[iProc]
+            elif domain == 'solid':
+                nLocal = self.solidPhysicalInterfaceNodesDistribution[iProc]
+            globalStartIndex = self.getGlobalIndex(domain, iProc, 0)
+            self.globalIndices[(domain, iProc)] = np.arange(globalStartIndex, globalStartIndex+nLocal, dtype=np.intc)
+
+        return self.globalIndices[(domain, iProc)]
+
     def getNumberOfFluidInterfaceNodes(self):
         """
         Description.
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: latin-1; -*-
+
+'''
+
+Copyright 2018 University of Liège
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+searchTree.py
+Spatial search tree (ADT) over a set of interface nodes.
+Authors : David THOMAS, Marco Lucio CERQUAGLIA, Romain BOMAN
+
+'''
+
+# ----------------------------------------------------------------------
+#  Imports
+# ----------------------------------------------------------------------
+
+import numpy as np
+
+import ccupydo
+
+# ----------------------------------------------------------------------
+#  SearchTree class
+# ----------------------------------------------------------------------
+
+class SearchTree(ccupydo.ADTPoint):
+    """
+    Alternating digital tree over a fixed set of points, built once and queried by batches of points.
+    The queries are multithreaded (OpenMP) in the C++ core.
+    The neighbours are returned in CSR layout : the neighbours of the query point i are ids[indptr[i]:indptr[i+1]],
+    at the distances dist[indptr[i]:indptr[i+1]]. ids are the indices of the points in the arrays given to the constructor.
+    Inherited public members :
+        -getSize()
+        -queryKNearest()
+        -queryBall()
+        -getNeighbours()
+        -getClusterTree()
+    """
+
+    def __init__(self, X, Y, Z):
+        """
+        Constructor.
+        X, Y, Z are the coordinates of the points (the tree keeps its own copy).
+        """
+
+        ccupydo.ADTPoint.__init__(self, self.__toArray(X), self.__toArray(Y), self.__toArray(Z))
+
+    def __toArray(self, values):
+        """
+        Des.
+        """
+
+        return np.ascontiguousarray(values, dtype=float).reshape(-1)
+
+    def __getNeighbours(self):
+        """
+        Des.
+        Copies the results of the last query (the C++ buffers are reused by the next one).
+        """
+
+        indptr, ids, dist = self.getNeighbours()
+
+        return np.array(indptr, dtype=int), np.array(ids, dtype=int), np.array(dist)
+
+    def kNearest(self, X, Y, Z, k):
+        """
+        Des.
+        The min(k, getSize()) nearest points of each query point, sorted by increasing distance.
+        """
+
+        ccupydo.ADTPoint.queryKNearest(self, self.__toArray(X), self.__toArray(Y), self.__toArray(Z), int(k))
+
+        return self.__getNeighbours()
+
+    def nearest(self, X, Y, Z):
+        """
+        Des.
+        Returns the index and the distance of the nearest point of each query point.
+        """
+
+        if self.getSize() == 0:
+            raise Exception("Nearest point search in an empty tree !")
+
+        indptr, ids, dist = self.kNearest(X, Y, Z, 1)
+
+        return ids, dist
+
+    def ball(self, X, Y, Z, radius):
+        """
+        Des.
+        All the points within radius of each query point (not sorted). radius is a scalar or one radius per query point.
+        """
+
+        X, Y, Z = self.__toArray(X), self.__toArray(Y), self.__toArray(Z)
+        radii = np.ascontiguousarray(np.broadcast_to(np.asarray(radius, dtype=float), X.shape))
+
+        ccupydo.ADTPoint.queryBall(self, X, Y, Z, radii)
+
+        return self.__getNeighbours()
+
+    def clusters(self):
+        """
+        Des.
+        The nodes of the tree seen as clusters of points (binary tree of bisections, root first).
+        Returns perm and nodes, a list of [start, stop, boxMin, boxMax, children] : the points of a node are perm[start:stop]
+        and children lists the child nodes (empty when the node ends with single points).
+        """
+
+        perm, nodes, boxes = self.getClusterTree()
+        perm = np.array(perm, dtype=int)
+        nodes = np.array(nodes, dtype=int).reshape(-1, 4)
+        boxes = np.array(boxes).reshape(-1, 6)
+
+        # a node has either two child nodes or only point children, except the 3 points nodes (one child node and one point)
+        return perm, [[start, stop, boxes[iNode,:3], boxes[iNode,3:], [left, right] if min(left, right) >= 0 else []]
+                      for iNode, (start, stop, left, right) in enumerate(nodes)]
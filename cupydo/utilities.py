@@ -32,6 +32,7 @@ import numpy as np
 import scipy as sp
 import os, os.path, sys, string
 import time as tm
+import hashlib
 
 import socket, fnmatch
 import fsi_pyutils
@@ -313,10 +314,20 @@ def mpiGatherInterfaceData(interfData, globalSize, mpiComm = None, rootProcess =
     interfData_Gat = []
 
     if mpiComm != None :
-        localSize = interfData.getDataArray(0).shape[0]
-        for iDim in range(interfData.nDim):
-            array_Gat = mpiGatherv(interfData.getDataArray(iDim), localSize, globalSize, mpiComm, 0)
-            interfData_Gat.append(array_Gat)
+        localSize = interfData.getLocalLength()
+        if interfData.isBlocked():
+            with interfData.readBlock() as localBlock:
+                block_Gat = mpiGatherv(localBlock.reshape(-1), localSize*interfData.nDim, globalSize*interfData.nDim, mpiComm, 0)
+            for iDim in range(interfData.nDim):
+                if block_Gat is not None:
+                    interfData_Gat.append(block_Gat[iDim::interfData.nDim])
+                else:
+                    interfData_Gat.append(None)
+        else:
+            with interfData.readArrays() as localArrays:
+                for iDim in range(interfData.nDim):
+                    array_Gat = mpiGatherv(localArrays[iDim], localSize, globalSize, mpiComm, 0)
+                    interfData_Gat.append(array_Gat)
     else:
         for iDim in range(interfData.nDim):
             interfData_Gat.append(interfData.getData(iDim))
@@ -385,3 +396,92 @@ class Timer:
         """
 
         return self.cumulTime
+
+# ----------------------------------------------------------------------
+#   MappingCache class
+# ----------------------------------------------------------------------
+
+class MappingCache:
+    """
+    On-disk cache of the assembled interpolation matrices.
+    Entries are keyed by a hash of the interface coordinates, the partition layout and the interpolator settings.
+    """
+
+    def __init__(self, cacheDir, mpiComm = None):
+        """
+        Des.
+        """
+
+        self.cacheDir = cacheDir
+        self.mpiComm = mpiComm
+
+        if mpiComm != None:
+            myid = mpiComm.Get_rank()
+        else:
+            myid = 0
+
+        if myid == 0 and not os.path.isdir(cacheDir):
+            os.makedirs(cacheDir)
+        mpiBarrier(mpiComm)
+
+    def computeKey(self, signature, localArrays):
+        """
+        Des.
+        signature is a string (identical on all ranks) describing the interpolator and the partition layout.
+        localArrays is the list of the coordinate arrays owned by the rank.
+        """
+
+        localHash = hashlib.sha1()
+        for array in localArrays:
+            localHash.update(np.ascontiguousarray(array, dtype=np.float64).tostring())
+
+        if self.mpiComm != None:
+            digests = self.mpiComm.allgather(localHash.hexdigest())
+        else:
+            digests = [localHash.hexdigest()]
+
+        key = hashlib.sha1(signature)
+        for digest in digests:
+            key.update(digest)
+
+        return key.hexdigest()
+
+    def getFileName(self, key, name):
+        """
+        Des.
+        """
+
+        return os.path.join(self.cacheDir, '{}_{}.bin'.format(key, name))
+
+    def contains(self, key, names):
+        """
+        Des.
+        """
+
+        missing = 0
+        for name in names:
+            if not os.path.isfile(self.getFileName(key, name)):
+                missing = 1
+
+        return mpiAllReduce(self.mpiComm, missing) == 0
+
+    def load(self, key, matrices):
+        """
+        Des.
+        matrices is a dict of InterfaceMatrix, returns True if all of them have been loaded from the cache.
+        """
+
+        failed = 0
+        for name in sorted(matrices.keys()):
+            if not matrices[name].load(self.getFileName(key, name)):
+                failed = 1
+
+        return mpiAllReduce(self.mpiComm, failed) == 0
+
+    def save(self, key, matrices):
+        """
+        Des.
+        """
+
+        for name in sorted(matrices.keys()):
+            matrices[name].save(self.getFileName(key, name))
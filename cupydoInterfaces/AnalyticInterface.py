@@ -0,0 +1,335 @@
+#!/usr/bin/env python
+# -*- coding: latin-1; -*-
+
+'''
+
+Copyright 2018 University of Liège
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+AnalyticInterface.py
+Analytic fluid and solid solvers (no physics) on a parametric interface, used to verify the transfers of the interpolators.
+Authors : David THOMAS, Marco Lucio CERQUAGLIA, Romain BOMAN
+
+'''
+
+# ----------------------------------------------------------------------
+#  Imports
+# ----------------------------------------------------------------------
+
+import numpy as np
+from cupydo.genericSolvers import FluidSolver, SolidSolver
+from cupydo.utilities import mpiAllReduce, MappingCache
+from cupydo.interfaceData import FlexInterfaceData
+
+# ----------------------------------------------------------------------
+#  Interface geometry
+# ----------------------------------------------------------------------
+
+def surfaceGrid(nx, ny, amplitude=0.1, shift=0.0):
+    """
+    Structured grid of nx X ny nodes on the surface z = amplitude*(sin(2x)*cos(1.5y) + 0.5*x*y), (x,y) in [shift,1+shift] X [0,1].
+    Returns the coordinates of the nodes and the triangles of the grid (local node indices).
+    """
+
+    X, Y = np.meshgrid(np.linspace(0.0, 1.0, nx) + shift, np.linspace(0.0, 1.0, ny), indexing='ij')
+    X, Y = X.ravel(), Y.ravel()
+    Z = amplitude*(np.sin(2.0*X)*np.cos(1.5*Y) + 0.5*X*Y)
+
+    faces = []
+    for i in range(nx-1):
+        for j in range(ny-1):
+            a, b, c, d = i*ny+j, (i+1)*ny+j, (i+1)*ny+j+1, i*ny+j+1
+            faces += [[a, b, c], [a, c, d]]
+
+    return X, Y, Z, np.array(faces, dtype=np.intc)
+
+def partition(X, Y, Z, faces, myid, nProcs):
+    """
+    Contiguous block of the nodes owned by rank myid, with the faces lying entirely on it (renumbered).
+    Returns the coordinates, the faces and the identifiers (original indices) of the local nodes.
+    """
+
+    nodes = np.array_split(np.arange(len(X)), nProcs)[myid]
+    local = -np.ones(len(X), dtype=int)
+    local[nodes] = np.arange(len(nodes))
+    localFaces = faces[np.all(local[faces] >= 0, axis=1)]
+
+    return X[nodes], Y[nodes], Z[nodes], local[localFaces].astype(np.intc), nodes
+
+def scaledSurfaceGrid(nx, ny, amplitude=0.1, scale=1.0, offset=0.0):
+    """
+    surfaceGrid with the coordinates scaled by scale and then shifted by offset.
+    """
+
+    X, Y, Z, faces = surfaceGrid(nx, ny, amplitude)
+
+    return scale*X+offset, scale*Y+offset, scale*Z+offset, faces
+
+def createSolvers(nSolid, nFluid, amplitude=0.1, mpiComm=None, rootProcess=0, scale=1.0, offset=0.0):
+    """
+    Creates the solvers on grids of nSolid and nFluid nodes (scaledSurfaceGrid) of the same surface.
+    The fluid interface is partitioned over the ranks, the solid interface lies on rootProcess (the solid solver is None elsewhere).
+    """
+
+    myid, nProcs = (mpiComm.Get_rank(), mpiComm.Get_size()) if mpiComm != None else (0, 1)
+
+    fluidSolver = AnalyticFluidSolver(*partition(*scaledSurfaceGrid(nFluid[0], nFluid[1], amplitude, scale, offset), myid=myid, nProcs=nProcs))
+    solidSolver = None
+    if myid == rootProcess:
+        solidSolver = AnalyticSolidSolver(*scaledSurfaceGrid(nSolid[0], nSolid[1], amplitude, scale, offset))
+
+    return fluidSolver, solidSolver
+
+def linearField(X, Y, Z):
+    """
+    Linear displacement field, exactly reproduced by the interpolators with a linear polynomial.
+    """
+
+    return (1.0+2.0*X-Y+0.5*Z, -0.3+X+Z, 0.2*Y)
+
+def checkTransfers(interpolator, fluidSolver, solidSolver, mpiComm=None, field=linearField, seed=0):
+    """
+    Transfers field (evaluated at the solid nodes) to the fluid nodes and random loads from the fluid nodes to the solid nodes.
+    Returns the maximum error of the fluid displacements with respect to field at the fluid nodes and the relative differences
+    of the total force and of the virtual work between both sides. The solvers are None on the ranks without interface.
+    """
+
+    myid = mpiComm.Get_rank() if mpiComm != None else 0
+
+    if solidSolver != None:
+        solidSolver.setDisplacements(*field(*solidSolver.getNodalInitialPositions()))
+    interpolator.getDisplacementFromSolidSolver()
+    interpolator.interpolateSolidDisplacementOnFluidMesh()
+    interpolator.setDisplacementToFluidSolver(0.0)
+
+    if fluidSolver != None:
+        rng = np.random.RandomState(seed+myid)
+        fluidSolver.setLoads(*rng.rand(3, fluidSolver.nPhysicalNodes))
+    interpolator.getLoadsFromFluidSolver()
+    interpolator.interpolateFluidLoadsOnSolidMesh()
+    interpolator.setLoadsToSolidSolver(0.0)
+
+    dispError = 0.0
+    fluidForce, fluidWork, fluidScale = np.zeros(3), 0.0, 0.0
+    if fluidSolver != None and fluidSolver.nPhysicalNodes > 0:
+        exact = field(*fluidSolver.getNodalInitialPositions())
+        loads = fluidSolver.getNodalLoads()
+        for iDim in range(3):
+            dispError = max(dispError, np.max(np.abs(fluidSolver.displacements[iDim]-exact[iDim])))
+            fluidForce[iDim] = np.sum(loads[iDim])
+            fluidWork += np.dot(loads[iDim], fluidSolver.displacements[iDim])
+            fluidScale += np.dot(np.abs(loads[iDim]), np.abs(fluidSolver.displacements[iDim]))
+    solidForce, solidWork = np.zeros(3), 0.0
+    if solidSolver != None and solidSolver.nPhysicalNodes > 0:
+        displacements = solidSolver.getNodalDisplacements()
+        for iDim in range(3):
+            solidForce[iDim] = np.sum(solidSolver.loads[iDim])
+            solidWork += np.dot(solidSolver.loads[iDim], displacements[iDim])
+
+    dispError = max(mpiComm.allgather(dispError)) if mpiComm != None else dispError
+    fluidForce = np.array([mpiAllReduce(mpiComm, value) for value in fluidForce])
+    solidForce = np.array([mpiAllReduce(mpiComm, value) for value in solidForce])
+    fluidWork, solidWork, fluidScale = mpiAllReduce(mpiComm, fluidWork), mpiAllReduce(mpiComm, solidWork), mpiAllReduce(mpiComm, fluidScale)
+    forceError = np.max(np.abs(fluidForce-solidForce))/np.max(np.abs(fluidForce))
+    workError = abs(fluidWork-solidWork)/fluidScale
+
+    return dispError, forceError, workError
+
+def isInMappingCache(interpolator):
+    """
+    Returns True if the mapping cache of interpolator holds all its interpolation matrices.
+    """
+
+    cache = MappingCache(interpolator.mappingCacheDir, interpolator.mpiComm)
+    key = cache.computeKey(interpolator.getMappingSignature(), interpolator.getLocalInterfaceCoordinates())
+
+    return cache.contains(key, interpolator.getMappingMatrices().keys())
+
+def randomData(nPoint, mpiComm=None, seed=0):
+    """
+    Interface data of nPoint points with 3 random components (the same whatever the number of ranks).
+    """
+
+    data = FlexInterfaceData(nPoint, 3, mpiComm)
+    start, stop = data.getOwnershipRange()
+    rng = np.random.RandomState(seed)
+    data.setLocalBlock(np.arange(start, stop, dtype=np.intc), rng.rand(3, nPoint)[:,start:stop])
+    data.assemble()
+
+    return data
+
+def matrixDifference(matrix, otherMatrix, mpiComm=None, seed=0, transpose=False):
+    """
+    Relative difference between the products (or the transposed products) of two interface matrices of the same size with random interface data.
+    """
+
+    nRows, nCols = matrix.sizes[::-1] if transpose else matrix.sizes
+    data = randomData(nCols, mpiComm, seed)
+
+    product = FlexInterfaceData(nRows, 3, mpiComm)
+    otherProduct = FlexInterfaceData(nRows, 3, mpiComm)
+    if transpose:
+        matrix.multTranspose(data, product)
+        otherMatrix.multTranspose(data, otherProduct)
+    else:
+        matrix.mult(data, product)
+        otherMatrix.mult(data, otherProduct)
+
+    return np.max(np.array((product-otherProduct).norm())/np.array(product.norm()))
+
+# ----------------------------------------------------------------------
+#  AnalyticFluidSolver class
+# ----------------------------------------------------------------------
+
+class AnalyticFluidSolver(FluidSolver):
+    """
+    Fluid solver whose interface nodes and loads are prescribed.
+    The displacements received from the coupler are stored in self.displacements.
+    """
+
+    def __init__(self, X, Y, Z, faces=None, nodeIndices=None):
+        """
+        Des.
+        """
+
+        self.nHaloNode = 0
+        self.pendingNodes = None
+        self.__setInterfaceNodes(X, Y, Z, faces, nodeIndices)
+
+    def __setInterfaceNodes(self, X, Y, Z, faces, nodeIndices):
+        """
+        Des.
+        """
+
+        self.X, self.Y, self.Z = np.array(X, dtype=float), np.array(Y, dtype=float), np.array(Z, dtype=float)
+        self.faces = faces
+        self.nodeIndices = np.arange(len(self.X)) if nodeIndices is None else np.array(nodeIndices, dtype=int)
+        self.nNodes = len(self.X)
+        self.nPhysicalNodes = self.nNodes - self.nHaloNode
+
+        FluidSolver.__init__(self)
+
+        self.displacements = (np.zeros(self.nPhysicalNodes), np.zeros(self.nPhysicalNodes), np.zeros(self.nPhysicalNodes))
+
+    def setLoads(self, load_X, load_Y, load_Z):
+        """
+        Des.
+        """
+
+        self.nodalLoad_X = np.array(load_X, dtype=float)
+        self.nodalLoad_Y = np.array(load_Y, dtype=float)
+        self.nodalLoad_Z = np.array(load_Z, dtype=float)
+
+    def remesh(self, X, Y, Z, nodeIndices, faces=None):
+        """
+        Des.
+        The new interface nodes are taken into account by the next call to updateInterfaceNodes.
+        """
+
+        self.pendingNodes = (X, Y, Z, faces, nodeIndices)
+
+    def updateInterfaceNodes(self):
+        """
+        Des.
+        """
+
+        if self.pendingNodes != None:
+            self.__setInterfaceNodes(*self.pendingNodes)
+            self.pendingNodes = None
+
+    def getNodalInitialPositions(self):
+        """
+        Des.
+        """
+
+        return (self.X, self.Y, self.Z)
+
+    def getNodalIndex(self, iVertex):
+        """
+        Returns the index (identifier) of the iVertex^th interface node.
+        """
+
+        return int(self.nodeIndices[iVertex])
+
+    def applyNodalDisplacements(self, dx, dy, dz, dx_nM1, dy_nM1, dz_nM1, haloNodesDisplacements, time):
+        """
+        Des.
+        """
+
+        # the interface data may hold extra (e.g. polynomial) entries after the physical nodes
+        self.displacements = tuple(np.array(d[:self.nPhysicalNodes]) for d in (dx, dy, dz))
+
+# ----------------------------------------------------------------------
+#  AnalyticSolidSolver class
+# ----------------------------------------------------------------------
+
+class AnalyticSolidSolver(SolidSolver):
+    """
+    Solid solver whose interface nodes and displacements are prescribed.
+    The loads received from the coupler are stored in self.loads.
+    """
+
+    def __init__(self, X, Y, Z, faces=None, nodeIndices=None):
+        """
+        Des.
+        """
+
+        self.X, self.Y, self.Z = np.array(X, dtype=float), np.array(Y, dtype=float), np.array(Z, dtype=float)
+        self.faces = faces
+        self.nodeIndices = np.arange(len(self.X)) if nodeIndices is None else np.array(nodeIndices, dtype=int)
+        self.nNodes = len(self.X)
+        self.nHaloNode = 0
+        self.nPhysicalNodes = self.nNodes - self.nHaloNode
+
+        SolidSolver.__init__(self)
+
+        self.loads = (np.zeros(self.nPhysicalNodes), np.zeros(self.nPhysicalNodes), np.zeros(self.nPhysicalNodes))
+
+    def setDisplacements(self, disp_X, disp_Y, disp_Z):
+        """
+        Des.
+        """
+
+        self.nodalDisp_X = np.array(disp_X, dtype=float)
+        self.nodalDisp_Y = np.array(disp_Y, dtype=float)
+        self.nodalDisp_Z = np.array(disp_Z, dtype=float)
+
+    def getNodalInitialPositions(self):
+        """
+        Des.
+        """
+
+        return (self.X, self.Y, self.Z)
+
+    def getNodalIndex(self, iVertex):
+        """
+        Returns the index (identifier) of the iVertex^th interface node.
+        """
+
+        return int(self.nodeIndices[iVertex])
+
+    def getInterfaceConnectivity(self):
+        """
+        Des.
+        """
+
+        return self.faces
+
+    def applyNodalLoads(self, load_X, load_Y, load_Z, time):
+        """
+        Des.
+        """
+
+        # the interface data may hold extra (e.g. polynomial) entries after the physical nodes
+        self.loads = tuple(np.array(load[:self.nPhysicalNodes]) for load in (load_X, load_Y, load_Z))
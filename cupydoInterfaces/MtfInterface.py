@@ -258,6 +258,27 @@ class MtfSolver(SolidSolver):
     
         return no
 
+    def getInterfaceConnectivity(self):
+        """
+        Returns the mesh segments of the curves of the f/s boundary (local interface vertex indices).
+        Only available for 2D interfaces (None otherwise).
+        """
+
+        if self.gr.getNumberOfCurves() == 0:
+            return None
+
+        index = {}
+        for ii in range(self.nPhysicalNodes):
+            index[self.gr.getMeshPoint(ii).getNo()] = ii
+
+        faces = []
+        for iCurve in range(self.gr.getNumberOfCurves()):
+            curve = self.gr.getCurve(iCurve)
+            for jj in range(curve.getNumberOfMeshPoints()-1):
+                faces.append([index[curve.getMeshPoint(jj).getNo()], index[curve.getMeshPoint(jj+1).getNo()]])
+
+        return np.array(faces, dtype=np.intc)
+
     def fakeFluidSolver(self, time):
         """
         calculate some dummy loads as a function of timestep.
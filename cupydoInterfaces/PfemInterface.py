@@ -60,6 +60,7 @@ class PfemSolver(FluidSolver):
         
         # retrieve the f/s boundary and the related nodes
         gr = self.pfem.w.Group(self.pfem.msh, bndno)
+        self.gr = gr
         
         # builds a list (dict) of interface nodes
         
@@ -238,6 +239,35 @@ class PfemSolver(FluidSolver):
         self.pfem.scheme.remeshing(self.V,self.V0,self.p)
         self.pfem.scheme.updateData()
     
+    def updateInterfaceNodes(self):
+        """
+        Rebuilds the list of interface nodes after remeshing (nodes may have been added or removed on the f/s boundary).
+        The accumulated displacements of the kept nodes are preserved, the new nodes start from zero.
+        """
+        displ = {}
+        for i in range(len(self.vnods)):
+            displ[self.vnods[i].no] = (self.displ_x_Nm1[i], self.displ_y_Nm1[i], self.displ_z_Nm1[i])
+        
+        nods = {}
+        for e in self.gr.tag.elems:
+            for n in e.nodes:
+                nods[n.no] = n
+        
+        self.vnods = list(nods.values())
+        self.nNodes = len(self.vnods)
+        self.nPhysicalNodes = self.nNodes - self.nHaloNode
+        
+        FluidSolver.__init__(self)
+        
+        self.displ_x_Nm1 = np.zeros((self.nPhysicalNodes))
+        self.displ_y_Nm1 = np.zeros((self.nPhysicalNodes))
+        self.displ_z_Nm1 = np.zeros((self.nPhysicalNodes))
+        for i in range(len(self.vnods)):
+            if self.vnods[i].no in displ:
+                self.displ_x_Nm1[i], self.displ_y_Nm1[i], self.displ_z_Nm1[i] = displ[self.vnods[i].no]
+        
+        self.__setCurrentState()
+    
     def exit(self):
         """
         Exits the Pfem solver.
@@ -32,7 +32,9 @@ threads="1"
 #include "cManager.h"
 #include "cFlexInterfaceData.h"
 #include "cInterfaceMatrix.h"
+#include "cInterfacePermutation.h"
 #include "cLinearSolver.h"
+#include "cAdt.h"
 %}
 
 // petite bidouille pour pouvoir compiler avec "threads=1" et iterer sur des std_vector
@@ -93,12 +95,35 @@ namespace std {
                                       (int size_buff_y, double* buff_y),
                                       (int size_buff_z, double* buff_z)}
 
-%apply (int DIM1, int* IN_ARRAY1) {(int size_indices, int* indices_list)}
+%apply (int DIM1, double* IN_ARRAY1) {(int size_x, double* data_x),
+                                      (int size_y, double* data_y),
+                                      (int size_z, double* data_z),
+                                      (int size_qx, double* query_x),
+                                      (int size_qy, double* query_y),
+                                      (int size_qz, double* query_z)}
+
+%apply (int DIM1, int* IN_ARRAY1) {(int size_indices, int* indices_list),
+                                   (int size_indptr, int* indptr_list),
+                                   (int size_donors, int* donors_list),
+                                   (int size_faces, int* faces_list)}
 %apply (int DIM1, double* IN_ARRAY1) {(int size_values, double *values_array)}
+%apply (int DIM1, int DIM2, double* IN_ARRAY2) {(int size_block1, int size_block2, double* block_array)}
+%apply (int DIM1, double* IN_ARRAY1) {(int size_radii, double* radii_array),
+                                      (int size_loc_radii, double* loc_radii_array)}
+%apply (int DIM1, double* INPLACE_ARRAY1) {(int size_dist, double* dist_array)}
 %apply (int DIM1, double* IN_ARRAY1) {(int size, double *data)}
 %apply(int *DIM1, double** ARGOUTVIEW_ARRAY1) {(int* size, double** data_array)}
+%apply(int *DIM1, int** ARGOUTVIEW_ARRAY1) {(int* size_nbr_indptr, int** nbr_indptr_array),
+                                         (int* size_nbr_ids, int** nbr_ids_array)}
+%apply(int *DIM1, double** ARGOUTVIEW_ARRAY1) {(int* size_nbr_dist, double** nbr_dist_array)}
+%apply(int *DIM1, int** ARGOUTVIEW_ARRAY1) {(int* size_tree_perm, int** tree_perm_array),
+                                         (int* size_tree_nodes, int** tree_nodes_array)}
+%apply(int *DIM1, double** ARGOUTVIEW_ARRAY1) {(int* size_tree_boxes, double** tree_boxes_array)}
 #ifndef HAVE_MPI
 %apply(int *DIM1, int* DIM2, double** ARGOUTVIEW_ARRAY2) {(int* size1, int* size2, double** mat_array)}
+%apply(int *DIM1, int** ARGOUTVIEW_ARRAY1) {(int* size_indptr, int** indptr_array),
+                                         (int* size_indices, int** indices_array)}
+%apply(int *DIM1, double** ARGOUTVIEW_ARRAY1) {(int* size_values, double** values_array)}
 #endif
 
 //%apply (int DIM1, double* IN_ARRAY1) {(int size, double *in_array)};
@@ -125,10 +150,16 @@ namespace std {
 //%pythonappend CInterfaceMatrix "self.__disown__()"    // for directors
 %include "cInterfaceMatrix.h"
 
+%feature("director") CInterfacePermutation;
+//%pythonappend CInterfacePermutation "self.__disown__()"    // for directors
+%include "cInterfacePermutation.h"
+
 %feature("director") CLinearSolver;
 //%pythonappend CLinearSolver "self.__disown__()"    // for directors
 %include "cLinearSolver.h"
 
+%include "cAdt.h"
+
 %feature("director::except"){
     if ($error != NULL) {
         std::cout << "[in director:except]\n";
@@ -109,8 +109,6 @@ public:
 
 class ADT_PointType : public ADT_BaseType {
 private:
-    std::vector<int> frontLeaves;
-    std::vector<int> frontLeavesNew;
     std::vector<double> coordPoints;
     std::vector<int> localPointIDs;
     std::vector<int> ranksOfPoints;
@@ -123,6 +121,10 @@ public:
     ~ADT_PointType();
     void queryNearestNeighboor(double *coord, double &dist, int &pointID, int &rankID);                                               //Query a nearest neighboor point
     void queryBallNeighboors(double *coord, double const& radius, std::vector<double> &dist, std::vector<int> &pointID, int &rankID); //Query all neighboor within a sphere
+    void queryKNearestNeighboors(double *coord, int const& k, std::vector<double> &dist, std::vector<int> &pointID);                   //Query the k nearest neighboors (sorted by distance)
+    void getClusterTree(std::vector<int> &perm, std::vector<int> &nodes, std::vector<double> &boxes);                                  //Leaves of the tree as clusters of consecutive points of perm
+private:
+    void appendClusterPoints(int iLeaf, std::vector<int> &perm, std::vector<int> &nodes);
 };
 
 
@@ -31,9 +31,31 @@ protected:
   int *dataIDs;
   int size, nDim;
   ADT_PointType *dataTree;
+  //Neighbours found by the last batched query called from Python (see getNeighbours)
+  std::vector<int> resultIndptr, resultIDs;
+  std::vector<double> resultDist;
+  //Cluster tree of the points (see getClusterTree)
+  std::vector<int> clusterPerm, clusterNodes;
+  std::vector<double> clusterBoxes;
 public:
-  ADTPoint(int size_x, double* data_x, int val_size_y, double* val_data_y, int size_z, double* data_z);
+  ADTPoint(int size_x, double* data_x, int size_y, double* data_y, int size_z, double* data_z);
   ~ADTPoint();
-  void queryNN(int size, double* coord, int &pointID, double &distance);
-  void queryBallNN(int size, double* coord, double radius, std::vector<int> &allIDs);
+  int getSize() const;
+  bool hasSamePoints(int size_x, double const* data_x, double const* data_y, double const* data_z) const;
+  void queryNN(int size, double* coord, int &pointID, double &distance) const;
+  void queryBallNN(int size, double* coord, double radius, std::vector<int> &allIDs) const;
+  void queryKNN(int size, double* coord, int k, std::vector<double> &allDist, std::vector<int> &allIDs) const;
+  //Batched queries (multithreaded), the neighbours of the query point i are allIDs[indptr[i]:indptr[i+1]]
+  void batchQueryNN(int nQuery, double const* query_x, double const* query_y, double const* query_z, int* allIDs, double* allDist) const;
+  void batchQueryKNN(int nQuery, double const* query_x, double const* query_y, double const* query_z, int k,
+                     std::vector<int> &indptr, std::vector<int> &allIDs, std::vector<double> &allDist) const;
+  void batchQueryBall(int nQuery, double const* query_x, double const* query_y, double const* query_z, double const* radii,
+                      std::vector<int> &indptr, std::vector<int> &allIDs, std::vector<double> &allDist) const;
+  //Python interface of the batched queries, the results are read with getNeighbours
+  void queryKNearest(int size_qx, double* query_x, int size_qy, double* query_y, int size_qz, double* query_z, int k);
+  void queryBall(int size_qx, double* query_x, int size_qy, double* query_y, int size_qz, double* query_z, int size_radii, double* radii_array);
+  void getNeighbours(int* size_nbr_indptr, int** nbr_indptr_array, int* size_nbr_ids, int** nbr_ids_array, int* size_nbr_dist, double** nbr_dist_array);
+  //Nodes of the tree as clusters of points, the points of the node i are perm[nodes[4*i]:nodes[4*i+1]], its children are nodes[4*i+2:4*i+4]
+  //(-1 for a point) and its bounding box is boxes[6*i:6*i+6] (min coords, max coords)
+  void getClusterTree(int* size_tree_perm, int** tree_perm_array, int* size_tree_nodes, int** tree_nodes_array, int* size_tree_boxes, double** tree_boxes_array);
 };
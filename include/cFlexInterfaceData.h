@@ -25,6 +25,7 @@
 
 #ifdef HAVE_MPI
 #include "petscvec.h"
+#include "petscmat.h"
 #endif  //HAVE_MPI
 
 #include "cMpi.h"
@@ -32,12 +33,20 @@
 class CFlexInterfaceData{
 #ifdef HAVE_MPI
   std::vector<Vec> dataContainer;
+  //Blocked layout : all the components interleaved in one vector of block size nDim (dataContainer then holds work vectors)
+  Vec blockContainer;
+  Vec arrayVec(const int& iDim) const;
 #else //HAVE_MPI
   std::vector<double*> dataContainer;
 #endif //HAVE_MPI
+  bool blocked;
+  //Access to the local arrays : 0 (none), n>0 (n read accesses), -1 (write access)
+  std::vector<int> arrayAccess;
+  std::vector<double*> arrayPointer;
+  void releaseDataArray(const int& iDim);
 public:
   //Public members
-  CFlexInterfaceData(int const& val_nPoint, int const& val_nDim, Cupydo_Comm val_comm);
+  CFlexInterfaceData(int const& val_nPoint, int const& val_nDim, Cupydo_Comm val_comm, bool const& val_blocked=false);
   CFlexInterfaceData(CFlexInterfaceData& data);
   virtual ~CFlexInterfaceData();
   void destroy();
@@ -46,17 +55,26 @@ public:
   int getDim();
   Cupydo_Comm getComm();
   int getLocalLength();
+  bool isBlocked() const;
   void setValue(const int& iDim, const int& index, const double& value);
   void setValues(const int& iDim, int size_indices, int *indices_list, int size_values, double *values_array);
   void setAllValues(const int& iDim, const double& value);
+  void setLocalBlock(int size_indices, int *indices_list, int size_block1, int size_block2, double *block_array);
   //void getDataContainer();
 #ifdef HAVE_MPI
   Vec getData(const int& iDim);
+  void restoreData(const int& iDim);
+  Vec getBlockData();
+  void getMultiVector(Mat* multiVec);
+  void setFromMultiVector(Mat multiVec);
 #else //HAVE_MPI
   void getData(const int& iDim, int* size, double** data_array);
   void setData(const int& iDim, int size, double* data);
 #endif //HAVE_MPI
   void getDataArray(const int& iDim, int* size, double** data_array);
+  void restoreDataArray(const int& iDim);
+  void getDataArrayRead(const int& iDim, int* size, double** data_array);
+  void restoreDataArrayRead(const int& iDim);
   void assemble();
   std::vector<double> norm();
   std::vector<double> sum();
@@ -22,6 +22,8 @@
 #pragma once
 
 #include <vector>
+#include <map>
+#include <string>
 
 #include "cMpi.h"
 
@@ -34,23 +36,49 @@
 class CInterfaceMatrix{
 #ifdef HAVE_MPI
 Mat H;
+bool countingNonZeros;
+std::map<int, std::vector<int> > nonZeroPattern;
+//Multi-component (MAIJ) form of H acting on blocked (interleaved) interface data
+Mat HBlocked;
+int blockedDof;
+Mat getBlockedMat(int const& dof);
+void destroyBlockedMat();
 #else //HAVE_MPI
 std::vector<double> H;
+bool sparse, assembled;
+std::vector< std::map<int, double> > H_rows;
+std::vector<int> H_indptr, H_indices;
+std::vector<double> H_values;
+void openSparse();
 #endif //HAVE_MPI
 int M,N;
+bool symmetric;
 public:
   CInterfaceMatrix(int const& val_M, int const& val_N);
   virtual ~CInterfaceMatrix();
   void createDense();
   void createSparse(int val_dnz, int val_onz);
   void createSparseFullAlloc();
+  void initNonZeros();
+  void addNonZeros(int iGlobalIndex, int size_indices, int* indices_list);
+  void createSparseExactAlloc();
   void setValue(int const& iGlobalIndex, int const& jGlobalIndex, double const& value);
   void setValues(int const& m, int const iGlobalIndices[], int const& n, int const jGlobalIndices[], double const values[]);
+  void setRowValues(int iGlobalIndex, int size_indices, int* indices_list, int size_values, double* values_array);
+  void setRowsCSR(int iFirstRow, int size_indptr, int* indptr_list, int size_indices, int* indices_list, int size_values, double* values_array);
+  void setSymmetric(bool val_symmetric);
+  bool isSymmetric() const;
+  void flush();
   void assemble();
   void mult(CFlexInterfaceData* B, CFlexInterfaceData* X);
+  void multTranspose(CFlexInterfaceData* B, CFlexInterfaceData* X);
+  void save(const std::string& fileName);
+  bool load(const std::string& fileName);
 #ifdef HAVE_MPI
   Mat getMat();
 #else  //HAVE_MPI
   void getMat(int* size1, int* size2, double** mat_array);
+  bool isSparse() const;
+  void getCSR(int* size_indptr, int** indptr_array, int* size_indices, int** indices_array, int* size_values, double** values_array);
 #endif  //HAVE_MPI
 };
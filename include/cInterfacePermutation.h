@@ -0,0 +1,57 @@
+/*
+ * Copyright 2018 University of Liège
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+/*!
+ * Header for CInterfacePermutation.
+ * Authors : D. THOMAS.
+ */
+
+#pragma once
+
+#include <vector>
+#include <string>
+
+#include "cMpi.h"
+
+#ifdef HAVE_MPI
+#include "petscvec.h"
+#endif  //HAVE_MPI
+
+#include "cFlexInterfaceData.h"
+
+//Transfer operator with a single unit entry per row (matching meshes) : X[i] = B[indices[i]]
+class CInterfacePermutation{
+#ifdef HAVE_MPI
+Vec donorIndices;
+VecScatter scatter;
+void createScatter();
+#else //HAVE_MPI
+std::vector<int> indices;
+#endif //HAVE_MPI
+int M,N;
+public:
+  CInterfacePermutation(int const& val_M, int const& val_N);
+  virtual ~CInterfacePermutation();
+  void setMapping(int nEntries, int const targetIndices[], int const donorIndices_list[]);
+  void setEntries(int size_indices, int* indices_list, int size_donors, int* donors_list);
+  void mult(CFlexInterfaceData* B, CFlexInterfaceData* X);
+  void multTranspose(CFlexInterfaceData* B, CFlexInterfaceData* X);
+  void save(const std::string& fileName);
+  bool load(const std::string& fileName);
+#ifndef HAVE_MPI
+  void getIndices(int* size_indices, int** indices_array);
+#endif  //HAVE_MPI
+};
@@ -21,41 +21,48 @@
 
 #pragma once
 
+#include <map>
+#include <string>
+#include <utility>
+
 #include "cManager.h"
 #include "cInterfaceMatrix.h"
+#include "cInterfacePermutation.h"
+
+class ADTPoint;
 
 class CInterpolator{
   CManager* manager;
   double* minDist;
   int* jGlobalVertexSolid_array;
+  //Search trees of the donor point sets, reused by the successive fills as long as the points do not change
+  mutable std::map<std::pair<std::string,int>, ADTPoint*> searchTrees;
+  ADTPoint const& getSearchTree(std::string const& key, int iProc, int size, double* x, double* y, double* z) const;
 public:
   CInterpolator(CManager* val_manager);
 
   virtual ~CInterpolator();
 
+  void clearSearchTrees();
+
   void matching_initSearch();
 
   void matching_search(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
                        int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
                        int iProc) const;
 
-  void matching_fillMatrix(CInterfaceMatrix *H, CInterfaceMatrix *H_T) const;
+  void matching_fillPermutation(CInterfacePermutation *H) const;
 
   void TPS_fillMatrixA(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
                        int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
-                       CInterfaceMatrix *A, CInterfaceMatrix *A_T,
+                       CInterfaceMatrix *A,
                        int iProc) const;
 
   void TPS_fillMatrixB(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
                        int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
-                       CInterfaceMatrix *B, CInterfaceMatrix *B_T,
+                       CInterfaceMatrix *B,
                        int iProc) const;
 
-  void consistent_TPS_fillMatrixA(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
-                                  int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
-                                  CInterfaceMatrix *A,
-                                  int iProc) const;
-
   void consistent_TPS_fillMatrixBD(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
                                   int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
                                   CInterfaceMatrix *B, CInterfaceMatrix *D,
@@ -68,28 +75,46 @@ public:
 
   void RBF_fillMatrixA(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
                        int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
-                       CInterfaceMatrix *A, CInterfaceMatrix *A_T,
-                       int iProc, double const& radius) const;
+                       CInterfaceMatrix *A,
+                       int iProc, double const& radius, int size_radii, double* radii_array) const;
 
   void RBF_fillMatrixB(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
                        int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
-                       CInterfaceMatrix *B, CInterfaceMatrix *B_T,
-                       int iProc, double const& radius) const;
-
-  void consistent_RBF_fillMatrixA(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
-                                  int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
-                                  CInterfaceMatrix *A,
-                                  int iProc, double const& radius) const;
+                       CInterfaceMatrix *B,
+                       int iProc, double const& radius, int size_radii, double* radii_array) const;
 
   void consistent_RBF_fillMatrixBD(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
                        int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
                        CInterfaceMatrix *B, CInterfaceMatrix *D,
-                       int iProc, double const& radius) const;
+                       int iProc, double const& radius,
+                       int size_radii, double* radii_array, int size_loc_radii, double* loc_radii_array) const;
 
   void consistent_RBF_fillMatrixC(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
                                   int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
                                   CInterfaceMatrix *C,
-                                  int iProc, double const& radius) const;
+                                  int iProc, double const& radius, int size_radii, double* radii_array) const;
+
+  void PU_fillMatrix(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
+                     int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
+                     int size_indices, int* indices_list,
+                     CInterfaceMatrix *H,
+                     double const& patchRadius, bool const& useTPS) const;
+
+  void IDW_fillMatrix(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
+                      int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
+                      int size_indices, int* indices_list,
+                      CInterfaceMatrix *H,
+                      int const& nNeighbours, double const& power) const;
+
+  void projection_fillMatrix(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
+                             int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
+                             int size_faces, int* faces_list,
+                             CInterfaceMatrix *H,
+                             int const& nNodesPerFace) const;
+
+  void kNN_updateDistances(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
+                           int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
+                           int size_dist, double* dist_array, std::string const& physics, int iProc) const;
 
   double PHI_TPS(double& distance) const;
 
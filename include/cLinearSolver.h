@@ -37,18 +37,27 @@ class CLinearSolver{
   PC Precond;
   int nInt, maxInt;
   double rNorm, relTol, absTol, divTol;
+  std::string factorPackage;
 
+  void setSubSolvers(const std::string& val_subPrecond);
 #endif
 public:
   CLinearSolver(CInterfaceMatrix* val_matrixOperator);
   virtual ~CLinearSolver();
 #ifdef HAVE_MPI
   void solve(CFlexInterfaceData* B, CFlexInterfaceData* X);
+  void solveTranspose(CFlexInterfaceData* B, CFlexInterfaceData* X);
 #endif  //HAVE_MPI
   void setMaxNumberIterations(const int& val_maxInt);
   void setRelativeTolerance(const double& val_relTol);
-  void setPreconditioner(const std::string& val_precond);
+  void setTolerances(const double& val_relTol, const double& val_absTol, const double& val_divTol, const int& val_maxInt);
+  void setKSPType(const std::string& val_ksp);
+  void setPreconditioner(const std::string& val_precond, const std::string& val_subPrecond = "ILU", const int& val_overlap = 1);
+  void setFactorizationPackage(const std::string& val_package);
+  void setOptionsPrefix(const std::string& val_prefix);
+  void setFromOptions();
   void monitor();
+  int getIterationNumber();
   void printTolerances();
 
 };
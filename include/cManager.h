@@ -30,6 +30,7 @@ public:
   CManager();
   virtual ~CManager();
   int getGlobalIndex(std::string const& str_physics, int const& iProc, int const& iVertex);
+  int getGlobalIndexOffset(std::string const& str_physics, int const& iProc) const;
   void setGlobalIndexing(std::string str_physics, std::vector<std::vector<int> > index_range);
   std::vector< std::vector< std::vector<int> > > globalIndexRange;
   int nPhyscis;
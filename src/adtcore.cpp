@@ -27,6 +27,8 @@
 
 #include <iomanip>
 #include <stdexcept>
+#include <queue>
+#include <functional>
 
 using namespace std;
 
@@ -339,7 +341,8 @@ double ADT_BaseType::computeDistanceSquare(double *pointA, double *pointB){
 
     double distance(0.0);
     for(int dim=0; dim<nDimADT; dim ++){
-        distance += pow(pointA[dim] - pointB[dim], 2);
+        const double delta = pointA[dim] - pointB[dim];
+        distance += delta*delta;
     }
 
     return distance;
@@ -436,6 +439,10 @@ void ADT_PointType::queryNearestNeighboor(double *coord, double &dist, int &poin
 
     dist = computeDistanceSquare(coord, coordTarget);
 
+    /* The fronts are thread-local so that concurrent queries can share the same tree,
+       they keep their capacity from one query to the next (no reallocation per query). */
+    static thread_local std::vector<int> frontLeaves, frontLeavesNew;
+
     /* Traverse the tree to find the nearest node and start at the root. */
     frontLeaves.clear();       // Make sure to wipe out any data from aprevious search.
     frontLeaves.push_back(0);  // Initialize frontLeaves such that it only contains the root leaf.
@@ -501,7 +508,7 @@ void ADT_PointType::queryNearestNeighboor(double *coord, double &dist, int &poin
       }
 
       /* Update the data for the next round*/
-      frontLeaves = frontLeavesNew;
+      frontLeaves.swap(frontLeavesNew);
 
       /* If the new front is empty, it means we have reached a terminal leaf and the search is over. */
       if(frontLeaves.size() == 0) break;
@@ -526,6 +533,9 @@ void ADT_PointType::queryBallNeighboors(double *coord, double const& radius, std
     pointID.clear();
     rankID = -1;
 
+    /* The fronts are thread-local so that concurrent queries can share the same tree,
+       they keep their capacity from one query to the next (no reallocation per query). */
+    static thread_local std::vector<int> frontLeaves, frontLeavesNew;
     frontLeaves.clear();
     frontLeaves.push_back(0);
 
@@ -548,7 +558,7 @@ void ADT_PointType::queryBallNeighboors(double *coord, double const& radius, std
             coordTarget = coordPoints.data() + nDimADT*childID;
             distanceSquare = computeDistanceSquare(coord, coordTarget);
             /* If the point is included in the ball search, add the point to the list */
-            if (distanceSquare <= pow(radius,2)){
+            if (distanceSquare <= radius*radius){
               dist.push_back(sqrt(distanceSquare));
               pointID.push_back(childID);
             }
@@ -567,11 +577,105 @@ void ADT_PointType::queryBallNeighboors(double *coord, double const& radius, std
         }
       }
 
-      frontLeaves = frontLeavesNew;
+      frontLeaves.swap(frontLeavesNew);
       if(frontLeaves.size() == 0) break;
     }
 }
 
+void ADT_PointType::queryKNearestNeighboors(double *coord, int const& k, std::vector<double> &dist, std::vector<int> &pointID){
+
+    dist.clear();
+    pointID.clear();
+
+    if(empty || k <= 0) return;
+
+    typedef std::pair<double,int> DistID;
+
+    /* Max-heap of the k nearest points found so far (squared distance, point index). */
+    std::priority_queue<DistID> nearest;
+    /* Min-heap of the leaves still to be visited, ordered by the distance to their bounding box. */
+    std::priority_queue<DistID, std::vector<DistID>, std::greater<DistID> > front;
+    front.push(DistID(0.0, 0));
+
+    const unsigned int kk = static_cast<unsigned int>(k);
+
+    while(!front.empty()){
+
+      const DistID leaf = front.top();
+      front.pop();
+
+      /* The remaining leaves are farther than the current k-th neighboor. */
+      if(nearest.size() == kk && leaf.first > nearest.top().first) break;
+
+      for(int iChild=0; iChild<2; iChild++){
+        int childID = leaves[leaf.second].getChild(iChild);
+        if(leaves[leaf.second].isChildTerminal(iChild)){
+          /* A terminal leaf with a single point references it twice. */
+          if(iChild == 1 && leaves[leaf.second].isChildTerminal(0) && leaves[leaf.second].getChild(0) == childID) continue;
+          double distanceSquare = computeDistanceSquare(coord, coordPoints.data() + nDimADT*childID);
+          if(nearest.size() < kk){
+            nearest.push(DistID(distanceSquare, childID));
+          }
+          else if(distanceSquare < nearest.top().first){
+            nearest.pop();
+            nearest.push(DistID(distanceSquare, childID));
+          }
+        }
+        else{
+          double boxDistance = computeDistanceSquare(coord, leaves[childID]);
+          if(nearest.size() < kk || boxDistance <= nearest.top().first) front.push(DistID(boxDistance, childID));
+        }
+      }
+    }
+
+    /* The heap is emptied from the farthest point. */
+    dist.resize(nearest.size());
+    pointID.resize(nearest.size());
+    for(int ii=static_cast<int>(nearest.size())-1; ii>=0; ii--){
+      dist[ii] = sqrt(nearest.top().first);
+      pointID[ii] = localPointIDs[nearest.top().second];
+      nearest.pop();
+    }
+}
+
+void ADT_PointType::getClusterTree(std::vector<int> &perm, std::vector<int> &nodes, std::vector<double> &boxes){
+
+    /* The points are reordered by a depth first traversal so that the points of every leaf are consecutive in perm.
+       nodes holds (start, stop, left child, right child) for each leaf, a child is -1 if it is a point (terminal).
+       boxes holds the bounding box (min coords, max coords) of each leaf. */
+    perm.clear();
+    nodes.assign(4*leaves.size(), -1);
+    boxes.resize(2*nDimADT*leaves.size());
+    if(empty) return;
+
+    appendClusterPoints(0, perm, nodes);
+
+    for(unsigned int iLeaf=0; iLeaf<leaves.size(); ++iLeaf) {
+      for(int dim=0; dim<nDimADT; ++dim) {
+        boxes[2*nDimADT*iLeaf+dim] = leaves[iLeaf].getValMinCoords(dim);
+        boxes[2*nDimADT*iLeaf+nDimADT+dim] = leaves[iLeaf].getValMaxCoords(dim);
+      }
+    }
+}
+
+void ADT_PointType::appendClusterPoints(int iLeaf, std::vector<int> &perm, std::vector<int> &nodes){
+
+    nodes[4*iLeaf] = static_cast<int>(perm.size());
+    for(int iChild=0; iChild<2; iChild++) {
+      const int childID = leaves[iLeaf].getChild(iChild);
+      if(leaves[iLeaf].isChildTerminal(iChild)) {
+        /* A leaf holding a single point has it as both children. */
+        if(iChild == CHILD_RIGHT && leaves[iLeaf].isChildTerminal(CHILD_LEFT) && leaves[iLeaf].getChild(CHILD_LEFT) == childID) continue;
+        perm.push_back(localPointIDs[childID]);
+      }
+      else {
+        nodes[4*iLeaf+2+iChild] = childID;
+        appendClusterPoints(childID, perm, nodes);
+      }
+    }
+    nodes[4*iLeaf+1] = static_cast<int>(perm.size());
+}
+
 /* FUNCTOR ADT_COMPARE*/
 
 ADT_Compare::ADT_Compare(const double *coord, const int splitDir, const int nDimADT): pointCoord(coord), splitDirection(splitDir), nDim(nDimADT){}
@@ -21,6 +21,7 @@
 
 #include <iostream>
 #include <cassert>
+#include <limits>
 
 #include "../include/adtcore.h"
 #include "../include/cAdt.h"
@@ -61,12 +62,29 @@ ADTPoint::ADTPoint(int size_x, double* data_x, int size_y, double* data_y, int s
 
 ADTPoint::~ADTPoint(){
 
-  if(data != NULL) delete data;
-  if(dataIDs != NULL) delete dataIDs;
+  if(data != NULL) delete [] data;
+  if(dataIDs != NULL) delete [] dataIDs;
   if(dataTree != NULL) delete dataTree;
 }
 
-void ADTPoint::queryNN(int size, double *coord, int &pointID, double &distance){
+int ADTPoint::getSize() const{
+
+  return size;
+}
+
+bool ADTPoint::hasSamePoints(int size_x, double const* data_x, double const* data_y, double const* data_z) const{
+
+  //Used to reuse a tree for a new (identical) point set instead of building it again
+  if(size_x != size) return false;
+
+  for(int ii=0; ii<size; ii++){
+    if(data[nDim*ii] != data_x[ii] || data[nDim*ii+1] != data_y[ii] || data[nDim*ii+2] != data_z[ii]) return false;
+  }
+
+  return true;
+}
+
+void ADTPoint::queryNN(int size, double *coord, int &pointID, double &distance) const{
 
   assert(size <= 3);
 
@@ -74,7 +92,7 @@ void ADTPoint::queryNN(int size, double *coord, int &pointID, double &distance){
   dataTree->queryNearestNeighboor(coord, distance, pointID, rank);
 }
 
-void ADTPoint::queryBallNN(int size, double* coord, double radius, std::vector<int> &allIDs){
+void ADTPoint::queryBallNN(int size, double* coord, double radius, std::vector<int> &allIDs) const{
 
   assert(size <= 3);
 
@@ -84,3 +102,131 @@ void ADTPoint::queryBallNN(int size, double* coord, double radius, std::vector<i
   dataTree->queryBallNeighboors(coord, radius, allDist, allIDs, rank);
 
 }
+
+void ADTPoint::queryKNN(int size, double* coord, int k, std::vector<double> &allDist, std::vector<int> &allIDs) const{
+
+  assert(size <= 3);
+
+  dataTree->queryKNearestNeighboors(coord, k, allDist, allIDs);
+}
+
+void ADTPoint::batchQueryNN(int nQuery, double const* query_x, double const* query_y, double const* query_z, int* allIDs, double* allDist) const{
+
+  //Nearest point of each query point (-1 if the tree is empty)
+  if(size == 0){
+    fill(allIDs, allIDs+nQuery, -1);
+    fill(allDist, allDist+nQuery, numeric_limits<double>::max());
+    return;
+  }
+
+#pragma omp parallel for schedule(static)
+  for(int iQuery=0; iQuery<nQuery; iQuery++){
+    double point[3] = {query_x[iQuery], query_y[iQuery], query_z[iQuery]};
+    int rank = 0;
+    dataTree->queryNearestNeighboor(point, allDist[iQuery], allIDs[iQuery], rank);
+  }
+}
+
+void ADTPoint::batchQueryKNN(int nQuery, double const* query_x, double const* query_y, double const* query_z, int k,
+                             std::vector<int> &indptr, std::vector<int> &allIDs, std::vector<double> &allDist) const{
+
+  //The min(k, size) nearest points of each query point, sorted by increasing distance
+  const int kk = (k < size) ? k : size;
+
+  indptr.resize(nQuery+1);
+  for(int iQuery=0; iQuery<=nQuery; iQuery++) indptr[iQuery] = iQuery*kk;
+  allIDs.resize(static_cast<size_t>(nQuery)*kk);
+  allDist.resize(static_cast<size_t>(nQuery)*kk);
+  if(kk <= 0) return;
+
+#pragma omp parallel
+  {
+    double point[3] = {0.0, 0.0, 0.0};
+    vector<int> IDs;
+    vector<double> dist;
+
+#pragma omp for schedule(dynamic, 64)
+    for(int iQuery=0; iQuery<nQuery; iQuery++){
+      point[0] = query_x[iQuery];
+      point[1] = query_y[iQuery];
+      point[2] = query_z[iQuery];
+      dataTree->queryKNearestNeighboors(point, kk, dist, IDs);
+      copy(IDs.begin(), IDs.end(), allIDs.begin()+static_cast<size_t>(iQuery)*kk);
+      copy(dist.begin(), dist.end(), allDist.begin()+static_cast<size_t>(iQuery)*kk);
+    }
+  }
+}
+
+void ADTPoint::batchQueryBall(int nQuery, double const* query_x, double const* query_y, double const* query_z, double const* radii,
+                              std::vector<int> &indptr, std::vector<int> &allIDs, std::vector<double> &allDist) const{
+
+  //All the points within radii[i] of each query point i (not sorted)
+  vector<vector<int> > queryIDs(size > 0 ? nQuery : 0);
+  vector<vector<double> > queryDist(size > 0 ? nQuery : 0);
+
+  if(size > 0){
+#pragma omp parallel
+    {
+      double point[3] = {0.0, 0.0, 0.0};
+      int rank = 0;
+
+#pragma omp for schedule(dynamic, 64)
+      for(int iQuery=0; iQuery<nQuery; iQuery++){
+        point[0] = query_x[iQuery];
+        point[1] = query_y[iQuery];
+        point[2] = query_z[iQuery];
+        dataTree->queryBallNeighboors(point, radii[iQuery], queryDist[iQuery], queryIDs[iQuery], rank);
+      }
+    }
+  }
+
+  indptr.assign(nQuery+1, 0);
+  for(int iQuery=0; iQuery<static_cast<int>(queryIDs.size()); iQuery++) indptr[iQuery+1] = indptr[iQuery] + static_cast<int>(queryIDs[iQuery].size());
+  for(int iQuery=static_cast<int>(queryIDs.size()); iQuery<nQuery; iQuery++) indptr[iQuery+1] = indptr[iQuery];
+  allIDs.resize(indptr[nQuery]);
+  allDist.resize(indptr[nQuery]);
+  for(int iQuery=0; iQuery<static_cast<int>(queryIDs.size()); iQuery++){
+    copy(queryIDs[iQuery].begin(), queryIDs[iQuery].end(), allIDs.begin()+indptr[iQuery]);
+    copy(queryDist[iQuery].begin(), queryDist[iQuery].end(), allDist.begin()+indptr[iQuery]);
+  }
+}
+
+void ADTPoint::queryKNearest(int size_qx, double* query_x, int size_qy, double* query_y, int size_qz, double* query_z, int k){
+
+  assert(size_qx == size_qy);
+  assert(size_qy == size_qz);
+
+  batchQueryKNN(size_qx, query_x, query_y, query_z, k, resultIndptr, resultIDs, resultDist);
+}
+
+void ADTPoint::queryBall(int size_qx, double* query_x, int size_qy, double* query_y, int size_qz, double* query_z, int size_radii, double* radii_array){
+
+  assert(size_qx == size_qy);
+  assert(size_qy == size_qz);
+  assert(size_qx == size_radii);
+
+  batchQueryBall(size_qx, query_x, query_y, query_z, radii_array, resultIndptr, resultIDs, resultDist);
+}
+
+void ADTPoint::getNeighbours(int* size_nbr_indptr, int** nbr_indptr_array, int* size_nbr_ids, int** nbr_ids_array, int* size_nbr_dist, double** nbr_dist_array){
+
+  //Views (no copy) on the results of the last queryKNearest/queryBall call
+  *size_nbr_indptr = static_cast<int>(resultIndptr.size());
+  *nbr_indptr_array = resultIndptr.data();
+  *size_nbr_ids = static_cast<int>(resultIDs.size());
+  *nbr_ids_array = resultIDs.data();
+  *size_nbr_dist = static_cast<int>(resultDist.size());
+  *nbr_dist_array = resultDist.data();
+}
+
+void ADTPoint::getClusterTree(int* size_tree_perm, int** tree_perm_array, int* size_tree_nodes, int** tree_nodes_array, int* size_tree_boxes, double** tree_boxes_array){
+
+  //Views (no copy) on the cluster tree, valid until the next call
+  dataTree->getClusterTree(clusterPerm, clusterNodes, clusterBoxes);
+  *size_tree_perm = static_cast<int>(clusterPerm.size());
+  *tree_perm_array = clusterPerm.data();
+  *size_tree_nodes = static_cast<int>(clusterNodes.size());
+  *tree_nodes_array = clusterNodes.data();
+  *size_tree_boxes = static_cast<int>(clusterBoxes.size());
+  *tree_boxes_array = clusterBoxes.data();
+}
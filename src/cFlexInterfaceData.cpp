@@ -27,6 +27,7 @@
 
 #ifdef HAVE_MPI
 #include "petscvec.h"
+#include "petscmat.h"
 #endif  //HAVE_MPI
 
 #include "../include/cMpi.h"
@@ -34,16 +35,35 @@
 
 using namespace std;
 
-CFlexInterfaceData::CFlexInterfaceData(int const& val_nPoint, int const& val_nDim, Cupydo_Comm val_comm):nPoint(val_nPoint), nDim(val_nDim), comm(val_comm){
+CFlexInterfaceData::CFlexInterfaceData(int const& val_nPoint, int const& val_nDim, Cupydo_Comm val_comm, bool const& val_blocked):nPoint(val_nPoint), nDim(val_nDim), comm(val_comm){
 
   dataContainer.resize(nDim);
+  arrayAccess.assign(nDim, 0);
+  arrayPointer.assign(nDim, NULL);
 
 #ifdef HAVE_MPI
-  for(int ii=0; ii<nDim; ii++){
-    VecCreateMPI(comm, PETSC_DECIDE, nPoint, &(dataContainer[ii]));
-    VecSet(dataContainer[ii], 0.0);
+  blocked = val_blocked && nDim > 1;
+  blockContainer = NULL;
+  if(blocked){
+    //Same distribution of the points as the component vectors (PETSC_DECIDE)
+    PetscInt nLocal(PETSC_DECIDE), nGlobal(nPoint);
+    PetscSplitOwnership(comm, &nLocal, &nGlobal);
+    VecCreate(comm, &blockContainer);
+    VecSetSizes(blockContainer, nLocal*nDim, nPoint*nDim);
+    VecSetBlockSize(blockContainer, nDim);
+    VecSetType(blockContainer, VECMPI);
+    VecSet(blockContainer, 0.0);
+    for(int ii=0; ii<nDim; ii++) dataContainer[ii] = NULL;
+  }
+  else{
+    for(int ii=0; ii<nDim; ii++){
+      VecCreateMPI(comm, PETSC_DECIDE, nPoint, &(dataContainer[ii]));
+      VecSet(dataContainer[ii], 0.0);
+    }
   }
 #else //HAVE_MPI
+  //The serial storage is never blocked
+  blocked = false;
   for(int ii=0; ii<nDim; ii++){
     dataContainer[ii] = new double[nPoint];
     fill(dataContainer[ii], dataContainer[ii]+nPoint, 0.0);
@@ -57,12 +77,23 @@ CFlexInterfaceData::CFlexInterfaceData(CFlexInterfaceData &data){
   nDim = data.nDim;
   comm = data.comm;
 
+  blocked = data.blocked;
   dataContainer.resize(nDim);
+  arrayAccess.assign(nDim, 0);
+  arrayPointer.assign(nDim, NULL);
 
 #ifdef HAVE_MPI
-  for(int ii=0; ii<nDim; ii++){
-    VecCreateMPI(comm, PETSC_DECIDE, nPoint, &(dataContainer[ii]));
-    VecCopy(data.getData(ii), dataContainer[ii]);
+  blockContainer = NULL;
+  if(blocked){
+    VecDuplicate(data.blockContainer, &blockContainer);
+    VecCopy(data.blockContainer, blockContainer);
+    for(int ii=0; ii<nDim; ii++) dataContainer[ii] = NULL;
+  }
+  else{
+    for(int ii=0; ii<nDim; ii++){
+      VecCreateMPI(comm, PETSC_DECIDE, nPoint, &(dataContainer[ii]));
+      VecCopy(data.getData(ii), dataContainer[ii]);
+    }
   }
 #else  //HAVE_MPI
   double* dataToCopy;
@@ -84,10 +115,14 @@ CFlexInterfaceData::~CFlexInterfaceData(){
 
 #ifdef HAVE_MPI
   for(int ii=0; ii<nDim; ii++){
+    releaseDataArray(ii);
     if(dataContainer[ii]){
       VecDestroy(&(dataContainer[ii]));
     }
   }
+  if(blockContainer){
+    VecDestroy(&blockContainer);
+  }
 #else //HAVE_MPI
   for(int ii=0; ii<nDim; ii++){
     if(dataContainer[ii] != NULL) delete [] dataContainer[ii];
@@ -103,10 +138,14 @@ void CFlexInterfaceData::destroy(){
 
 #ifdef HAVE_MPI
   for(int ii=0; ii<nDim; ii++){
+    releaseDataArray(ii);
     if(dataContainer[ii]){
       VecDestroy(&(dataContainer[ii]));
     }
   }
+  if(blockContainer){
+    VecDestroy(&blockContainer);
+  }
 #else //HAVE_MPI
   for(int ii=0; ii<nDim; ii++){
     if(dataContainer[ii] != NULL) delete [] dataContainer[ii];
@@ -118,7 +157,7 @@ void CFlexInterfaceData::destroy(){
 void CFlexInterfaceData::view(const int &iDim){
 
 #ifdef HAVE_MPI
-  VecView(dataContainer[iDim], PETSC_VIEWER_STDOUT_(comm));
+  VecView(getData(iDim), PETSC_VIEWER_STDOUT_(comm));
 #else  //HAVE_MPI
   for(int jj=0; jj<nPoint; jj++){
     cout << dataContainer[iDim][jj] << endl;
@@ -146,7 +185,8 @@ int CFlexInterfaceData::getLocalLength(){
   int localLength;
 
 #ifdef HAVE_MPI
-  VecGetLocalSize(dataContainer[0], &localLength);
+  VecGetLocalSize(arrayVec(0), &localLength);
+  if(blocked) localLength /= nDim;
 #else  //HAVE_MPI
   localLength = nPoint;
 #endif  //HAVE_MPI
@@ -154,10 +194,16 @@ int CFlexInterfaceData::getLocalLength(){
   return localLength;
 }
 
+bool CFlexInterfaceData::isBlocked() const{
+
+  return blocked;
+}
+
 void CFlexInterfaceData::setValue(const int& iDim, const int& index, const double& value){
 
 #ifdef HAVE_MPI
-  VecSetValue(dataContainer[iDim], index, value, INSERT_VALUES);
+  if(blocked) VecSetValue(blockContainer, index*nDim+iDim, value, INSERT_VALUES);
+  else VecSetValue(dataContainer[iDim], index, value, INSERT_VALUES);
 #else
   dataContainer[iDim][index] = value;
 #endif
@@ -169,7 +215,14 @@ void CFlexInterfaceData::setValues(const int& iDim, int size_indices, int *indic
   assert(size_indices == size_values);
 
 #ifdef HAVE_MPI
-  VecSetValues(dataContainer[iDim], size_indices, indices_list, values_array, INSERT_VALUES);
+  if(blocked){
+    vector<int> blockIndices(size_indices);
+    for(int ii=0; ii<size_indices; ii++) blockIndices[ii] = indices_list[ii]*nDim+iDim;
+    VecSetValues(blockContainer, size_indices, blockIndices.data(), values_array, INSERT_VALUES);
+  }
+  else{
+    VecSetValues(dataContainer[iDim], size_indices, indices_list, values_array, INSERT_VALUES);
+  }
 #else //HAVE_MPI
   for(int ii=0; ii<size_indices; ii++){
     dataContainer[iDim][indices_list[ii]] = values_array[ii];
@@ -178,10 +231,52 @@ void CFlexInterfaceData::setValues(const int& iDim, int size_indices, int *indic
 
 }
 
+void CFlexInterfaceData::setLocalBlock(int size_indices, int *indices_list, int size_block1, int size_block2, double *block_array){
+
+  //block_array is a (nDim X size_indices) row-major block, row iDim holds the values of component iDim
+  assert(size_block1 == nDim);
+  assert(size_block2 == size_indices);
+
+#ifdef HAVE_MPI
+  if(blocked){
+    //All the components in one call, the values are interleaved point by point
+    vector<double> blockValues(size_indices*nDim);
+    for(int iDim=0; iDim<nDim; iDim++){
+      for(int ii=0; ii<size_indices; ii++){
+        blockValues[ii*nDim+iDim] = block_array[iDim*size_indices+ii];
+      }
+    }
+    VecSetValuesBlocked(blockContainer, size_indices, indices_list, blockValues.data(), INSERT_VALUES);
+  }
+  else{
+    for(int iDim=0; iDim<nDim; iDim++){
+      VecSetValues(dataContainer[iDim], size_indices, indices_list, block_array+iDim*size_indices, INSERT_VALUES);
+    }
+  }
+#else //HAVE_MPI
+  for(int iDim=0; iDim<nDim; iDim++){
+    for(int ii=0; ii<size_indices; ii++){
+      dataContainer[iDim][indices_list[ii]] = block_array[iDim*size_indices+ii];
+    }
+  }
+#endif //HAVE_MPI
+
+}
+
 void CFlexInterfaceData::setAllValues(const int& iDim, const double& value){
 
 #ifdef HAVE_MPI
-  VecSet(dataContainer[iDim], value);
+  if(blocked){
+    int nLocal;
+    PetscScalar *blockArray;
+    VecGetLocalSize(blockContainer, &nLocal);
+    VecGetArray(blockContainer, &blockArray);
+    for(int jj=iDim; jj<nLocal; jj+=nDim) blockArray[jj] = value;
+    VecRestoreArray(blockContainer, &blockArray);
+  }
+  else{
+    VecSet(dataContainer[iDim], value);
+  }
 #else //HAVE_MPI
   fill(dataContainer[iDim], dataContainer[iDim]+nPoint, value);
 #endif //HAVE_MPI
@@ -189,8 +284,88 @@ void CFlexInterfaceData::setAllValues(const int& iDim, const double& value){
 
 #ifdef HAVE_MPI
   Vec CFlexInterfaceData::getData(const int& iDim){
+
+    //For blocked data, the component is gathered in a work vector (and written back by restoreData)
+    if(blocked){
+      if(!dataContainer[iDim]){
+        VecCreateMPI(comm, getLocalLength(), nPoint, &(dataContainer[iDim]));
+      }
+      VecStrideGather(blockContainer, iDim, dataContainer[iDim], INSERT_VALUES);
+    }
     return dataContainer[iDim];
   }
+
+  void CFlexInterfaceData::restoreData(const int& iDim){
+
+    //Writes back a component modified through getData (nothing to do if the data is not blocked)
+    if(blocked){
+      VecStrideScatter(dataContainer[iDim], iDim, blockContainer, INSERT_VALUES);
+    }
+  }
+
+  Vec CFlexInterfaceData::getBlockData(){
+    return blockContainer;
+  }
+
+  Vec CFlexInterfaceData::arrayVec(const int& iDim) const{
+    return blocked ? blockContainer : dataContainer[iDim];
+  }
+
+  void CFlexInterfaceData::getMultiVector(Mat* multiVec){
+
+    //Packs the components into a (nPoint x nDim) dense matrix with the same row distribution as the data
+    int nLocal, lda;
+    PetscScalar *multiVecArray;
+    const PetscScalar *vecArray;
+
+    nLocal = getLocalLength();
+    MatCreateDense(comm, nLocal, PETSC_DECIDE, nPoint, nDim, NULL, multiVec);
+    MatDenseGetLDA(*multiVec, &lda);
+    MatDenseGetArray(*multiVec, &multiVecArray);
+    if(blocked){
+      VecGetArrayRead(blockContainer, &vecArray);
+      for(int ii=0; ii<nDim; ii++){
+        for(int jj=0; jj<nLocal; jj++) multiVecArray[ii*lda+jj] = vecArray[jj*nDim+ii];
+      }
+      VecRestoreArrayRead(blockContainer, &vecArray);
+    }
+    else{
+      for(int ii=0; ii<nDim; ii++){
+        VecGetArrayRead(dataContainer[ii], &vecArray);
+        std::copy(vecArray, vecArray+nLocal, multiVecArray+ii*lda);
+        VecRestoreArrayRead(dataContainer[ii], &vecArray);
+      }
+    }
+    MatDenseRestoreArray(*multiVec, &multiVecArray);
+    MatAssemblyBegin(*multiVec, MAT_FINAL_ASSEMBLY);
+    MatAssemblyEnd(*multiVec, MAT_FINAL_ASSEMBLY);
+  }
+
+  void CFlexInterfaceData::setFromMultiVector(Mat multiVec){
+
+    int nLocal, lda;
+    const PetscScalar *multiVecArray;
+    PetscScalar *vecArray;
+
+    nLocal = getLocalLength();
+    MatDenseGetLDA(multiVec, &lda);
+    MatDenseGetArrayRead(multiVec, &multiVecArray);
+    if(blocked){
+      VecGetArray(blockContainer, &vecArray);
+      for(int ii=0; ii<nDim; ii++){
+        for(int jj=0; jj<nLocal; jj++) vecArray[jj*nDim+ii] = multiVecArray[ii*lda+jj];
+      }
+      VecRestoreArray(blockContainer, &vecArray);
+    }
+    else{
+      for(int ii=0; ii<nDim; ii++){
+        VecGetArray(dataContainer[ii], &vecArray);
+        std::copy(multiVecArray+ii*lda, multiVecArray+ii*lda+nLocal, vecArray);
+        VecRestoreArray(dataContainer[ii], &vecArray);
+      }
+    }
+    MatDenseRestoreArrayRead(multiVec, &multiVecArray);
+  }
 #else //HAVE_MPI
   void CFlexInterfaceData::getData(const int& iDim, int* size, double** data_array){
     *size = nPoint;
@@ -207,24 +382,96 @@ void CFlexInterfaceData::setAllValues(const int& iDim, const double& value){
 
 void CFlexInterfaceData::getDataArray(const int& iDim, int* size, double** data_array){
 
+  //Write access to the local part of the component iDim, to be given back with restoreDataArray
+  //For blocked data, iDim must be 0 and the array is the local interleaved block (nLocal*nDim values)
+  assert(arrayAccess[iDim] == 0);
+  assert(!blocked || iDim == 0);
 
+#ifdef HAVE_MPI
+  VecGetLocalSize(arrayVec(iDim),size);
+  VecGetArray(arrayVec(iDim), &(arrayPointer[iDim]));
+#else //HAVE_MPI
+  *size = nPoint;
+  arrayPointer[iDim] = dataContainer[iDim];
+#endif
+
+  arrayAccess[iDim] = -1;
+  *data_array = arrayPointer[iDim];
+
+}
+
+void CFlexInterfaceData::restoreDataArray(const int& iDim){
+
+  assert(arrayAccess[iDim] == -1);
 
 #ifdef HAVE_MPI
-  VecGetLocalSize(dataContainer[iDim],size);
-  VecGetArray(dataContainer[iDim], &(*data_array));
+  VecRestoreArray(arrayVec(iDim), &(arrayPointer[iDim]));
+#endif
+
+  arrayAccess[iDim] = 0;
+  arrayPointer[iDim] = NULL;
+
+}
+
+void CFlexInterfaceData::getDataArrayRead(const int& iDim, int* size, double** data_array){
+
+  //Read access to the local part of the component iDim (may be nested), to be given back with restoreDataArrayRead
+  //For blocked data, iDim must be 0 and the array is the local interleaved block (nLocal*nDim values)
+  assert(arrayAccess[iDim] >= 0);
+  assert(!blocked || iDim == 0);
+
+#ifdef HAVE_MPI
+  VecGetLocalSize(arrayVec(iDim),size);
+  if(arrayAccess[iDim] == 0){
+    const PetscScalar *readArray;
+    VecGetArrayRead(arrayVec(iDim), &readArray);
+    arrayPointer[iDim] = const_cast<PetscScalar*>(readArray);
+  }
 #else //HAVE_MPI
   *size = nPoint;
-  *data_array = dataContainer[iDim];
+  arrayPointer[iDim] = dataContainer[iDim];
 #endif
 
+  arrayAccess[iDim]++;
+  *data_array = arrayPointer[iDim];
+
+}
+
+void CFlexInterfaceData::restoreDataArrayRead(const int& iDim){
+
+  assert(arrayAccess[iDim] > 0);
+
+  arrayAccess[iDim]--;
+  if(arrayAccess[iDim] == 0){
+#ifdef HAVE_MPI
+    const PetscScalar *readArray = arrayPointer[iDim];
+    VecRestoreArrayRead(arrayVec(iDim), &readArray);
+#endif
+    arrayPointer[iDim] = NULL;
+  }
+
+}
+
+void CFlexInterfaceData::releaseDataArray(const int& iDim){
+
+  //Gives back an access that is still held (e.g. when the data is destroyed)
+  if(arrayAccess[iDim] == -1) restoreDataArray(iDim);
+  while(arrayAccess[iDim] > 0) restoreDataArrayRead(iDim);
+
 }
 
 void CFlexInterfaceData::assemble(){
 
 #ifdef HAVE_MPI
-  for(int ii=0; ii<nDim; ii++){
-    VecAssemblyBegin(dataContainer[ii]);
-    VecAssemblyEnd(dataContainer[ii]);
+  if(blocked){
+    VecAssemblyBegin(blockContainer);
+    VecAssemblyEnd(blockContainer);
+  }
+  else{
+    for(int ii=0; ii<nDim; ii++){
+      VecAssemblyBegin(dataContainer[ii]);
+      VecAssemblyEnd(dataContainer[ii]);
+    }
   }
 #endif //HAVE_MPI
 
@@ -235,8 +482,14 @@ vector<double> CFlexInterfaceData::norm(){
     vector<double> norm_list(nDim);
 #ifdef HAVE_MPI
 
-  for(int ii=0; ii<nDim; ii++){
-    VecNorm(dataContainer[ii], NORM_2, &(norm_list[ii]));
+  if(blocked){
+    //All the components in one reduction
+    VecStrideNormAll(blockContainer, NORM_2, norm_list.data());
+  }
+  else{
+    for(int ii=0; ii<nDim; ii++){
+      VecNorm(dataContainer[ii], NORM_2, &(norm_list[ii]));
+    }
   }
 #endif //HAVE_MPI
     return norm_list;
@@ -247,8 +500,20 @@ vector<double> CFlexInterfaceData::sum(){
     vector<double> sum_list(nDim);
 #ifdef HAVE_MPI
 
-  for(int ii=0; ii<nDim; ii++){
-    VecSum(dataContainer[ii], &(sum_list[ii]));
+  if(blocked){
+    //Local sums of the components, then one reduction
+    int nLocal;
+    const PetscScalar *blockArray;
+    VecGetLocalSize(blockContainer, &nLocal);
+    VecGetArrayRead(blockContainer, &blockArray);
+    for(int jj=0; jj<nLocal; jj++) sum_list[jj%nDim] += blockArray[jj];
+    VecRestoreArrayRead(blockContainer, &blockArray);
+    MPI_Allreduce(MPI_IN_PLACE, sum_list.data(), nDim, MPI_DOUBLE, MPI_SUM, comm);
+  }
+  else{
+    for(int ii=0; ii<nDim; ii++){
+      VecSum(dataContainer[ii], &(sum_list[ii]));
+    }
   }
 #endif  //HAVE_MPI
     return sum_list;
@@ -260,8 +525,14 @@ void CFlexInterfaceData::copy(CFlexInterfaceData& target){
   assert(nDim == target.nDim);
 
 #ifdef HAVE_MPI
-  for(int ii=0; ii<nDim; ii++){
-    VecCopy(dataContainer[ii], target.getData(ii));
+  if(blocked && target.blocked){
+    VecCopy(blockContainer, target.blockContainer);
+  }
+  else{
+    for(int ii=0; ii<nDim; ii++){
+      VecCopy(getData(ii), target.getData(ii));
+      target.restoreData(ii);
+    }
   }
 #else //HAVE_MPI
   int dataContainerTargetSize;
@@ -281,8 +552,14 @@ void CFlexInterfaceData::set(CFlexInterfaceData& donor){
   assert(nDim == donor.nDim);
 
 #ifdef HAVE_MPI
-  for(int ii=0; ii<nDim; ii++){
-    VecCopy(donor.getData(ii), dataContainer[ii]);
+  if(blocked && donor.blocked){
+    VecCopy(donor.blockContainer, blockContainer);
+  }
+  else{
+    for(int ii=0; ii<nDim; ii++){
+      VecCopy(donor.getData(ii), getData(ii));
+      restoreData(ii);
+    }
   }
 #else  //HAVE_MPI
   double* dataToCopy;
@@ -301,8 +578,23 @@ vector<double> CFlexInterfaceData::dot(CFlexInterfaceData& data){
     vector<double> dot_list(nDim);
 #ifdef HAVE_MPI
 
-  for(int ii=0; ii<nDim; ii++){
-    VecDot(dataContainer[ii],data.getData(ii),&(dot_list[ii]));
+  assert(nDim == data.nDim);
+  if(blocked && data.blocked){
+    //Local dot products of the components, then one reduction
+    int nLocal;
+    const PetscScalar *blockArray, *dataBlockArray;
+    VecGetLocalSize(blockContainer, &nLocal);
+    VecGetArrayRead(blockContainer, &blockArray);
+    VecGetArrayRead(data.blockContainer, &dataBlockArray);
+    for(int jj=0; jj<nLocal; jj++) dot_list[jj%nDim] += blockArray[jj]*dataBlockArray[jj];
+    VecRestoreArrayRead(data.blockContainer, &dataBlockArray);
+    VecRestoreArrayRead(blockContainer, &blockArray);
+    MPI_Allreduce(MPI_IN_PLACE, dot_list.data(), nDim, MPI_DOUBLE, MPI_SUM, comm);
+  }
+  else{
+    for(int ii=0; ii<nDim; ii++){
+      VecDot(getData(ii),data.getData(ii),&(dot_list[ii]));
+    }
   }
 #endif  //HAVE_MPI
     return dot_list;
@@ -312,7 +604,11 @@ vector<int> CFlexInterfaceData::getOwnershipRange() const{
 
   vector<int> ownershipRange(2);
 #ifdef HAVE_MPI
-  VecGetOwnershipRange(dataContainer[0], &(ownershipRange[0]), &(ownershipRange[1]));
+  VecGetOwnershipRange(arrayVec(0), &(ownershipRange[0]), &(ownershipRange[1]));
+  if(blocked){
+    ownershipRange[0] /= nDim;
+    ownershipRange[1] /= nDim;
+  }
 #else  //HAVE_MPI
   ownershipRange[0] = 0;
   ownershipRange[1] = nPoint;
@@ -332,8 +628,14 @@ void CFlexInterfaceData::add(CFlexInterfaceData& data){
 
 
 #ifdef HAVE_MPI
-  for(int ii=0; ii<nDim; ii++){
-    VecAXPY(dataContainer[ii],1.0,data.getData(ii));
+  if(blocked && data.blocked){
+    VecAXPY(blockContainer,1.0,data.blockContainer);
+  }
+  else{
+    for(int ii=0; ii<nDim; ii++){
+      VecAXPY(getData(ii),1.0,data.getData(ii));
+      restoreData(ii);
+    }
   }
 #else  //HAVE_MPI
   double* dataToAdd;
@@ -356,8 +658,13 @@ void CFlexInterfaceData::add(const double & scalar){
 #endif  //NDEBUG
 
 #ifdef HAVE_MPI
-  for(int ii=0; ii<nDim; ii++){
-    VecShift(dataContainer[ii], scalar);
+  if(blocked){
+    VecShift(blockContainer, scalar);
+  }
+  else{
+    for(int ii=0; ii<nDim; ii++){
+      VecShift(dataContainer[ii], scalar);
+    }
   }
 #else  //HAVE_MPI
   for(int ii=0; ii<nDim; ii++){
@@ -376,8 +683,13 @@ void CFlexInterfaceData::add(const int & scalar){
 #endif  //NDEBUG
 
 #ifdef HAVE_MPI
-  for(int ii=0; ii<nDim; ii++){
-    VecShift(dataContainer[ii], scalar);
+  if(blocked){
+    VecShift(blockContainer, scalar);
+  }
+  else{
+    for(int ii=0; ii<nDim; ii++){
+      VecShift(dataContainer[ii], scalar);
+    }
   }
 #else  //HAVE_MPI
   for(int ii=0; ii<nDim; ii++){
@@ -399,8 +711,14 @@ void CFlexInterfaceData::sub(CFlexInterfaceData& data){
   assert(nDim == data.nDim);
 
 #ifdef HAVE_MPI
-  for(int ii=0; ii<nDim; ii++){
-    VecAXPY(dataContainer[ii],-1.0,data.getData(ii));
+  if(blocked && data.blocked){
+    VecAXPY(blockContainer,-1.0,data.blockContainer);
+  }
+  else{
+    for(int ii=0; ii<nDim; ii++){
+      VecAXPY(getData(ii),-1.0,data.getData(ii));
+      restoreData(ii);
+    }
   }
 #else  //HAVE_MPI
   double* dataToAdd;
@@ -423,8 +741,13 @@ void CFlexInterfaceData::sub(const double & scalar){
 #endif  //NDEBUG
 
 #ifdef HAVE_MPI
-  for(int ii=0; ii<nDim; ii++){
-    VecShift(dataContainer[ii], -scalar);
+  if(blocked){
+    VecShift(blockContainer, -scalar);
+  }
+  else{
+    for(int ii=0; ii<nDim; ii++){
+      VecShift(dataContainer[ii], -scalar);
+    }
   }
 #else  //HAVE_MPI
   for(int ii=0; ii<nDim; ii++){
@@ -443,8 +766,13 @@ void CFlexInterfaceData::sub(const int & scalar){
 #endif  //NDEBUG
 
 #ifdef HAVE_MPI
-  for(int ii=0; ii<nDim; ii++){
-    VecShift(dataContainer[ii], -scalar);
+  if(blocked){
+    VecShift(blockContainer, -scalar);
+  }
+  else{
+    for(int ii=0; ii<nDim; ii++){
+      VecShift(dataContainer[ii], -scalar);
+    }
   }
 #else  //HAVE_MPI
   for(int ii=0; ii<nDim; ii++){
@@ -463,8 +791,13 @@ void CFlexInterfaceData::scale(const double& value){
 #endif  //NDEBUG
 
 #ifdef HAVE_MPI
-  for(int ii=0; ii<nDim; ii++){
-    VecScale(dataContainer[ii], value);
+  if(blocked){
+    VecScale(blockContainer, value);
+  }
+  else{
+    for(int ii=0; ii<nDim; ii++){
+      VecScale(dataContainer[ii], value);
+    }
   }
 #else  //HAVE_MPI
   for(int ii=0; ii<nDim; ii++){
@@ -491,8 +824,14 @@ void CFlexInterfaceData::scale(const double& value){
   assert(nDim == data.nDim);
 
 #ifdef HAVE_MPI
-  for(int ii=0; ii<nDim; ii++){
-    VecAXPY(dataContainer[ii],1.0,data.getData(ii));
+  if(blocked && data.blocked){
+    VecAXPY(blockContainer,1.0,data.blockContainer);
+  }
+  else{
+    for(int ii=0; ii<nDim; ii++){
+      VecAXPY(getData(ii),1.0,data.getData(ii));
+      restoreData(ii);
+    }
   }
 #else  //HAVE_MPI
   double* dataToAdd;
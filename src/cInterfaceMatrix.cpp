@@ -20,11 +20,15 @@
  */
 
 #include <iostream>
+#include <fstream>
 #include <vector>
+#include <map>
+#include <algorithm>
 #include <cassert>
 
 #ifdef HAVE_MPI
 #include "petscmat.h"
+#include "petscviewer.h"
 #endif  //HAVE_MPI
 
 #include "../include/cMpi.h"
@@ -32,7 +36,11 @@
 
 using namespace std;
 
-CInterfaceMatrix::CInterfaceMatrix(int const& val_M, int const& val_N):M(val_M), N(val_N){ }
+#ifdef HAVE_MPI
+CInterfaceMatrix::CInterfaceMatrix(int const& val_M, int const& val_N):H(NULL), countingNonZeros(false), HBlocked(NULL), blockedDof(0), M(val_M), N(val_N), symmetric(false){ }
+#else //HAVE_MPI
+CInterfaceMatrix::CInterfaceMatrix(int const& val_M, int const& val_N):sparse(false), assembled(false), M(val_M), N(val_N), symmetric(false){ }
+#endif //HAVE_MPI
 
 CInterfaceMatrix::~CInterfaceMatrix(){
 
@@ -41,6 +49,7 @@ CInterfaceMatrix::~CInterfaceMatrix(){
 #endif  //NDEBUG
 
 #ifdef HAVE_MPI
+  destroyBlockedMat();
   if(H){
     MatDestroy(&H);
   }
@@ -55,6 +64,7 @@ void CInterfaceMatrix::createDense(){
   //MatCreateDense(MPI_COMM_WORLD, PETSC_DECIDE, PETSC_DECIDE, M, N, NULL, &H);
   MatCreateAIJ(MPI_COMM_WORLD, PETSC_DECIDE, PETSC_DECIDE, M, N, N, NULL, N, NULL, &H);
 #else  //HAVE_MPI
+  sparse = false;
   H.resize(M*N);
 #endif  //HAVE_MPI
 
@@ -63,9 +73,16 @@ void CInterfaceMatrix::createDense(){
 void CInterfaceMatrix::createSparse(int val_dnz, int val_onz){
 
 #ifdef HAVE_MPI
+  //The preallocation may be an estimate, the extra entries are allocated on the fly
   MatCreateAIJ(MPI_COMM_WORLD, PETSC_DECIDE, PETSC_DECIDE, M, N, val_dnz, NULL, val_onz, NULL, &H);
+  MatSetOption(H, MAT_NEW_NONZERO_ALLOCATION_ERR, PETSC_FALSE);
 #else //HAVE_MPI
-  H.resize(M*N);
+  sparse = true;
+  assembled = false;
+  H_rows.assign(M, map<int, double>());
+  H_indptr.assign(M+1, 0);
+  H_indices.clear();
+  H_values.clear();
 #endif //HAVE_MPI
 
 }
@@ -75,7 +92,80 @@ void CInterfaceMatrix::createSparseFullAlloc(){
 #ifdef HAVE_MPI
   MatCreateAIJ(MPI_COMM_WORLD, PETSC_DECIDE, PETSC_DECIDE, M, N, N, NULL, N, NULL, &H);
 #else //HAVE_MPI
-  H.resize(M*N);
+  sparse = true;
+  assembled = false;
+  H_rows.assign(M, map<int, double>());
+  H_indptr.assign(M+1, 0);
+  H_indices.clear();
+  H_values.clear();
+#endif //HAVE_MPI
+
+}
+
+void CInterfaceMatrix::initNonZeros(){
+
+  //Switches the matrix to counting mode : setValue(s) only record the nonzero pattern until createSparseExactAlloc is called
+#ifdef HAVE_MPI
+  countingNonZeros = true;
+  nonZeroPattern.clear();
+#endif //HAVE_MPI
+
+}
+
+void CInterfaceMatrix::addNonZeros(int iGlobalIndex, int size_indices, int* indices_list){
+
+#ifdef HAVE_MPI
+  vector<int>& row = nonZeroPattern[iGlobalIndex];
+  row.insert(row.end(), indices_list, indices_list+size_indices);
+#endif //HAVE_MPI
+
+}
+
+void CInterfaceMatrix::createSparseExactAlloc(){
+
+#ifdef HAVE_MPI
+  int size, rank;
+  MPI_Comm_size(MPI_COMM_WORLD, &size);
+  MPI_Comm_rank(MPI_COMM_WORLD, &rank);
+
+  //Same distribution as PETSC_DECIDE (PetscSplitOwnership)
+  vector<int> rowRanges(size+1,0), colRanges(size+1,0);
+  for(int iProc=0; iProc<size; iProc++){
+    rowRanges[iProc+1] = rowRanges[iProc] + M/size + ((M % size) > iProc);
+    colRanges[iProc+1] = colRanges[iProc] + N/size + ((N % size) > iProc);
+  }
+
+  //Count the (unique) diagonal and off-diagonal block entries of each row seen by this rank
+  vector<int> dnz_global(M,0), onz_global(M,0);
+  for(map<int, vector<int> >::iterator it=nonZeroPattern.begin(); it!=nonZeroPattern.end(); ++it){
+    vector<int>& cols = it->second;
+    sort(cols.begin(), cols.end());
+    cols.erase(unique(cols.begin(), cols.end()), cols.end());
+    int owner = static_cast<int>(upper_bound(rowRanges.begin(), rowRanges.end(), it->first) - rowRanges.begin()) - 1;
+    for(size_t jj=0; jj<cols.size(); jj++){
+      if(cols[jj] >= colRanges[owner] && cols[jj] < colRanges[owner+1]) dnz_global[it->first]++;
+      else onz_global[it->first]++;
+    }
+  }
+  nonZeroPattern.clear();
+  countingNonZeros = false;
+
+  //Entries of a given row seen by different ranks are disjoint, their counts are summed on the owner of the row
+  vector<int> recvCounts(size);
+  for(int iProc=0; iProc<size; iProc++) recvCounts[iProc] = rowRanges[iProc+1] - rowRanges[iProc];
+  int nLocalRows(recvCounts[rank]), nLocalCols(colRanges[rank+1]-colRanges[rank]);
+  vector<int> dnz(max(nLocalRows,1),0), onz(max(nLocalRows,1),0);
+  MPI_Reduce_scatter(&(dnz_global.front()), &(dnz.front()), &(recvCounts.front()), MPI_INT, MPI_SUM, MPI_COMM_WORLD);
+  MPI_Reduce_scatter(&(onz_global.front()), &(onz.front()), &(recvCounts.front()), MPI_INT, MPI_SUM, MPI_COMM_WORLD);
+  for(int iRow=0; iRow<nLocalRows; iRow++){
+    dnz[iRow] = min(dnz[iRow], nLocalCols);
+    onz[iRow] = min(onz[iRow], N-nLocalCols);
+  }
+
+  MatCreateAIJ(MPI_COMM_WORLD, nLocalRows, nLocalCols, M, N, 0, &(dnz.front()), 0, &(onz.front()), &H);
+  MatSetOption(H, MAT_NEW_NONZERO_ALLOCATION_ERR, PETSC_FALSE);
+#else //HAVE_MPI
+  createSparse(0,0);
 #endif //HAVE_MPI
 
 }
@@ -83,30 +173,145 @@ void CInterfaceMatrix::createSparseFullAlloc(){
 void CInterfaceMatrix::setValue(const int &iGlobalIndex, const int &jGlobalIndex, double const &value){
 
 #ifdef HAVE_MPI
+  if(countingNonZeros){
+    nonZeroPattern[iGlobalIndex].push_back(jGlobalIndex);
+    return;
+  }
   MatSetValue(H, iGlobalIndex, jGlobalIndex, value, INSERT_VALUES);
 #else  //HAVE_MPI
-  H[iGlobalIndex*N+jGlobalIndex] = value;
+  if(sparse){
+    openSparse();
+    H_rows[iGlobalIndex][jGlobalIndex] = value;
+  }
+  else H[iGlobalIndex*N+jGlobalIndex] = value;
 #endif  //HAVE_MPI
 }
 
 void CInterfaceMatrix::setValues(int const& m, int const iGlobalIndices[], int const& n, int const jGlobalIndices[], double const values[]){
 
 #ifdef HAVE_MPI
+  if(countingNonZeros){
+    for(int ii=0; ii<m; ii++){
+      vector<int>& row = nonZeroPattern[iGlobalIndices[ii]];
+      row.insert(row.end(), jGlobalIndices, jGlobalIndices+n);
+    }
+    return;
+  }
   MatSetValues(H, m, iGlobalIndices, n, jGlobalIndices, values, INSERT_VALUES);
 #else //HAVE_MPI
-  for(int ii=0; ii<m; ii++){
-    for(int jj=0; jj<n; jj++){
-      H[iGlobalIndices[ii]*N+jGlobalIndices[jj]] = values[ii*n+jj];
+  if(sparse){
+    openSparse();
+    for(int ii=0; ii<m; ii++){
+      map<int, double>& row = H_rows[iGlobalIndices[ii]];
+      for(int jj=0; jj<n; jj++){
+        row[jGlobalIndices[jj]] = values[ii*n+jj];
+      }
+    }
+  }
+  else{
+    for(int ii=0; ii<m; ii++){
+      for(int jj=0; jj<n; jj++){
+        H[iGlobalIndices[ii]*N+jGlobalIndices[jj]] = values[ii*n+jj];
+      }
+    }
+  }
+#endif //HAVE_MPI
+}
+
+void CInterfaceMatrix::setRowValues(int iGlobalIndex, int size_indices, int* indices_list, int size_values, double* values_array){
+
+  //Sets (a part of) a single row, callable from the Python side
+  assert(size_indices == size_values);
+
+  setValues(1, &iGlobalIndex, size_indices, indices_list, values_array);
+
+}
+
+void CInterfaceMatrix::setRowsCSR(int iFirstRow, int size_indptr, int* indptr_list, int size_indices, int* indices_list, int size_values, double* values_array){
+
+  //Sets the consecutive rows iFirstRow, iFirstRow+1, ... given in CSR format in one call, callable from the Python side
+  const int nRows(size_indptr-1);
+  assert(size_indices == size_values);
+  assert(nRows >= 0 && indptr_list[nRows] <= size_indices);
+
+#ifndef HAVE_MPI
+  //A new sparse matrix set as a whole takes the CSR arrays as they are (the column indices must be sorted and unique within each row)
+  if(sparse && !assembled && iFirstRow == 0 && nRows == M){
+    bool empty(true);
+    for(int iRow=0; iRow<M && empty; iRow++) empty = H_rows[iRow].empty();
+    if(empty){
+      const int nnz(indptr_list[nRows]);
+      H_indptr.assign(indptr_list, indptr_list+M+1);
+      H_indices.assign(indices_list, indices_list+nnz);
+      H_values.assign(values_array, values_array+nnz);
+      vector< map<int, double> >().swap(H_rows);
+      assembled = true;
+      return;
     }
   }
 #endif //HAVE_MPI
+
+  for(int iRow=0; iRow<nRows; iRow++){
+    int iGlobalIndex(iFirstRow+iRow), nCols(indptr_list[iRow+1]-indptr_list[iRow]);
+    if(nCols > 0) setValues(1, &iGlobalIndex, nCols, indices_list+indptr_list[iRow], values_array+indptr_list[iRow]);
+  }
+
+}
+
+void CInterfaceMatrix::setSymmetric(bool val_symmetric){
+
+  //Declares the matrix as symmetric, the flag is passed to PETSc at assembly (or loading)
+  symmetric = val_symmetric;
+
+}
+
+bool CInterfaceMatrix::isSymmetric() const{
+
+  return symmetric;
+
+}
+
+void CInterfaceMatrix::flush(){
+
+  //Sends the entries set so far in the rows owned by the other ranks (collective), the matrix is still open for new entries
+#ifdef HAVE_MPI
+  MatAssemblyBegin(H, MAT_FLUSH_ASSEMBLY);
+  MatAssemblyEnd(H, MAT_FLUSH_ASSEMBLY);
+#endif //HAVE_MPI
+
 }
 
 void CInterfaceMatrix::assemble(){
 
 #ifdef HAVE_MPI
+  //The structure of H may have changed, its MAIJ form is rebuilt on demand
+  destroyBlockedMat();
   MatAssemblyBegin(H, MAT_FINAL_ASSEMBLY);
   MatAssemblyEnd(H, MAT_FINAL_ASSEMBLY);
+  if(symmetric){
+    MatSetOption(H, MAT_SYMMETRIC, PETSC_TRUE);
+    MatSetOption(H, MAT_SYMMETRY_ETERNAL, PETSC_TRUE);
+  }
+#else //HAVE_MPI
+  if(sparse && !assembled){
+    //Compress the row maps into CSR arrays (column indices are sorted within each row)
+    int nnz(0);
+    for(int iRow=0; iRow<M; iRow++) nnz += H_rows[iRow].size();
+    H_indptr.assign(M+1, 0);
+    H_indices.resize(nnz);
+    H_values.resize(nnz);
+    int jj(0);
+    for(int iRow=0; iRow<M; iRow++){
+      for(map<int, double>::const_iterator it=H_rows[iRow].begin(); it!=H_rows[iRow].end(); ++it){
+        H_indices[jj] = it->first;
+        H_values[jj] = it->second;
+        jj++;
+      }
+      H_indptr[iRow+1] = jj;
+    }
+    vector< map<int, double> >().swap(H_rows);
+    assembled = true;
+  }
 #endif  //HAVE_MPI
 }
 
@@ -115,11 +320,157 @@ void CInterfaceMatrix::mult(CFlexInterfaceData* B, CFlexInterfaceData* X){
   assert(B->getDim() == X->getDim());
 
 #ifdef HAVE_MPI
-  for(int i=0; i<X->getDim(); i++){
-    MatMult(H, B->getData(i), X->getData(i));
+  if(B->isBlocked() && X->isBlocked()){
+    //Interleaved components : one product (one scatter) for all of them
+    MatMult(getBlockedMat(X->getDim()), B->getBlockData(), X->getBlockData());
+  }
+  else if(X->getDim() == 1){
+    MatMult(H, B->getData(0), X->getData(0));
+  }
+  else{
+    //All the components are multiplied in one pass
+    Mat BMulti, XMulti;
+    B->getMultiVector(&BMulti);
+    MatMatMult(H, BMulti, MAT_INITIAL_MATRIX, PETSC_DEFAULT, &XMulti);
+    X->setFromMultiVector(XMulti);
+    MatDestroy(&BMulti);
+    MatDestroy(&XMulti);
+  }
+#endif  //HAVE_MPI
+
+}
+
+void CInterfaceMatrix::multTranspose(CFlexInterfaceData* B, CFlexInterfaceData* X){
+
+  assert(B->getDim() == X->getDim());
+
+#ifdef HAVE_MPI
+  if(B->isBlocked() && X->isBlocked()){
+    //Interleaved components : one product (one scatter) for all of them
+    MatMultTranspose(getBlockedMat(X->getDim()), B->getBlockData(), X->getBlockData());
+  }
+  else if(X->getDim() == 1){
+    MatMultTranspose(H, B->getData(0), X->getData(0));
+  }
+  else{
+    //All the components are multiplied in one pass
+    Mat BMulti, XMulti;
+    B->getMultiVector(&BMulti);
+    MatTransposeMatMult(H, BMulti, MAT_INITIAL_MATRIX, PETSC_DEFAULT, &XMulti);
+    X->setFromMultiVector(XMulti);
+    MatDestroy(&BMulti);
+    MatDestroy(&XMulti);
+  }
+#endif  //HAVE_MPI
+
+}
+
+#ifdef HAVE_MPI
+Mat CInterfaceMatrix::getBlockedMat(int const& dof){
+
+  if(HBlocked && blockedDof != dof) destroyBlockedMat();
+  if(!HBlocked){
+    MatCreateMAIJ(H, dof, &HBlocked);
+    blockedDof = dof;
+  }
+
+  return HBlocked;
+}
+
+void CInterfaceMatrix::destroyBlockedMat(){
+
+  if(HBlocked){
+    MatDestroy(&HBlocked);
   }
+  blockedDof = 0;
+}
 #endif  //HAVE_MPI
 
+void CInterfaceMatrix::save(const string& fileName){
+
+  //The matrix must be assembled
+#ifdef HAVE_MPI
+  PetscViewer viewer;
+  PetscViewerBinaryOpen(MPI_COMM_WORLD, fileName.c_str(), FILE_MODE_WRITE, &viewer);
+  MatView(H, viewer);
+  PetscViewerDestroy(&viewer);
+#else //HAVE_MPI
+  assemble();
+  ofstream file(fileName.c_str(), ios::out | ios::binary);
+  int isSparse(sparse);
+  file.write(reinterpret_cast<const char*>(&M), sizeof(int));
+  file.write(reinterpret_cast<const char*>(&N), sizeof(int));
+  file.write(reinterpret_cast<const char*>(&isSparse), sizeof(int));
+  if(sparse){
+    int nnz(H_values.size());
+    file.write(reinterpret_cast<const char*>(&nnz), sizeof(int));
+    file.write(reinterpret_cast<const char*>(&(H_indptr.front())), (M+1)*sizeof(int));
+    if(nnz > 0){
+      file.write(reinterpret_cast<const char*>(&(H_indices.front())), nnz*sizeof(int));
+      file.write(reinterpret_cast<const char*>(&(H_values.front())), nnz*sizeof(double));
+    }
+  }
+  else{
+    file.write(reinterpret_cast<const char*>(&(H.front())), H.size()*sizeof(double));
+  }
+  file.close();
+#endif //HAVE_MPI
+
+}
+
+bool CInterfaceMatrix::load(const string& fileName){
+
+  //Replaces the current content of the matrix, returns false if the stored sizes do not match
+#ifdef HAVE_MPI
+  int loadedM, loadedN;
+  PetscViewer viewer;
+
+  destroyBlockedMat();
+  if(H) MatDestroy(&H);
+  PetscViewerBinaryOpen(MPI_COMM_WORLD, fileName.c_str(), FILE_MODE_READ, &viewer);
+  MatCreate(MPI_COMM_WORLD, &H);
+  MatSetType(H, MATAIJ);
+  MatLoad(H, viewer);
+  PetscViewerDestroy(&viewer);
+  MatGetSize(H, &loadedM, &loadedN);
+  if(symmetric){
+    MatSetOption(H, MAT_SYMMETRIC, PETSC_TRUE);
+    MatSetOption(H, MAT_SYMMETRY_ETERNAL, PETSC_TRUE);
+  }
+
+  return (loadedM == M && loadedN == N);
+#else //HAVE_MPI
+  int loadedM, loadedN, isSparse, nnz;
+  ifstream file(fileName.c_str(), ios::in | ios::binary);
+  if(!file.is_open()) return false;
+  file.read(reinterpret_cast<char*>(&loadedM), sizeof(int));
+  file.read(reinterpret_cast<char*>(&loadedN), sizeof(int));
+  file.read(reinterpret_cast<char*>(&isSparse), sizeof(int));
+  if(!file.good() || loadedM != M || loadedN != N) return false;
+  if(isSparse){
+    file.read(reinterpret_cast<char*>(&nnz), sizeof(int));
+    sparse = true;
+    assembled = true;
+    vector< map<int, double> >().swap(H_rows);
+    vector<double>().swap(H);
+    H_indptr.resize(M+1);
+    H_indices.resize(nnz);
+    H_values.resize(nnz);
+    file.read(reinterpret_cast<char*>(&(H_indptr.front())), (M+1)*sizeof(int));
+    if(nnz > 0){
+      file.read(reinterpret_cast<char*>(&(H_indices.front())), nnz*sizeof(int));
+      file.read(reinterpret_cast<char*>(&(H_values.front())), nnz*sizeof(double));
+    }
+  }
+  else{
+    sparse = false;
+    H.resize(M*N);
+    file.read(reinterpret_cast<char*>(&(H.front())), M*N*sizeof(double));
+  }
+
+  return file.good();
+#endif //HAVE_MPI
+
 }
 
 #ifdef HAVE_MPI
@@ -130,9 +481,44 @@ Mat CInterfaceMatrix::getMat(){
 #else //HAVE_MPI
 void CInterfaceMatrix::getMat(int* size1, int* size2, double** mat_array){
 
+  assert(!sparse);
+
   *size1 = M;
   *size2 = N;
-  *mat_array = &(H.front());;
+  *mat_array = &(H.front());
+}
+
+bool CInterfaceMatrix::isSparse() const{
+
+  return sparse;
+}
+
+void CInterfaceMatrix::getCSR(int* size_indptr, int** indptr_array, int* size_indices, int** indices_array, int* size_values, double** values_array){
+
+  assert(sparse);
+
+  assemble();
+
+  *size_indptr = H_indptr.size();
+  *indptr_array = &(H_indptr.front());
+  *size_indices = H_indices.size();
+  *indices_array = H_indices.empty() ? NULL : &(H_indices.front());
+  *size_values = H_values.size();
+  *values_array = H_values.empty() ? NULL : &(H_values.front());
+}
+
+void CInterfaceMatrix::openSparse(){
+
+  //Expand the CSR arrays back into row maps if new values are set after assembly
+  if(assembled){
+    H_rows.assign(M, map<int, double>());
+    for(int iRow=0; iRow<M; iRow++){
+      for(int jj=H_indptr[iRow]; jj<H_indptr[iRow+1]; jj++){
+        H_rows[iRow][H_indices[jj]] = H_values[jj];
+      }
+    }
+    assembled = false;
+  }
 }
 
 #endif  //HAVE_MPI
@@ -0,0 +1,215 @@
+/*
+ * Copyright 2018 University of Liège
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+/*!
+ * Source for CInterfacePermutation.
+ * Authors : D. THOMAS.
+ */
+
+#include <iostream>
+#include <fstream>
+#include <vector>
+#include <cassert>
+
+#ifdef HAVE_MPI
+#include "petscvec.h"
+#include "petscviewer.h"
+#endif  //HAVE_MPI
+
+#include "../include/cMpi.h"
+#include "../include/cInterfacePermutation.h"
+
+using namespace std;
+
+#ifdef HAVE_MPI
+CInterfacePermutation::CInterfacePermutation(int const& val_M, int const& val_N):donorIndices(NULL), scatter(NULL), M(val_M), N(val_N){ }
+#else //HAVE_MPI
+CInterfacePermutation::CInterfacePermutation(int const& val_M, int const& val_N):indices(val_M, -1), M(val_M), N(val_N){ }
+#endif //HAVE_MPI
+
+CInterfacePermutation::~CInterfacePermutation(){
+
+#ifndef NDEBUG
+  cout << "Calling CInterfacePermutation::~CInterfacePermutation()" << endl;
+#endif  //NDEBUG
+
+#ifdef HAVE_MPI
+  if(scatter) VecScatterDestroy(&scatter);
+  if(donorIndices) VecDestroy(&donorIndices);
+#endif  //HAVE_MPI
+
+}
+
+#ifdef HAVE_MPI
+void CInterfacePermutation::createScatter(){
+
+  //Builds the scatter from the donor index stored for each (locally owned) target row
+  //The target rows without donor (index < 0) are left out of the scatter and remain zero
+  Vec donor, target;
+  IS isDonor, isTarget;
+  int start, nLocal;
+  const PetscScalar *donorIndicesArray;
+  vector<int> donorList, targetList;
+
+  if(scatter) VecScatterDestroy(&scatter);
+
+  VecGetOwnershipRange(donorIndices, &start, NULL);
+  VecGetLocalSize(donorIndices, &nLocal);
+  VecGetArrayRead(donorIndices, &donorIndicesArray);
+  for(int ii=0; ii<nLocal; ii++){
+    int jj = static_cast<int>(PetscRealPart(donorIndicesArray[ii]));
+    if(jj >= 0){
+      donorList.push_back(jj);
+      targetList.push_back(start+ii);
+    }
+  }
+  VecRestoreArrayRead(donorIndices, &donorIndicesArray);
+
+  VecCreateMPI(MPI_COMM_WORLD, PETSC_DECIDE, N, &donor);
+  VecCreateMPI(MPI_COMM_WORLD, PETSC_DECIDE, M, &target);
+  ISCreateGeneral(PETSC_COMM_SELF, donorList.size(), donorList.data(), PETSC_COPY_VALUES, &isDonor);
+  ISCreateGeneral(PETSC_COMM_SELF, targetList.size(), targetList.data(), PETSC_COPY_VALUES, &isTarget);
+  VecScatterCreate(donor, isDonor, target, isTarget, &scatter);
+  ISDestroy(&isDonor);
+  ISDestroy(&isTarget);
+  VecDestroy(&donor);
+  VecDestroy(&target);
+
+}
+#endif  //HAVE_MPI
+
+void CInterfacePermutation::setMapping(int nEntries, int const targetIndices[], int const donorIndices_list[]){
+
+  //Collective in parallel, the target rows may be owned by another rank
+#ifdef HAVE_MPI
+  vector<PetscScalar> values(donorIndices_list, donorIndices_list+nEntries);
+
+  if(donorIndices) VecDestroy(&donorIndices);
+  VecCreateMPI(MPI_COMM_WORLD, PETSC_DECIDE, M, &donorIndices);
+  VecSet(donorIndices, -1.0);
+  VecSetValues(donorIndices, nEntries, targetIndices, values.data(), INSERT_VALUES);
+  VecAssemblyBegin(donorIndices);
+  VecAssemblyEnd(donorIndices);
+  createScatter();
+#else //HAVE_MPI
+  for(int ii=0; ii<nEntries; ii++){
+    assert(targetIndices[ii] < M && donorIndices_list[ii] < N);
+    indices[targetIndices[ii]] = donorIndices_list[ii];
+  }
+#endif //HAVE_MPI
+
+}
+
+void CInterfacePermutation::setEntries(int size_indices, int* indices_list, int size_donors, int* donors_list){
+
+  //Same as setMapping (collective), with the target rows and their donors given as arrays
+  assert(size_indices == size_donors);
+
+  setMapping(size_indices, indices_list, donors_list);
+
+}
+
+void CInterfacePermutation::mult(CFlexInterfaceData* B, CFlexInterfaceData* X){
+
+  assert(B->getDim() == X->getDim());
+
+#ifdef HAVE_MPI
+  for(int iDim=0; iDim<X->getDim(); iDim++){
+    //The component vectors are fetched once (for blocked data, getData gathers the component)
+    Vec BData = B->getData(iDim), XData = X->getData(iDim);
+    VecSet(XData, 0.0);
+    VecScatterBegin(scatter, BData, XData, INSERT_VALUES, SCATTER_FORWARD);
+    VecScatterEnd(scatter, BData, XData, INSERT_VALUES, SCATTER_FORWARD);
+    X->restoreData(iDim);
+  }
+#endif  //HAVE_MPI
+
+}
+
+void CInterfacePermutation::multTranspose(CFlexInterfaceData* B, CFlexInterfaceData* X){
+
+  assert(B->getDim() == X->getDim());
+
+#ifdef HAVE_MPI
+  for(int iDim=0; iDim<X->getDim(); iDim++){
+    //The component vectors are fetched once (for blocked data, getData gathers the component)
+    Vec BData = B->getData(iDim), XData = X->getData(iDim);
+    VecSet(XData, 0.0);
+    VecScatterBegin(scatter, BData, XData, ADD_VALUES, SCATTER_REVERSE);
+    VecScatterEnd(scatter, BData, XData, ADD_VALUES, SCATTER_REVERSE);
+    X->restoreData(iDim);
+  }
+#endif  //HAVE_MPI
+
+}
+
+void CInterfacePermutation::save(const string& fileName){
+
+#ifdef HAVE_MPI
+  PetscViewer viewer;
+  PetscViewerBinaryOpen(MPI_COMM_WORLD, fileName.c_str(), FILE_MODE_WRITE, &viewer);
+  VecView(donorIndices, viewer);
+  PetscViewerDestroy(&viewer);
+#else //HAVE_MPI
+  ofstream file(fileName.c_str(), ios::out | ios::binary);
+  file.write(reinterpret_cast<const char*>(&M), sizeof(int));
+  file.write(reinterpret_cast<const char*>(&N), sizeof(int));
+  if(M > 0) file.write(reinterpret_cast<const char*>(&(indices.front())), M*sizeof(int));
+  file.close();
+#endif //HAVE_MPI
+
+}
+
+bool CInterfacePermutation::load(const string& fileName){
+
+  //Replaces the current mapping, returns false if the stored sizes do not match
+#ifdef HAVE_MPI
+  int loadedM;
+  PetscViewer viewer;
+
+  if(donorIndices) VecDestroy(&donorIndices);
+  PetscViewerBinaryOpen(MPI_COMM_WORLD, fileName.c_str(), FILE_MODE_READ, &viewer);
+  VecCreate(MPI_COMM_WORLD, &donorIndices);
+  VecSetType(donorIndices, VECMPI);
+  VecLoad(donorIndices, viewer);
+  PetscViewerDestroy(&viewer);
+  VecGetSize(donorIndices, &loadedM);
+  if(loadedM != M) return false;
+  createScatter();
+
+  return true;
+#else //HAVE_MPI
+  int loadedM, loadedN;
+  ifstream file(fileName.c_str(), ios::in | ios::binary);
+  if(!file.is_open()) return false;
+  file.read(reinterpret_cast<char*>(&loadedM), sizeof(int));
+  file.read(reinterpret_cast<char*>(&loadedN), sizeof(int));
+  if(!file.good() || loadedM != M || loadedN != N) return false;
+  if(M > 0) file.read(reinterpret_cast<char*>(&(indices.front())), M*sizeof(int));
+
+  return file.good();
+#endif //HAVE_MPI
+
+}
+
+#ifndef HAVE_MPI
+void CInterfacePermutation::getIndices(int* size_indices, int** indices_array){
+
+  *size_indices = M;
+  *indices_array = indices.data();
+
+}
+#endif  //HAVE_MPI
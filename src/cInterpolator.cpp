@@ -24,14 +24,326 @@
 #include <cmath>
 #include <ctime>
 #include <vector>
+#include <array>
+#include <map>
 #include <algorithm>
+#include <limits>
 
 #include "../include/cInterpolator.h"
 #include "../include/cInterfaceMatrix.h"
+#include "../include/cInterfacePermutation.h"
 #include "../include/cAdt.h"
 
 using namespace std;
 
+//Evaluation kernels used by the fill routines. The loops are written without branches nor calls to pow
+//so that they are vectorized, and they work on thread-local buffers so that the rows can be filled concurrently.
+namespace {
+
+//Squared distances between a point and the points (x[ids[j]], y[ids[j]], z[ids[j]]), or the first n points if ids is NULL
+inline void squaredDistances(double const* point, int n, int const* ids, double const* x, double const* y, double const* z, double* dist2){
+
+  const double px(point[0]), py(point[1]), pz(point[2]);
+
+  if(ids == nullptr){
+#pragma omp simd
+    for(int jj=0; jj<n; jj++){
+      const double dx(x[jj]-px), dy(y[jj]-py), dz(z[jj]-pz);
+      dist2[jj] = dx*dx + dy*dy + dz*dz;
+    }
+  }
+  else{
+#pragma omp simd
+    for(int jj=0; jj<n; jj++){
+      const int kk(ids[jj]);
+      const double dx(x[kk]-px), dy(y[kk]-py), dz(z[kk]-pz);
+      dist2[jj] = dx*dx + dy*dy + dz*dz;
+    }
+  }
+}
+
+//phi = r^2*log10(r) = 0.5*r^2*log10(r^2), with phi(0) = 0
+inline void batchPHI_TPS(int n, double const* dist2, double* phi){
+
+#pragma omp simd
+  for(int jj=0; jj<n; jj++){
+    const double d2(dist2[jj]);
+    const double arg((d2 > 0.0) ? d2 : 1.0);
+    phi[jj] = 0.5*d2*log10(arg);
+  }
+}
+
+//phi = (1-eps)^4*(4*eps+1) for eps = r/radius < 1, 0 otherwise
+inline void batchPHI_RBF(int n, double const* dist2, double const& radius, double* phi){
+
+  const double invRadius(1.0/radius);
+
+#pragma omp simd
+  for(int jj=0; jj<n; jj++){
+    const double eps(sqrt(dist2[jj])*invRadius);
+    double oneMinusEps(1.0-eps);
+    oneMinusEps = (oneMinusEps > 0.0) ? oneMinusEps : 0.0;
+    const double sq(oneMinusEps*oneMinusEps);
+    phi[jj] = sq*sq*(4.0*eps+1.0);
+  }
+}
+
+//phi with the support radius of each donor (radii[ids[jj]]), or with the uniform radius if radii is null
+inline void batchPHI_RBF(int n, double const* dist2, int const* ids, double const* radii, double const& radius, double* phi){
+
+  if(radii == nullptr){
+    batchPHI_RBF(n, dist2, radius, phi);
+    return;
+  }
+
+  for(int jj=0; jj<n; jj++) batchPHI_RBF(1, dist2+jj, radii[ids[jj]], phi+jj);
+}
+
+//Squared distances to the donors returned by a ball search (with the largest support radius)
+//With adaptive radii, only the donors whose own support contains the point are kept
+inline void supportedDonors(double const* point, vector<int>& ids, double const* x, double const* y, double const* z, double const* radii, vector<double>& dist2){
+
+  dist2.resize(ids.size());
+  squaredDistances(point, static_cast<int>(ids.size()), ids.data(), x, y, z, dist2.data());
+
+  if(radii == nullptr) return;
+
+  size_t nKept(0);
+  for(size_t jj=0; jj<ids.size(); jj++){
+    const double r(radii[ids[jj]]);
+    if(dist2[jj] < r*r){
+      ids[nKept] = ids[jj];
+      dist2[nKept] = dist2[jj];
+      nKept++;
+    }
+  }
+  ids.resize(nKept);
+  dist2.resize(nKept);
+}
+
+//Values of the linear polynomial basis (1, x, y[, z]) at a point
+inline void polynomialValues(double const* point, int nDim, double* values){
+
+  values[0] = 1.0;
+  values[1] = point[0];
+  values[2] = point[1];
+  if(nDim == 3) values[3] = point[2];
+}
+
+//Partition of unity weight (Wendland C2) of a point at the normalized distance eps from the patch centre
+inline double weightPU(double const& eps){
+
+  if(eps >= 1.0) return 0.0;
+  const double sq((1.0-eps)*(1.0-eps));
+  return sq*sq*(4.0*eps+1.0);
+}
+
+//Principal axes of the m points (x, y, z) (only the first nDim coordinates are used), returns the number of axes along which
+//the points are spread and stores them in axes (row-major, nDim values per axis, largest spread first) and their centroid in mean.
+//The polynomial basis of a patch is built on these axes, so that flat patches do not make the local systems singular.
+int principalAxes(int m, int nDim, double const* x, double const* y, double const* z, double* axes, double* mean){
+
+  //Relative variance below which an axis is considered degenerate
+  const double tol(1e-12);
+  double const* coords[3] = {x, y, z};
+  double cov[3][3] = {{0.0, 0.0, 0.0}, {0.0, 0.0, 0.0}, {0.0, 0.0, 0.0}};
+  double vec[3][3] = {{1.0, 0.0, 0.0}, {0.0, 1.0, 0.0}, {0.0, 0.0, 1.0}};
+
+  for(int iDim=0; iDim<nDim; iDim++){
+    mean[iDim] = 0.0;
+    for(int jj=0; jj<m; jj++) mean[iDim] += coords[iDim][jj];
+    mean[iDim] /= m;
+  }
+  for(int iDim=0; iDim<nDim; iDim++){
+    for(int jDim=iDim; jDim<nDim; jDim++){
+      for(int jj=0; jj<m; jj++) cov[iDim][jDim] += (coords[iDim][jj]-mean[iDim])*(coords[jDim][jj]-mean[jDim]);
+      cov[jDim][iDim] = cov[iDim][jDim];
+    }
+  }
+
+  //Cyclic Jacobi rotations, the columns of vec are the eigenvectors
+  for(int sweep=0; sweep<50; sweep++){
+    double offDiag(0.0);
+    for(int p=0; p<nDim; p++) for(int q=p+1; q<nDim; q++) offDiag += cov[p][q]*cov[p][q];
+    if(offDiag == 0.0) break;
+    for(int p=0; p<nDim; p++){
+      for(int q=p+1; q<nDim; q++){
+        if(cov[p][q] == 0.0) continue;
+        const double theta(0.5*(cov[q][q]-cov[p][p])/cov[p][q]);
+        const double t(((theta >= 0.0) ? 1.0 : -1.0)/(fabs(theta) + sqrt(theta*theta+1.0)));
+        const double c(1.0/sqrt(t*t+1.0)), s(t*c);
+        for(int k=0; k<nDim; k++){
+          const double akp(cov[k][p]), akq(cov[k][q]);
+          cov[k][p] = c*akp - s*akq;
+          cov[k][q] = s*akp + c*akq;
+        }
+        for(int k=0; k<nDim; k++){
+          const double apk(cov[p][k]), aqk(cov[q][k]);
+          cov[p][k] = c*apk - s*aqk;
+          cov[q][k] = s*apk + c*aqk;
+        }
+        for(int k=0; k<nDim; k++){
+          const double vkp(vec[k][p]), vkq(vec[k][q]);
+          vec[k][p] = c*vkp - s*vkq;
+          vec[k][q] = s*vkp + c*vkq;
+        }
+      }
+    }
+  }
+
+  int order[3] = {0, 1, 2};
+  sort(order, order+nDim, [&cov](int a, int b){ return cov[a][a] > cov[b][b]; });
+  const double largest(cov[order[0]][order[0]]);
+  int nAxes(0);
+  for(int kk=0; kk<nDim; kk++){
+    if(!(largest > 0.0) || cov[order[kk]][order[kk]] <= tol*largest) break;
+    for(int iDim=0; iDim<nDim; iDim++) axes[nAxes*nDim+iDim] = vec[iDim][order[kk]];
+    nAxes++;
+  }
+  return nAxes;
+}
+
+//Values of the linear polynomial basis (1, axes.point) at a point
+inline void polynomialValuesOnAxes(double const* point, int nDim, int nAxes, double const* axes, double* values){
+
+  values[0] = 1.0;
+  for(int kk=0; kk<nAxes; kk++){
+    values[kk+1] = 0.0;
+    for(int iDim=0; iDim<nDim; iDim++) values[kk+1] += axes[kk*nDim+iDim]*point[iDim];
+  }
+}
+
+//Distance from a point to the affine span (mean, axes) of a set of points
+inline double distanceToSpan(double const* point, int nDim, int nAxes, double const* axes, double const* mean){
+
+  double offset[3], dist2(0.0);
+  for(int iDim=0; iDim<nDim; iDim++){
+    offset[iDim] = point[iDim]-mean[iDim];
+    dist2 += offset[iDim]*offset[iDim];
+  }
+  for(int kk=0; kk<nAxes; kk++){
+    double proj(0.0);
+    for(int iDim=0; iDim<nDim; iDim++) proj += axes[kk*nDim+iDim]*offset[iDim];
+    dist2 -= proj*proj;
+  }
+  return sqrt(max(dist2, 0.0));
+}
+
+//In place LU factorization with partial pivoting of the n x n row-major matrix A, false if A is singular
+bool luFactor(int n, double* A, int* piv){
+
+  for(int kk=0; kk<n; kk++){
+    int p(kk);
+    for(int ii=kk+1; ii<n; ii++) if(fabs(A[ii*n+kk]) > fabs(A[p*n+kk])) p = ii;
+    piv[kk] = p;
+    if(A[p*n+kk] == 0.0) return false;
+    if(p != kk) swap_ranges(A+kk*n, A+(kk+1)*n, A+p*n);
+    const double invPivot(1.0/A[kk*n+kk]);
+    for(int ii=kk+1; ii<n; ii++){
+      const double factor(A[ii*n+kk]*invPivot);
+      A[ii*n+kk] = factor;
+#pragma omp simd
+      for(int jj=kk+1; jj<n; jj++) A[ii*n+jj] -= factor*A[kk*n+jj];
+    }
+  }
+  return true;
+}
+
+//Solves A*x = b in place with the factors computed by luFactor
+void luSolve(int n, double const* A, int const* piv, double* b){
+
+  //The rows of the multipliers were swapped with the following pivots, so all the permutations are applied first
+  for(int kk=0; kk<n; kk++) swap(b[kk], b[piv[kk]]);
+  for(int ii=1; ii<n; ii++){
+    for(int jj=0; jj<ii; jj++) b[ii] -= A[ii*n+jj]*b[jj];
+  }
+  for(int ii=n-1; ii>=0; ii--){
+    for(int jj=ii+1; jj<n; jj++) b[ii] -= A[ii*n+jj]*b[jj];
+    b[ii] /= A[ii*n+ii];
+  }
+}
+
+//Closest point of the segment [a,b] to p, returns the squared distance and the linear shape functions (w[0], w[1]) at that point
+double projectOnSegment(double const* p, double const* a, double const* b, double* w){
+
+  const double ab[3] = {b[0]-a[0], b[1]-a[1], b[2]-a[2]};
+  const double length2(ab[0]*ab[0] + ab[1]*ab[1] + ab[2]*ab[2]);
+  double t(0.0);
+  if(length2 > 0.0){
+    t = ((p[0]-a[0])*ab[0] + (p[1]-a[1])*ab[1] + (p[2]-a[2])*ab[2])/length2;
+    t = min(max(t, 0.0), 1.0);
+  }
+  w[0] = 1.0-t;
+  w[1] = t;
+  double dist2(0.0);
+  for(int iDim=0; iDim<3; iDim++){
+    const double d(a[iDim]+t*ab[iDim]-p[iDim]);
+    dist2 += d*d;
+  }
+  return dist2;
+}
+
+//Closest point of the triangle (a,b,c) to p (Voronoi regions of the vertices and edges, see Ericson, Real-Time Collision Detection),
+//returns the squared distance and the barycentric coordinates (w[0], w[1], w[2]) of that point
+double projectOnTriangle(double const* p, double const* a, double const* b, double const* c, double* w){
+
+  double ab[3], ac[3], ap[3], bp[3], cp[3];
+  for(int iDim=0; iDim<3; iDim++){
+    ab[iDim] = b[iDim]-a[iDim];
+    ac[iDim] = c[iDim]-a[iDim];
+    ap[iDim] = p[iDim]-a[iDim];
+    bp[iDim] = p[iDim]-b[iDim];
+    cp[iDim] = p[iDim]-c[iDim];
+  }
+  auto dot = [](double const* u, double const* v){ return u[0]*v[0] + u[1]*v[1] + u[2]*v[2]; };
+
+  const double d1(dot(ab,ap)), d2(dot(ac,ap)), d3(dot(ab,bp)), d4(dot(ac,bp)), d5(dot(ab,cp)), d6(dot(ac,cp));
+  double v(0.0), u(0.0);
+  if(d1 <= 0.0 && d2 <= 0.0){ v = 0.0; u = 0.0; }
+  else if(d3 >= 0.0 && d4 <= d3){ v = 1.0; u = 0.0; }
+  else if(d6 >= 0.0 && d5 <= d6){ v = 0.0; u = 1.0; }
+  else{
+    const double vc(d1*d4 - d3*d2), vb(d5*d2 - d1*d6), va(d3*d6 - d5*d4);
+    if(vc <= 0.0 && d1 >= 0.0 && d3 <= 0.0){ v = d1/(d1-d3); u = 0.0; }
+    else if(vb <= 0.0 && d2 >= 0.0 && d6 <= 0.0){ v = 0.0; u = d2/(d2-d6); }
+    else if(va <= 0.0 && (d4-d3) >= 0.0 && (d5-d6) >= 0.0){ u = (d4-d3)/((d4-d3)+(d5-d6)); v = 1.0-u; }
+    else{
+      const double denom(va+vb+vc);
+      if(denom > 0.0){ v = vb/denom; u = vc/denom; }
+    }
+  }
+  w[0] = 1.0-v-u;
+  w[1] = v;
+  w[2] = u;
+  double dist2(0.0);
+  for(int iDim=0; iDim<3; iDim++){
+    const double d(a[iDim]+v*ab[iDim]+u*ac[iDim]-p[iDim]);
+    dist2 += d*d;
+  }
+  return dist2;
+}
+
+//Closest point of a face (segment, triangle, or quadrangle split along its diagonal 0-2) to p,
+//returns the squared distance and the weights of the nodes of the face at that point
+double projectOnFace(double const* p, int nNodesPerFace, double const* const* nodes, double* w){
+
+  if(nNodesPerFace == 2) return projectOnSegment(p, nodes[0], nodes[1], w);
+  if(nNodesPerFace == 3) return projectOnTriangle(p, nodes[0], nodes[1], nodes[2], w);
+
+  double w1[3], w2[3];
+  const double dist1(projectOnTriangle(p, nodes[0], nodes[1], nodes[2], w1));
+  const double dist2(projectOnTriangle(p, nodes[0], nodes[2], nodes[3], w2));
+  if(dist1 <= dist2){
+    w[0] = w1[0]; w[1] = w1[1]; w[2] = w1[2]; w[3] = 0.0;
+    return dist1;
+  }
+  w[0] = w2[0]; w[1] = 0.0; w[2] = w2[1]; w[3] = w2[2];
+  return dist2;
+}
+
+}
+
+
 CInterpolator::CInterpolator(CManager *val_manager):manager(val_manager){
 
   ns = 0;
@@ -51,6 +363,27 @@ CInterpolator::~CInterpolator(){
 
   if(minDist != nullptr) delete [] minDist;
   if(jGlobalVertexSolid_array != nullptr) delete [] jGlobalVertexSolid_array;
+  clearSearchTrees();
+}
+
+ADTPoint const& CInterpolator::getSearchTree(string const& key, int iProc, int size, double* x, double* y, double* z) const{
+
+  //The tree of a point set (key, iProc) is built once and reused by the next fills (A/B/C/D, preallocation and fill passes)
+  //as long as the points are unchanged. Not thread-safe, to be called outside of the parallel regions.
+  ADTPoint*& tree = searchTrees[make_pair(key, iProc)];
+  if(tree != nullptr && !tree->hasSamePoints(size, x, y, z)){
+    delete tree;
+    tree = nullptr;
+  }
+  if(tree == nullptr) tree = new ADTPoint(size, x, size, y, size, z);
+
+  return *tree;
+}
+
+void CInterpolator::clearSearchTrees(){
+
+  for(map<pair<string,int>, ADTPoint*>::iterator it=searchTrees.begin(); it!=searchTrees.end(); ++it) delete it->second;
+  searchTrees.clear();
 }
 
 void CInterpolator::matching_initSearch(){
@@ -66,10 +399,6 @@ void CInterpolator::matching_search(int size_loc_x, double* array_loc_x, int siz
                        int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
                        int iProc) const {
 
-  double fluidPoint[3] = {0.0, 0.0, 0.0};
-  double dist;
-  int jVertex(100);
-
   assert(nf_loc == size_loc_x);
   assert(nf_loc == size_loc_y);
   assert(nf_loc == size_loc_z);
@@ -78,42 +407,42 @@ void CInterpolator::matching_search(int size_loc_x, double* array_loc_x, int siz
   assert(size_buff_y == size_buff_z);
   assert(size_buff_x == size_buff_z);
 
-  ADTPoint ADT(size_buff_x, buff_x, size_buff_y, buff_y, size_buff_z, buff_z);
+  const int jOffset = manager->getGlobalIndexOffset("solid", iProc);
+
+  ADTPoint const& ADT = getSearchTree("solid", iProc, size_buff_x, buff_x, buff_y, buff_z);
+  vector<int> jVertex(nf_loc);
+  vector<double> dist(nf_loc);
+  ADT.batchQueryNN(nf_loc, array_loc_x, array_loc_y, array_loc_z, jVertex.data(), dist.data());
   for(int iVertex=0; iVertex < nf_loc; iVertex++){
-    fluidPoint[0] = array_loc_x[iVertex];
-    fluidPoint[1] = array_loc_y[iVertex];
-    fluidPoint[2] = array_loc_z[iVertex];
-    ADT.queryNN(3, fluidPoint, jVertex, dist);
-    if (dist < minDist[iVertex]){
-      minDist[iVertex] = dist;
-      jGlobalVertexSolid_array[iVertex] = manager->getGlobalIndex("solid", iProc, jVertex);
+    if (dist[iVertex] < minDist[iVertex]){
+      minDist[iVertex] = dist[iVertex];
+      jGlobalVertexSolid_array[iVertex] = jOffset + jVertex[iVertex];
     }
   }
 }
 
-void CInterpolator::matching_fillMatrix(CInterfaceMatrix *H, CInterfaceMatrix *H_T) const {
+void CInterpolator::matching_fillPermutation(CInterfacePermutation *H) const {
 
+  //Collective in parallel (ranks without fluid interface nodes have nf_loc = 0)
   int iGlobalVertexFluid, jGlobalVertexSolid;
+  const int iOffset = manager->getGlobalIndexOffset("fluid", myid);
+  vector<int> iGlobalVertexFluid_list(nf_loc);
 
   for(int iVertex=0; iVertex < nf_loc; iVertex++){
-    iGlobalVertexFluid = manager->getGlobalIndex("fluid", myid, iVertex);
+    iGlobalVertexFluid = iOffset + iVertex;
     jGlobalVertexSolid = jGlobalVertexSolid_array[iVertex];
     if(minDist[iVertex] > 1e-6) cout << "WARNING : Tolerance for matching meshes is not matched between node F" << iGlobalVertexFluid << " and S" << jGlobalVertexSolid << " DISTANCE : " << minDist[iVertex] << " !" << endl;
-    H->setValue(iGlobalVertexFluid, jGlobalVertexSolid, 1.0);
-    H_T->setValue(jGlobalVertexSolid, iGlobalVertexFluid, 1.0);
+    iGlobalVertexFluid_list[iVertex] = iGlobalVertexFluid;
   }
+  H->setMapping(nf_loc, iGlobalVertexFluid_list.data(), jGlobalVertexSolid_array);
 
 }
 
 void CInterpolator::TPS_fillMatrixA(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
                                     int size_buff_x, double* buff_x, int size_buff_y, double* buff_y, int size_buff_z, double* buff_z,
-                                    CInterfaceMatrix* A, CInterfaceMatrix* A_T,
+                                    CInterfaceMatrix* A,
                                     int iProc) const {
 
-  double solidPoint[3] = {0.0,0.0,0.0}, solidQuery[3] = {0.0,0.0,0.0};
-  double phi, dist;
-  int iGlobalVertexSolid, jGlobalVertexSolid;
-
   assert(ns_loc == size_loc_x);
   assert(ns_loc == size_loc_y);
   assert(ns_loc == size_loc_z);
@@ -122,48 +451,39 @@ void CInterpolator::TPS_fillMatrixA(int size_loc_x, double* array_loc_x, int siz
   assert(size_buff_y == size_buff_z);
   assert(size_buff_x == size_buff_z);
 
-  vector<int> jGlobalVertexSolid_list(size_buff_x);
-  vector<int> iGlobalVertexSolid_list(1);
-  vector<double> phi_value(size_buff_x);
-
-  for(int iVertex=0; iVertex<ns_loc; iVertex++){
-    solidPoint[0] = array_loc_x[iVertex];
-    solidPoint[1] = array_loc_y[iVertex];
-    solidPoint[2] = array_loc_z[iVertex];
-    iGlobalVertexSolid = manager->getGlobalIndex("solid", myid, iVertex);
-    iGlobalVertexSolid_list[0] = iGlobalVertexSolid;
-    for(int jVertex=0; jVertex<size_buff_x; jVertex++){
-      jGlobalVertexSolid = manager->getGlobalIndex("solid", iProc, jVertex);
-      jGlobalVertexSolid_list[jVertex] = jGlobalVertexSolid;
-      solidQuery[0] = buff_x[jVertex];
-      solidQuery[1] = buff_y[jVertex];
-      solidQuery[2] = buff_z[jVertex];
-      dist = distance(3, solidPoint, 3, solidQuery);
-      phi = PHI_TPS(dist);
-      phi_value[jVertex] = phi;
-    }
-    //Set PHI block
-    A->setValues(1, &(iGlobalVertexSolid_list.front()), static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), &(phi_value.front()));    //set the entire row
-    A_T->setValues(static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), 1, &(iGlobalVertexSolid_list.front()), &(phi_value.front()));  //set the entire column of the transposed matrix
-    //Set P block
-    A->setValue(iGlobalVertexSolid, ns, 1.0);
-    A->setValue(iGlobalVertexSolid, ns+1, solidPoint[0]);
-    A->setValue(iGlobalVertexSolid, ns+2, solidPoint[1]);
-    A_T->setValue(ns, iGlobalVertexSolid, 1.0);
-    A_T->setValue(ns+1, iGlobalVertexSolid, solidPoint[0]);
-    A_T->setValue(ns+2, iGlobalVertexSolid, solidPoint[1]);
-    //Set P^T block
-    A->setValue(ns, iGlobalVertexSolid, 1.0);
-    A->setValue(ns+1, iGlobalVertexSolid, solidPoint[0]);
-    A->setValue(ns+2, iGlobalVertexSolid, solidPoint[1]);
-    A_T->setValue(iGlobalVertexSolid, ns, 1.0);
-    A_T->setValue(iGlobalVertexSolid, ns+1, solidPoint[0]);
-    A_T->setValue(iGlobalVertexSolid, ns+2, solidPoint[1]);
-    if(nDim == 3){
-      A->setValue(iGlobalVertexSolid, ns+3, solidPoint[2]);
-      A->setValue(ns+3,iGlobalVertexSolid, solidPoint[2]);
-      A_T->setValue(ns+3, iGlobalVertexSolid, solidPoint[2]);
-      A_T->setValue(iGlobalVertexSolid, ns+3, solidPoint[2]);
+  const int iOffset = manager->getGlobalIndexOffset("solid", myid);
+  const int jOffset = manager->getGlobalIndexOffset("solid", iProc);
+  const int nPoly = nDim+1;
+  const int rowSize = size_buff_x+nPoly;
+
+  //Columns of a row : the donor vertices (PHI block) followed by the polynomial terms (P block)
+  vector<int> jGlobalVertexSolid_list(rowSize);
+  for(int jVertex=0; jVertex<size_buff_x; jVertex++) jGlobalVertexSolid_list[jVertex] = jOffset + jVertex;
+  for(int kk=0; kk<nPoly; kk++) jGlobalVertexSolid_list[size_buff_x+kk] = ns + kk;
+  int* polyIndices = jGlobalVertexSolid_list.data() + size_buff_x;
+
+#pragma omp parallel
+  {
+    double solidPoint[3] = {0.0,0.0,0.0};
+    int iGlobalVertexSolid;
+    vector<double> dist2(size_buff_x);
+    vector<double> row_values(rowSize);
+
+#pragma omp for schedule(static)
+    for(int iVertex=0; iVertex<ns_loc; iVertex++){
+      solidPoint[0] = array_loc_x[iVertex];
+      solidPoint[1] = array_loc_y[iVertex];
+      solidPoint[2] = array_loc_z[iVertex];
+      iGlobalVertexSolid = iOffset + iVertex;
+      squaredDistances(solidPoint, size_buff_x, nullptr, buff_x, buff_y, buff_z, dist2.data());
+      batchPHI_TPS(size_buff_x, dist2.data(), row_values.data());
+      polynomialValues(solidPoint, nDim, row_values.data()+size_buff_x);
+#pragma omp critical(CInterpolator_setValues)
+      {
+        //Set PHI and P blocks (entire row), P^T block
+        A->setValues(1, &iGlobalVertexSolid, rowSize, jGlobalVertexSolid_list.data(), row_values.data());
+        A->setValues(nPoly, polyIndices, 1, &iGlobalVertexSolid, row_values.data()+size_buff_x);
+      }
     }
   }
 
@@ -171,13 +491,9 @@ void CInterpolator::TPS_fillMatrixA(int size_loc_x, double* array_loc_x, int siz
 
 void CInterpolator::TPS_fillMatrixB(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
                                     int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
-                                    CInterfaceMatrix *B, CInterfaceMatrix *B_T,
+                                    CInterfaceMatrix *B,
                                     int iProc) const {
 
-  double fluidPoint[3] = {0.0, 0.0, 0.0}, solidQuery[3] = {0.0,0.0,0.0};
-  double phi, dist;
-  int iGlobalVertexFluid, jGlobalVertexSolid;
-
   assert(nf_loc == size_loc_x);
   assert(nf_loc == size_loc_y);
   assert(nf_loc == size_loc_z);
@@ -186,94 +502,34 @@ void CInterpolator::TPS_fillMatrixB(int size_loc_x, double* array_loc_x, int siz
   assert(size_buff_y == size_buff_z);
   assert(size_buff_x == size_buff_z);
 
-  vector<int> jGlobalVertexSolid_list(size_buff_x);
-  vector<int> iGlobalVertexFluid_list(1);
-  vector<double> phi_value(size_buff_x);
-
-  for(int iVertex=0; iVertex < nf_loc; iVertex++){
-    fluidPoint[0] = array_loc_x[iVertex];
-    fluidPoint[1] = array_loc_y[iVertex];
-    fluidPoint[2] = array_loc_z[iVertex];
-    iGlobalVertexFluid = manager->getGlobalIndex("fluid", myid, iVertex);
-    iGlobalVertexFluid_list[0] = iGlobalVertexFluid;
-    for(int jVertex=0; jVertex < size_buff_x; jVertex++){
-      jGlobalVertexSolid = manager->getGlobalIndex("solid", iProc, jVertex);
-      jGlobalVertexSolid_list[jVertex] = jGlobalVertexSolid;
-      solidQuery[0] = buff_x[jVertex];
-      solidQuery[1] = buff_y[jVertex];
-      solidQuery[2] = buff_z[jVertex];
-      dist = distance(3, fluidPoint, 3, solidQuery);
-      phi = PHI_TPS(dist);
-      phi_value[jVertex] = phi;
-    }
-    //Set PHI block
-    B->setValues(1, &(iGlobalVertexFluid_list.front()), static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), &(phi_value.front()));    //set the entire row
-    B_T->setValues(static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), 1, &(iGlobalVertexFluid_list.front()), &(phi_value.front()));  //set the entire column of the transposed matrix
-    //Set P block
-    B->setValue(iGlobalVertexFluid, ns, 1.0);
-    B->setValue(iGlobalVertexFluid, ns+1, fluidPoint[0]);
-    B->setValue(iGlobalVertexFluid, ns+2, fluidPoint[1]);
-    B_T->setValue(ns, iGlobalVertexFluid, 1.0);
-    B_T->setValue(ns+1, iGlobalVertexFluid, fluidPoint[0]);
-    B_T->setValue(ns+2, iGlobalVertexFluid, fluidPoint[1]);
-    if(nDim == 3){
-      B->setValue(iGlobalVertexFluid, ns+3, fluidPoint[2]);
-      B_T->setValue(ns+3, iGlobalVertexFluid, fluidPoint[2]);
-    }
-  }
-
-}
-
-void CInterpolator::consistent_TPS_fillMatrixA(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
-                                               int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
-                                               CInterfaceMatrix *A,
-                                               int iProc) const{
-
-  double solidPoint[3] = {0.0,0.0,0.0}, solidQuery[3] = {0.0,0.0,0.0};
-  double phi, dist;
-  int iGlobalVertexSolid, jGlobalVertexSolid;
-
-  assert(ns_loc == size_loc_x);
-  assert(ns_loc == size_loc_y);
-  assert(ns_loc == size_loc_z);
-
-  assert(size_buff_x == size_buff_y);
-  assert(size_buff_y == size_buff_z);
-  assert(size_buff_x == size_buff_z);
-
-  vector<int> jGlobalVertexSolid_list(size_buff_x);
-  vector<int> iGlobalVertexSolid_list(1);
-  vector<double> phi_value(size_buff_x);
-
-  for(int iVertex=0; iVertex<ns_loc; iVertex++){
-    solidPoint[0] = array_loc_x[iVertex];
-    solidPoint[1] = array_loc_y[iVertex];
-    solidPoint[2] = array_loc_z[iVertex];
-    iGlobalVertexSolid = manager->getGlobalIndex("solid", myid, iVertex);
-    iGlobalVertexSolid_list[0] = iGlobalVertexSolid;
-    for(int jVertex=0; jVertex<size_buff_x; jVertex++){
-      jGlobalVertexSolid = manager->getGlobalIndex("solid", iProc, jVertex);
-      jGlobalVertexSolid_list[jVertex] = jGlobalVertexSolid;
-      solidQuery[0] = buff_x[jVertex];
-      solidQuery[1] = buff_y[jVertex];
-      solidQuery[2] = buff_z[jVertex];
-      dist = distance(3, solidPoint, 3, solidQuery);
-      phi = PHI_TPS(dist);
-      phi_value[jVertex] = phi;
-    }
-    //Set PHI block
-    A->setValues(1, &(iGlobalVertexSolid_list.front()), static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), &(phi_value.front()));    //set the entire row
-    //Set P block
-    A->setValue(iGlobalVertexSolid, ns, 1.0);
-    A->setValue(iGlobalVertexSolid, ns+1, solidPoint[0]);
-    A->setValue(iGlobalVertexSolid, ns+2, solidPoint[1]);
-    //Set P^T block
-    A->setValue(ns, iGlobalVertexSolid, 1.0);
-    A->setValue(ns+1, iGlobalVertexSolid, solidPoint[0]);
-    A->setValue(ns+2, iGlobalVertexSolid, solidPoint[1]);
-    if(nDim == 3){
-      A->setValue(iGlobalVertexSolid, ns+3, solidPoint[2]);
-      A->setValue(ns+3, iGlobalVertexSolid, solidPoint[2]);
+  const int iOffset = manager->getGlobalIndexOffset("fluid", myid);
+  const int jOffset = manager->getGlobalIndexOffset("solid", iProc);
+  const int nPoly = nDim+1;
+  const int rowSize = size_buff_x+nPoly;
+
+  vector<int> jGlobalVertexSolid_list(rowSize);
+  for(int jVertex=0; jVertex<size_buff_x; jVertex++) jGlobalVertexSolid_list[jVertex] = jOffset + jVertex;
+  for(int kk=0; kk<nPoly; kk++) jGlobalVertexSolid_list[size_buff_x+kk] = ns + kk;
+
+#pragma omp parallel
+  {
+    double fluidPoint[3] = {0.0, 0.0, 0.0};
+    int iGlobalVertexFluid;
+    vector<double> dist2(size_buff_x);
+    vector<double> row_values(rowSize);
+
+#pragma omp for schedule(static)
+    for(int iVertex=0; iVertex < nf_loc; iVertex++){
+      fluidPoint[0] = array_loc_x[iVertex];
+      fluidPoint[1] = array_loc_y[iVertex];
+      fluidPoint[2] = array_loc_z[iVertex];
+      iGlobalVertexFluid = iOffset + iVertex;
+      squaredDistances(fluidPoint, size_buff_x, nullptr, buff_x, buff_y, buff_z, dist2.data());
+      batchPHI_TPS(size_buff_x, dist2.data(), row_values.data());
+      polynomialValues(fluidPoint, nDim, row_values.data()+size_buff_x);
+#pragma omp critical(CInterpolator_setValues)
+      //Set PHI and P blocks (entire row)
+      B->setValues(1, &iGlobalVertexFluid, rowSize, jGlobalVertexSolid_list.data(), row_values.data());
     }
   }
 
@@ -284,10 +540,6 @@ void CInterpolator::consistent_TPS_fillMatrixBD(int size_loc_x, double* array_lo
                                   CInterfaceMatrix *B, CInterfaceMatrix *D,
                                   int iProc) const{
 
-  double fluidPoint[3] = {0.0, 0.0, 0.0}, solidQuery[3] = {0.0,0.0,0.0};
-  double phi, dist;
-  int iGlobalVertexFluid, jGlobalVertexSolid;
-
   assert(nf_loc == size_loc_x);
   assert(nf_loc == size_loc_y);
   assert(nf_loc == size_loc_z);
@@ -296,40 +548,56 @@ void CInterpolator::consistent_TPS_fillMatrixBD(int size_loc_x, double* array_lo
   assert(size_buff_y == size_buff_z);
   assert(size_buff_x == size_buff_z);
 
-  vector<int> jGlobalVertexSolid_list(size_buff_x);
-  vector<int> iGlobalVertexFluid_list(1);
-  vector<double> phi_value(size_buff_x);
+  const int iOffset = manager->getGlobalIndexOffset("fluid", myid);
+  const int jOffset = manager->getGlobalIndexOffset("solid", iProc);
+  const int nPoly = nDim+1;
+  const int rowSize = size_buff_x+nPoly;
+
+  vector<int> jGlobalVertexSolid_list(rowSize);
+  for(int jVertex=0; jVertex<size_buff_x; jVertex++) jGlobalVertexSolid_list[jVertex] = jOffset + jVertex;
+  for(int kk=0; kk<nPoly; kk++) jGlobalVertexSolid_list[size_buff_x+kk] = ns + kk;
 
   //Build B (donor = solid, target = fluid)
-  //Build D (donor = fluid, target = solid)
-  for(int iVertex=0; iVertex < nf_loc; iVertex++){
-    fluidPoint[0] = array_loc_x[iVertex];
-    fluidPoint[1] = array_loc_y[iVertex];
-    fluidPoint[2] = array_loc_z[iVertex];
-    iGlobalVertexFluid = manager->getGlobalIndex("fluid", myid, iVertex);
-    iGlobalVertexFluid_list[0] = iGlobalVertexFluid;
+  //Build D (donor = fluid, target = solid), PHI block only
+#pragma omp parallel
+  {
+    double fluidPoint[3] = {0.0, 0.0, 0.0};
+    int iGlobalVertexFluid;
+    vector<double> dist2(size_buff_x);
+    vector<double> row_values(rowSize);
+
+#pragma omp for schedule(static)
+    for(int iVertex=0; iVertex < nf_loc; iVertex++){
+      fluidPoint[0] = array_loc_x[iVertex];
+      fluidPoint[1] = array_loc_y[iVertex];
+      fluidPoint[2] = array_loc_z[iVertex];
+      iGlobalVertexFluid = iOffset + iVertex;
+      squaredDistances(fluidPoint, size_buff_x, nullptr, buff_x, buff_y, buff_z, dist2.data());
+      batchPHI_TPS(size_buff_x, dist2.data(), row_values.data());
+      polynomialValues(fluidPoint, nDim, row_values.data()+size_buff_x);
+#pragma omp critical(CInterpolator_setValues)
+      {
+        B->setValues(1, &iGlobalVertexFluid, rowSize, jGlobalVertexSolid_list.data(), row_values.data());
+        D->setValues(size_buff_x, jGlobalVertexSolid_list.data(), 1, &iGlobalVertexFluid, row_values.data());
+      }
+    }
+  }
+
+  //Set the P block of D, once per donor vertex
+  if(nf_loc > 0){
+    double solidQuery[3] = {0.0,0.0,0.0};
+    int jGlobalVertexSolid;
+    vector<int> polyIndices(nPoly);
+    vector<double> poly_values(nPoly);
+    for(int kk=0; kk<nPoly; kk++) polyIndices[kk] = nf + kk;
     for(int jVertex=0; jVertex < size_buff_x; jVertex++){
-      jGlobalVertexSolid = manager->getGlobalIndex("solid", iProc, jVertex);
-      jGlobalVertexSolid_list[jVertex] = jGlobalVertexSolid;
       solidQuery[0] = buff_x[jVertex];
       solidQuery[1] = buff_y[jVertex];
       solidQuery[2] = buff_z[jVertex];
-      dist = distance(3, fluidPoint, 3, solidQuery);
-      phi = PHI_TPS(dist);
-      phi_value[jVertex] = phi;
-      D->setValue(jGlobalVertexSolid, nf, 1.0);
-      D->setValue(jGlobalVertexSolid, nf+1, solidQuery[0]);
-      D->setValue(jGlobalVertexSolid, nf+2, solidQuery[1]);
-      if(nDim==3) D->setValue(jGlobalVertexSolid, nf+3, solidQuery[2]);
-    }
-    B->setValues(1, &(iGlobalVertexFluid_list.front()), static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), &(phi_value.front()));
-    B->setValue(iGlobalVertexFluid, ns, 1.0);
-    B->setValue(iGlobalVertexFluid, ns+1, fluidPoint[0]);
-    B->setValue(iGlobalVertexFluid, ns+2, fluidPoint[1]);
-    if(nDim == 3){
-      B->setValue(iGlobalVertexFluid, ns+3, fluidPoint[2]);
+      jGlobalVertexSolid = jOffset + jVertex;
+      polynomialValues(solidQuery, nDim, poly_values.data());
+      D->setValues(1, &jGlobalVertexSolid, nPoly, polyIndices.data(), poly_values.data());
     }
-    D->setValues(static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), 1, &(iGlobalVertexFluid_list.front()), &(phi_value.front()));
   }
 
 }
@@ -339,11 +607,6 @@ void CInterpolator::consistent_TPS_fillMatrixC(int size_loc_x, double* array_loc
                                   CInterfaceMatrix *C,
                                   int iProc) const{
 
-  double fluidPoint[3] = {0.0,0.0,0.0}, fluidQuery[3] = {0.0,0.0,0.0};
-  double phi, dist;
-  int iGlobalVertexFluid, jGlobalVertexFluid;
-
-
   assert(nf_loc == size_loc_x);
   assert(nf_loc == size_loc_y);
   assert(nf_loc == size_loc_z);
@@ -352,39 +615,38 @@ void CInterpolator::consistent_TPS_fillMatrixC(int size_loc_x, double* array_loc
   assert(size_buff_y == size_buff_z);
   assert(size_buff_x == size_buff_z);
 
-  vector<int> jGlobalVertexFluid_list(size_buff_x);
-  vector<int> iGlobalVertexFluid_list(1);
-  vector<double> phi_value(size_buff_x);
-
-  for(int iVertex=0; iVertex<nf_loc; iVertex++){
-    fluidPoint[0] = array_loc_x[iVertex];
-    fluidPoint[1] = array_loc_y[iVertex];
-    fluidPoint[2] = array_loc_z[iVertex];
-    iGlobalVertexFluid = manager->getGlobalIndex("fluid", myid, iVertex);
-    iGlobalVertexFluid_list[0] = iGlobalVertexFluid;
-    for(int jVertex=0; jVertex<size_buff_x; jVertex++){
-      jGlobalVertexFluid = manager->getGlobalIndex("fluid", iProc, jVertex);
-      jGlobalVertexFluid_list[jVertex] = jGlobalVertexFluid;
-      fluidQuery[0] = buff_x[jVertex];
-      fluidQuery[1] = buff_y[jVertex];
-      fluidQuery[2] = buff_z[jVertex];
-      dist = distance(3, fluidPoint, 3, fluidQuery);
-      phi = PHI_TPS(dist);
-      phi_value[jVertex] = phi;
-    }
-    //Set block PHI
-    C->setValues(1, &(iGlobalVertexFluid_list.front()), static_cast<int>(jGlobalVertexFluid_list.size()), &(jGlobalVertexFluid_list.front()), &(phi_value.front()));
-    //Set block P
-    C->setValue(iGlobalVertexFluid, nf, 1.0);
-    C->setValue(iGlobalVertexFluid, nf+1, fluidPoint[0]);
-    C->setValue(iGlobalVertexFluid, nf+2, fluidPoint[1]);
-    //Set block P^T
-    C->setValue(nf, iGlobalVertexFluid, 1.0);
-    C->setValue(nf+1, iGlobalVertexFluid, fluidPoint[0]);
-    C->setValue(nf+2, iGlobalVertexFluid, fluidPoint[1]);
-    if(nDim == 3){
-      C->setValue(iGlobalVertexFluid, nf+3, fluidPoint[2]);
-      C->setValue(nf+3, iGlobalVertexFluid, fluidPoint[2]);
+  const int iOffset = manager->getGlobalIndexOffset("fluid", myid);
+  const int jOffset = manager->getGlobalIndexOffset("fluid", iProc);
+  const int nPoly = nDim+1;
+  const int rowSize = size_buff_x+nPoly;
+
+  vector<int> jGlobalVertexFluid_list(rowSize);
+  for(int jVertex=0; jVertex<size_buff_x; jVertex++) jGlobalVertexFluid_list[jVertex] = jOffset + jVertex;
+  for(int kk=0; kk<nPoly; kk++) jGlobalVertexFluid_list[size_buff_x+kk] = nf + kk;
+  int* polyIndices = jGlobalVertexFluid_list.data() + size_buff_x;
+
+#pragma omp parallel
+  {
+    double fluidPoint[3] = {0.0,0.0,0.0};
+    int iGlobalVertexFluid;
+    vector<double> dist2(size_buff_x);
+    vector<double> row_values(rowSize);
+
+#pragma omp for schedule(static)
+    for(int iVertex=0; iVertex<nf_loc; iVertex++){
+      fluidPoint[0] = array_loc_x[iVertex];
+      fluidPoint[1] = array_loc_y[iVertex];
+      fluidPoint[2] = array_loc_z[iVertex];
+      iGlobalVertexFluid = iOffset + iVertex;
+      squaredDistances(fluidPoint, size_buff_x, nullptr, buff_x, buff_y, buff_z, dist2.data());
+      batchPHI_TPS(size_buff_x, dist2.data(), row_values.data());
+      polynomialValues(fluidPoint, nDim, row_values.data()+size_buff_x);
+#pragma omp critical(CInterpolator_setValues)
+      {
+        //Set blocks PHI and P (entire row), block P^T
+        C->setValues(1, &iGlobalVertexFluid, rowSize, jGlobalVertexFluid_list.data(), row_values.data());
+        C->setValues(nPoly, polyIndices, 1, &iGlobalVertexFluid, row_values.data()+size_buff_x);
+      }
     }
   }
 
@@ -392,16 +654,8 @@ void CInterpolator::consistent_TPS_fillMatrixC(int size_loc_x, double* array_loc
 
 void CInterpolator::RBF_fillMatrixA(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
                      int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
-                     CInterfaceMatrix *A, CInterfaceMatrix *A_T,
-                     int iProc, double const& radius) const {
-
-  double solidPoint[3] = {0.0,0.0,0.0}, solidQuery[3] = {0.0,0.0,0.0};
-  double phi, dist;
-  int iGlobalVertexSolid, jGlobalVertexSolid;
-  vector<int> solidVertices;
-  vector<int> jGlobalVertexSolid_list;
-  vector<int> iGlobalVertexSolid_list(1);
-  vector<double> phi_value;
+                     CInterfaceMatrix *A,
+                     int iProc, double const& radius, int size_radii, double* radii_array) const {
 
   assert(ns_loc == size_loc_x);
   assert(ns_loc == size_loc_y);
@@ -411,49 +665,48 @@ void CInterpolator::RBF_fillMatrixA(int size_loc_x, double* array_loc_x, int siz
   assert(size_buff_y == size_buff_z);
   assert(size_buff_x == size_buff_z);
 
-  ADTPoint ADT(size_buff_x, buff_x, size_buff_y, buff_y, size_buff_z, buff_z);
-  for(int iVertex=0; iVertex<ns_loc; iVertex++){
-    solidPoint[0] = array_loc_x[iVertex];
-    solidPoint[1] = array_loc_y[iVertex];
-    solidPoint[2] = array_loc_z[iVertex];
-    iGlobalVertexSolid = manager->getGlobalIndex("solid", myid, iVertex);
-    iGlobalVertexSolid_list[0] = iGlobalVertexSolid;
-    jGlobalVertexSolid_list.clear();
-    phi_value.clear();
-    ADT.queryBallNN(3, solidPoint, radius, solidVertices);
-    for(int jVertex : solidVertices){
-      jGlobalVertexSolid = manager->getGlobalIndex("solid", iProc, jVertex);
-      jGlobalVertexSolid_list.push_back(jGlobalVertexSolid);
-      solidQuery[0] = buff_x[jVertex];
-      solidQuery[1] = buff_y[jVertex];
-      solidQuery[2] = buff_z[jVertex];
-      dist = distance(3, solidPoint, 3, solidQuery);
-      phi = PHI_RBF(dist, radius);
-      phi_value.push_back(phi);
-    }
-    //Set block PHI
-    A->setValues(1, &(iGlobalVertexSolid_list.front()), static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), &(phi_value.front()));
-    A_T->setValues(static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), 1, &(iGlobalVertexSolid_list.front()), &(phi_value.front()));
-    //set block P
-    A->setValue(iGlobalVertexSolid, ns, 1.0);
-    A->setValue(iGlobalVertexSolid, ns+1, solidPoint[0]);
-    A->setValue(iGlobalVertexSolid, ns+2, solidPoint[1]);
-    A_T->setValue(ns, iGlobalVertexSolid, 1.0);
-    A_T->setValue(ns+1, iGlobalVertexSolid, solidPoint[0]);
-    A_T->setValue(ns+2, iGlobalVertexSolid, solidPoint[1]);
-    //Set block P^T
-    A->setValue(ns, iGlobalVertexSolid, 1.0);
-    A->setValue(ns+1, iGlobalVertexSolid, solidPoint[0]);
-    A->setValue(ns+2, iGlobalVertexSolid, solidPoint[1]);
-    A_T->setValue(iGlobalVertexSolid, ns, 1.0);
-    A_T->setValue(iGlobalVertexSolid, ns+1, solidPoint[0]);
-    A_T->setValue(iGlobalVertexSolid, ns+2, solidPoint[1]);
-    if(nDim == 3){
-      A->setValue(iGlobalVertexSolid, ns+3, solidPoint[2]);
-      A->setValue(ns+3, iGlobalVertexSolid, solidPoint[2]);
-      A_T->setValue(ns+3, iGlobalVertexSolid, solidPoint[2]);
-      A_T->setValue(iGlobalVertexSolid, ns+3, solidPoint[2]);
-
+  const int iOffset = manager->getGlobalIndexOffset("solid", myid);
+  const int jOffset = manager->getGlobalIndexOffset("solid", iProc);
+  const int nPoly = nDim+1;
+
+  //Support radius of each donor (adaptive radii), the uniform radius is used if none is given
+  assert(size_radii == 0 || size_radii == size_buff_x);
+  double const* donorRadii = (size_radii > 0) ? radii_array : nullptr;
+
+  vector<int> polyIndices(nPoly);
+  for(int kk=0; kk<nPoly; kk++) polyIndices[kk] = ns + kk;
+
+  ADTPoint const& ADT = getSearchTree("solid", iProc, size_buff_x, buff_x, buff_y, buff_z);
+#pragma omp parallel
+  {
+    double solidPoint[3] = {0.0,0.0,0.0};
+    int iGlobalVertexSolid, nNeighbours;
+    vector<int> solidVertices;
+    vector<int> jGlobalVertexSolid_list;
+    vector<double> dist2;
+    vector<double> row_values;
+
+#pragma omp for schedule(dynamic, 64)
+    for(int iVertex=0; iVertex<ns_loc; iVertex++){
+      solidPoint[0] = array_loc_x[iVertex];
+      solidPoint[1] = array_loc_y[iVertex];
+      solidPoint[2] = array_loc_z[iVertex];
+      iGlobalVertexSolid = iOffset + iVertex;
+      ADT.queryBallNN(3, solidPoint, radius, solidVertices);
+      supportedDonors(solidPoint, solidVertices, buff_x, buff_y, buff_z, donorRadii, dist2);
+      nNeighbours = static_cast<int>(solidVertices.size());
+      jGlobalVertexSolid_list.resize(nNeighbours+nPoly);
+      row_values.resize(nNeighbours+nPoly);
+      for(int jj=0; jj<nNeighbours; jj++) jGlobalVertexSolid_list[jj] = jOffset + solidVertices[jj];
+      for(int kk=0; kk<nPoly; kk++) jGlobalVertexSolid_list[nNeighbours+kk] = polyIndices[kk];
+      batchPHI_RBF(nNeighbours, dist2.data(), solidVertices.data(), donorRadii, radius, row_values.data());
+      polynomialValues(solidPoint, nDim, row_values.data()+nNeighbours);
+#pragma omp critical(CInterpolator_setValues)
+      {
+        //Set blocks PHI and P (entire row), block P^T
+        A->setValues(1, &iGlobalVertexSolid, nNeighbours+nPoly, jGlobalVertexSolid_list.data(), row_values.data());
+        A->setValues(nPoly, polyIndices.data(), 1, &iGlobalVertexSolid, row_values.data()+nNeighbours);
+      }
     }
   }
 
@@ -461,16 +714,8 @@ void CInterpolator::RBF_fillMatrixA(int size_loc_x, double* array_loc_x, int siz
 
 void CInterpolator::RBF_fillMatrixB(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
                      int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
-                     CInterfaceMatrix *B, CInterfaceMatrix *B_T,
-                     int iProc, double const& radius) const {
-
-  double fluidPoint[3] = {0.0, 0.0, 0.0}, solidQuery[3] = {0.0,0.0,0.0};
-  double phi, dist;
-  int iGlobalVertexFluid, jGlobalVertexSolid;
-  vector<int> solidVertices;
-  vector<int> jGlobalVertexSolid_list;
-  vector<double> phi_value;
-  vector<int> iGlobalVertexFluid_list(1);
+                     CInterfaceMatrix *B,
+                     int iProc, double const& radius, int size_radii, double* radii_array) const {
 
   assert(nf_loc == size_loc_x);
   assert(nf_loc == size_loc_y);
@@ -480,118 +725,202 @@ void CInterpolator::RBF_fillMatrixB(int size_loc_x, double* array_loc_x, int siz
   assert(size_buff_y == size_buff_z);
   assert(size_buff_x == size_buff_z);
 
-  ADTPoint ADT(size_buff_x, buff_x, size_buff_y, buff_y, size_buff_z, buff_z);
-  for(int iVertex=0; iVertex < nf_loc; iVertex++){
-    fluidPoint[0] = array_loc_x[iVertex];
-    fluidPoint[1] = array_loc_y[iVertex];
-    fluidPoint[2] = array_loc_z[iVertex];
-    iGlobalVertexFluid = manager->getGlobalIndex("fluid", myid, iVertex);
-    iGlobalVertexFluid_list[0] = iGlobalVertexFluid;
-    jGlobalVertexSolid_list.clear();
-    phi_value.clear();
-    ADT.queryBallNN(3, fluidPoint, radius, solidVertices);
-    for(int jVertex : solidVertices){
-      jGlobalVertexSolid = manager->getGlobalIndex("solid", iProc, jVertex);
-      jGlobalVertexSolid_list.push_back(jGlobalVertexSolid);
-      solidQuery[0] = buff_x[jVertex];
-      solidQuery[1] = buff_y[jVertex];
-      solidQuery[2] = buff_z[jVertex];
-      dist = distance(3, fluidPoint, 3, solidQuery);
-      phi = PHI_RBF(dist, radius);
-      phi_value.push_back(phi);
-    }
-    B->setValues(1, &(iGlobalVertexFluid_list.front()), static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), &(phi_value.front()));
-    B_T->setValues(static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), 1, &(iGlobalVertexFluid_list.front()), &(phi_value.front()));
-    B->setValue(iGlobalVertexFluid, ns, 1.0);
-    B->setValue(iGlobalVertexFluid, ns+1, fluidPoint[0]);
-    B->setValue(iGlobalVertexFluid, ns+2, fluidPoint[1]);
-    B_T->setValue(ns, iGlobalVertexFluid, 1.0);
-    B_T->setValue(ns+1, iGlobalVertexFluid, fluidPoint[0]);
-    B_T->setValue(ns+2, iGlobalVertexFluid, fluidPoint[1]);
-    if(nDim == 3){
-      B->setValue(iGlobalVertexFluid, ns+3, fluidPoint[2]);
-      B_T->setValue(ns+3, iGlobalVertexFluid, fluidPoint[2]);
+  const int iOffset = manager->getGlobalIndexOffset("fluid", myid);
+  const int jOffset = manager->getGlobalIndexOffset("solid", iProc);
+  const int nPoly = nDim+1;
+
+  //Support radius of each donor (adaptive radii), the uniform radius is used if none is given
+  assert(size_radii == 0 || size_radii == size_buff_x);
+  double const* donorRadii = (size_radii > 0) ? radii_array : nullptr;
+
+  ADTPoint const& ADT = getSearchTree("solid", iProc, size_buff_x, buff_x, buff_y, buff_z);
+#pragma omp parallel
+  {
+    double fluidPoint[3] = {0.0, 0.0, 0.0};
+    int iGlobalVertexFluid, nNeighbours;
+    vector<int> solidVertices;
+    vector<int> jGlobalVertexSolid_list;
+    vector<double> dist2;
+    vector<double> row_values;
+
+#pragma omp for schedule(dynamic, 64)
+    for(int iVertex=0; iVertex < nf_loc; iVertex++){
+      fluidPoint[0] = array_loc_x[iVertex];
+      fluidPoint[1] = array_loc_y[iVertex];
+      fluidPoint[2] = array_loc_z[iVertex];
+      iGlobalVertexFluid = iOffset + iVertex;
+      ADT.queryBallNN(3, fluidPoint, radius, solidVertices);
+      supportedDonors(fluidPoint, solidVertices, buff_x, buff_y, buff_z, donorRadii, dist2);
+      nNeighbours = static_cast<int>(solidVertices.size());
+      jGlobalVertexSolid_list.resize(nNeighbours+nPoly);
+      row_values.resize(nNeighbours+nPoly);
+      for(int jj=0; jj<nNeighbours; jj++) jGlobalVertexSolid_list[jj] = jOffset + solidVertices[jj];
+      for(int kk=0; kk<nPoly; kk++) jGlobalVertexSolid_list[nNeighbours+kk] = ns + kk;
+      batchPHI_RBF(nNeighbours, dist2.data(), solidVertices.data(), donorRadii, radius, row_values.data());
+      polynomialValues(fluidPoint, nDim, row_values.data()+nNeighbours);
+#pragma omp critical(CInterpolator_setValues)
+      B->setValues(1, &iGlobalVertexFluid, nNeighbours+nPoly, jGlobalVertexSolid_list.data(), row_values.data());
     }
   }
 }
 
-void CInterpolator::consistent_RBF_fillMatrixA(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
-                                  int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
-                                  CInterfaceMatrix *A,
-                                  int iProc, double const& radius) const{
-
-  double solidPoint[3] = {0.0,0.0,0.0}, solidQuery[3] = {0.0,0.0,0.0};
-  double phi, dist;
-  int iGlobalVertexSolid, jGlobalVertexSolid;
-  vector<int> solidVertices;
-  vector<int> jGlobalVertexSolid_list;
-  vector<int> iGlobalVertexSolid_list(1);
-  vector<double> phi_value;
+void CInterpolator::consistent_RBF_fillMatrixBD(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
+                       int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
+                       CInterfaceMatrix *B, CInterfaceMatrix *D,
+                       int iProc, double const& radius,
+                       int size_radii, double* radii_array, int size_loc_radii, double* loc_radii_array) const{
 
-  assert(ns_loc == size_loc_x);
-  assert(ns_loc == size_loc_y);
-  assert(ns_loc == size_loc_z);
+  assert(nf_loc == size_loc_x);
+  assert(nf_loc == size_loc_y);
+  assert(nf_loc == size_loc_z);
 
   assert(size_buff_x == size_buff_y);
   assert(size_buff_y == size_buff_z);
   assert(size_buff_x == size_buff_z);
 
-  ADTPoint ADT(size_buff_x, buff_x, size_buff_y, buff_y, size_buff_z, buff_z);
-  for(int iVertex=0; iVertex<ns_loc; iVertex++){
-    solidPoint[0] = array_loc_x[iVertex];
-    solidPoint[1] = array_loc_y[iVertex];
-    solidPoint[2] = array_loc_z[iVertex];
-    iGlobalVertexSolid = manager->getGlobalIndex("solid", myid, iVertex);
-    iGlobalVertexSolid_list[0] = iGlobalVertexSolid;
-    jGlobalVertexSolid_list.clear();
-    phi_value.clear();
-    ADT.queryBallNN(3, solidPoint, radius, solidVertices);
-    for(int jVertex : solidVertices){
-      jGlobalVertexSolid = manager->getGlobalIndex("solid", iProc, jVertex);
-      jGlobalVertexSolid_list.push_back(jGlobalVertexSolid);
-      solidQuery[0] = buff_x[jVertex];
-      solidQuery[1] = buff_y[jVertex];
-      solidQuery[2] = buff_z[jVertex];
-      dist = distance(3, solidPoint, 3, solidQuery);
-      phi = PHI_RBF(dist, radius);
-      phi_value.push_back(phi);
+  const int fluidOffset = manager->getGlobalIndexOffset("fluid", myid);
+  const int solidOffset = manager->getGlobalIndexOffset("solid", iProc);
+  const int nPoly = nDim+1;
+
+  //Support radius of each solid donor (B) and of each local fluid donor (D), the uniform radius is used if none is given
+  assert(size_radii == 0 || size_radii == size_buff_x);
+  assert(size_loc_radii == 0 || size_loc_radii == size_loc_x);
+  double const* donorRadii = (size_radii > 0) ? radii_array : nullptr;
+  double const* localRadii = (size_loc_radii > 0) ? loc_radii_array : nullptr;
+
+  //Build B (donor = solid, target = fluid)
+  ADTPoint const& ADTDonor = getSearchTree("solid", iProc, size_buff_x, buff_x, buff_y, buff_z);
+#pragma omp parallel
+  {
+    double fluidPoint[3] = {0.0, 0.0, 0.0};
+    int iGlobalVertexFluid, nNeighbours;
+    vector<int> solidVertices;
+    vector<int> jGlobalVertexSolid_list;
+    vector<double> dist2;
+    vector<double> row_values;
+
+#pragma omp for schedule(dynamic, 64)
+    for(int iVertex=0; iVertex < nf_loc; iVertex++){
+      fluidPoint[0] = array_loc_x[iVertex];
+      fluidPoint[1] = array_loc_y[iVertex];
+      fluidPoint[2] = array_loc_z[iVertex];
+      iGlobalVertexFluid = fluidOffset + iVertex;
+      ADTDonor.queryBallNN(3, fluidPoint, radius, solidVertices);
+      supportedDonors(fluidPoint, solidVertices, buff_x, buff_y, buff_z, donorRadii, dist2);
+      nNeighbours = static_cast<int>(solidVertices.size());
+      jGlobalVertexSolid_list.resize(nNeighbours+nPoly);
+      row_values.resize(nNeighbours+nPoly);
+      for(int jj=0; jj<nNeighbours; jj++) jGlobalVertexSolid_list[jj] = solidOffset + solidVertices[jj];
+      for(int kk=0; kk<nPoly; kk++) jGlobalVertexSolid_list[nNeighbours+kk] = ns + kk;
+      batchPHI_RBF(nNeighbours, dist2.data(), solidVertices.data(), donorRadii, radius, row_values.data());
+      polynomialValues(fluidPoint, nDim, row_values.data()+nNeighbours);
+#pragma omp critical(CInterpolator_setValues)
+      B->setValues(1, &iGlobalVertexFluid, nNeighbours+nPoly, jGlobalVertexSolid_list.data(), row_values.data());
     }
-    //Set block PHI
-    A->setValues(1, &(iGlobalVertexSolid_list.front()), static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), &(phi_value.front()));
-    //Set block P
-    A->setValue(iGlobalVertexSolid, ns, 1.0);
-    A->setValue(iGlobalVertexSolid, ns+1, solidPoint[0]);
-    A->setValue(iGlobalVertexSolid, ns+2, solidPoint[1]);
-    //Set block P^T
-    A->setValue(ns, iGlobalVertexSolid, 1.0);
-    A->setValue(ns+1, iGlobalVertexSolid, solidPoint[0]);
-    A->setValue(ns+2, iGlobalVertexSolid, solidPoint[1]);
-    if(nDim == 3){
-      A->setValue(iGlobalVertexSolid, ns+3, solidPoint[2]);
-      A->setValue(ns+3, iGlobalVertexSolid, solidPoint[2]);
+  }
+
+  //Build D (donor = fluid, target = solid)
+  ADTPoint const& ADTTarget = getSearchTree("fluid", myid, size_loc_x, array_loc_x, array_loc_y, array_loc_z);
+#pragma omp parallel
+  {
+    double solidPoint[3] = {0.0, 0.0, 0.0};
+    int iGlobalVertexSolid, nNeighbours;
+    vector<int> fluidVertices;
+    vector<int> jGlobalVertexFluid_list;
+    vector<double> dist2;
+    vector<double> row_values;
+
+#pragma omp for schedule(dynamic, 64)
+    for(int iVertex=0; iVertex<size_buff_x; iVertex++){
+      solidPoint[0] = buff_x[iVertex];
+      solidPoint[1] = buff_y[iVertex];
+      solidPoint[2] = buff_z[iVertex];
+      iGlobalVertexSolid = solidOffset + iVertex;
+      ADTTarget.queryBallNN(3, solidPoint, radius, fluidVertices);
+      supportedDonors(solidPoint, fluidVertices, array_loc_x, array_loc_y, array_loc_z, localRadii, dist2);
+      nNeighbours = static_cast<int>(fluidVertices.size());
+      jGlobalVertexFluid_list.resize(nNeighbours+nPoly);
+      row_values.resize(nNeighbours+nPoly);
+      for(int jj=0; jj<nNeighbours; jj++) jGlobalVertexFluid_list[jj] = fluidOffset + fluidVertices[jj];
+      for(int kk=0; kk<nPoly; kk++) jGlobalVertexFluid_list[nNeighbours+kk] = nf + kk;
+      batchPHI_RBF(nNeighbours, dist2.data(), fluidVertices.data(), localRadii, radius, row_values.data());
+      polynomialValues(solidPoint, nDim, row_values.data()+nNeighbours);
+#pragma omp critical(CInterpolator_setValues)
+      D->setValues(1, &iGlobalVertexSolid, nNeighbours+nPoly, jGlobalVertexFluid_list.data(), row_values.data());
     }
   }
+
 }
 
-void CInterpolator::consistent_RBF_fillMatrixBD(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
-                       int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
-                       CInterfaceMatrix *B, CInterfaceMatrix *D,
-                       int iProc, double const& radius) const{
+void CInterpolator::consistent_RBF_fillMatrixC(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
+                                  int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
+                                  CInterfaceMatrix *C,
+                                  int iProc, double const& radius, int size_radii, double* radii_array) const{
 
-  double fluidPoint[3] = {0.0, 0.0, 0.0}, solidQuery[3] = {0.0,0.0,0.0};
-  double solidPoint[3] = {0.0, 0.0, 0.0}, fluidQuery[3] = {0.0,0.0,0.0};
-  double phi, dist;
-  int iGlobalVertexFluid, jGlobalVertexSolid;
-  int iGlobalVertexSolid, jGlobalVertexFluid;
-  vector<int> solidVertices;
-  vector<int> fluidVertices;
+  assert(nf_loc == size_loc_x);
+  assert(nf_loc == size_loc_y);
+  assert(nf_loc == size_loc_z);
+
+  assert(size_buff_x == size_buff_y);
+  assert(size_buff_y == size_buff_z);
+  assert(size_buff_x == size_buff_z);
+
+  const int iOffset = manager->getGlobalIndexOffset("fluid", myid);
+  const int jOffset = manager->getGlobalIndexOffset("fluid", iProc);
+  const int nPoly = nDim+1;
+
+  //Support radius of each donor (adaptive radii), the uniform radius is used if none is given
+  assert(size_radii == 0 || size_radii == size_buff_x);
+  double const* donorRadii = (size_radii > 0) ? radii_array : nullptr;
+
+  vector<int> polyIndices(nPoly);
+  for(int kk=0; kk<nPoly; kk++) polyIndices[kk] = nf + kk;
+
+  ADTPoint const& ADT = getSearchTree("fluid", iProc, size_buff_x, buff_x, buff_y, buff_z);
+#pragma omp parallel
+  {
+    double fluidPoint[3] = {0.0,0.0,0.0};
+    int iGlobalVertexFluid, nNeighbours;
+    vector<int> fluidVertices;
+    vector<int> jGlobalVertexFluid_list;
+    vector<double> dist2;
+    vector<double> row_values;
+
+#pragma omp for schedule(dynamic, 64)
+    for(int iVertex=0; iVertex<nf_loc; iVertex++){
+      fluidPoint[0] = array_loc_x[iVertex];
+      fluidPoint[1] = array_loc_y[iVertex];
+      fluidPoint[2] = array_loc_z[iVertex];
+      iGlobalVertexFluid = iOffset + iVertex;
+      ADT.queryBallNN(3, fluidPoint, radius, fluidVertices);
+      supportedDonors(fluidPoint, fluidVertices, buff_x, buff_y, buff_z, donorRadii, dist2);
+      nNeighbours = static_cast<int>(fluidVertices.size());
+      jGlobalVertexFluid_list.resize(nNeighbours+nPoly);
+      row_values.resize(nNeighbours+nPoly);
+      for(int jj=0; jj<nNeighbours; jj++) jGlobalVertexFluid_list[jj] = jOffset + fluidVertices[jj];
+      for(int kk=0; kk<nPoly; kk++) jGlobalVertexFluid_list[nNeighbours+kk] = polyIndices[kk];
+      batchPHI_RBF(nNeighbours, dist2.data(), fluidVertices.data(), donorRadii, radius, row_values.data());
+      polynomialValues(fluidPoint, nDim, row_values.data()+nNeighbours);
+#pragma omp critical(CInterpolator_setValues)
+      {
+        //Set blocks PHI and P (entire row), block P^T
+        C->setValues(1, &iGlobalVertexFluid, nNeighbours+nPoly, jGlobalVertexFluid_list.data(), row_values.data());
+        C->setValues(nPoly, polyIndices.data(), 1, &iGlobalVertexFluid, row_values.data()+nNeighbours);
+      }
+    }
+  }
 
-  vector<int> jGlobalVertexSolid_list;
-  vector<int> iGlobalVertexFluid_list(1);
-  vector<int> jGlobalVertexFluid_list;
-  vector<int> iGlobalVertexSolid_list(1);
-  vector<double> phi_value;
+}
+
+void CInterpolator::PU_fillMatrix(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
+                                  int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
+                                  int size_indices, int* indices_list,
+                                  CInterfaceMatrix *H,
+                                  double const& patchRadius, bool const& useTPS) const{
 
+  //Partition of unity interpolation : the interface is covered by overlapping spherical patches centred on a regular grid,
+  //a small RBF (or TPS) system is solved on each patch and the local interpolants are blended with normalized weights.
+  //The buffers contain all the solid nodes lying within 2*patchRadius of the local fluid nodes (indices_list gives their global indices).
 
   assert(nf_loc == size_loc_x);
   assert(nf_loc == size_loc_y);
@@ -599,83 +928,272 @@ void CInterpolator::consistent_RBF_fillMatrixBD(int size_loc_x, double* array_lo
 
   assert(size_buff_x == size_buff_y);
   assert(size_buff_y == size_buff_z);
-  assert(size_buff_x == size_buff_z);
+  assert(size_buff_x == size_indices);
+
+  const int iOffset = manager->getGlobalIndexOffset("fluid", myid);
+  const int nPoly = nDim+1;
+  //The nearest centre is at most 0.58*patchRadius away from any point, so that every point gets a significant weight
+  const double spacing(patchRadius/1.5);
+  const double invRadius(1.0/patchRadius);
+  //Support of the local compact RBF, in patch units (the whole patch)
+  const double localRadius(2.0);
+
+  //Patches covering the local fluid nodes, identified by their grid coordinates so that all the ranks agree on them
+  map<array<long,3>, int> patchIDs;
+  vector<array<double,3> > patchCentres;
+  vector<vector<int> > patchTargets;
+  for(int iVertex=0; iVertex<nf_loc; iVertex++){
+    const double point[3] = {array_loc_x[iVertex], array_loc_y[iVertex], array_loc_z[iVertex]};
+    long lower[3], upper[3];
+    for(int iDim=0; iDim<3; iDim++){
+      lower[iDim] = static_cast<long>(floor((point[iDim]-patchRadius)/spacing));
+      upper[iDim] = static_cast<long>(ceil((point[iDim]+patchRadius)/spacing));
+    }
+    array<long,3> key;
+    for(key[0]=lower[0]; key[0]<=upper[0]; key[0]++){
+      for(key[1]=lower[1]; key[1]<=upper[1]; key[1]++){
+        for(key[2]=lower[2]; key[2]<=upper[2]; key[2]++){
+          array<double,3> centre = {{key[0]*spacing, key[1]*spacing, key[2]*spacing}};
+          const double dx(point[0]-centre[0]), dy(point[1]-centre[1]), dz(point[2]-centre[2]);
+          if(dx*dx + dy*dy + dz*dz >= patchRadius*patchRadius) continue;
+          map<array<long,3>, int>::iterator it = patchIDs.find(key);
+          if(it == patchIDs.end()){
+            it = patchIDs.insert(make_pair(key, static_cast<int>(patchCentres.size()))).first;
+            patchCentres.push_back(centre);
+            patchTargets.push_back(vector<int>());
+          }
+          patchTargets[it->second].push_back(iVertex);
+        }
+      }
+    }
+  }
+  //Without donors (no solid node close to the local fluid nodes) the rank only takes part in the preallocation
+  const int nPatches = (size_buff_x > 0) ? static_cast<int>(patchCentres.size()) : 0;
 
-  //Build B (donor = solid, target = fluid)
-  ADTPoint ADTDonor(size_buff_x, buff_x, size_buff_y, buff_y, size_buff_z, buff_z);
-  for(int iVertex=0; iVertex < nf_loc; iVertex++){
-    fluidPoint[0] = array_loc_x[iVertex];
-    fluidPoint[1] = array_loc_y[iVertex];
-    fluidPoint[2] = array_loc_z[iVertex];
-    iGlobalVertexFluid = manager->getGlobalIndex("fluid", myid, iVertex);
-    iGlobalVertexFluid_list[0] = iGlobalVertexFluid;
-    jGlobalVertexSolid_list.clear();
-    phi_value.clear();
-    ADTDonor.queryBallNN(3, fluidPoint, radius, solidVertices);
-    for(int jVertex : solidVertices){
-      jGlobalVertexSolid = manager->getGlobalIndex("solid", iProc, jVertex);
-      jGlobalVertexSolid_list.push_back(jGlobalVertexSolid);
-      solidQuery[0] = buff_x[jVertex];
-      solidQuery[1] = buff_y[jVertex];
-      solidQuery[2] = buff_z[jVertex];
-      dist = distance(3, fluidPoint, 3, solidQuery);
-      phi = PHI_RBF(dist, radius);
-      phi_value.push_back(phi);
+  ADTPoint const* ADT = (size_buff_x > 0) ? &getSearchTree("solid", -1, size_buff_x, buff_x, buff_y, buff_z) : nullptr;
+
+  //Donors of each patch, patches with too few donors to define the polynomial are discarded
+  vector<vector<int> > patchDonors(nPatches);
+#pragma omp parallel for schedule(dynamic, 16)
+  for(int iPatch=0; iPatch<nPatches; iPatch++){
+    ADT->queryBallNN(3, patchCentres[iPatch].data(), patchRadius, patchDonors[iPatch]);
+    if(static_cast<int>(patchDonors[iPatch].size()) <= nPoly) patchDonors[iPatch].clear();
+  }
+
+  //Contributions (column, unnormalized value) of each patch to the rows of its targets, partition of unity weights of the targets
+  //and distances of the targets to the span of the donors (patch units), empty if the local system of the patch could not be factorized
+  vector<vector<int> > patchCols(nPatches);
+  vector<vector<double> > patchValues(nPatches);
+  vector<vector<double> > patchWeights(nPatches);
+  vector<vector<double> > patchSpanDist(nPatches);
+#pragma omp parallel
+  {
+    vector<double> localX, localY, localZ, dist2, A, rhs;
+    double axes[9], mean[3];
+    vector<int> piv;
+
+#pragma omp for schedule(dynamic, 4)
+    for(int iPatch=0; iPatch<nPatches; iPatch++){
+      const vector<int>& donors = patchDonors[iPatch];
+      const int m = static_cast<int>(donors.size());
+      if(m == 0) continue;
+      double const* centre = patchCentres[iPatch].data();
+
+      //Donor coordinates centred and scaled by the patch
+      localX.resize(m); localY.resize(m); localZ.resize(m);
+      for(int jj=0; jj<m; jj++){
+        localX[jj] = (buff_x[donors[jj]]-centre[0])*invRadius;
+        localY[jj] = (buff_y[donors[jj]]-centre[1])*invRadius;
+        localZ[jj] = (buff_z[donors[jj]]-centre[2])*invRadius;
+      }
+
+      //The polynomial is built on the principal axes of the donors, the degenerate directions of flat (or straight) patches are dropped
+      //so that the polynomial block keeps full rank. The linear fields are still reproduced exactly on the span of the donors.
+      const int nAxes = principalAxes(m, nDim, localX.data(), localY.data(), localZ.data(), axes, mean);
+      const int nPatchPoly = nAxes+1;
+      const int n = m+nPatchPoly;
+
+      //Local system [PHI P; P^T 0]
+      A.assign(static_cast<size_t>(n)*n, 0.0);
+      dist2.resize(m);
+      for(int ii=0; ii<m; ii++){
+        const double point[3] = {localX[ii], localY[ii], localZ[ii]};
+        squaredDistances(point, m, nullptr, localX.data(), localY.data(), localZ.data(), dist2.data());
+        if(useTPS) batchPHI_TPS(m, dist2.data(), A.data()+static_cast<size_t>(ii)*n);
+        else batchPHI_RBF(m, dist2.data(), localRadius, A.data()+static_cast<size_t>(ii)*n);
+        polynomialValuesOnAxes(point, nDim, nAxes, axes, A.data()+static_cast<size_t>(ii)*n+m);
+        for(int kk=0; kk<nPatchPoly; kk++) A[static_cast<size_t>(m+kk)*n+ii] = A[static_cast<size_t>(ii)*n+m+kk];
+      }
+      piv.resize(n);
+      if(!luFactor(n, A.data(), piv.data())) continue;
+
+      //The system is symmetric, the interpolation weights of a target are A^-1*[phi(x); p(x)]
+      const vector<int>& targets = patchTargets[iPatch];
+      patchCols[iPatch].resize(targets.size()*m);
+      patchValues[iPatch].resize(targets.size()*m);
+      patchWeights[iPatch].resize(targets.size());
+      patchSpanDist[iPatch].resize(targets.size());
+      rhs.resize(n);
+      for(size_t tt=0; tt<targets.size(); tt++){
+        const int iVertex(targets[tt]);
+        const double point[3] = {(array_loc_x[iVertex]-centre[0])*invRadius, (array_loc_y[iVertex]-centre[1])*invRadius, (array_loc_z[iVertex]-centre[2])*invRadius};
+        squaredDistances(point, m, nullptr, localX.data(), localY.data(), localZ.data(), dist2.data());
+        if(useTPS) batchPHI_TPS(m, dist2.data(), rhs.data());
+        else batchPHI_RBF(m, dist2.data(), localRadius, rhs.data());
+        polynomialValuesOnAxes(point, nDim, nAxes, axes, rhs.data()+m);
+        luSolve(n, A.data(), piv.data(), rhs.data());
+        const double weight(weightPU(sqrt(point[0]*point[0] + point[1]*point[1] + point[2]*point[2])));
+        patchWeights[iPatch][tt] = weight;
+        patchSpanDist[iPatch][tt] = distanceToSpan(point, nDim, nAxes, axes, mean);
+        for(int jj=0; jj<m; jj++){
+          patchCols[iPatch][tt*m+jj] = indices_list[donors[jj]];
+          patchValues[iPatch][tt*m+jj] = rhs[jj];
+        }
+      }
     }
-    B->setValues(1, &(iGlobalVertexFluid_list.front()), static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), &(phi_value.front()));
-    B->setValue(iGlobalVertexFluid, ns, 1.0);
-    B->setValue(iGlobalVertexFluid, ns+1, fluidPoint[0]);
-    B->setValue(iGlobalVertexFluid, ns+2, fluidPoint[1]);
-    if(nDim == 3){
-      B->setValue(iGlobalVertexFluid, ns+3, fluidPoint[2]);
+  }
+
+  //A patch whose donors are degenerate (e.g. aligned on a curved surface) cannot recover the linear fields away from their span.
+  //Each target only blends the patches it is closest to the span of (all of them in the usual case, distance 0), and the weights
+  //are normalized over these patches, so that the rows of H sum to 1 and reproduce linear fields whenever a patch can do so.
+  const double spanTol(1e-8);
+  vector<double> minSpanDist(nf_loc, numeric_limits<double>::max());
+  for(int iPatch=0; iPatch<nPatches; iPatch++){
+    for(size_t tt=0; tt<patchSpanDist[iPatch].size(); tt++){
+      const int iVertex(patchTargets[iPatch][tt]);
+      minSpanDist[iVertex] = min(minSpanDist[iVertex], patchSpanDist[iPatch][tt]);
+    }
+  }
+  vector<double> weightSum(nf_loc, 0.0);
+  for(int iPatch=0; iPatch<nPatches; iPatch++){
+    for(size_t tt=0; tt<patchWeights[iPatch].size(); tt++){
+      const int iVertex(patchTargets[iPatch][tt]);
+      if(patchSpanDist[iPatch][tt] > minSpanDist[iVertex] + spanTol) patchWeights[iPatch][tt] = 0.0;
+      weightSum[iVertex] += patchWeights[iPatch][tt];
     }
   }
 
-  //Build D (donor = fluid, target = solid)
-  ADTPoint ADTTarget(size_loc_x, array_loc_x, size_loc_y, array_loc_y, size_loc_z, array_loc_z);
-  for(int iVertex=0; iVertex<size_buff_x; iVertex++){
-    solidPoint[0] = buff_x[iVertex];
-    solidPoint[1] = buff_y[iVertex];
-    solidPoint[2] = buff_z[iVertex];
-    iGlobalVertexSolid = manager->getGlobalIndex("solid", iProc, iVertex);
-    iGlobalVertexSolid_list[0] = iGlobalVertexSolid;
-    jGlobalVertexFluid_list.clear();
-    phi_value.clear();
-    ADTTarget.queryBallNN(3, solidPoint, radius, fluidVertices);
-    for(int jVertex : fluidVertices){
-      jGlobalVertexFluid = manager->getGlobalIndex("fluid", myid, jVertex);
-      jGlobalVertexFluid_list.push_back(jGlobalVertexFluid);
-      fluidQuery[0] = array_loc_x[jVertex];
-      fluidQuery[1] = array_loc_y[jVertex];
-      fluidQuery[2] = array_loc_z[jVertex];
-      dist = distance(3, solidPoint, 3, fluidQuery);
-      phi = PHI_RBF(dist, radius);
-      phi_value.push_back(phi);
+  //Rows of H, the contributions of the patches to a given row are summed
+  vector<map<int, double> > rows(nf_loc);
+  for(int iPatch=0; iPatch<nPatches; iPatch++){
+    const int m = static_cast<int>(patchDonors[iPatch].size());
+    if(patchCols[iPatch].empty()) continue;
+    for(size_t tt=0; tt<patchTargets[iPatch].size(); tt++){
+      const int iVertex(patchTargets[iPatch][tt]);
+      if(patchWeights[iPatch][tt] == 0.0) continue;
+      const double weight(patchWeights[iPatch][tt]/weightSum[iVertex]);
+      map<int, double>& row = rows[iVertex];
+      for(int jj=0; jj<m; jj++) row[patchCols[iPatch][tt*m+jj]] += patchValues[iPatch][tt*m+jj]*weight;
     }
-    D->setValues(1, &(iGlobalVertexSolid_list.front()), static_cast<int>(jGlobalVertexFluid_list.size()), &(jGlobalVertexFluid_list.front()), &(phi_value.front()));
-    D->setValue(iGlobalVertexSolid, nf, 1.0);
-    D->setValue(iGlobalVertexSolid, nf+1, solidPoint[0]);
-    D->setValue(iGlobalVertexSolid, nf+2, solidPoint[1]);
-    if(nDim==3){
-      D->setValue(iGlobalVertexSolid, nf+3, solidPoint[2]);
+  }
+
+  //Nodes that no patch could interpolate take the value of their nearest solid node
+  for(int iVertex=0; iVertex<nf_loc; iVertex++){
+    if(!rows[iVertex].empty() || size_buff_x == 0) continue;
+    double point[3] = {array_loc_x[iVertex], array_loc_y[iVertex], array_loc_z[iVertex]};
+    int jVertex;
+    double dist;
+    ADT->queryNN(3, point, jVertex, dist);
+    rows[iVertex][indices_list[jVertex]] = 1.0;
+  }
+
+  //Exact preallocation (collective), then fill
+  vector<int> cols;
+  vector<double> values;
+  H->initNonZeros();
+  for(int iVertex=0; iVertex<nf_loc; iVertex++){
+    cols.clear();
+    for(map<int, double>::const_iterator it=rows[iVertex].begin(); it!=rows[iVertex].end(); ++it) cols.push_back(it->first);
+    H->addNonZeros(iOffset+iVertex, static_cast<int>(cols.size()), cols.data());
+  }
+  H->createSparseExactAlloc();
+  for(int iVertex=0; iVertex<nf_loc; iVertex++){
+    const int iGlobalVertexFluid(iOffset+iVertex);
+    cols.clear();
+    values.clear();
+    for(map<int, double>::const_iterator it=rows[iVertex].begin(); it!=rows[iVertex].end(); ++it){
+      cols.push_back(it->first);
+      values.push_back(it->second);
     }
+    if(!cols.empty()) H->setValues(1, &iGlobalVertexFluid, static_cast<int>(cols.size()), cols.data(), values.data());
   }
 
 }
 
-void CInterpolator::consistent_RBF_fillMatrixC(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
-                                  int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
-                                  CInterfaceMatrix *C,
-                                  int iProc, double const& radius) const{
+void CInterpolator::IDW_fillMatrix(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
+                                   int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
+                                   int size_indices, int* indices_list,
+                                   CInterfaceMatrix *H,
+                                   int const& nNeighbours, double const& power) const{
+
+  //Inverse distance weighting : each fluid node takes the weighted mean of its nNeighbours nearest solid nodes (weights 1/d^power).
+  //The buffers contain the solid nodes received from all the partitions (indices_list gives their global indices).
+
+  assert(nf_loc == size_loc_x);
+  assert(nf_loc == size_loc_y);
+  assert(nf_loc == size_loc_z);
+
+  assert(size_buff_x == size_buff_y);
+  assert(size_buff_y == size_buff_z);
+  assert(size_buff_x == size_indices);
+
+  const int iOffset = manager->getGlobalIndexOffset("fluid", myid);
+  //Without donors the rank only takes part in the preallocation
+  const int nRows = (size_buff_x > 0) ? nf_loc : 0;
+  const int k = min(nNeighbours, size_buff_x);
+
+  vector<int> cols(static_cast<size_t>(nRows)*k);
+  vector<double> values(static_cast<size_t>(nRows)*k);
+  vector<int> rowSize(nRows, k);
+
+  //Batched k-NN queries (k neighbours per row, sorted by distance)
+  vector<int> indptr, solidVertices;
+  vector<double> dist;
+  if(nRows > 0) getSearchTree("solid", -1, size_buff_x, buff_x, buff_y, buff_z).batchQueryKNN(nRows, array_loc_x, array_loc_y, array_loc_z, k, indptr, solidVertices, dist);
+
+#pragma omp parallel for schedule(static)
+  for(int iVertex=0; iVertex<nRows; iVertex++){
+    int const* rowNeighbours = solidVertices.data() + static_cast<size_t>(iVertex)*k;
+    double const* rowDist = dist.data() + static_cast<size_t>(iVertex)*k;
+    int* rowCols = cols.data() + static_cast<size_t>(iVertex)*k;
+    double* rowValues = values.data() + static_cast<size_t>(iVertex)*k;
+    //A fluid node lying on a solid node takes its value
+    if(rowDist[0] <= 1e-12*rowDist[k-1]){
+      rowSize[iVertex] = 1;
+      rowCols[0] = indices_list[rowNeighbours[0]];
+      rowValues[0] = 1.0;
+      continue;
+    }
+    double weightSum(0.0);
+    for(int jj=0; jj<k; jj++){
+      rowCols[jj] = indices_list[rowNeighbours[jj]];
+      rowValues[jj] = pow(rowDist[jj], -power);
+      weightSum += rowValues[jj];
+    }
+    for(int jj=0; jj<k; jj++) rowValues[jj] /= weightSum;
+  }
+
+  //Exact preallocation (collective), then fill
+  H->initNonZeros();
+  for(int iVertex=0; iVertex<nRows; iVertex++) H->addNonZeros(iOffset+iVertex, rowSize[iVertex], cols.data()+static_cast<size_t>(iVertex)*k);
+  H->createSparseExactAlloc();
+  for(int iVertex=0; iVertex<nRows; iVertex++){
+    const int iGlobalVertexFluid(iOffset+iVertex);
+    H->setValues(1, &iGlobalVertexFluid, rowSize[iVertex], cols.data()+static_cast<size_t>(iVertex)*k, values.data()+static_cast<size_t>(iVertex)*k);
+  }
+
+}
 
-  double fluidPoint[3] = {0.0,0.0,0.0}, fluidQuery[3] = {0.0,0.0,0.0};
-  double phi, dist;
-  int iGlobalVertexFluid, jGlobalVertexFluid;
-  vector<int> fluidVertices;
-  vector<int> iGlobalVertexFluid_list(1);
-  vector<int> jGlobalVertexFluid_list;
-  vector<double> phi_value;
+void CInterpolator::projection_fillMatrix(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
+                                          int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
+                                          int size_faces, int* faces_list,
+                                          CInterfaceMatrix *H,
+                                          int const& nNodesPerFace) const{
 
+  //Projection : each fluid node is projected onto the nearest solid face and takes the values of the shape functions of that face at the projection.
+  //The buffers contain the coordinates of all the solid interface nodes (by global index), faces_list the global indices of the nodes of each face.
+  //The candidate faces are found with an ADT over the face centroids : the nearest face lies within the distance to the nearest centroid
+  //inflated by the largest face radius (distance from a centroid to the nodes of its face).
 
   assert(nf_loc == size_loc_x);
   assert(nf_loc == size_loc_y);
@@ -683,41 +1201,129 @@ void CInterpolator::consistent_RBF_fillMatrixC(int size_loc_x, double* array_loc
 
   assert(size_buff_x == size_buff_y);
   assert(size_buff_y == size_buff_z);
-  assert(size_buff_x == size_buff_z);
+  assert(nNodesPerFace >= 2 && nNodesPerFace <= 4);
+  assert(size_faces%nNodesPerFace == 0);
+
+  const int iOffset = manager->getGlobalIndexOffset("fluid", myid);
+  const int nFaces = size_faces/nNodesPerFace;
+  //Without faces the rank only takes part in the preallocation
+  const int nRows = (nFaces > 0) ? nf_loc : 0;
+
+  vector<double> centroid_x(nFaces), centroid_y(nFaces), centroid_z(nFaces);
+  double maxFaceRadius(0.0);
+  for(int iFace=0; iFace<nFaces; iFace++){
+    int const* faceNodes = faces_list + iFace*nNodesPerFace;
+    double centroid[3] = {0.0,0.0,0.0};
+    for(int jj=0; jj<nNodesPerFace; jj++){
+      centroid[0] += buff_x[faceNodes[jj]]/nNodesPerFace;
+      centroid[1] += buff_y[faceNodes[jj]]/nNodesPerFace;
+      centroid[2] += buff_z[faceNodes[jj]]/nNodesPerFace;
+    }
+    for(int jj=0; jj<nNodesPerFace; jj++){
+      double node[3] = {buff_x[faceNodes[jj]], buff_y[faceNodes[jj]], buff_z[faceNodes[jj]]};
+      maxFaceRadius = max(maxFaceRadius, distance(3, centroid, 3, node));
+    }
+    centroid_x[iFace] = centroid[0];
+    centroid_y[iFace] = centroid[1];
+    centroid_z[iFace] = centroid[2];
+  }
 
-  ADTPoint ADT(size_buff_x, buff_x, size_buff_y, buff_y, size_buff_z, buff_z);
-  for(int iVertex=0; iVertex<nf_loc; iVertex++){
-    fluidPoint[0] = array_loc_x[iVertex];
-    fluidPoint[1] = array_loc_y[iVertex];
-    fluidPoint[2] = array_loc_z[iVertex];
-    iGlobalVertexFluid = manager->getGlobalIndex("fluid", myid, iVertex);
-    iGlobalVertexFluid_list[0] = iGlobalVertexFluid;
-    jGlobalVertexFluid_list.clear();
-    phi_value.clear();
-    ADT.queryBallNN(3, fluidPoint, radius, fluidVertices);
-    for(int jVertex : fluidVertices){
-      jGlobalVertexFluid = manager->getGlobalIndex("fluid", iProc, jVertex);
-      jGlobalVertexFluid_list.push_back(jGlobalVertexFluid);
-      fluidQuery[0] = buff_x[jVertex];
-      fluidQuery[1] = buff_y[jVertex];
-      fluidQuery[2] = buff_z[jVertex];
-      dist = distance(3, fluidPoint, 3, fluidQuery);
-      phi = PHI_RBF(dist, radius);
-      phi_value.push_back(phi);
+  vector<int> cols(static_cast<size_t>(nRows)*nNodesPerFace);
+  vector<double> values(static_cast<size_t>(nRows)*nNodesPerFace);
+  vector<int> rowSize(nRows, 0);
+
+  ADTPoint const* ADT = (nFaces > 0) ? &getSearchTree("faces", -1, nFaces, centroid_x.data(), centroid_y.data(), centroid_z.data()) : nullptr;
+#pragma omp parallel
+  {
+    double fluidPoint[3] = {0.0,0.0,0.0};
+    double faceNodesCoord[4][3];
+    double const* faceNodesPtr[4] = {faceNodesCoord[0], faceNodesCoord[1], faceNodesCoord[2], faceNodesCoord[3]};
+    double weights[4], bestWeights[4];
+    vector<int> candidateFaces;
+
+#pragma omp for schedule(dynamic, 64)
+    for(int iVertex=0; iVertex<nRows; iVertex++){
+      fluidPoint[0] = array_loc_x[iVertex];
+      fluidPoint[1] = array_loc_y[iVertex];
+      fluidPoint[2] = array_loc_z[iVertex];
+      int nearestCentroid(0);
+      double centroidDist(0.0);
+      ADT->queryNN(3, fluidPoint, nearestCentroid, centroidDist);
+      candidateFaces.clear();
+      ADT->queryBallNN(3, fluidPoint, centroidDist+maxFaceRadius, candidateFaces);
+      if(candidateFaces.empty()) candidateFaces.push_back(nearestCentroid);
+
+      int bestFace(-1);
+      double bestDist2(0.0);
+      for(size_t jj=0; jj<candidateFaces.size(); jj++){
+        int const* faceNodes = faces_list + candidateFaces[jj]*nNodesPerFace;
+        for(int kk=0; kk<nNodesPerFace; kk++){
+          faceNodesCoord[kk][0] = buff_x[faceNodes[kk]];
+          faceNodesCoord[kk][1] = buff_y[faceNodes[kk]];
+          faceNodesCoord[kk][2] = buff_z[faceNodes[kk]];
+        }
+        const double dist2(projectOnFace(fluidPoint, nNodesPerFace, faceNodesPtr, weights));
+        if(bestFace < 0 || dist2 < bestDist2){
+          bestFace = candidateFaces[jj];
+          bestDist2 = dist2;
+          copy(weights, weights+nNodesPerFace, bestWeights);
+        }
+      }
+
+      //Nodes with a vanishing weight (projection on an edge or a vertex) are not stored
+      int const* faceNodes = faces_list + bestFace*nNodesPerFace;
+      int* rowCols = cols.data() + static_cast<size_t>(iVertex)*nNodesPerFace;
+      double* rowValues = values.data() + static_cast<size_t>(iVertex)*nNodesPerFace;
+      for(int kk=0; kk<nNodesPerFace; kk++){
+        if(bestWeights[kk] != 0.0){
+          rowCols[rowSize[iVertex]] = faceNodes[kk];
+          rowValues[rowSize[iVertex]] = bestWeights[kk];
+          rowSize[iVertex]++;
+        }
+      }
     }
-    //Set block PHI
-    C->setValues(1, &(iGlobalVertexFluid_list.front()), static_cast<int>(jGlobalVertexFluid_list.size()), &(jGlobalVertexFluid_list.front()), &(phi_value.front()));
-    //Set block P
-    C->setValue(iGlobalVertexFluid, nf, 1.0);
-    C->setValue(iGlobalVertexFluid, nf+1, fluidPoint[0]);
-    C->setValue(iGlobalVertexFluid, nf+2, fluidPoint[1]);
-    //Set block P^T
-    C->setValue(nf, iGlobalVertexFluid, 1.0);
-    C->setValue(nf+1, iGlobalVertexFluid, fluidPoint[0]);
-    C->setValue(nf+2, iGlobalVertexFluid, fluidPoint[1]);
-    if(nDim == 3){
-      C->setValue(iGlobalVertexFluid, nf+3, fluidPoint[2]);
-      C->setValue(nf+3, iGlobalVertexFluid, fluidPoint[2]);
+  }
+
+  //Exact preallocation (collective), then fill
+  H->initNonZeros();
+  for(int iVertex=0; iVertex<nRows; iVertex++) H->addNonZeros(iOffset+iVertex, rowSize[iVertex], cols.data()+static_cast<size_t>(iVertex)*nNodesPerFace);
+  H->createSparseExactAlloc();
+  for(int iVertex=0; iVertex<nRows; iVertex++){
+    const int iGlobalVertexFluid(iOffset+iVertex);
+    H->setValues(1, &iGlobalVertexFluid, rowSize[iVertex], cols.data()+static_cast<size_t>(iVertex)*nNodesPerFace, values.data()+static_cast<size_t>(iVertex)*nNodesPerFace);
+  }
+
+}
+
+void CInterpolator::kNN_updateDistances(int size_loc_x, double* array_loc_x, int size_loc_y, double* array_loc_y, int size_loc_z, double* array_loc_z,
+                                        int size_buff_x, double *buff_x, int size_buff_y, double *buff_y, int size_buff_z, double *buff_z,
+                                        int size_dist, double* dist_array, std::string const& physics, int iProc) const{
+
+  //dist_array holds the k smallest distances (sorted) of each local point, they are updated with the points of the buffer
+  assert(size_loc_x == size_loc_y);
+  assert(size_loc_y == size_loc_z);
+  assert(size_buff_x == size_buff_y);
+  assert(size_buff_y == size_buff_z);
+
+  if(size_loc_x == 0 || size_buff_x == 0) return;
+
+  assert(size_dist % size_loc_x == 0);
+  const int k = size_dist/size_loc_x;
+
+  //The tree of the buffer is shared with the fills using the same donors
+  vector<int> indptr, neighbours;
+  vector<double> dist;
+  getSearchTree(physics, iProc, size_buff_x, buff_x, buff_y, buff_z).batchQueryKNN(size_loc_x, array_loc_x, array_loc_y, array_loc_z, k, indptr, neighbours, dist);
+
+#pragma omp parallel
+  {
+    vector<double> merged(2*k);
+
+#pragma omp for schedule(static)
+    for(int iVertex=0; iVertex<size_loc_x; iVertex++){
+      double* current = dist_array + static_cast<size_t>(iVertex)*k;
+      merge(current, current+k, dist.begin()+indptr[iVertex], dist.begin()+indptr[iVertex+1], merged.begin());
+      copy(merged.begin(), merged.begin()+k, current);
     }
   }
 
@@ -725,7 +1331,7 @@ void CInterpolator::consistent_RBF_fillMatrixC(int size_loc_x, double* array_loc
 
 double CInterpolator::PHI_TPS(double &distance) const{
 
-  if(distance > 0.0) return pow(distance,2)*log10(distance);
+  if(distance > 0.0) return distance*distance*log10(distance);
   else return 0.0;
 
 }
@@ -734,7 +1340,10 @@ double CInterpolator::PHI_RBF(double &distance, const double &radius) const{
 
   double eps(distance/radius);
 
-  if(eps < 1.0) return pow((1.0-eps),4)*(4.0*eps+1.0);
+  if(eps < 1.0){
+    const double sq((1.0-eps)*(1.0-eps));
+    return sq*sq*(4.0*eps+1.0);
+  }
   else return 0.0;
 
 }
@@ -744,5 +1353,7 @@ double CInterpolator::distance(int val_size1, double *array1, int val_size2, dou
   assert(val_size1 <= 3);
   assert(val_size2 <= 3);
 
-  return sqrt(pow(array2[0] - array1[0],2) + pow(array2[1] - array1[1],2) + pow(array2[2]-array1[2],2));
+  const double dx(array2[0]-array1[0]), dy(array2[1]-array1[1]), dz(array2[2]-array1[2]);
+
+  return sqrt(dx*dx + dy*dy + dz*dz);
 }
@@ -21,6 +21,8 @@
 
  #include <iostream>
  #include <cassert>
+ #include <cctype>
+ #include <algorithm>
 
 #ifdef HAVE_MPI
 #include "petscvec.h"
@@ -33,18 +35,47 @@
 
 using namespace std;
 
+namespace {
+
+//PETSc type names are lower case strings
+string toLower(string val_name){
+
+  transform(val_name.begin(), val_name.end(), val_name.begin(), [](unsigned char c){ return tolower(c); });
+  return val_name;
+}
+
+#ifdef HAVE_MPI
+//Empty package : PETSc default
+void setFactorPackage(PC pc, const string& val_package){
+
+  if(!val_package.empty()){
+#if PETSC_VERSION_GE(3,9,0)
+    PCFactorSetMatSolverType(pc, val_package.c_str());
+#else
+    PCFactorSetMatSolverPackage(pc, val_package.c_str());
+#endif
+  }
+}
+#endif //HAVE_MPI
+
+}
+
 CLinearSolver::CLinearSolver(CInterfaceMatrix *val_matrixOperator){
 
 #ifdef HAVE_MPI
 
+  factorPackage = "";
+
   KSPCreate(MPI_COMM_WORLD, &KSPSolver);
   KSPSetType(KSPSolver, KSPFGMRES);
   KSPGetPC(KSPSolver, &Precond);
   PCSetType(Precond, PCJACOBI);
-  PCSetUp(Precond);
   KSPSetOperators(KSPSolver, val_matrixOperator->getMat(),val_matrixOperator->getMat());
-  //KSPSetFromOptions(KSPSolver);
   KSPSetInitialGuessNonzero(KSPSolver, PETSC_TRUE);
+  //The operator never changes, the preconditioner is built once and reused by every solve
+  KSPSetReusePreconditioner(KSPSolver, PETSC_TRUE);
+  //Command line options (-ksp_type, -pc_type, ...) override the defaults
+  KSPSetFromOptions(KSPSolver);
   KSPSetUp(KSPSolver);
   printTolerances();
 #endif  //HAVE_MPI
@@ -67,8 +98,47 @@ void CLinearSolver::solve(CFlexInterfaceData* B, CFlexInterfaceData* X){
 
   assert(X->getDim() == B->getDim());
 
+#if PETSC_VERSION_GE(3,14,0)
+  if(X->getDim() > 1){
+    //All the components are solved in one pass (the current values of X are used as initial guess)
+    Mat BMulti, XMulti;
+    B->getMultiVector(&BMulti);
+    X->getMultiVector(&XMulti);
+    KSPMatSolve(KSPSolver, BMulti, XMulti);
+    monitor();
+    X->setFromMultiVector(XMulti);
+    MatDestroy(&BMulti);
+    MatDestroy(&XMulti);
+    return;
+  }
+#endif
+
   for(int i=0; i<X->getDim(); i++){
     KSPSolve(KSPSolver, B->getData(i), X->getData(i));
+    X->restoreData(i);
+    monitor();
+  }
+
+}
+
+void CLinearSolver::solveTranspose(CFlexInterfaceData* B, CFlexInterfaceData* X){
+
+  //Solves MatrixOperator^T*X = B, which is the regular solve if the operator is known to be symmetric
+  Mat Op;
+  PetscBool isSet, isSymmetric;
+
+  assert(X->getDim() == B->getDim());
+
+  KSPGetOperators(KSPSolver, &Op, NULL);
+  MatIsSymmetricKnown(Op, &isSet, &isSymmetric);
+  if(isSet && isSymmetric){
+    solve(B, X);
+    return;
+  }
+
+  for(int i=0; i<X->getDim(); i++){
+    KSPSolveTranspose(KSPSolver, B->getData(i), X->getData(i));
+    X->restoreData(i);
     monitor();
   }
 
@@ -100,54 +170,169 @@ void CLinearSolver::setRelativeTolerance(const double& val_relTol){
 
 }
 
-void CLinearSolver::setPreconditioner(const std::string& val_precond){  //DO NOT USE !
+void CLinearSolver::setTolerances(const double& val_relTol, const double& val_absTol, const double& val_divTol, const int& val_maxInt){
 
 #ifdef HAVE_MPI
+  relTol = val_relTol;
+  absTol = val_absTol;
+  divTol = val_divTol;
+  maxInt = val_maxInt;
+  KSPSetTolerances(KSPSolver, relTol, absTol, divTol, maxInt);
 
-  int nlocal, first;
-  KSP *subksp;
-  PC subpc;
+  printTolerances();
+
+#endif //HAVE_MPI
+
+}
+
+void CLinearSolver::setKSPType(const std::string& val_ksp){
+
+#ifdef HAVE_MPI
+  int rank;
+  string ksp = toLower(val_ksp);
+
+  MPI_Comm_rank(MPI_COMM_WORLD, &rank);
+
+  if(ksp != KSPFGMRES && ksp != KSPGMRES && ksp != KSPBCGS && ksp != KSPCG && ksp != KSPMINRES && ksp != KSPPREONLY){
+    if(rank==0) cout << "Krylov solver not recognized, using default FGMRES" << endl;
+    ksp = KSPFGMRES;
+  }
+
+  KSPSetType(KSPSolver, ksp.c_str());
+  //A single application of the preconditioner (direct solve) does not accept an initial guess
+  KSPSetInitialGuessNonzero(KSPSolver, ksp == KSPPREONLY ? PETSC_FALSE : PETSC_TRUE);
+  KSPSetUp(KSPSolver);
+#endif //HAVE_MPI
+
+}
+
+void CLinearSolver::setPreconditioner(const std::string& val_precond, const std::string& val_subPrecond, const int& val_overlap){
+
+#ifdef HAVE_MPI
+  int rank, size;
+  bool localILU = false;
+
+  MPI_Comm_rank(MPI_COMM_WORLD, &rank);
+  MPI_Comm_size(MPI_COMM_WORLD, &size);
 
   KSPGetPC(KSPSolver, &Precond);
 
   if(val_precond.compare("JACOBI") == 0){
     PCSetType(Precond, PCJACOBI);
-    PCSetUp(Precond);
   }
   else if(val_precond.compare("BJACOBI") == 0){
+    //One block per process, each block is solved by the sub-preconditioner
     PCSetType(Precond, PCBJACOBI);
-    PCBJacobiSetTotalBlocks(Precond,14,NULL);
-    PCSetUp(Precond);
-    PCBJacobiGetSubKSP(Precond,&nlocal,&first,&subksp);
-    for(int ii=0; ii<nlocal; ii++){
-      KSPGetPC(subksp[ii],&subpc);
-      PCSetType(subpc,PCSOR);
-      KSPSetType(subksp[ii],KSPFGMRES);
-    }
   }
-  else if(val_precond.compare("SCHWARZ") == 0){
+  else if(val_precond.compare("SCHWARZ") == 0 || val_precond.compare("ASM") == 0){
+    //One subdomain per process, extended by val_overlap layers of neighbours
     PCSetType(Precond, PCASM);
     PCASMSetType(Precond, PC_ASM_BASIC);
-    PCASMSetTotalSubdomains(Precond,14, NULL,NULL);
-    PCASMSetOverlap(Precond, 1);
-    PCSetUp(Precond);
-    PCASMGetSubKSP(Precond, &nlocal, &first, &subksp);
-    for(int ii=0; ii<nlocal; ii++){
-      KSPGetPC(subksp[ii],&subpc);
-      PCSetType(subpc,PCJACOBI);
-      KSPSetType(subksp[ii],KSPFGMRES);
-    }
-
+    PCASMSetOverlap(Precond, val_overlap);
   }
   else if(val_precond.compare("SOR") == 0){
     PCSetType(Precond, PCSOR);
-    PCSetUp(Precond);
+  }
+  else if(val_precond.compare("ILU") == 0){
+    if(size > 1 && factorPackage.empty()){
+      //PETSc's own ILU is sequential, without a parallel package each process factorizes its own diagonal block
+      if(rank==0) cout << "No factorization package for the parallel ILU, using BJACOBI with ILU blocks" << endl;
+      PCSetType(Precond, PCBJACOBI);
+      localILU = true;
+    }
+    else{
+      PCSetType(Precond, PCILU);
+      setFactorPackage(Precond, factorPackage);
+    }
+  }
+  else if(val_precond.compare("LU") == 0){
+    //Parallel direct solve, the factorization is computed once by the chosen package
+    PCSetType(Precond, PCLU);
+    if(size > 1 && factorPackage.empty()){
+      //PETSc's own LU is sequential
+      if(rank==0) cout << "No factorization package for the parallel LU, using MUMPS" << endl;
+      setFactorPackage(Precond, "mumps");
+    }
+    else setFactorPackage(Precond, factorPackage);
+  }
+  else if(val_precond.compare("NONE") == 0){
+    PCSetType(Precond, PCNONE);
   }
   else {
-    cout << "Preconditioner not recognized, using default JACOBI" << endl;
+    if(rank==0) cout << "Preconditioner not recognized, using default JACOBI" << endl;
     PCSetType(Precond, PCJACOBI);
-    PCSetUp(Precond);
   }
+
+  KSPSetUp(KSPSolver);
+
+  if(val_precond.compare("BJACOBI") == 0 || val_precond.compare("SCHWARZ") == 0 || val_precond.compare("ASM") == 0){
+    setSubSolvers(val_subPrecond);
+  }
+  else if(localILU){
+    setSubSolvers("ILU");
+  }
+#endif //HAVE_MPI
+
+}
+
+#ifdef HAVE_MPI
+void CLinearSolver::setSubSolvers(const std::string& val_subPrecond){
+
+  //The local blocks of BJACOBI/ASM are solved with a single application of the sub-preconditioner
+  int nlocal, first, rank;
+  KSP *subksp;
+  PC subpc;
+  PCType subType;
+
+  MPI_Comm_rank(MPI_COMM_WORLD, &rank);
+
+  if(val_subPrecond.compare("ILU") == 0) subType = PCILU;
+  else if(val_subPrecond.compare("LU") == 0) subType = PCLU;
+  else if(val_subPrecond.compare("ICC") == 0) subType = PCICC;
+  else if(val_subPrecond.compare("SOR") == 0) subType = PCSOR;
+  else if(val_subPrecond.compare("JACOBI") == 0) subType = PCJACOBI;
+  else {
+    if(rank==0) cout << "Sub-preconditioner not recognized, using default ILU" << endl;
+    subType = PCILU;
+  }
+
+  PetscBool isASM;
+  PetscObjectTypeCompare((PetscObject)Precond, PCASM, &isASM);
+  if(isASM) PCASMGetSubKSP(Precond, &nlocal, &first, &subksp);
+  else PCBJacobiGetSubKSP(Precond, &nlocal, &first, &subksp);
+
+  for(int ii=0; ii<nlocal; ii++){
+    KSPSetType(subksp[ii], KSPPREONLY);
+    KSPGetPC(subksp[ii], &subpc);
+    PCSetType(subpc, subType);
+  }
+
+}
+#endif //HAVE_MPI
+
+void CLinearSolver::setFactorizationPackage(const std::string& val_package){
+
+#ifdef HAVE_MPI
+  //e.g. MUMPS or SUPERLU_DIST, used by the LU preconditioner (empty for the PETSc default)
+  factorPackage = toLower(val_package);
+#endif //HAVE_MPI
+
+}
+
+void CLinearSolver::setOptionsPrefix(const std::string& val_prefix){
+
+#ifdef HAVE_MPI
+  KSPSetOptionsPrefix(KSPSolver, val_prefix.c_str());
+  setFromOptions();
+#endif //HAVE_MPI
+
+}
+
+void CLinearSolver::setFromOptions(){
+
+#ifdef HAVE_MPI
+  KSPSetFromOptions(KSPSolver);
+  KSPSetUp(KSPSolver);
 #endif //HAVE_MPI
 
 }
@@ -167,6 +352,16 @@ void CLinearSolver::monitor(){
 
 }
 
+int CLinearSolver::getIterationNumber(){
+
+  int nIter(0);
+#ifdef HAVE_MPI
+  KSPGetIterationNumber(KSPSolver, &nIter);
+#endif //HAVE_MPI
+
+  return nIter;
+}
+
 void CLinearSolver::printTolerances(){
 
 #ifdef HAVE_MPI
@@ -59,14 +59,20 @@ CManager::~CManager(){
 
 int CManager::getGlobalIndex(string const& str_physics, int const& iProc, int const& iVertex){
 
+  return getGlobalIndexOffset(str_physics, iProc) + iVertex;
 
+}
+
+int CManager::getGlobalIndexOffset(string const& str_physics, int const& iProc) const{
+
+  //Global index of the first vertex owned by iProc, to be hoisted out of the vertex loops
   int physics;
 
   if(str_physics.compare("fluid") == 0) physics = 0;
   else if(str_physics.compare("solid") == 0) physics = 1;
   else physics=1000;
 
-  return globalIndexRange[physics][iProc][0] + iVertex;
+  return globalIndexRange[physics][iProc][0];
 
 }
 
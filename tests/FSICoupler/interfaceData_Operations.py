@@ -0,0 +1,199 @@
+# -*- coding: latin-1; -*-
+
+''' 
+
+Copyright 2018 University of Lige
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License. 
+
+'''
+
+import os, sys
+
+filePath = os.path.abspath(os.path.dirname(sys.argv[0]))
+fileName = os.path.splitext(os.path.basename(__file__))[0]
+FSICouplerPath = os.path.join(os.path.dirname(__file__), '../../')
+
+sys.path.append(FSICouplerPath)
+
+from optparse import OptionParser
+
+import cupydo.utilities as cupyutil
+import numpy as np
+from cupydo.interfaceData import FlexInterfaceData, SerialFlexInterfaceData, ParallelFlexInterfaceData
+
+def getParameters(_p):
+    # --- Input parameters --- #
+    p = {}
+    p['nPoint'] = 101
+    p['nDim'] = 3
+    p['scalar'] = 2.5
+    p['tollData'] = 1e-12
+    p['withMPI'] = False
+    p.update(_p)
+    return p
+
+def fillData(data, values):
+    """
+    Sets the (global) values of data, each rank setting its own part.
+    """
+
+    start, stop = data.getOwnershipRange()
+    data.setLocalBlock(np.arange(start, stop, dtype=np.intc), values[start:stop,:].T)
+    data.assemble()
+
+    return data
+
+def gatherData(data):
+    """
+    Returns the (global) values of data, nPoint X nDim.
+    """
+
+    localValues = np.column_stack([data.getDataArray(iDim) for iDim in range(data.getDim())])
+    if data.getComm() != None:
+        return np.vstack(data.getComm().allgather(localValues))
+
+    return localValues
+
+def main(_p, nogui):
+
+    p = getParameters(_p)
+
+    comm = None
+    myid = 0
+    numberPart = 0
+    rootProcess = 0
+
+    cupyutil.load(fileName, p['withMPI'], comm, myid, numberPart)
+
+    if p['withMPI']:
+        from mpi4py import MPI
+        comm = MPI.COMM_WORLD
+        myid = comm.Get_rank()
+        numberPart = comm.Get_size()
+    else:
+        comm = None
+        myid = 0
+        numberPart = 1
+
+    # --- Reference values (numpy) --- #
+    rng = np.random.RandomState(0)
+    A, B = rng.rand(p['nPoint'], p['nDim']), rng.rand(p['nPoint'], p['nDim'])
+    alpha = p['scalar']
+    references = {'a+b':A+B, 'a-b':A-B, 'a+alpha':A+alpha, 'alpha+a':alpha+A, 'a-alpha':A-alpha, 'alpha-a':alpha-A,
+                  'a*alpha':A*alpha, 'alpha*a':alpha*A, 'a+=b':A+B, 'a-=b':A-B, 'a*=alpha':A*alpha,
+                  'sum':A.sum(axis=0), 'norm':np.sqrt(np.sum(A*A, axis=0)), 'dot':np.sum(A*B, axis=0)}
+
+    # --- The serial (numpy) data and the parallel (PETSc, with and without blocked layout) data match the reference --- #
+    implementations = [('Serial', lambda nPoint : SerialFlexInterfaceData(nPoint, p['nDim']))]
+    if comm != None:
+        implementations += [('PETSc', lambda nPoint : FlexInterfaceData(nPoint, p['nDim'], comm)),
+                            ('PETSc_blocked', lambda nPoint : FlexInterfaceData(nPoint, p['nDim'], comm, True))]
+
+    # --- Both implementations are created (and initialized) through FlexInterfaceData and are FlexInterfaceData --- #
+    serialData = FlexInterfaceData(p['nPoint'], p['nDim'])
+    success = type(serialData) is SerialFlexInterfaceData and isinstance(serialData, FlexInterfaceData) and serialData.getnPoint() == p['nPoint']
+    if comm != None:
+        parallelData = FlexInterfaceData(p['nPoint'], p['nDim'], comm)
+        success = success and type(parallelData) is ParallelFlexInterfaceData and isinstance(parallelData, FlexInterfaceData) and parallelData.mpiComm is comm
+    cupyutil.mpiPrint('RES-FSI-FlexInterfaceData_types: {}'.format(success), comm)
+
+    for name, createData in implementations:
+        a, b = fillData(createData(p['nPoint']), A), fillData(createData(p['nPoint']), B)
+        results = {'a+b':a+b, 'a-b':a-b, 'a+alpha':a+alpha, 'alpha+a':alpha+a, 'a-alpha':a-alpha, 'alpha-a':alpha-a,
+                   'a*alpha':a*alpha, 'alpha*a':alpha*a, 'sum':a.sum(), 'norm':a.norm(), 'dot':a.dot(b)}
+        for operation, operand in [('a+=b', b), ('a-=b', b), ('a*=alpha', alpha)]:
+            c = fillData(createData(p['nPoint']), A)
+            if operation == 'a+=b':
+                c += operand
+            elif operation == 'a-=b':
+                c -= operand
+            else:
+                c *= operand
+            results[operation] = c
+
+        error = 0.0
+        for operation in sorted(references.keys()):
+            result = results[operation]
+            if not isinstance(result, (list, tuple)):
+                result = gatherData(result)
+            error = max(error, np.abs(np.array(result)-references[operation]).max())
+        # operands of different sizes are rejected
+        try:
+            a + createData(p['nPoint']+1)
+            sizeCheck = False
+        except IndexError:
+            sizeCheck = True
+
+        cupyutil.mpiPrint('RES-FSI-{}InterfaceData: {:.3e}\t{}'.format(name, error, sizeCheck), comm)
+        success = success and error < p['tollData'] and sizeCheck
+
+    # --- Bulk fill from solver-like arrays (permuted points, extra halo entries) against a fill point by point --- #
+    for name, createData in implementations:
+        a, b = createData(p['nPoint']), createData(p['nPoint'])
+        start, stop = a.getOwnershipRange()
+        localIndices = np.random.RandomState(myid).permutation(np.arange(start, stop)).astype(np.intc)
+        haloValues = np.zeros((1, p['nDim']))
+        a.setLocalBlock(localIndices, np.vstack((A[localIndices], haloValues)).T)
+        a.assemble()
+        for index in localIndices:
+            b[int(index)] = list(A[index])
+        b.assemble()
+        error = max(np.abs(gatherData(a)-A).max(), np.abs(gatherData(b)-A).max())
+        cupyutil.mpiPrint('RES-FSI-{}InterfaceData_block: {:.3e}'.format(name, error), comm)
+        success = success and error == 0.0
+
+    # --- Views on the local values : read-only inside readArrays, modified in place inside writeArrays --- #
+    for name, createData in implementations:
+        a = fillData(createData(p['nPoint']), A)
+        start, stop = a.getOwnershipRange()
+        with a.readArrays() as arrays:
+            error = max(np.abs(arrays[iDim]-A[start:stop,iDim]).max() if stop > start else 0.0 for iDim in range(p['nDim']))
+            isReadOnly = all(not array.flags.writeable for array in arrays)
+        with a.writeArrays() as arrays:
+            for iDim in range(p['nDim']):
+                arrays[iDim] *= 2.0
+        error = max(error, np.abs(gatherData(a)-2.0*A).max())
+        cupyutil.mpiPrint('RES-FSI-{}InterfaceData_views: {:.3e}\t{}'.format(name, error, isReadOnly), comm)
+        success = success and error == 0.0 and isReadOnly
+
+    # --- Serial remapping (reordered, removed and new points) --- #
+    a = fillData(SerialFlexInterfaceData(p['nPoint'], p['nDim']), A)
+    sourceIndices = np.append(np.arange(p['nPoint']-1, 10, -1), [-1, -1])
+    remapped = a.remap(len(sourceIndices), sourceIndices)
+    reference = np.vstack((A[sourceIndices[:-2]], np.zeros((2, p['nDim']))))
+    error = np.abs(gatherData(remapped)-reference).max()
+    cupyutil.mpiPrint('RES-FSI-SerialInterfaceData_remap: {:.3e}'.format(error), comm)
+    success = success and error == 0.0
+
+    cupyutil.mpiPrint('[Successful Run FSI]: ' + str(success), comm)
+
+    # --- Exit computation --- #
+    cupyutil.mpiBarrier(comm)
+    return 0
+    
+
+# --- This is only accessed if running from command prompt --- #
+if __name__ == '__main__':
+
+    p = {}
+    
+    parser=OptionParser()
+    parser.add_option("--nogui", action="store_true",
+                        help="Specify if we need to use the GUI", dest="nogui", default=False)
+
+    (options, args)=parser.parse_args()
+    
+    nogui = options.nogui
+    
+    main(p, nogui)
@@ -0,0 +1,156 @@
+# -*- coding: latin-1; -*-
+
+''' 
+
+Copyright 2018 University of Lige
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License. 
+
+'''
+
+import os, sys
+
+filePath = os.path.abspath(os.path.dirname(sys.argv[0]))
+fileName = os.path.splitext(os.path.basename(__file__))[0]
+FSICouplerPath = os.path.join(os.path.dirname(__file__), '../../')
+
+sys.path.append(FSICouplerPath)
+
+from optparse import OptionParser
+
+import cupydo.utilities as cupyutil
+import cupydoInterfaces.AnalyticInterface as analytic
+from cupydo.interfaceData import InterfaceMatrix, FlexInterfaceData
+import numpy as np
+
+def getParameters(_p):
+    # --- Input parameters --- #
+    p = {}
+    p['sizes'] = (83, 61)
+    p['density'] = 0.1
+    p['tollMatrix'] = 1e-13
+    p['withMPI'] = True
+    p.update(_p)
+    return p
+
+def main(_p, nogui):
+
+    p = getParameters(_p)
+
+    comm = None
+    myid = 0
+    numberPart = 0
+    rootProcess = 0
+
+    cupyutil.load(fileName, p['withMPI'], comm, myid, numberPart)
+
+    if p['withMPI']:
+        from mpi4py import MPI
+        comm = MPI.COMM_WORLD
+        myid = comm.Get_rank()
+        numberPart = comm.Get_size()
+    else:
+        comm = None
+        myid = 0
+        numberPart = 1
+
+    # --- Reference (numpy) sparse matrix, each rank filling a block of rows --- #
+    nRows, nCols = p['sizes']
+    rng = np.random.RandomState(0)
+    M = rng.rand(nRows, nCols)*(rng.rand(nRows, nCols) < p['density'])
+    localRows = np.array_split(np.arange(nRows), numberPart)[myid]
+
+    # --- Sparse matrix : rows set at once or entry by entry (in random order), some entries overwritten after an assembly --- #
+    sparse = InterfaceMatrix((nRows, nCols), comm)
+    sparse.createSparse(int(np.count_nonzero(M, axis=1).max()), int(np.count_nonzero(M, axis=1).max()))
+    for iRow in localRows[::2]:
+        indices = np.flatnonzero(M[iRow]).astype(np.intc)
+        sparse.setRowValues(int(iRow), indices, M[iRow,indices].copy())
+    for iRow in localRows[1::2]:
+        for jCol in rng.permutation(np.flatnonzero(M[iRow])):
+            sparse.setValue(int(iRow), int(jCol), 0.5)
+            sparse.setValue(int(iRow), int(jCol), M[iRow,jCol])
+    sparse.assemble()
+    for iRow in localRows[::3]:
+        for jCol in np.flatnonzero(M[iRow])[:2]:
+            M[iRow,jCol] = -1.0
+            sparse.setValue(int(iRow), int(jCol), M[iRow,jCol])
+    sparse.assemble()
+
+    # --- Dense matrix with the same entries --- #
+    dense = InterfaceMatrix((nRows, nCols), comm)
+    dense.createDense()
+    for iRow in localRows:
+        for jCol in np.flatnonzero(M[iRow]):
+            dense.setValue(int(iRow), int(jCol), M[iRow,jCol])
+    dense.assemble()
+
+    # --- Sparse matrix whose local rows are set in one call from CSR arrays --- #
+    localCSR = [np.flatnonzero(M[iRow]) for iRow in localRows]
+    csr = InterfaceMatrix((nRows, nCols), comm)
+    csr.createSparse(0, 0)
+    if len(localRows) > 0:
+        csr.setRowsCSR(int(localRows[0]), np.concatenate(([0], np.cumsum([len(cols) for cols in localCSR]))).astype(np.intc),
+                       np.concatenate(localCSR).astype(np.intc), np.concatenate([M[iRow,cols] for iRow, cols in zip(localRows, localCSR)]))
+    csr.assemble()
+
+    # --- Products (of all the components at once) compared with numpy --- #
+    success = True
+    for name, matrix in [('sparse', sparse), ('dense', dense), ('csr', csr)]:
+        errors = []
+        for transpose, nIn, nOut, reference in [(False, nCols, nRows, M), (True, nRows, nCols, M.T)]:
+            data = analytic.randomData(nIn, comm)
+            product = FlexInterfaceData(nOut, 3, comm)
+            if transpose:
+                matrix.multTranspose(data, product)
+            else:
+                matrix.mult(data, product)
+            values = reference.dot(np.random.RandomState(0).rand(3, nIn).T)
+            start, stop = product.getOwnershipRange()
+            localError = max(np.abs(product.getDataArray(iDim)-values[start:stop,iDim]).max() if stop > start else 0.0 for iDim in range(3))
+            errors.append(max(comm.allgather(localError)) if comm != None else localError)
+        cupyutil.mpiPrint('RES-FSI-InterfaceMatrix_{}: {:.3e}\t{:.3e}'.format(name, errors[0], errors[1]), comm)
+        success = success and max(errors) < p['tollMatrix']
+
+    # --- Serial storage : CSR arrays holding exactly the nonzeros --- #
+    if comm == None:
+        storedMatrix = sparse.getMat()
+        csrError = np.abs(storedMatrix.toarray()-M).max()
+        cupyutil.mpiPrint('RES-FSI-InterfaceMatrix_CSR: {:.3e}\t{}\t{}'.format(csrError, storedMatrix.nnz, np.count_nonzero(M)), comm)
+        success = success and sparse.isSparse() and not dense.isSparse() and csrError == 0.0 and storedMatrix.nnz == np.count_nonzero(M)
+        success = success and np.abs(csr.getMat().toarray()-M).max() == 0.0 and csr.getMat().nnz == np.count_nonzero(M)
+
+    cupyutil.mpiPrint('[Successful Run FSI]: ' + str(success), comm)
+
+    # --- Exit computation --- #
+    del csr
+    del sparse
+    del dense
+    cupyutil.mpiBarrier(comm)
+    return 0
+    
+
+# --- This is only accessed if running from command prompt --- #
+if __name__ == '__main__':
+
+    p = {}
+    
+    parser=OptionParser()
+    parser.add_option("--nogui", action="store_true",
+                        help="Specify if we need to use the GUI", dest="nogui", default=False)
+
+    (options, args)=parser.parse_args()
+    
+    nogui = options.nogui
+    
+    main(p, nogui)
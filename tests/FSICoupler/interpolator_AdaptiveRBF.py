@@ -0,0 +1,124 @@
+# -*- coding: latin-1; -*-
+
+''' 
+
+Copyright 2018 University of Lige
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License. 
+
+'''
+
+import os, sys
+
+filePath = os.path.abspath(os.path.dirname(sys.argv[0]))
+fileName = os.path.splitext(os.path.basename(__file__))[0]
+FSICouplerPath = os.path.join(os.path.dirname(__file__), '../../')
+
+sys.path.append(FSICouplerPath)
+
+from optparse import OptionParser
+
+import cupydo.utilities as cupyutil
+import cupydo.manager as cupyman
+import cupydo.interpolator as cupyinterp
+import cupydoInterfaces.AnalyticInterface as analytic
+import numpy as np
+
+def getParameters(_p):
+    # --- Input parameters --- #
+    p = {}
+    p['nDim'] = 3
+    p['computationType'] = 'steady'
+    p['nSolid'] = (9, 8)
+    p['nFluid'] = (14, 13)
+    p['RBFradius'] = 0.6
+    p['nNeighbours'] = 20
+    p['minRadius'] = 0.1
+    p['tollDisp'] = 1e-10
+    p['tollConservation'] = 1e-10
+    p['tollRadii'] = 1e-12
+    p['withMPI'] = False
+    p.update(_p)
+    return p
+
+def main(_p, nogui):
+
+    p = getParameters(_p)
+
+    comm = None
+    myid = 0
+    numberPart = 0
+    rootProcess = 0
+
+    cupyutil.load(fileName, p['withMPI'], comm, myid, numberPart)
+
+    if p['withMPI']:
+        from mpi4py import MPI
+        comm = MPI.COMM_WORLD
+        myid = comm.Get_rank()
+        numberPart = comm.Get_size()
+    else:
+        comm = None
+        myid = 0
+        numberPart = 1
+
+    fluidSolver, solidSolver = analytic.createSolvers(p['nSolid'], p['nFluid'], 0.1, comm, rootProcess)
+    manager = cupyman.Manager(fluidSolver, solidSolver, p['nDim'], p['computationType'], comm)
+
+    # --- Reference radii : distance to the nNeighbours-th nearest solid node (brute force) --- #
+    X, Y, Z, faces = analytic.surfaceGrid(p['nSolid'][0], p['nSolid'][1])
+    points = np.column_stack((X, Y, Z))
+    distances = np.sort(np.linalg.norm(points[:,np.newaxis,:]-points[np.newaxis,:,:], axis=2), axis=1)
+    referenceRadii = np.clip(1.01*distances[:,p['nNeighbours']], 1.01*p['minRadius'], 1.01*p['RBFradius'])
+
+    # --- Adaptive radii, linear reproduction and conservation of the transfers --- #
+    interpolator = cupyinterp.RBFInterpolator(manager, fluidSolver, solidSolver, p['RBFradius'], comm, nNeighbours=p['nNeighbours'], minRadius=p['minRadius'])
+    # the solid interface lies on the root process, which holds all the radii (the other ranks only receive those of the overlapping partitions)
+    radiiError = np.abs(interpolator.getDonorRadii('solid', myid)-referenceRadii).max() if myid == rootProcess else 0.0
+    radiiError = max(comm.allgather(radiiError)) if comm != None else radiiError
+    dispError, forceError, workError = analytic.checkTransfers(interpolator, fluidSolver, solidSolver, comm)
+    cupyutil.mpiPrint('RES-FSI-RBF_adaptive: {:.3e}\t{:.3e}\t{:.3e}\t{:.3e}'.format(radiiError, dispError, forceError, workError), comm)
+    success = radiiError < p['tollRadii'] and dispError < p['tollDisp'] and max(forceError, workError) < p['tollConservation']
+    del interpolator
+
+    # --- Consistent interpolation : linear reproduction only --- #
+    interpolator = cupyinterp.ConsistentRBFInterpolator(manager, fluidSolver, solidSolver, p['RBFradius'], comm, nNeighbours=p['nNeighbours'], minRadius=p['minRadius'])
+    dispError, forceError, workError = analytic.checkTransfers(interpolator, fluidSolver, solidSolver, comm)
+    cupyutil.mpiPrint('RES-FSI-ConsistentRBF_adaptive: {:.3e}'.format(dispError), comm)
+    success = success and dispError < p['tollDisp']
+
+    cupyutil.mpiPrint('[Successful Run FSI]: ' + str(success), comm)
+
+    # --- Exit computation --- #
+    del interpolator
+    del manager
+    del fluidSolver
+    del solidSolver
+    cupyutil.mpiBarrier(comm)
+    return 0
+    
+
+# --- This is only accessed if running from command prompt --- #
+if __name__ == '__main__':
+
+    p = {}
+    
+    parser=OptionParser()
+    parser.add_option("--nogui", action="store_true",
+                        help="Specify if we need to use the GUI", dest="nogui", default=False)
+
+    (options, args)=parser.parse_args()
+    
+    nogui = options.nogui
+    
+    main(p, nogui)
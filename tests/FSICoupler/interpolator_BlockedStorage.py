@@ -0,0 +1,126 @@
+# -*- coding: latin-1; -*-
+
+''' 
+
+Copyright 2018 University of Lige
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License. 
+
+'''
+
+import os, sys
+
+filePath = os.path.abspath(os.path.dirname(sys.argv[0]))
+fileName = os.path.splitext(os.path.basename(__file__))[0]
+FSICouplerPath = os.path.join(os.path.dirname(__file__), '../../')
+
+sys.path.append(FSICouplerPath)
+
+from optparse import OptionParser
+
+import cupydo.utilities as cupyutil
+import cupydo.manager as cupyman
+import cupydo.interpolator as cupyinterp
+import cupydoInterfaces.AnalyticInterface as analytic
+import numpy as np
+
+def getParameters(_p):
+    # --- Input parameters --- #
+    p = {}
+    p['nDim'] = 3
+    p['computationType'] = 'steady'
+    p['nSolid'] = (9, 8)
+    p['nFluid'] = (14, 13)
+    p['RBFradius'] = 0.6
+    p['patchRadius'] = 0.4
+    p['tollBlocked'] = 1e-12
+    p['withMPI'] = True
+    p.update(_p)
+    return p
+
+def main(_p, nogui):
+
+    p = getParameters(_p)
+
+    comm = None
+    myid = 0
+    numberPart = 0
+    rootProcess = 0
+
+    cupyutil.load(fileName, p['withMPI'], comm, myid, numberPart)
+
+    if p['withMPI']:
+        from mpi4py import MPI
+        comm = MPI.COMM_WORLD
+        myid = comm.Get_rank()
+        numberPart = comm.Get_size()
+    else:
+        comm = None
+        myid = 0
+        numberPart = 1
+
+    if comm == None:
+        cupyutil.mpiPrint('The blocked storage is only used in parallel (the serial storage is already interleaved).', comm)
+
+    interpolators = [('RBF', lambda manager, fluidSolver, solidSolver : cupyinterp.RBFInterpolator(manager, fluidSolver, solidSolver, p['RBFradius'], comm)),
+                     ('TPS', lambda manager, fluidSolver, solidSolver : cupyinterp.TPSInterpolator(manager, fluidSolver, solidSolver, comm)),
+                     ('ConsistentRBF', lambda manager, fluidSolver, solidSolver : cupyinterp.ConsistentRBFInterpolator(manager, fluidSolver, solidSolver, p['RBFradius'], comm)),
+                     ('PU', lambda manager, fluidSolver, solidSolver : cupyinterp.PartitionOfUnityRBFInterpolator(manager, fluidSolver, solidSolver, p['patchRadius'], mpiComm=comm))]
+
+    # --- The transfers with the blocked (interleaved) storage match the ones with one vector per component --- #
+    success = True
+    fluidSolver, solidSolver = analytic.createSolvers(p['nSolid'], p['nFluid'], 0.1, comm, rootProcess)
+    manager = cupyman.Manager(fluidSolver, solidSolver, p['nDim'], p['computationType'], comm)
+    for name, createInterpolator in interpolators:
+        interpolator = createInterpolator(manager, fluidSolver, solidSolver)
+        errors = analytic.checkTransfers(interpolator, fluidSolver, solidSolver, comm)
+        displacements = np.array(fluidSolver.displacements)
+        loads = np.array(solidSolver.loads) if solidSolver != None else np.zeros((3,0))
+        del interpolator
+
+        interpolator = createInterpolator(manager, fluidSolver, solidSolver)
+        interpolator.enableBlockedStorage()
+        blockedErrors = analytic.checkTransfers(interpolator, fluidSolver, solidSolver, comm)
+        difference = np.abs(np.array(fluidSolver.displacements)-displacements).max() if fluidSolver.nPhysicalNodes > 0 else 0.0
+        if solidSolver != None:
+            difference = max(difference, np.abs(np.array(solidSolver.loads)-loads).max())
+        difference = max(comm.allgather(difference)) if comm != None else difference
+        del interpolator
+
+        cupyutil.mpiPrint('RES-FSI-{}_blocked: {:.3e}\t{:.3e}\t{:.3e}'.format(name, difference, errors[0], blockedErrors[0]), comm)
+        success = success and difference < p['tollBlocked'] and abs(errors[0]-blockedErrors[0]) < p['tollBlocked']
+
+    cupyutil.mpiPrint('[Successful Run FSI]: ' + str(success), comm)
+
+    # --- Exit computation --- #
+    del manager
+    del fluidSolver
+    del solidSolver
+    cupyutil.mpiBarrier(comm)
+    return 0
+    
+
+# --- This is only accessed if running from command prompt --- #
+if __name__ == '__main__':
+
+    p = {}
+    
+    parser=OptionParser()
+    parser.add_option("--nogui", action="store_true",
+                        help="Specify if we need to use the GUI", dest="nogui", default=False)
+
+    (options, args)=parser.parse_args()
+    
+    nogui = options.nogui
+    
+    main(p, nogui)
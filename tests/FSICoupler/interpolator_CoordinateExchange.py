@@ -0,0 +1,140 @@
+# -*- coding: latin-1; -*-
+
+''' 
+
+Copyright 2018 University of Lige
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License. 
+
+'''
+
+import os, sys
+
+filePath = os.path.abspath(os.path.dirname(sys.argv[0]))
+fileName = os.path.splitext(os.path.basename(__file__))[0]
+FSICouplerPath = os.path.join(os.path.dirname(__file__), '../../')
+
+sys.path.append(FSICouplerPath)
+
+from optparse import OptionParser
+
+import cupydo.utilities as cupyutil
+import cupydo.manager as cupyman
+import cupydo.interpolator as cupyinterp
+import cupydoInterfaces.AnalyticInterface as analytic
+import numpy as np
+
+def getParameters(_p):
+    # --- Input parameters --- #
+    p = {}
+    p['nDim'] = 3
+    p['computationType'] = 'steady'
+    p['nSolid'] = (31, 9)
+    p['nFluid'] = (40, 11)
+    p['RBFradius'] = 0.12
+    p['tollDisp'] = 1e-8
+    p['tollConservation'] = 1e-10
+    p['withMPI'] = True
+    p.update(_p)
+    return p
+
+def checkExchange(interpolator, donorPhysics, donorSolver, receiverSolver, comm):
+    """
+    Checks that the coordinates received by the rank from the donor partitions are exact, and that they come from all the donor partitions
+    having a node within the kernel support of a local receiver node. Returns this check and the number of received partitions.
+    """
+
+    received = interpolator.exchangeInterfaceCoordinates(donorPhysics, 'fluid' if donorPhysics == 'solid' else 'solid')
+
+    localDonor = np.column_stack(donorSolver.getNodalInitialPositions()) if donorSolver != None else np.zeros((0, 3))
+    donors = comm.allgather(localDonor) if comm != None else [localDonor]
+    receivers = np.column_stack(receiverSolver.getNodalInitialPositions()) if receiverSolver != None else np.zeros((0, 3))
+
+    isExact = all(np.array_equal(np.column_stack(buff[1:]), donors[buff[0]]) for buff in received)
+    receivedProcs = set(buff[0] for buff in received)
+    for iProc, points in enumerate(donors):
+        if len(points) > 0 and len(receivers) > 0:
+            distances = np.sqrt(np.sum((receivers[:,np.newaxis,:]-points[np.newaxis,:,:])**2, axis=2))
+            if distances.min() <= interpolator.getKernelRadius() and iProc not in receivedProcs:
+                isExact = False
+    isExact = cupyutil.mpiAllReduce(comm, int(not isExact)) == 0
+
+    return isExact, len(received)
+
+def main(_p, nogui):
+
+    p = getParameters(_p)
+
+    comm = None
+    myid = 0
+    numberPart = 0
+    rootProcess = 0
+
+    cupyutil.load(fileName, p['withMPI'], comm, myid, numberPart)
+
+    if p['withMPI']:
+        from mpi4py import MPI
+        comm = MPI.COMM_WORLD
+        myid = comm.Get_rank()
+        numberPart = comm.Get_size()
+    else:
+        comm = None
+        myid = 0
+        numberPart = 1
+
+    # --- Both interfaces partitioned in strips along x --- #
+    fluidSolver = analytic.AnalyticFluidSolver(*analytic.partition(*analytic.surfaceGrid(p['nFluid'][0], p['nFluid'][1]), myid=myid, nProcs=numberPart))
+    solidSolver = analytic.AnalyticSolidSolver(*analytic.partition(*analytic.surfaceGrid(p['nSolid'][0], p['nSolid'][1]), myid=myid, nProcs=numberPart))
+    manager = cupyman.Manager(fluidSolver, solidSolver, p['nDim'], p['computationType'], comm)
+
+    # --- Exchanges of the coordinates : exact and complete, but limited to the neighbouring strips --- #
+    success = True
+    for name, Interpolator, donorPhysics in [('RBF', cupyinterp.RBFInterpolator, 'solid'), ('ConsistentRBF', cupyinterp.ConsistentRBFInterpolator, 'fluid')]:
+        interpolator = Interpolator(manager, fluidSolver, solidSolver, p['RBFradius'], comm)
+        if donorPhysics == 'solid':
+            isExact, nReceived = checkExchange(interpolator, 'solid', solidSolver, fluidSolver, comm)
+        else:
+            isExact, nReceived = checkExchange(interpolator, 'fluid', fluidSolver, solidSolver, comm)
+        nReceived = max(comm.allgather(nReceived)) if comm != None else nReceived
+        dispError, forceError, workError = analytic.checkTransfers(interpolator, fluidSolver, solidSolver, comm)
+        cupyutil.mpiPrint('RES-FSI-{}_exchange: {}\t{}\t{:.3e}\t{:.3e}\t{:.3e}'.format(name, isExact, nReceived, dispError, forceError, workError), comm)
+        # a strip only overlaps the nearest strips, the farthest ones are never received
+        success = success and isExact and (numberPart < 4 or nReceived < numberPart) and dispError < p['tollDisp']
+        if donorPhysics == 'solid':
+            success = success and max(forceError, workError) < p['tollConservation']
+        del interpolator
+
+    cupyutil.mpiPrint('[Successful Run FSI]: ' + str(success), comm)
+
+    # --- Exit computation --- #
+    del manager
+    del fluidSolver
+    del solidSolver
+    cupyutil.mpiBarrier(comm)
+    return 0
+    
+
+# --- This is only accessed if running from command prompt --- #
+if __name__ == '__main__':
+
+    p = {}
+    
+    parser=OptionParser()
+    parser.add_option("--nogui", action="store_true",
+                        help="Specify if we need to use the GUI", dest="nogui", default=False)
+
+    (options, args)=parser.parse_args()
+    
+    nogui = options.nogui
+    
+    main(p, nogui)
@@ -0,0 +1,143 @@
+# -*- coding: latin-1; -*-
+
+''' 
+
+Copyright 2018 University of Lige
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License. 
+
+'''
+
+import os, sys
+
+filePath = os.path.abspath(os.path.dirname(sys.argv[0]))
+fileName = os.path.splitext(os.path.basename(__file__))[0]
+FSICouplerPath = os.path.join(os.path.dirname(__file__), '../../')
+
+sys.path.append(FSICouplerPath)
+
+from optparse import OptionParser
+
+import cupydo.utilities as cupyutil
+import cupydo.manager as cupyman
+import cupydo.interpolator as cupyinterp
+import cupydoInterfaces.AnalyticInterface as analytic
+import numpy as np
+
+def getParameters(_p):
+    # --- Input parameters --- #
+    p = {}
+    p['nDim'] = 3
+    p['computationType'] = 'steady'
+    p['nSolid'] = (12, 11)
+    p['nFluid'] = (17, 15)
+    p['RBFradius'] = 0.4
+    p['blockSize'] = 16
+    p['tollDisp'] = 1e-10
+    p['tollConservation'] = 1e-10
+    p['tollSolve'] = 1e-10
+    p['withMPI'] = True
+    p.update(_p)
+    return p
+
+def compareTransfers(interpolator, fluidSolver, solidSolver, comm, p):
+    """
+    Transfers with the solves, then with the explicit operators (built by blocks of blockSize rows).
+    Returns the errors of the explicit transfers and their relative differences with the ones of the solves.
+    """
+
+    analytic.checkTransfers(interpolator, fluidSolver, solidSolver, comm)
+    displacements = np.array(fluidSolver.displacements) if fluidSolver != None else np.zeros((3,0))
+    loads = np.array(solidSolver.loads) if solidSolver != None else np.zeros((3,0))
+
+    interpolator.computeExplicitOperators(blockSize=p['blockSize'])
+    dispError, forceError, workError = analytic.checkTransfers(interpolator, fluidSolver, solidSolver, comm)
+    dispDifference = np.abs(np.array(fluidSolver.displacements)-displacements).max() if displacements.size > 0 else 0.0
+    loadDifference = np.abs(np.array(solidSolver.loads)-loads).max()/np.abs(loads).max() if loads.size > 0 else 0.0
+    difference = max(comm.allgather(max(dispDifference, loadDifference))) if comm != None else max(dispDifference, loadDifference)
+
+    return dispError, forceError, workError, difference
+
+def main(_p, nogui):
+
+    p = getParameters(_p)
+
+    comm = None
+    myid = 0
+    numberPart = 0
+    rootProcess = 0
+
+    cupyutil.load(fileName, p['withMPI'], comm, myid, numberPart)
+
+    if p['withMPI']:
+        from mpi4py import MPI
+        comm = MPI.COMM_WORLD
+        myid = comm.Get_rank()
+        numberPart = comm.Get_size()
+    else:
+        comm = None
+        myid = 0
+        numberPart = 1
+
+    fluidSolver, solidSolver = analytic.createSolvers(p['nSolid'], p['nFluid'], 0.1, comm, rootProcess)
+    manager = cupyman.Manager(fluidSolver, solidSolver, p['nDim'], p['computationType'], comm)
+
+    # --- Conservative RBF : the explicit operator gives the transfers of the solves --- #
+    interpolator = cupyinterp.RBFInterpolator(manager, fluidSolver, solidSolver, p['RBFradius'], comm)
+    dispError, forceError, workError, difference = compareTransfers(interpolator, fluidSolver, solidSolver, comm, p)
+    cupyutil.mpiPrint('RES-FSI-RBF_explicit: {:.3e}\t{:.3e}\t{:.3e}\t{:.3e}'.format(dispError, forceError, workError, difference), comm)
+    success = dispError < p['tollDisp'] and max(forceError, workError) < p['tollConservation'] and difference < p['tollSolve']
+    del interpolator
+
+    # --- Consistent RBF : both explicit operators --- #
+    interpolator = cupyinterp.ConsistentRBFInterpolator(manager, fluidSolver, solidSolver, p['RBFradius'], comm)
+    dispError, forceError, workError, difference = compareTransfers(interpolator, fluidSolver, solidSolver, comm, p)
+    cupyutil.mpiPrint('RES-FSI-ConsistentRBF_explicit: {:.3e}\t{:.3e}'.format(dispError, difference), comm)
+    success = success and dispError < p['tollDisp'] and difference < p['tollSolve']
+    del interpolator
+
+    # --- The dense explicit operators of the TPS are refused --- #
+    interpolator = cupyinterp.TPSInterpolator(manager, fluidSolver, solidSolver, comm)
+    try:
+        interpolator.computeExplicitOperators()
+        refused = False
+    except Exception:
+        refused = True
+    cupyutil.mpiPrint('RES-FSI-TPS_explicit_refused: {}'.format(refused), comm)
+    success = success and refused
+
+    cupyutil.mpiPrint('[Successful Run FSI]: ' + str(success), comm)
+
+    # --- Exit computation --- #
+    del interpolator
+    del manager
+    del fluidSolver
+    del solidSolver
+    cupyutil.mpiBarrier(comm)
+    return 0
+    
+
+# --- This is only accessed if running from command prompt --- #
+if __name__ == '__main__':
+
+    p = {}
+    
+    parser=OptionParser()
+    parser.add_option("--nogui", action="store_true",
+                        help="Specify if we need to use the GUI", dest="nogui", default=False)
+
+    (options, args)=parser.parse_args()
+    
+    nogui = options.nogui
+    
+    main(p, nogui)
@@ -0,0 +1,134 @@
+# -*- coding: latin-1; -*-
+
+''' 
+
+Copyright 2018 University of Lige
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License. 
+
+'''
+
+import os, sys
+
+filePath = os.path.abspath(os.path.dirname(sys.argv[0]))
+fileName = os.path.splitext(os.path.basename(__file__))[0]
+FSICouplerPath = os.path.join(os.path.dirname(__file__), '../../')
+
+sys.path.append(FSICouplerPath)
+
+from optparse import OptionParser
+
+import cupydo.utilities as cupyutil
+import cupydo.manager as cupyman
+import cupydo.interpolator as cupyinterp
+import cupydoInterfaces.AnalyticInterface as analytic
+import numpy as np
+
+def getParameters(_p):
+    # --- Input parameters --- #
+    p = {}
+    p['nDim'] = 3
+    p['computationType'] = 'steady'
+    p['nSolid'] = (9, 8)
+    p['nFluid'] = (14, 13)
+    p['nNeighbours'] = 4
+    p['power'] = 2.0
+    p['tollDisp'] = 1e-12
+    p['tollConservation'] = 1e-12
+    p['withMPI'] = False
+    p.update(_p)
+    return p
+
+def constantField(X, Y, Z):
+    return (np.full(len(X), 1.5), np.full(len(X), -0.5), np.full(len(X), 0.25))
+
+def main(_p, nogui):
+
+    p = getParameters(_p)
+
+    comm = None
+    myid = 0
+    numberPart = 0
+    rootProcess = 0
+
+    cupyutil.load(fileName, p['withMPI'], comm, myid, numberPart)
+
+    if p['withMPI']:
+        from mpi4py import MPI
+        comm = MPI.COMM_WORLD
+        myid = comm.Get_rank()
+        numberPart = comm.Get_size()
+    else:
+        comm = None
+        myid = 0
+        numberPart = 1
+
+    fluidSolver, solidSolver = analytic.createSolvers(p['nSolid'], p['nFluid'], 0.1, comm, rootProcess)
+    manager = cupyman.Manager(fluidSolver, solidSolver, p['nDim'], p['computationType'], comm)
+    interpolator = cupyinterp.IDWInterpolator(manager, fluidSolver, solidSolver, p['nNeighbours'], p['power'], comm)
+
+    # --- Constant reproduction and conservation of the transfers --- #
+    dispError, forceError, workError = analytic.checkTransfers(interpolator, fluidSolver, solidSolver, comm, constantField)
+    cupyutil.mpiPrint('RES-FSI-IDW_constant: {:.3e}\t{:.3e}\t{:.3e}'.format(dispError, forceError, workError), comm)
+    success = dispError < p['tollDisp'] and max(forceError, workError) < p['tollConservation']
+
+    # --- Linear field : weighted mean of the nNeighbours nearest solid nodes (brute force), conservation --- #
+    dispError, forceError, workError = analytic.checkTransfers(interpolator, fluidSolver, solidSolver, comm)
+    X, Y, Z, faces = analytic.surfaceGrid(p['nSolid'][0], p['nSolid'][1])
+    solidValues = np.column_stack(analytic.linearField(X, Y, Z))
+    fluidPoints = np.column_stack(fluidSolver.getNodalInitialPositions())
+    distances = np.linalg.norm(fluidPoints[:,np.newaxis,:]-np.column_stack((X, Y, Z))[np.newaxis,:,:], axis=2)
+    neighbours = np.argsort(distances, axis=1)
+    referenceError, nCompared = 0.0, 0
+    for iVertex in range(fluidSolver.nPhysicalNodes):
+        rowDistances = distances[iVertex,neighbours[iVertex]]
+        # the selected neighbours are ambiguous if the next node is as close as the last one
+        if rowDistances[p['nNeighbours']]-rowDistances[p['nNeighbours']-1] < 1e-12:
+            continue
+        if rowDistances[0] <= 1e-12*rowDistances[p['nNeighbours']-1]:
+            reference = solidValues[neighbours[iVertex,0]]
+        else:
+            weights = rowDistances[:p['nNeighbours']]**(-p['power'])
+            reference = weights.dot(solidValues[neighbours[iVertex,:p['nNeighbours']]])/np.sum(weights)
+        referenceError = max(referenceError, np.abs(np.array(fluidSolver.displacements)[:,iVertex]-reference).max())
+        nCompared += 1
+    referenceError = max(comm.allgather(referenceError)) if comm != None else referenceError
+    nCompared = cupyutil.mpiAllReduce(comm, nCompared)
+    cupyutil.mpiPrint('RES-FSI-IDW_linear: {:.3e}\t{}\t{:.3e}\t{:.3e}\t{:.3e}'.format(dispError, nCompared, referenceError, forceError, workError), comm)
+    success = success and nCompared > manager.getNumberOfFluidInterfaceNodes()/2 and referenceError < p['tollDisp'] and max(forceError, workError) < p['tollConservation']
+
+    cupyutil.mpiPrint('[Successful Run FSI]: ' + str(success), comm)
+
+    # --- Exit computation --- #
+    del interpolator
+    del manager
+    del fluidSolver
+    del solidSolver
+    cupyutil.mpiBarrier(comm)
+    return 0
+    
+
+# --- This is only accessed if running from command prompt --- #
+if __name__ == '__main__':
+
+    p = {}
+    
+    parser=OptionParser()
+    parser.add_option("--nogui", action="store_true",
+                        help="Specify if we need to use the GUI", dest="nogui", default=False)
+
+    (options, args)=parser.parse_args()
+    
+    nogui = options.nogui
+    
+    main(p, nogui)
@@ -0,0 +1,175 @@
+# -*- coding: latin-1; -*-
+
+''' 
+
+Copyright 2018 University of Lige
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License. 
+
+'''
+
+import os, sys
+
+filePath = os.path.abspath(os.path.dirname(sys.argv[0]))
+fileName = os.path.splitext(os.path.basename(__file__))[0]
+FSICouplerPath = os.path.join(os.path.dirname(__file__), '../../')
+
+sys.path.append(FSICouplerPath)
+
+from optparse import OptionParser
+
+import cupydo.utilities as cupyutil
+import cupydo.manager as cupyman
+import cupydo.interpolator as cupyinterp
+import cupydoInterfaces.AnalyticInterface as analytic
+import numpy as np
+
+def getParameters(_p):
+    # --- Input parameters --- #
+    p = {}
+    p['nDim'] = 3
+    p['computationType'] = 'steady'
+    p['nSolid'] = (15, 13)
+    p['nFluid'] = (22, 19)
+    p['RBFradius'] = 0.3
+    p['mappingCacheDir'] = '.'
+    p['withMPI'] = True
+    p.update(_p)
+    return p
+
+def getCacheKeys(cacheDir, comm):
+    """
+    Keys of the entries of the mapping cache (as seen from the first rank).
+    """
+
+    keys = set(entryName.split('_')[0] for entryName in os.listdir(cacheDir) if entryName.endswith('.bin'))
+    cupyutil.mpiBarrier(comm)
+
+    return comm.bcast(keys, root=0) if comm != None else keys
+
+def transferResults(interpolator, fluidSolver, solidSolver, comm):
+    """
+    Displacements and loads obtained by checkTransfers.
+    """
+
+    analytic.checkTransfers(interpolator, fluidSolver, solidSolver, comm)
+    loads = np.array(solidSolver.loads) if solidSolver != None else np.zeros((3, 0))
+
+    return np.array(fluidSolver.displacements), loads
+
+def main(_p, nogui):
+
+    p = getParameters(_p)
+
+    comm = None
+    myid = 0
+    numberPart = 0
+    rootProcess = 0
+
+    cupyutil.load(fileName, p['withMPI'], comm, myid, numberPart)
+
+    if p['withMPI']:
+        from mpi4py import MPI
+        comm = MPI.COMM_WORLD
+        myid = comm.Get_rank()
+        numberPart = comm.Get_size()
+    else:
+        comm = None
+        myid = 0
+        numberPart = 1
+
+    fluidSolver, solidSolver = analytic.createSolvers(p['nSolid'], p['nFluid'], 0.1, comm, rootProcess)
+    manager = cupyman.Manager(fluidSolver, solidSolver, p['nDim'], p['computationType'], comm)
+    # the workspace (emptied by load) holds the mapping cache
+    cacheDir = p['mappingCacheDir']
+
+    interpolators = [('RBF', cupyinterp.RBFInterpolator, (p['RBFradius'], comm)),
+                     ('ConsistentRBF', cupyinterp.ConsistentRBFInterpolator, (p['RBFradius'], comm)),
+                     ('IDW', cupyinterp.IDWInterpolator, (4, 2.0, comm))]
+
+    success = True
+    for name, Interpolator, arguments in interpolators:
+        # --- The first interpolator builds and stores its matrices under a new key --- #
+        nKeys = len(getCacheKeys(cacheDir, comm))
+        interpolator = Interpolator(manager, fluidSolver, solidSolver, *arguments, mappingCacheDir=cacheDir)
+        isStored = analytic.isInMappingCache(interpolator) and len(getCacheKeys(cacheDir, comm)) == nKeys+1
+        results = transferResults(interpolator, fluidSolver, solidSolver, comm)
+
+        # --- The second one loads them : same matrices, same transfers, no new key --- #
+        cachedInterpolator = Interpolator(manager, fluidSolver, solidSolver, *arguments, mappingCacheDir=cacheDir)
+        isStored = isStored and len(getCacheKeys(cacheDir, comm)) == nKeys+1
+        matrices, cachedMatrices = interpolator.getMappingMatrices(), cachedInterpolator.getMappingMatrices()
+        difference = max(analytic.matrixDifference(matrices[key], cachedMatrices[key], comm) for key in matrices.keys())
+        cachedResults = transferResults(cachedInterpolator, fluidSolver, solidSolver, comm)
+        transferDifference = max(np.abs(cachedResults[i]-results[i]).max() if results[i].size > 0 else 0.0 for i in range(2))
+        transferDifference = max(comm.allgather(transferDifference)) if comm != None else transferDifference
+        cupyutil.mpiPrint('RES-FSI-{}_cache: {}\t{:.3e}\t{:.3e}'.format(name, isStored, difference, transferDifference), comm)
+        success = success and isStored and difference == 0.0 and transferDifference == 0.0
+
+        del cachedInterpolator
+        del interpolator
+
+    # --- Other settings or other coordinates give other keys --- #
+    nKeys = len(getCacheKeys(cacheDir, comm))
+    interpolator = cupyinterp.RBFInterpolator(manager, fluidSolver, solidSolver, 1.5*p['RBFradius'], comm, mappingCacheDir=cacheDir)
+    del interpolator
+    movedFluidSolver, movedSolidSolver = analytic.createSolvers(p['nSolid'], p['nFluid'], 0.15, comm, rootProcess)
+    movedManager = cupyman.Manager(movedFluidSolver, movedSolidSolver, p['nDim'], p['computationType'], comm)
+    interpolator = cupyinterp.RBFInterpolator(movedManager, movedFluidSolver, movedSolidSolver, p['RBFradius'], comm, mappingCacheDir=cacheDir)
+    del interpolator
+    nNewKeys = len(getCacheKeys(cacheDir, comm))-nKeys
+    cupyutil.mpiPrint('RES-FSI-cache_keys: {}'.format(nNewKeys), comm)
+    success = success and nNewKeys == 2
+
+    # --- An unreadable entry is rebuilt (serial storage only, PETSc aborts on corrupted files) --- #
+    if comm == None:
+        interpolator = cupyinterp.RBFInterpolator(manager, fluidSolver, solidSolver, p['RBFradius'], comm, mappingCacheDir=cacheDir)
+        results = transferResults(interpolator, fluidSolver, solidSolver, comm)
+        for entryName in [entryName for entryName in os.listdir(cacheDir) if entryName.endswith('.bin')]:
+            with open(os.path.join(cacheDir, entryName), 'r+b') as cacheFile:
+                cacheFile.truncate(16)
+        rebuiltInterpolator = cupyinterp.RBFInterpolator(manager, fluidSolver, solidSolver, p['RBFradius'], comm, mappingCacheDir=cacheDir)
+        rebuiltResults = transferResults(rebuiltInterpolator, fluidSolver, solidSolver, comm)
+        transferDifference = max(np.abs(rebuiltResults[i]-results[i]).max() for i in range(2))
+        cupyutil.mpiPrint('RES-FSI-cache_rebuilt: {:.3e}'.format(transferDifference), comm)
+        success = success and transferDifference == 0.0 and analytic.isInMappingCache(rebuiltInterpolator)
+        del rebuiltInterpolator
+        del interpolator
+
+    cupyutil.mpiPrint('[Successful Run FSI]: ' + str(success), comm)
+
+    # --- Exit computation --- #
+    del movedManager
+    del movedFluidSolver
+    del movedSolidSolver
+    del manager
+    del fluidSolver
+    del solidSolver
+    cupyutil.mpiBarrier(comm)
+    return 0
+    
+
+# --- This is only accessed if running from command prompt --- #
+if __name__ == '__main__':
+
+    p = {}
+    
+    parser=OptionParser()
+    parser.add_option("--nogui", action="store_true",
+                        help="Specify if we need to use the GUI", dest="nogui", default=False)
+
+    (options, args)=parser.parse_args()
+    
+    nogui = options.nogui
+    
+    main(p, nogui)
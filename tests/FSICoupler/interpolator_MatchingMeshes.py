@@ -0,0 +1,137 @@
+# -*- coding: latin-1; -*-
+
+''' 
+
+Copyright 2018 University of Lige
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License. 
+
+'''
+
+import os, sys
+
+filePath = os.path.abspath(os.path.dirname(sys.argv[0]))
+fileName = os.path.splitext(os.path.basename(__file__))[0]
+FSICouplerPath = os.path.join(os.path.dirname(__file__), '../../')
+
+sys.path.append(FSICouplerPath)
+
+from optparse import OptionParser
+
+import cupydo.utilities as cupyutil
+import cupydo.manager as cupyman
+import cupydo.interpolator as cupyinterp
+from cupydo.interfaceData import InterfaceMatrix, FlexInterfaceData
+import cupydoInterfaces.AnalyticInterface as analytic
+import numpy as np
+
+def getParameters(_p):
+    # --- Input parameters --- #
+    p = {}
+    p['nDim'] = 3
+    p['computationType'] = 'steady'
+    p['nInterface'] = (13, 11)
+    p['withMPI'] = True
+    p.update(_p)
+    return p
+
+def main(_p, nogui):
+
+    p = getParameters(_p)
+
+    comm = None
+    myid = 0
+    numberPart = 0
+    rootProcess = 0
+
+    cupyutil.load(fileName, p['withMPI'], comm, myid, numberPart)
+
+    if p['withMPI']:
+        from mpi4py import MPI
+        comm = MPI.COMM_WORLD
+        myid = comm.Get_rank()
+        numberPart = comm.Get_size()
+    else:
+        comm = None
+        myid = 0
+        numberPart = 1
+
+    # --- Same nodes on both sides, shuffled and partitioned on the fluid side, on rootProcess on the solid side --- #
+    X, Y, Z, faces = analytic.surfaceGrid(p['nInterface'][0], p['nInterface'][1])
+    shuffle = np.random.RandomState(0).permutation(len(X))
+    fluidSolver = analytic.AnalyticFluidSolver(*analytic.partition(X[shuffle], Y[shuffle], Z[shuffle], np.argsort(shuffle)[faces].astype(np.intc), myid, numberPart))
+    solidSolver = analytic.AnalyticSolidSolver(X, Y, Z, faces) if myid == rootProcess else None
+    manager = cupyman.Manager(fluidSolver, solidSolver, p['nDim'], p['computationType'], comm)
+
+    interpolator = cupyinterp.MatchingMeshesInterpolator(manager, fluidSolver, solidSolver, comm)
+    ns, nf = interpolator.getNs(), interpolator.getNf()
+
+    # --- Mapping of the former sparse matrix H : unit entries between the fluid nodes and their solid nodes --- #
+    H = InterfaceMatrix((nf, ns), comm)
+    H.createSparse(1, 1)
+    points = np.column_stack((X, Y, Z))
+    for iVertex, point in enumerate(np.column_stack(fluidSolver.getNodalInitialPositions())):
+        iGlobalVertexFluid = manager.getGlobalIndex('fluid', myid, iVertex)
+        jGlobalVertexSolid = int(np.argmin(np.sum((points-point)**2, axis=1)))
+        H.setValue(iGlobalVertexFluid, jGlobalVertexSolid, 1.0)
+    H.assemble()
+
+    # --- The permutation moves the data as the matrices did --- #
+    multDifference = analytic.matrixDifference(interpolator.H, H, comm)
+    multTransposeDifference = analytic.matrixDifference(interpolator.H, H, comm, transpose=True)
+    cupyutil.mpiPrint('RES-FSI-Permutation_matrices: {:.3e}\t{:.3e}'.format(multDifference, multTransposeDifference), comm)
+    success = multDifference == 0.0 and multTransposeDifference == 0.0
+    if comm == None:
+        # the fluid node i is the solid node shuffle[i]
+        success = success and np.array_equal(interpolator.H.getIndices(), shuffle)
+
+    # --- The transposed permutation is its inverse --- #
+    solidData = analytic.randomData(ns, comm)
+    fluidData = FlexInterfaceData(nf, 3, comm)
+    backData = FlexInterfaceData(ns, 3, comm)
+    interpolator.H.mult(solidData, fluidData)
+    interpolator.H.multTranspose(fluidData, backData)
+    roundTripDifference = np.max(np.array((backData-solidData).norm()))
+    cupyutil.mpiPrint('RES-FSI-Permutation_inverse: {:.3e}'.format(roundTripDifference), comm)
+    success = success and roundTripDifference == 0.0
+
+    # --- Exact transfers --- #
+    dispError, forceError, workError = analytic.checkTransfers(interpolator, fluidSolver, solidSolver, comm)
+    cupyutil.mpiPrint('RES-FSI-Permutation_transfers: {:.3e}\t{:.3e}\t{:.3e}'.format(dispError, forceError, workError), comm)
+    success = success and dispError == 0.0 and max(forceError, workError) < 1e-14
+
+    cupyutil.mpiPrint('[Successful Run FSI]: ' + str(success), comm)
+
+    # --- Exit computation --- #
+    del interpolator
+    del manager
+    del fluidSolver
+    del solidSolver
+    cupyutil.mpiBarrier(comm)
+    return 0
+    
+
+# --- This is only accessed if running from command prompt --- #
+if __name__ == '__main__':
+
+    p = {}
+    
+    parser=OptionParser()
+    parser.add_option("--nogui", action="store_true",
+                        help="Specify if we need to use the GUI", dest="nogui", default=False)
+
+    (options, args)=parser.parse_args()
+    
+    nogui = options.nogui
+    
+    main(p, nogui)
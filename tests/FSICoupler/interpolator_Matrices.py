@@ -0,0 +1,207 @@
+# -*- coding: latin-1; -*-
+
+''' 
+
+Copyright 2018 University of Lige
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License. 
+
+'''
+
+import os, sys
+
+filePath = os.path.abspath(os.path.dirname(sys.argv[0]))
+fileName = os.path.splitext(os.path.basename(__file__))[0]
+FSICouplerPath = os.path.join(os.path.dirname(__file__), '../../')
+
+sys.path.append(FSICouplerPath)
+
+from optparse import OptionParser
+
+import cupydo.utilities as cupyutil
+import cupydo.manager as cupyman
+import cupydo.interpolator as cupyinterp
+import cupydoInterfaces.AnalyticInterface as analytic
+from cupydo.interfaceData import InterfaceMatrix, FlexInterfaceData
+import numpy as np
+
+def getParameters(_p):
+    # --- Input parameters --- #
+    p = {}
+    p['nDim'] = 3
+    p['computationType'] = 'steady'
+    p['nSolid'] = (15, 13)
+    p['nFluid'] = (22, 19)
+    p['RBFradius'] = 0.3
+    p['nNeighbours'] = 12
+    p['tollMatrix'] = 1e-12
+    p['tollTransposed'] = 1e-8
+    p['withMPI'] = True
+    p.update(_p)
+    return p
+
+def kernelMatrix(targets, sources, radius, nDim, saddle=False):
+    """
+    Dense reference of an interpolation matrix : Wendland C2 kernel of support radius (one per source if an array, TPS kernel if None)
+    between the targets and the sources, followed by the linear polynomial columns (and rows if saddle).
+    Returns the matrix and its number of structural nonzeros (kernel support and polynomial blocks, even where they vanish).
+    """
+
+    dist2 = np.sum((targets[:,np.newaxis,:]-sources[np.newaxis,:,:])**2, axis=2)
+    if radius is None:
+        phi = 0.5*dist2*np.log10(np.where(dist2 > 0.0, dist2, 1.0))
+        support = np.ones(phi.shape, dtype=bool)
+    else:
+        eps = np.sqrt(dist2)/radius
+        support = eps < 1.0
+        phi = np.where(support, (1.0-np.minimum(eps, 1.0))**4*(4.0*eps+1.0), 0.0)
+    P = np.column_stack((np.ones(len(targets)), targets[:,:nDim]))
+    if not saddle:
+        return np.hstack((phi, P)), np.count_nonzero(support) + P.size
+    Q = np.column_stack((np.ones(len(sources)), sources[:,:nDim]))
+
+    return np.vstack((np.hstack((phi, P)), np.hstack((Q.T, np.zeros((nDim+1, nDim+1)))))), np.count_nonzero(support) + P.size + Q.size
+
+def toInterfaceMatrix(M, comm, myid, numberPart):
+    """
+    Interface matrix holding the nonzeros of M, each rank setting a block of rows.
+    """
+
+    matrix = InterfaceMatrix(M.shape, comm)
+    rowLength = int(np.count_nonzero(M, axis=1).max())
+    matrix.createSparse(rowLength, rowLength)
+    for iRow in np.array_split(np.arange(M.shape[0]), numberPart)[myid]:
+        indices = np.flatnonzero(M[iRow]).astype(np.intc)
+        matrix.setRowValues(int(iRow), indices, M[iRow,indices].copy())
+    matrix.assemble()
+
+    return matrix
+
+def main(_p, nogui):
+
+    p = getParameters(_p)
+
+    comm = None
+    myid = 0
+    numberPart = 0
+    rootProcess = 0
+
+    cupyutil.load(fileName, p['withMPI'], comm, myid, numberPart)
+
+    if p['withMPI']:
+        from mpi4py import MPI
+        comm = MPI.COMM_WORLD
+        myid = comm.Get_rank()
+        numberPart = comm.Get_size()
+    else:
+        comm = None
+        myid = 0
+        numberPart = 1
+
+    fluidSolver, solidSolver = analytic.createSolvers(p['nSolid'], p['nFluid'], 0.1, comm, rootProcess)
+    manager = cupyman.Manager(fluidSolver, solidSolver, p['nDim'], p['computationType'], comm)
+
+    # the fluid nodes are numbered as in the grid (contiguous partitions), the solid ones lie on rootProcess
+    solid = np.column_stack(analytic.surfaceGrid(p['nSolid'][0], p['nSolid'][1])[:3])
+    fluid = np.column_stack(analytic.surfaceGrid(p['nFluid'][0], p['nFluid'][1])[:3])
+
+    # --- Brute force references of the compact RBF matrices --- #
+    success = True
+    for name, Interpolator in [('RBF', cupyinterp.RBFInterpolator), ('ConsistentRBF', cupyinterp.ConsistentRBFInterpolator)]:
+        interpolator = Interpolator(manager, fluidSolver, solidSolver, p['RBFradius'], comm)
+        radius = interpolator.getKernelRadius()
+        references = {'A':kernelMatrix(solid, solid, radius, p['nDim'], True), 'B':kernelMatrix(fluid, solid, radius, p['nDim'])}
+        if name == 'ConsistentRBF':
+            references.update({'C':kernelMatrix(fluid, fluid, radius, p['nDim'], True), 'D':kernelMatrix(solid, fluid, radius, p['nDim'])})
+        matrices = interpolator.getMappingMatrices()
+        for key in sorted(references.keys()):
+            reference, nReferenceNonZeros = references[key]
+            referenceMatrix = toInterfaceMatrix(reference, comm, myid, numberPart)
+            difference = max(analytic.matrixDifference(matrices[key], referenceMatrix, comm), analytic.matrixDifference(matrices[key], referenceMatrix, comm, transpose=True))
+            success = success and difference < p['tollMatrix']
+            # --- Exact preallocation : only the kernel support and the polynomial blocks are stored (serial storage) --- #
+            if comm == None:
+                nNonZeros = matrices[key].getMat().nnz
+                cupyutil.mpiPrint('RES-FSI-{}_{}: {:.3e}\t{}\t{}'.format(name, key, difference, nNonZeros, nReferenceNonZeros), comm)
+                success = success and nNonZeros == nReferenceNonZeros
+            else:
+                cupyutil.mpiPrint('RES-FSI-{}_{}: {:.3e}'.format(name, key, difference), comm)
+            del referenceMatrix
+        del interpolator
+
+    # --- Batched kernels with one support radius per donor (adaptive radii, brute force nNeighbours-th nearest neighbour) --- #
+    interpolator = cupyinterp.RBFInterpolator(manager, fluidSolver, solidSolver, p['RBFradius'], comm, nNeighbours=p['nNeighbours'])
+    distances = np.sort(np.sqrt(np.sum((solid[:,np.newaxis,:]-solid[np.newaxis,:,:])**2, axis=2)), axis=1)
+    radii = np.minimum(1.01*distances[:,p['nNeighbours']], interpolator.getKernelRadius())
+    references = {'A':kernelMatrix(solid, solid, radii, p['nDim'], True)[0], 'B':kernelMatrix(fluid, solid, radii, p['nDim'])[0]}
+    matrices = interpolator.getMappingMatrices()
+    for key in sorted(references.keys()):
+        referenceMatrix = toInterfaceMatrix(references[key], comm, myid, numberPart)
+        difference = analytic.matrixDifference(matrices[key], referenceMatrix, comm)
+        cupyutil.mpiPrint('RES-FSI-AdaptiveRBF_{}: {:.3e}'.format(key, difference), comm)
+        success = success and difference < p['tollMatrix']
+        del referenceMatrix
+    del interpolator
+
+    # --- Batched TPS kernels (dense matrices) --- #
+    interpolator = cupyinterp.TPSInterpolator(manager, fluidSolver, solidSolver, comm)
+    references = {'A':kernelMatrix(solid, solid, None, p['nDim'], True)[0], 'B':kernelMatrix(fluid, solid, None, p['nDim'])[0]}
+    matrices = interpolator.getMappingMatrices()
+    for key in sorted(references.keys()):
+        referenceMatrix = toInterfaceMatrix(references[key], comm, myid, numberPart)
+        difference = analytic.matrixDifference(matrices[key], referenceMatrix, comm)
+        cupyutil.mpiPrint('RES-FSI-TPS_{}: {:.3e}'.format(key, difference), comm)
+        success = success and difference < p['tollMatrix']
+        del referenceMatrix
+    del interpolator
+
+    # --- Symmetric A : the fluid to solid transfers go through the transposed operations, A^-T B^T --- #
+    for name, Interpolator, arguments, radius in [('RBF', cupyinterp.RBFInterpolator, (p['RBFradius'], comm), 1.01*p['RBFradius']), ('TPS', cupyinterp.TPSInterpolator, (comm,), None)]:
+        interpolator = Interpolator(manager, fluidSolver, solidSolver, *arguments)
+        A, B = kernelMatrix(solid, solid, radius, p['nDim'], True)[0], kernelMatrix(fluid, solid, radius, p['nDim'])[0]
+        fluidData = analytic.randomData(len(fluid), comm)
+        solidData = FlexInterfaceData(A.shape[0], 3, comm)
+        interpolator.interpolateFluidToSolid(fluidData, solidData)
+        reference = np.linalg.solve(A.T, B.T.dot(np.random.RandomState(0).rand(3, len(fluid)).T))
+        start, stop = solidData.getOwnershipRange()
+        localError = max(np.abs(solidData.getDataArray(iDim)-reference[start:stop,iDim]).max() if stop > start else 0.0 for iDim in range(3))
+        error = (max(comm.allgather(localError)) if comm != None else localError)/np.abs(reference).max()
+        isSymmetric = interpolator.A.isSymmetric() and sorted(interpolator.getMappingMatrices().keys()) == ['A', 'B']
+        cupyutil.mpiPrint('RES-FSI-{}_transposed: {}\t{:.3e}'.format(name, isSymmetric, error), comm)
+        success = success and isSymmetric and error < p['tollTransposed']
+        del interpolator
+
+    cupyutil.mpiPrint('[Successful Run FSI]: ' + str(success), comm)
+
+    # --- Exit computation --- #
+    del manager
+    del fluidSolver
+    del solidSolver
+    cupyutil.mpiBarrier(comm)
+    return 0
+    
+
+# --- This is only accessed if running from command prompt --- #
+if __name__ == '__main__':
+
+    p = {}
+    
+    parser=OptionParser()
+    parser.add_option("--nogui", action="store_true",
+                        help="Specify if we need to use the GUI", dest="nogui", default=False)
+
+    (options, args)=parser.parse_args()
+    
+    nogui = options.nogui
+    
+    main(p, nogui)
@@ -0,0 +1,133 @@
+# -*- coding: latin-1; -*-
+
+''' 
+
+Copyright 2018 University of Lige
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License. 
+
+'''
+
+import os, sys
+
+filePath = os.path.abspath(os.path.dirname(sys.argv[0]))
+fileName = os.path.splitext(os.path.basename(__file__))[0]
+FSICouplerPath = os.path.join(os.path.dirname(__file__), '../../')
+
+sys.path.append(FSICouplerPath)
+
+from optparse import OptionParser
+
+import cupydo.utilities as cupyutil
+import cupydo.manager as cupyman
+import cupydo.interpolator as cupyinterp
+import cupydoInterfaces.AnalyticInterface as analytic
+import numpy as np
+
+def getParameters(_p):
+    # --- Input parameters --- #
+    p = {}
+    p['nDim'] = 3
+    p['computationType'] = 'steady'
+    p['nSolid'] = (15, 13)
+    p['nFluid'] = (22, 19)
+    p['scale'] = 1000.0
+    p['offset'] = 5000.0
+    p['RBFradius'] = 0.3
+    p['tollDisp'] = 1e-6
+    p['tollConservation'] = 1e-6
+    p['tollNormalization'] = 1e-6
+    p['withMPI'] = True
+    p.update(_p)
+    return p
+
+def main(_p, nogui):
+
+    p = getParameters(_p)
+
+    comm = None
+    myid = 0
+    numberPart = 0
+    rootProcess = 0
+
+    cupyutil.load(fileName, p['withMPI'], comm, myid, numberPart)
+
+    if p['withMPI']:
+        from mpi4py import MPI
+        comm = MPI.COMM_WORLD
+        myid = comm.Get_rank()
+        numberPart = comm.Get_size()
+    else:
+        comm = None
+        myid = 0
+        numberPart = 1
+
+    # --- Interface far from the unit scale : lengths of the order of scale, centred around offset --- #
+    fluidSolver, solidSolver = analytic.createSolvers(p['nSolid'], p['nFluid'], 0.1, comm, rootProcess, p['scale'], p['offset'])
+    manager = cupyman.Manager(fluidSolver, solidSolver, p['nDim'], p['computationType'], comm)
+
+    # the radii are given in the units of the interface
+    radius = p['RBFradius']*p['scale']
+    # the consistent interpolators do not conserve the loads
+    interpolators = [('RBF', cupyinterp.RBFInterpolator, (radius, comm), True),
+                     ('ConsistentRBF', cupyinterp.ConsistentRBFInterpolator, (radius, comm), False),
+                     ('TPS', cupyinterp.TPSInterpolator, (comm,), True),
+                     ('ConsistentTPS', cupyinterp.ConsistentTPSInterpolator, (comm,), False)]
+
+    # --- The transfers do not depend on the normalization of the coordinates (up to round-off) --- #
+    success = True
+    for name, Interpolator, arguments, conservative in interpolators:
+        results = []
+        for normalize in [False, True]:
+            interpolator = Interpolator(manager, fluidSolver, solidSolver, *arguments, normalizeCoordinates=normalize)
+            dispError, forceError, workError = analytic.checkTransfers(interpolator, fluidSolver, solidSolver, comm)
+            cupyutil.mpiPrint('RES-FSI-{}_normalize_{}: {:.3e}\t{:.3e}\t{:.3e}'.format(name, normalize, dispError, forceError, workError), comm)
+            success = success and dispError < p['tollDisp']*p['scale']
+            if conservative:
+                success = success and max(forceError, workError) < p['tollConservation']
+            loads = np.array(solidSolver.loads) if solidSolver != None else np.zeros((3, 0))
+            results.append((np.array(fluidSolver.displacements), loads))
+            del interpolator
+
+        # displacements of the order of scale, loads of order one
+        dispDifference = np.abs(results[1][0]-results[0][0]).max()/p['scale'] if results[0][0].size > 0 else 0.0
+        loadDifference = np.abs(results[1][1]-results[0][1]).max() if results[0][1].size > 0 else 0.0
+        dispDifference = max(comm.allgather(dispDifference)) if comm != None else dispDifference
+        loadDifference = max(comm.allgather(loadDifference)) if comm != None else loadDifference
+        cupyutil.mpiPrint('RES-FSI-{}_normalization: {:.3e}\t{:.3e}'.format(name, dispDifference, loadDifference), comm)
+        success = success and max(dispDifference, loadDifference) < p['tollNormalization']
+
+    cupyutil.mpiPrint('[Successful Run FSI]: ' + str(success), comm)
+
+    # --- Exit computation --- #
+    del manager
+    del fluidSolver
+    del solidSolver
+    cupyutil.mpiBarrier(comm)
+    return 0
+    
+
+# --- This is only accessed if running from command prompt --- #
+if __name__ == '__main__':
+
+    p = {}
+    
+    parser=OptionParser()
+    parser.add_option("--nogui", action="store_true",
+                        help="Specify if we need to use the GUI", dest="nogui", default=False)
+
+    (options, args)=parser.parse_args()
+    
+    nogui = options.nogui
+    
+    main(p, nogui)
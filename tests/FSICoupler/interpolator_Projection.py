@@ -0,0 +1,129 @@
+# -*- coding: latin-1; -*-
+
+''' 
+
+Copyright 2018 University of Lige
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License. 
+
+'''
+
+import os, sys
+
+filePath = os.path.abspath(os.path.dirname(sys.argv[0]))
+fileName = os.path.splitext(os.path.basename(__file__))[0]
+FSICouplerPath = os.path.join(os.path.dirname(__file__), '../../')
+
+sys.path.append(FSICouplerPath)
+
+from optparse import OptionParser
+
+import cupydo.utilities as cupyutil
+import cupydo.manager as cupyman
+import cupydo.interpolator as cupyinterp
+import cupydoInterfaces.AnalyticInterface as analytic
+import numpy as np
+
+def getParameters(_p):
+    # --- Input parameters --- #
+    p = {}
+    p['nDim'] = 3
+    p['computationType'] = 'steady'
+    p['nSolid'] = (9, 8)
+    p['nFluid'] = 200
+    p['mappingCacheDir'] = '.'
+    p['tollDisp'] = 1e-12
+    p['tollConservation'] = 1e-12
+    p['withMPI'] = False
+    p.update(_p)
+    return p
+
+def main(_p, nogui):
+
+    p = getParameters(_p)
+
+    comm = None
+    myid = 0
+    numberPart = 0
+    rootProcess = 0
+
+    cupyutil.load(fileName, p['withMPI'], comm, myid, numberPart)
+
+    if p['withMPI']:
+        from mpi4py import MPI
+        comm = MPI.COMM_WORLD
+        myid = comm.Get_rank()
+        numberPart = comm.Get_size()
+    else:
+        comm = None
+        myid = 0
+        numberPart = 1
+
+    # --- Fluid nodes at random positions on the solid faces (solid interface on the root process) --- #
+    X, Y, Z, faces = analytic.surfaceGrid(p['nSolid'][0], p['nSolid'][1])
+    rng = np.random.RandomState(0)
+    fluidFaces = faces[rng.randint(len(faces), size=p['nFluid'])]
+    r1, r2 = np.sqrt(rng.rand(p['nFluid'])), rng.rand(p['nFluid'])
+    barycentric = np.column_stack((1.0-r1, r1*(1.0-r2), r1*r2))
+    fX, fY, fZ = [np.sum(barycentric*coordinate[fluidFaces], axis=1) for coordinate in (X, Y, Z)]
+    fluidSolver = analytic.AnalyticFluidSolver(*analytic.partition(fX, fY, fZ, np.zeros((0,3), dtype=np.intc), myid, numberPart))
+    solidSolver = None
+    if myid == rootProcess:
+        solidSolver = analytic.AnalyticSolidSolver(X, Y, Z, faces)
+    manager = cupyman.Manager(fluidSolver, solidSolver, p['nDim'], p['computationType'], comm)
+
+    # --- Exact linear reproduction on the faces and conservation of the transfers (the matrices are stored in the mapping cache) --- #
+    interpolator = cupyinterp.ProjectionInterpolator(manager, fluidSolver, solidSolver, comm, mappingCacheDir=p['mappingCacheDir'])
+    dispError, forceError, workError = analytic.checkTransfers(interpolator, fluidSolver, solidSolver, comm)
+    cupyutil.mpiPrint('RES-FSI-Projection: {:.3e}\t{:.3e}\t{:.3e}'.format(dispError, forceError, workError), comm)
+    success = dispError < p['tollDisp'] and max(forceError, workError) < p['tollConservation']
+    success = success and analytic.isInMappingCache(interpolator)
+
+    # --- The other diagonal of the grid cells : new key of the mapping cache, new matrix --- #
+    if myid == rootProcess:
+        # the cell (a, b, c, d) is split into (a, b, c) and (a, c, d)
+        a, b, c, d = faces[0::2,0], faces[0::2,1], faces[0::2,2], faces[1::2,2]
+        solidSolver.faces = np.vstack((np.column_stack((a, b, d)), np.column_stack((b, c, d)))).astype(np.intc)
+    otherInterpolator = cupyinterp.ProjectionInterpolator(manager, fluidSolver, solidSolver, comm, mappingCacheDir=p['mappingCacheDir'])
+    isCached = otherInterpolator.getMappingSignature() == interpolator.getMappingSignature()
+    difference = analytic.matrixDifference(interpolator.H, otherInterpolator.H, comm)
+    dispError, forceError, workError = analytic.checkTransfers(otherInterpolator, fluidSolver, solidSolver, comm)
+    cupyutil.mpiPrint('RES-FSI-Projection_otherFaces: {}\t{:.3e}\t{:.3e}\t{:.3e}'.format(isCached, difference, forceError, workError), comm)
+    success = success and not isCached and difference > p['tollDisp'] and max(forceError, workError) < p['tollConservation']
+
+    cupyutil.mpiPrint('[Successful Run FSI]: ' + str(success), comm)
+
+    # --- Exit computation --- #
+    del otherInterpolator
+    del interpolator
+    del manager
+    del fluidSolver
+    del solidSolver
+    cupyutil.mpiBarrier(comm)
+    return 0
+    
+
+# --- This is only accessed if running from command prompt --- #
+if __name__ == '__main__':
+
+    p = {}
+    
+    parser=OptionParser()
+    parser.add_option("--nogui", action="store_true",
+                        help="Specify if we need to use the GUI", dest="nogui", default=False)
+
+    (options, args)=parser.parse_args()
+    
+    nogui = options.nogui
+    
+    main(p, nogui)
@@ -0,0 +1,123 @@
+# -*- coding: latin-1; -*-
+
+''' 
+
+Copyright 2018 University of Lige
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License. 
+
+'''
+
+import os, sys
+
+filePath = os.path.abspath(os.path.dirname(sys.argv[0]))
+fileName = os.path.splitext(os.path.basename(__file__))[0]
+FSICouplerPath = os.path.join(os.path.dirname(__file__), '../../')
+
+sys.path.append(FSICouplerPath)
+
+from optparse import OptionParser
+
+import cupydo.utilities as cupyutil
+import cupydo.manager as cupyman
+import cupydo.interpolator as cupyinterp
+import cupydoInterfaces.AnalyticInterface as analytic
+import numpy as np
+def getParameters(_p):
+    # --- Input parameters --- #
+    p = {}
+    p['nDim'] = 3
+    p['computationType'] = 'steady'
+    p['nSolid'] = (17, 17)
+    p['nFluid'] = (14, 13)
+    p['RBFradius'] = 5.0
+    p['tolerance'] = 1e-2
+    p['mappingCacheDir'] = '.'
+    p['tollDisp'] = 1e-10
+    p['tollConservation'] = 1e-10
+    p['withMPI'] = False
+    p.update(_p)
+    return p
+
+def main(_p, nogui):
+
+    p = getParameters(_p)
+
+    comm = None
+    myid = 0
+    numberPart = 0
+    rootProcess = 0
+
+    cupyutil.load(fileName, p['withMPI'], comm, myid, numberPart)
+
+    if p['withMPI']:
+        from mpi4py import MPI
+        comm = MPI.COMM_WORLD
+        myid = comm.Get_rank()
+        numberPart = comm.Get_size()
+    else:
+        comm = None
+        myid = 0
+        numberPart = 1
+
+    fluidSolver, solidSolver = analytic.createSolvers(p['nSolid'], p['nFluid'], 0.1, comm, rootProcess)
+    manager = cupyman.Manager(fluidSolver, solidSolver, p['nDim'], p['computationType'], comm)
+
+    # --- Linear reproduction and conservation of the transfers (the matrices are stored in the mapping cache, i.e. the workspace) --- #
+    interpolator = cupyinterp.ReducedRBFInterpolator(manager, fluidSolver, solidSolver, p['RBFradius'], p['tolerance'], mpiComm=comm, mappingCacheDir=p['mappingCacheDir'])
+    dispError, forceError, workError = analytic.checkTransfers(interpolator, fluidSolver, solidSolver, comm)
+    cupyutil.mpiPrint('RES-FSI-ReducedRBF: {}\t{:.3e}\t{:.3e}\t{:.3e}'.format(interpolator.nc, dispError, forceError, workError), comm)
+    success = dispError < p['tollDisp'] and max(forceError, workError) < p['tollConservation']
+    success = success and interpolator.nc < interpolator.ns
+
+    # --- The loads are distributed on all the solid interface nodes, not only on the centres --- #
+    nLoaded = np.count_nonzero(np.any(np.array(solidSolver.loads) != 0.0, axis=0)) if solidSolver != None else 0
+    nLoaded = int(cupyutil.mpiAllReduce(comm, nLoaded))
+    cupyutil.mpiPrint('RES-FSI-ReducedRBF_loaded: {}'.format(nLoaded), comm)
+    success = success and nLoaded == interpolator.ns
+
+    # --- The matrices loaded from the mapping cache are identical to the built ones --- #
+    success = success and analytic.isInMappingCache(interpolator)
+    cachedInterpolator = cupyinterp.ReducedRBFInterpolator(manager, fluidSolver, solidSolver, p['RBFradius'], p['tolerance'], mpiComm=comm, mappingCacheDir=p['mappingCacheDir'])
+    matrices, cachedMatrices = interpolator.getMappingMatrices(), cachedInterpolator.getMappingMatrices()
+    for name in sorted(matrices.keys()):
+        difference = analytic.matrixDifference(matrices[name], cachedMatrices[name], comm)
+        cupyutil.mpiPrint('RES-FSI-ReducedRBF_cached_{}: {:.3e}'.format(name, difference), comm)
+        success = success and difference == 0.0
+
+    cupyutil.mpiPrint('[Successful Run FSI]: ' + str(success), comm)
+
+    # --- Exit computation --- #
+    del cachedInterpolator
+    del interpolator
+    del manager
+    del fluidSolver
+    del solidSolver
+    cupyutil.mpiBarrier(comm)
+    return 0
+    
+
+# --- This is only accessed if running from command prompt --- #
+if __name__ == '__main__':
+
+    p = {}
+    
+    parser=OptionParser()
+    parser.add_option("--nogui", action="store_true",
+                        help="Specify if we need to use the GUI", dest="nogui", default=False)
+
+    (options, args)=parser.parse_args()
+    
+    nogui = options.nogui
+    
+    main(p, nogui)
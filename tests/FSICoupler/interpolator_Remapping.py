@@ -0,0 +1,132 @@
+# -*- coding: latin-1; -*-
+
+''' 
+
+Copyright 2018 University of Lige
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License. 
+
+'''
+
+import os, sys
+
+filePath = os.path.abspath(os.path.dirname(sys.argv[0]))
+fileName = os.path.splitext(os.path.basename(__file__))[0]
+FSICouplerPath = os.path.join(os.path.dirname(__file__), '../../')
+
+sys.path.append(FSICouplerPath)
+
+from optparse import OptionParser
+
+import cupydo.utilities as cupyutil
+import cupydo.manager as cupyman
+import cupydo.interpolator as cupyinterp
+import cupydoInterfaces.AnalyticInterface as analytic
+import numpy as np
+
+def getParameters(_p):
+    # --- Input parameters --- #
+    p = {}
+    p['nDim'] = 3
+    p['computationType'] = 'steady'
+    p['nSolid'] = (9, 8)
+    p['nFluid'] = (14, 13)
+    p['RBFradius'] = 0.6
+    p['patchRadius'] = 0.4
+    p['tollRebuild'] = 1e-12
+    p['withMPI'] = False
+    p.update(_p)
+    return p
+
+def main(_p, nogui):
+
+    p = getParameters(_p)
+
+    comm = None
+    myid = 0
+    numberPart = 0
+    rootProcess = 0
+
+    cupyutil.load(fileName, p['withMPI'], comm, myid, numberPart)
+
+    # the interface nodes can only be updated in serial
+    comm = None
+    myid = 0
+    numberPart = 1
+
+    # --- New fluid interface : every 7th node removed, one node moved and two nodes added (on the surface) --- #
+    X, Y, Z, faces = analytic.surfaceGrid(p['nFluid'][0], p['nFluid'][1])
+    newX, newY, newZ, newFaces = analytic.surfaceGrid(5, 5)
+    kept = np.flatnonzero(np.arange(len(X)) % 7 != 3)
+    remeshedX, remeshedY, remeshedZ = np.append(X[kept], newX[[6, 12]]), np.append(Y[kept], newY[[6, 12]]), np.append(Z[kept], newZ[[6, 12]])
+    remeshedIndices = np.append(kept, [1000, 1001])
+    remeshedX[5], remeshedY[5], remeshedZ[5] = newX[18], newY[18], newZ[18]
+
+    interpolators = [('RBF', lambda manager, fluidSolver, solidSolver : cupyinterp.RBFInterpolator(manager, fluidSolver, solidSolver, p['RBFradius'], comm)),
+                     ('TPS', lambda manager, fluidSolver, solidSolver : cupyinterp.TPSInterpolator(manager, fluidSolver, solidSolver, comm)),
+                     ('ConsistentRBF', lambda manager, fluidSolver, solidSolver : cupyinterp.ConsistentRBFInterpolator(manager, fluidSolver, solidSolver, p['RBFradius'], comm)),
+                     ('IDW', lambda manager, fluidSolver, solidSolver : cupyinterp.IDWInterpolator(manager, fluidSolver, solidSolver, mpiComm=comm)),
+                     ('Projection', lambda manager, fluidSolver, solidSolver : cupyinterp.ProjectionInterpolator(manager, fluidSolver, solidSolver, comm)),
+                     ('PU', lambda manager, fluidSolver, solidSolver : cupyinterp.PartitionOfUnityRBFInterpolator(manager, fluidSolver, solidSolver, p['patchRadius'], mpiComm=comm))]
+
+    # --- The transfers after the update of the mapping match the ones of a mapping built on the new interface --- #
+    success = True
+    for name, createInterpolator in interpolators:
+        fluidSolver, solidSolver = analytic.createSolvers(p['nSolid'], p['nFluid'], 0.1, comm, rootProcess)
+        manager = cupyman.Manager(fluidSolver, solidSolver, p['nDim'], p['computationType'], comm)
+        interpolator = createInterpolator(manager, fluidSolver, solidSolver)
+        interpolator.enableIncrementalRemapping()
+        fluidSolver.remesh(remeshedX, remeshedY, remeshedZ, remeshedIndices)
+        interpolator.updateMapping()
+        analytic.checkTransfers(interpolator, fluidSolver, solidSolver, comm)
+        displacements, loads = np.array(fluidSolver.displacements), np.array(solidSolver.loads)
+
+        rebuiltFluidSolver = analytic.AnalyticFluidSolver(remeshedX, remeshedY, remeshedZ, None, remeshedIndices)
+        rebuiltManager = cupyman.Manager(rebuiltFluidSolver, solidSolver, p['nDim'], p['computationType'], comm)
+        rebuiltInterpolator = createInterpolator(rebuiltManager, rebuiltFluidSolver, solidSolver)
+        analytic.checkTransfers(rebuiltInterpolator, rebuiltFluidSolver, solidSolver, comm)
+        dispDifference = np.abs(displacements-np.array(rebuiltFluidSolver.displacements)).max()/np.abs(displacements).max()
+        loadDifference = np.abs(loads-np.array(solidSolver.loads)).max()/np.abs(loads).max()
+
+        cupyutil.mpiPrint('RES-FSI-{}_remapped: {}\t{:.3e}\t{:.3e}'.format(name, fluidSolver.nPhysicalNodes, dispDifference, loadDifference), comm)
+        success = success and fluidSolver.nPhysicalNodes == len(remeshedIndices) and max(dispDifference, loadDifference) < p['tollRebuild']
+
+        del rebuiltInterpolator
+        del rebuiltManager
+        del interpolator
+        del manager
+
+    cupyutil.mpiPrint('[Successful Run FSI]: ' + str(success), comm)
+
+    # --- Exit computation --- #
+    del rebuiltFluidSolver
+    del fluidSolver
+    del solidSolver
+    cupyutil.mpiBarrier(comm)
+    return 0
+    
+
+# --- This is only accessed if running from command prompt --- #
+if __name__ == '__main__':
+
+    p = {}
+    
+    parser=OptionParser()
+    parser.add_option("--nogui", action="store_true",
+                        help="Specify if we need to use the GUI", dest="nogui", default=False)
+
+    (options, args)=parser.parse_args()
+    
+    nogui = options.nogui
+    
+    main(p, nogui)
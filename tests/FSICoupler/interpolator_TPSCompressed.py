@@ -0,0 +1,140 @@
+# -*- coding: latin-1; -*-
+
+''' 
+
+Copyright 2018 University of Lige
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License. 
+
+'''
+
+import os, sys
+
+filePath = os.path.abspath(os.path.dirname(sys.argv[0]))
+fileName = os.path.splitext(os.path.basename(__file__))[0]
+FSICouplerPath = os.path.join(os.path.dirname(__file__), '../../')
+
+sys.path.append(FSICouplerPath)
+
+from optparse import OptionParser
+
+import cupydo.utilities as cupyutil
+import cupydo.manager as cupyman
+import cupydo.interpolator as cupyinterp
+import cupydoInterfaces.AnalyticInterface as analytic
+import numpy as np
+
+def getParameters(_p):
+    # --- Input parameters --- #
+    p = {}
+    p['nDim'] = 3
+    p['computationType'] = 'steady'
+    p['nSolid'] = (30, 30)
+    p['nFluid'] = (45, 40)
+    p['compressionTolerance'] = 1e-6
+    p['mappingCacheDir'] = '.'
+    p['tollDisp'] = 1e-5
+    p['tollConservation'] = 1e-4
+    p['tollDense'] = 1e-5
+    p['nScaling'] = [(20, 20), (30, 30), (45, 45), (64, 64)]
+    p['maxIterations'] = 15
+    p['withMPI'] = False
+    p.update(_p)
+    return p
+
+def main(_p, nogui):
+
+    p = getParameters(_p)
+
+    comm = None
+    myid = 0
+    numberPart = 0
+    rootProcess = 0
+
+    cupyutil.load(fileName, p['withMPI'], comm, myid, numberPart)
+
+    # the compressed matrices are serial only
+    comm = None
+    myid = 0
+    numberPart = 1
+
+    fluidSolver, solidSolver = analytic.createSolvers(p['nSolid'], p['nFluid'], 0.1, comm, rootProcess)
+    manager = cupyman.Manager(fluidSolver, solidSolver, p['nDim'], p['computationType'], comm)
+
+    # --- Reference transfers with the dense matrices --- #
+    denseInterpolator = cupyinterp.TPSInterpolator(manager, fluidSolver, solidSolver, comm)
+    dispError, forceError, workError = analytic.checkTransfers(denseInterpolator, fluidSolver, solidSolver, comm)
+    cupyutil.mpiPrint('RES-FSI-TPS_dense: {:.3e}\t{:.3e}\t{:.3e}'.format(dispError, forceError, workError), comm)
+    denseDisplacements, denseLoads = np.array(fluidSolver.displacements), np.array(solidSolver.loads)
+
+    # --- Compressed transfers : linear reproduction and conservation up to the compression tolerance, close to the dense ones --- #
+    interpolator = cupyinterp.TPSInterpolator(manager, fluidSolver, solidSolver, comm, mappingCacheDir=p['mappingCacheDir'], compressed=True, compressionTolerance=p['compressionTolerance'])
+    dispError, forceError, workError = analytic.checkTransfers(interpolator, fluidSolver, solidSolver, comm)
+    dispDifference = np.abs(np.array(fluidSolver.displacements)-denseDisplacements).max()/np.abs(denseDisplacements).max()
+    # the load distribution is sensitive to the conditioning of A, it is compared through its work on a smooth field
+    X, Y, Z = solidSolver.getNodalInitialPositions()
+    smoothField = np.array([X*X, X*Y, Y*Y+Z])
+    loadDifference = abs(np.sum((np.array(solidSolver.loads)-denseLoads)*smoothField))/np.sum(np.abs(denseLoads*smoothField))
+    compressionRatio = max(interpolator.A.getCompressionRatio(), interpolator.B.getCompressionRatio())
+    cupyutil.mpiPrint('RES-FSI-TPS_compressed: {:.3e}\t{:.3e}\t{:.3e}\t{:.3e}\t{:.3e}\t{:.3f}'.format(dispError, forceError, workError, dispDifference, loadDifference, compressionRatio), comm)
+    success = dispError < p['tollDisp'] and max(forceError, workError) < p['tollConservation']
+    success = success and max(dispDifference, loadDifference) < p['tollDense'] and compressionRatio < 1.0
+
+    # --- The matrices loaded from the mapping cache are identical to the built ones --- #
+    success = success and analytic.isInMappingCache(interpolator)
+    cachedInterpolator = cupyinterp.TPSInterpolator(manager, fluidSolver, solidSolver, comm, mappingCacheDir=p['mappingCacheDir'], compressed=True, compressionTolerance=p['compressionTolerance'])
+    matrices, cachedMatrices = interpolator.getMappingMatrices(), cachedInterpolator.getMappingMatrices()
+    for name in sorted(matrices.keys()):
+        difference = analytic.matrixDifference(matrices[name], cachedMatrices[name], comm)
+        cupyutil.mpiPrint('RES-FSI-TPS_compressed_cached_{}: {:.3e}'.format(name, difference), comm)
+        success = success and difference == 0.0
+
+    # --- The number of preconditioned GMRES iterations hardly grows with the size of the interface --- #
+    for nSolid in p['nScaling']:
+        scalingFluidSolver, scalingSolidSolver = analytic.createSolvers(nSolid, (nSolid[0]+5, nSolid[1]+3), 0.1, comm, rootProcess)
+        scalingManager = cupyman.Manager(scalingFluidSolver, scalingSolidSolver, p['nDim'], p['computationType'], comm)
+        scalingInterpolator = cupyinterp.TPSInterpolator(scalingManager, scalingFluidSolver, scalingSolidSolver, comm, compressed=True, compressionTolerance=p['compressionTolerance'])
+        dispError, forceError, workError = analytic.checkTransfers(scalingInterpolator, scalingFluidSolver, scalingSolidSolver, comm)
+        nIterations = scalingInterpolator.SolverA.getIterationNumber()
+        cupyutil.mpiPrint('RES-FSI-TPS_compressed_{}: {}\t{:.3e}\t{:.3e}\t{:.3e}'.format(nSolid[0]*nSolid[1], nIterations, dispError, forceError, workError), comm)
+        success = success and 0 < nIterations <= p['maxIterations'] and dispError < p['tollDisp'] and max(forceError, workError) < p['tollConservation']
+        del scalingInterpolator
+        del scalingManager
+
+    cupyutil.mpiPrint('[Successful Run FSI]: ' + str(success), comm)
+
+    # --- Exit computation --- #
+    del cachedInterpolator
+    del interpolator
+    del denseInterpolator
+    del manager
+    del fluidSolver
+    del solidSolver
+    cupyutil.mpiBarrier(comm)
+    return 0
+    
+
+# --- This is only accessed if running from command prompt --- #
+if __name__ == '__main__':
+
+    p = {}
+    
+    parser=OptionParser()
+    parser.add_option("--nogui", action="store_true",
+                        help="Specify if we need to use the GUI", dest="nogui", default=False)
+
+    (options, args)=parser.parse_args()
+    
+    nogui = options.nogui
+    
+    main(p, nogui)
@@ -0,0 +1,129 @@
+# -*- coding: latin-1; -*-
+
+''' 
+
+Copyright 2018 University of Lige
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License. 
+
+'''
+
+import os, sys
+
+filePath = os.path.abspath(os.path.dirname(sys.argv[0]))
+fileName = os.path.splitext(os.path.basename(__file__))[0]
+FSICouplerPath = os.path.join(os.path.dirname(__file__), '../../')
+
+sys.path.append(FSICouplerPath)
+
+from optparse import OptionParser
+
+import cupydo.utilities as cupyutil
+import cupydo.manager as cupyman
+import cupydo.interpolator as cupyinterp
+import cupydo.linearSolver as cupylinsolv
+import cupydoInterfaces.AnalyticInterface as analytic
+import numpy as np
+
+def getParameters(_p):
+    # --- Input parameters --- #
+    p = {}
+    p['nDim'] = 3
+    p['computationType'] = 'steady'
+    p['nSolid'] = (30, 30)
+    p['nFluid'] = (37, 35)
+    p['RBFradius'] = 0.3
+    p['fillBound'] = 2.0
+    p['relTol'] = 1e-12
+    p['tollDisp'] = 1e-9
+    p['tollConservation'] = 1e-9
+    p['tollDirect'] = 1e-8
+    p['withMPI'] = False
+    p.update(_p)
+    return p
+
+def main(_p, nogui):
+
+    p = getParameters(_p)
+
+    comm = None
+    myid = 0
+    numberPart = 0
+    rootProcess = 0
+
+    cupyutil.load(fileName, p['withMPI'], comm, myid, numberPart)
+
+    # the factorization of the interpolation systems is serial only
+    comm = None
+    myid = 0
+    numberPart = 1
+
+    fluidSolver, solidSolver = analytic.createSolvers(p['nSolid'], p['nFluid'], 0.1, comm, rootProcess)
+    manager = cupyman.Manager(fluidSolver, solidSolver, p['nDim'], p['computationType'], comm)
+
+    # --- Direct solves with the complete factors --- #
+    directInterpolator = cupyinterp.RBFInterpolator(manager, fluidSolver, solidSolver, p['RBFradius'], comm)
+    dispError, forceError, workError = analytic.checkTransfers(directInterpolator, fluidSolver, solidSolver, comm)
+    cupyutil.mpiPrint('RES-FSI-RBF_direct: {:.3e}\t{:.3e}\t{:.3e}'.format(dispError, forceError, workError), comm)
+    success = directInterpolator.SolverA.LU != None and dispError < p['tollDisp'] and max(forceError, workError) < p['tollConservation']
+    directDisplacements, directLoads = np.array(fluidSolver.displacements), np.array(solidSolver.loads)
+
+    # --- The memory cap only leaves room for fillBound times the nonzeros of A : ILU-preconditioned GMRES --- #
+    memoryCap = cupylinsolv.LinearSolver.directSolverMemoryCap
+    cupylinsolv.LinearSolver.directSolverMemoryCap = 12.0*p['fillBound']*directInterpolator.A.getMat().nnz
+    interpolator = cupyinterp.RBFInterpolator(manager, fluidSolver, solidSolver, p['RBFradius'], comm)
+    cupylinsolv.LinearSolver.directSolverMemoryCap = memoryCap
+    interpolator.setSolverProfile({'relTol':p['relTol']})
+    dispError, forceError, workError = analytic.checkTransfers(interpolator, fluidSolver, solidSolver, comm)
+    dispDifference = np.abs(np.array(fluidSolver.displacements)-directDisplacements).max()/np.abs(directDisplacements).max()
+    loadDifference = np.abs(np.array(solidSolver.loads)-directLoads).max()/np.abs(directLoads).max()
+    cupyutil.mpiPrint('RES-FSI-RBF_capped: {:.3e}\t{:.3e}\t{:.3e}\t{:.3e}\t{:.3e}'.format(dispError, forceError, workError, dispDifference, loadDifference), comm)
+    success = success and interpolator.SolverA.LU == None and interpolator.SolverA.Precond != None
+    success = success and dispError < p['tollDisp'] and max(forceError, workError) < p['tollConservation'] and max(dispDifference, loadDifference) < p['tollDirect']
+
+    # --- Warm start : each field keeps its coefficients, so the same transfers again converge at once (at most one iteration, the true
+    # residual of the previous solution being at the level of the tolerance) --- #
+    coldIterations = interpolator.SolverA.getIterationNumber()
+    interpolator.interpolateSolidDisplacementOnFluidMesh()
+    dispIterations = interpolator.SolverA.getIterationNumber()
+    interpolator.interpolateFluidLoadsOnSolidMesh()
+    loadIterations = interpolator.SolverA.getIterationNumber()
+    cupyutil.mpiPrint('RES-FSI-RBF_warm_start: {}\t{}\t{}'.format(coldIterations, dispIterations, loadIterations), comm)
+    success = success and coldIterations > 1 and max(dispIterations, loadIterations) <= 1
+
+    cupyutil.mpiPrint('[Successful Run FSI]: ' + str(success), comm)
+
+    # --- Exit computation --- #
+    del interpolator
+    del directInterpolator
+    del manager
+    del fluidSolver
+    del solidSolver
+    cupyutil.mpiBarrier(comm)
+    return 0
+    
+
+# --- This is only accessed if running from command prompt --- #
+if __name__ == '__main__':
+
+    p = {}
+    
+    parser=OptionParser()
+    parser.add_option("--nogui", action="store_true",
+                        help="Specify if we need to use the GUI", dest="nogui", default=False)
+
+    (options, args)=parser.parse_args()
+    
+    nogui = options.nogui
+    
+    main(p, nogui)
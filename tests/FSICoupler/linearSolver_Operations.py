@@ -0,0 +1,162 @@
+# -*- coding: latin-1; -*-
+
+''' 
+
+Copyright 2018 University of Lige
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License. 
+
+'''
+
+import os, sys
+
+filePath = os.path.abspath(os.path.dirname(sys.argv[0]))
+fileName = os.path.splitext(os.path.basename(__file__))[0]
+FSICouplerPath = os.path.join(os.path.dirname(__file__), '../../')
+
+sys.path.append(FSICouplerPath)
+
+from optparse import OptionParser
+
+import cupydo.utilities as cupyutil
+import cupydo.linearSolver as cupylinsolv
+import cupydoInterfaces.AnalyticInterface as analytic
+from cupydo.interfaceData import InterfaceMatrix, FlexInterfaceData
+import numpy as np
+
+def getParameters(_p):
+    # --- Input parameters --- #
+    p = {}
+    p['size'] = 240
+    p['density'] = 0.05
+    p['relTol'] = 1e-12
+    p['tollSolve'] = 1e-9
+    p['withMPI'] = True
+    p.update(_p)
+    return p
+
+def gatherData(data):
+    """
+    Returns the (global) values of data, nPoint X nDim.
+    """
+
+    localValues = np.column_stack([data.getDataArray(iDim) for iDim in range(data.getDim())])
+    if data.getComm() != None:
+        return np.vstack(data.getComm().allgather(localValues))
+
+    return localValues
+
+def solveError(solver, M, n, comm, transpose=False):
+    """
+    Relative error of the solution of the (transposed) system for random right-hand sides with 3 components, solved at once.
+    """
+
+    B = analytic.randomData(n, comm)
+    X = FlexInterfaceData(n, 3, comm)
+    if transpose:
+        solver.solveTranspose(B, X)
+        M = M.T
+    else:
+        solver.solve(B, X)
+    reference = np.linalg.solve(M, gatherData(B))
+
+    return np.abs(gatherData(X)-reference).max()/np.abs(reference).max()
+
+def main(_p, nogui):
+
+    p = getParameters(_p)
+
+    comm = None
+    myid = 0
+    numberPart = 0
+    rootProcess = 0
+
+    cupyutil.load(fileName, p['withMPI'], comm, myid, numberPart)
+
+    if p['withMPI']:
+        from mpi4py import MPI
+        comm = MPI.COMM_WORLD
+        myid = comm.Get_rank()
+        numberPart = comm.Get_size()
+    else:
+        comm = None
+        myid = 0
+        numberPart = 1
+
+    # --- Sparse, non symmetric and diagonally dominant matrix, each rank filling a block of rows --- #
+    n = p['size']
+    rng = np.random.RandomState(0)
+    M = rng.rand(n, n)*(rng.rand(n, n) < p['density'])
+    M += np.diag(1.0+np.abs(M).sum(axis=1))
+    matrix = InterfaceMatrix((n, n), comm)
+    matrix.createSparse(int(np.count_nonzero(M, axis=1).max()), int(np.count_nonzero(M, axis=1).max()))
+    for iRow in np.array_split(np.arange(n), numberPart)[myid]:
+        indices = np.flatnonzero(M[iRow]).astype(np.intc)
+        matrix.setRowValues(int(iRow), indices, M[iRow,indices].copy())
+    matrix.assemble()
+
+    # --- Solves (and transposed solves) of all the components at once, direct and iterative (no room for the factors in serial) --- #
+    success = True
+    memoryCap = cupylinsolv.LinearSolver.directSolverMemoryCap
+    for name, cap in [('direct', memoryCap), ('iterative', 0.0)]:
+        cupylinsolv.LinearSolver.directSolverMemoryCap = cap
+        solver = cupylinsolv.LinearSolver(matrix, comm, {'relTol':p['relTol']})
+        cupylinsolv.LinearSolver.directSolverMemoryCap = memoryCap
+        errors = [solveError(solver, M, n, comm), solveError(solver, M, n, comm, True)]
+        cupyutil.mpiPrint('RES-FSI-LinearSolver_{}: {:.3e}\t{:.3e}'.format(name, errors[0], errors[1]), comm)
+        success = success and max(errors) < p['tollSolve']
+        if comm == None:
+            success = success and (solver.LU != None) == (name == 'direct')
+        del solver
+
+    # --- Solver profiles (Krylov solver, preconditioner, tolerances), the direct solve being forced by 'pc':'LU' in serial --- #
+    profiles = [('GMRES_ASM', {'ksp':'GMRES', 'pc':'ASM', 'subPc':'ILU', 'overlap':1}),
+                ('BCGS_BJACOBI', {'ksp':'BCGS', 'pc':'BJACOBI', 'subPc':'ILU'}),
+                ('FGMRES_ILU', {'ksp':'FGMRES', 'pc':'ILU'})]
+    # the parallel LU needs an external package (MUMPS by default)
+    if comm == None or numberPart == 1:
+        profiles.append(('LU', {'ksp':'PREONLY', 'pc':'LU'}))
+    for name, profile in profiles:
+        profile.update({'relTol':p['relTol'], 'maxIt':500})
+        cupylinsolv.LinearSolver.directSolverMemoryCap = 0.0
+        solver = cupylinsolv.LinearSolver(matrix, comm, profile)
+        cupylinsolv.LinearSolver.directSolverMemoryCap = memoryCap
+        errors = [solveError(solver, M, n, comm), solveError(solver, M, n, comm, True)]
+        cupyutil.mpiPrint('RES-FSI-LinearSolver_{}: {:.3e}\t{:.3e}'.format(name, errors[0], errors[1]), comm)
+        success = success and max(errors) < p['tollSolve']
+        if comm == None:
+            success = success and (solver.LU != None) == (name == 'LU') and solver.relTol == p['relTol'] and solver.maxInt == 500
+        del solver
+
+    cupyutil.mpiPrint('[Successful Run FSI]: ' + str(success), comm)
+
+    # --- Exit computation --- #
+    del matrix
+    cupyutil.mpiBarrier(comm)
+    return 0
+    
+
+# --- This is only accessed if running from command prompt --- #
+if __name__ == '__main__':
+
+    p = {}
+    
+    parser=OptionParser()
+    parser.add_option("--nogui", action="store_true",
+                        help="Specify if we need to use the GUI", dest="nogui", default=False)
+
+    (options, args)=parser.parse_args()
+    
+    nogui = options.nogui
+    
+    main(p, nogui)
@@ -0,0 +1,133 @@
+# -*- coding: latin-1; -*-
+
+''' 
+
+Copyright 2018 University of Lige
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License. 
+
+'''
+
+import os, sys
+
+filePath = os.path.abspath(os.path.dirname(sys.argv[0]))
+fileName = os.path.splitext(os.path.basename(__file__))[0]
+FSICouplerPath = os.path.join(os.path.dirname(__file__), '../../')
+
+sys.path.append(FSICouplerPath)
+
+from optparse import OptionParser
+
+import cupydo.utilities as cupyutil
+from cupydo.searchTree import SearchTree
+import numpy as np
+
+def getParameters(_p):
+    # --- Input parameters --- #
+    p = {}
+    p['nPoint'] = 1500
+    p['nQuery'] = 400
+    p['k'] = 7
+    p['radius'] = 0.15
+    p['tollDistance'] = 1e-12
+    p['withMPI'] = False
+    p.update(_p)
+    return p
+
+def main(_p, nogui):
+
+    p = getParameters(_p)
+
+    comm = None
+    myid = 0
+    numberPart = 0
+    rootProcess = 0
+
+    cupyutil.load(fileName, p['withMPI'], comm, myid, numberPart)
+
+    # the search trees are local to the ranks
+    comm = None
+    myid = 0
+    numberPart = 1
+
+    # --- Random points on a curved surface, queries around it --- #
+    rng = np.random.RandomState(0)
+    points = rng.rand(p['nPoint'], 3)
+    points[:,2] = 0.1*np.sin(3.0*points[:,0])
+    queries = rng.rand(p['nQuery'], 3)-[0.1, 0.1, 0.5]
+    tree = SearchTree(points[:,0], points[:,1], points[:,2])
+    distances = np.sqrt(np.sum((queries[:,np.newaxis,:]-points[np.newaxis,:,:])**2, axis=2))
+    success = tree.getSize() == p['nPoint']
+
+    # --- Nearest point and k nearest points, sorted by distance --- #
+    ids, dist = tree.nearest(queries[:,0], queries[:,1], queries[:,2])
+    nearestError = max(np.abs(dist-distances.min(axis=1)).max(), np.abs(distances[np.arange(p['nQuery']),ids]-dist).max())
+    indptr, ids, dist = tree.kNearest(queries[:,0], queries[:,1], queries[:,2], p['k'])
+    kNearestError = 0.0
+    isSorted = np.array_equal(indptr, p['k']*np.arange(p['nQuery']+1))
+    for iQuery in range(p['nQuery']):
+        rowIds, rowDist = ids[indptr[iQuery]:indptr[iQuery+1]], dist[indptr[iQuery]:indptr[iQuery+1]]
+        isSorted = isSorted and np.all(np.diff(rowDist) >= 0.0) and len(set(rowIds)) == len(rowIds)
+        kNearestError = max(kNearestError, np.abs(rowDist-np.sort(distances[iQuery])[:p['k']]).max(), np.abs(distances[iQuery,rowIds]-rowDist).max())
+    cupyutil.mpiPrint('RES-FSI-SearchTree_nearest: {:.3e}\t{:.3e}\t{}'.format(nearestError, kNearestError, isSorted), comm)
+    success = success and max(nearestError, kNearestError) < p['tollDistance'] and isSorted
+
+    # --- Ball queries with a uniform radius and with one radius per query point --- #
+    for name, radius in [('uniform', p['radius']), ('variable', p['radius']*(0.5+rng.rand(p['nQuery'])))]:
+        indptr, ids, dist = tree.ball(queries[:,0], queries[:,1], queries[:,2], radius)
+        radii = np.broadcast_to(radius, (p['nQuery'],))
+        isExact = len(indptr) == p['nQuery']+1
+        for iQuery in range(p['nQuery']):
+            rowIds = ids[indptr[iQuery]:indptr[iQuery+1]]
+            # the points at the radius (up to round-off) may be returned or not
+            inside = set(np.flatnonzero(distances[iQuery] < radii[iQuery]*(1.0-1e-12)))
+            maybe = set(np.flatnonzero(distances[iQuery] <= radii[iQuery]*(1.0+1e-12)))
+            isExact = isExact and inside <= set(rowIds) <= maybe and len(set(rowIds)) == len(rowIds)
+            if len(rowIds) > 0:
+                isExact = isExact and np.abs(distances[iQuery,rowIds]-dist[indptr[iQuery]:indptr[iQuery+1]]).max() < p['tollDistance']
+        cupyutil.mpiPrint('RES-FSI-SearchTree_ball_{}: {}\t{}'.format(name, isExact, len(ids)), comm)
+        success = success and isExact and len(ids) > 0
+
+    # --- Clusters : the nodes of the tree hold their points and the children split them --- #
+    perm, nodes = tree.clusters()
+    isPartition = np.array_equal(np.sort(perm), np.arange(p['nPoint']))
+    for start, stop, boxMin, boxMax, children in nodes:
+        clusterPoints = points[perm[start:stop]]
+        isPartition = isPartition and np.all(clusterPoints >= boxMin-1e-14) and np.all(clusterPoints <= boxMax+1e-14)
+        if len(children) > 0:
+            isPartition = isPartition and nodes[children[0]][0] == start and nodes[children[1]][1] == stop and nodes[children[0]][1] == nodes[children[1]][0]
+    cupyutil.mpiPrint('RES-FSI-SearchTree_clusters: {}\t{}'.format(isPartition, len(nodes)), comm)
+    success = success and isPartition and nodes[0][0] == 0 and nodes[0][1] == p['nPoint']
+
+    cupyutil.mpiPrint('[Successful Run FSI]: ' + str(success), comm)
+
+    # --- Exit computation --- #
+    del tree
+    cupyutil.mpiBarrier(comm)
+    return 0
+    
+
+# --- This is only accessed if running from command prompt --- #
+if __name__ == '__main__':
+
+    p = {}
+    
+    parser=OptionParser()
+    parser.add_option("--nogui", action="store_true",
+                        help="Specify if we need to use the GUI", dest="nogui", default=False)
+
+    (options, args)=parser.parse_args()
+    
+    nogui = options.nogui
+    
+    main(p, nogui)
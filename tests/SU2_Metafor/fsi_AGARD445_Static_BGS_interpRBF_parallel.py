@@ -104,9 +104,9 @@ def main(_p, nogui):
     # --- Initialize the interpolator --- #
     interpolator = cupyinterp.RBFInterpolator(manager, FluidSolver, SolidSolver, p['rbfRadius'], comm)
     solverList = interpolator.getLinearSolvers()
-    for ii in range(2):
-        solverList[ii].setMaxNumberIterations(1000)
-        solverList[ii].setPreconditioner("JACOBI")
+    for solver in solverList:
+        solver.setMaxNumberIterations(1000)
+        solver.setPreconditioner("JACOBI")
 
     # --- Initialize the FSI criterion --- #
     criterion = cupycrit.DispNormCriterion(p['tollFSI'])